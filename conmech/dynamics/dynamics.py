@@ -5,12 +5,21 @@ import jax.experimental.sparse
 import jax.interpreters.xla
 import jax.numpy as jnp
 import jax.scipy
-import numba
 import numpy as np
+import scipy.sparse
 from jax import lax
 
-from conmech.dynamics.factory.dynamics_factory_method import ConstMatrices, get_dynamics
-from conmech.helpers import cmh, jxh
+from conmech.dynamics.factory.dynamics_factory_method import (
+    ConstMatrices,
+    add_dynamics_update,
+    add_in_pattern,
+    complete_pattern,
+    get_changed_elements,
+    get_dynamics,
+    get_dynamics_update,
+    get_union_pattern,
+)
+from conmech.helpers import jxh, trh
 from conmech.helpers.config import SimulationConfig
 from conmech.helpers.lnh import complete_base
 from conmech.mesh.boundaries_description import BoundariesDescription
@@ -24,19 +33,6 @@ from conmech.solvers.optimization.schur_complement import SchurComplement
 from conmech.state.body_position import BodyPosition
 
 
-@numba.njit
-def get_edges_features_list_numba(edges_number, edges_features_matrix):
-    nodes_count = len(edges_features_matrix[0])
-    edges_features = np.zeros((edges_number + nodes_count, 8))
-    edge_id = 0
-    for i in range(nodes_count):
-        for j in range(nodes_count):
-            if np.any(edges_features_matrix[i, j]):
-                edges_features[edge_id] = edges_features_matrix[i, j]
-                edge_id += 1
-    return edges_features
-
-
 # TODO: #75
 @dataclass
 class SolverMatrices:
@@ -51,10 +47,11 @@ class SolverMatrices:
 
         self.lhs_sparse_jax: jax.experimental.sparse.BCOO
         self.lhs_acceleration_jax: np.ndarray
-        self.lhs_preconditioner_jax: np.ndarray
+        self._lhs_preconditioner_jax = None
         self.contact_x_contact: np.ndarray
         self.free_x_free: np.ndarray
 
+        self.lhs_temperature_sparse: scipy.sparse.csr_matrix
         self.lhs_temperature_sparse_jax: jax.experimental.sparse.BCOO  # sparse.base.spmatrix
         self.temperature_boundary: np.ndarray
         self.temperature_free_x_contact: np.ndarray
@@ -66,6 +63,19 @@ class SolverMatrices:
     def lhs(self):
         return jxh.to_dense_np(self.lhs_sparse)
 
+    @property
+    def lhs_preconditioner_jax(self):
+        # Jacobi preconditioner computed when first used after LHS changed
+        # TODO: Check SSOR / Incomplete Cholesky
+        if self._lhs_preconditioner_jax is None:
+            self._lhs_preconditioner_jax = jxh.to_jax_sparse(
+                jxh.to_inverse_diagonal(self.lhs_sparse)
+            )
+        return self._lhs_preconditioner_jax
+
+    def reset_lhs_preconditioner(self):
+        self._lhs_preconditioner_jax = None
+
     @property
     def lhs_temperature(self):
         return jxh.to_dense_np(self.lhs_temperature_sparse_jax)
@@ -76,6 +86,8 @@ class DynamicsConfiguration:
     create_in_subprocess: bool = False
     with_lhs: bool = False
     with_schur: bool = False
+    # matrices of moved nodes reassembled only on changed elements
+    incremental_assembly: bool = False
 
 
 def _get_jac(value, dx_big_jax):
@@ -132,6 +144,27 @@ def _get_rotation_jax(displacement, dx_big):
     return final_rotation, state
 
 
+def complete_base_jax(base_seed):
+    # Gram-Schmidt orthonormalization as in lnh.complete_base
+    vectors = jxh.normalize_euclidean(base_seed)
+    b0 = vectors[0]
+    b1 = vectors[1] - (vectors[1] @ b0) * b0
+    if len(vectors) == 2:
+        base = jnp.stack((b0, b1))
+    else:
+        base = jnp.stack((b0, b1, jnp.cross(b0, b1)))
+    return jxh.normalize_euclidean(base)
+
+
+def get_rotation_jax(displacement, dx_big):
+    final_rotation, state = _get_rotation_jax(displacement, dx_big)
+    return complete_base_jax(final_rotation), state.success
+
+
+# above this fraction of changed elements all matrices are assembled again
+MAX_UPDATED_ELEMENTS_FRACTION = 0.5
+
+
 class Dynamics(BodyPosition):
     def __init__(
         self,
@@ -153,6 +186,9 @@ class Dynamics(BodyPosition):
         self.simulation_config = simulation_config
         self.with_lhs = dynamics_config.with_lhs
         self.with_schur = dynamics_config.with_schur
+        self.incremental_assembly = dynamics_config.incremental_assembly
+        # nodes of last assembly, kept in incremental assembly
+        self.assembled_nodes: Optional[np.ndarray] = None
 
         self.solver_cache = SolverMatrices()
         self.matrices = ConstMatrices()
@@ -180,96 +216,184 @@ class Dynamics(BodyPosition):
     #     # self.reinitialize_matrices()  ###!!!
 
     def remesh(self, boundaries_description, create_in_subprocess):
-        self.mesh.remesh(boundaries_description, create_in_subprocess)
+        super().remesh(boundaries_description, create_in_subprocess)
+        self.assembled_nodes = None
         self.reinitialize_matrices()
+        self.set_rotation()
+
+    def get_lhs(self, matrices: ConstMatrices):
+        return (
+            matrices.acceleration_operator
+            + (matrices.viscosity + matrices.elasticity * self.time_step)
+            * self.time_step
+        )
+
+    def get_lhs_temperature(self, matrices: ConstMatrices):
+        i = self.independent_indices
+        return (1 / self.time_step) * matrices.acceleration_operator[
+            i, i
+        ] + matrices.thermal_conductivity[i, i]
+
+    @property
+    def with_lhs_sparse(self):
+        return (
+            self.with_lhs
+            or self.simulation_config.use_linear_solver
+            or self.simulation_config.use_lhs_preconditioner
+        )
 
     def reinitialize_matrices(self):
+        nodes = self.moved_nodes
+        if self.assembled_nodes is not None:
+            element_indices = get_changed_elements(
+                elements=self.elements, old_nodes=self.assembled_nodes, nodes=nodes
+            )
+            if len(element_indices) == 0:
+                return
+            if len(
+                element_indices
+            ) <= MAX_UPDATED_ELEMENTS_FRACTION * self.elements_count and (
+                self.update_matrices(element_indices=element_indices, nodes=nodes)
+            ):
+                self.assembled_nodes = nodes
+                return
+
         # print("Initializing matrices...")
-        def fun_dyn():
-            return get_dynamics(
+        with trh.span("assembly"):
+            self.matrices = get_dynamics(
                 elements=self.elements,
-                nodes=self.moved_nodes,
+                nodes=nodes,
                 body_prop=self.body_prop,
                 independent_indices=slice(
                     self.nodes_count
                 ),  # self.independent_indices,
+                complete_patterns=self.incremental_assembly,
             )
-
-        self.matrices = cmh.profile(fun_dyn, baypass=True)
+        self.assembled_nodes = nodes if self.incremental_assembly else None
 
         self.solver_cache.lhs_acceleration_jax = jxh.to_jax_sparse(
             self.matrices.acceleration_operator
         )
 
         if self.with_temperature:
-            i = self.independent_indices
-
+            lhs_temperature = self.get_lhs_temperature(self.matrices)
+            if self.incremental_assembly:
+                lhs_temperature = complete_pattern(
+                    lhs_temperature,
+                    get_union_pattern(
+                        self.matrices.acceleration_operator[
+                            self.independent_indices, self.independent_indices
+                        ],
+                        self.matrices.thermal_conductivity[
+                            self.independent_indices, self.independent_indices
+                        ],
+                    ),
+                )
+            self.solver_cache.lhs_temperature_sparse = lhs_temperature
             self.solver_cache.lhs_temperature_sparse_jax = jxh.to_jax_sparse(
-                (1 / self.time_step) * self.matrices.acceleration_operator[i, i]
-                + self.matrices.thermal_conductivity[i, i]
+                lhs_temperature
             )
 
-        if (
-            self.with_lhs
-            or self.simulation_config.use_linear_solver
-            or self.simulation_config.use_lhs_preconditioner
-        ):
+        if self.with_lhs_sparse:
             print("Creating LHS...")
-            self.solver_cache.lhs_sparse = (
-                self.matrices.acceleration_operator
-                + (self.matrices.viscosity + self.matrices.elasticity * self.time_step)
-                * self.time_step
+            lhs_sparse = self.get_lhs(self.matrices)
+            if self.incremental_assembly:
+                lhs_sparse = complete_pattern(
+                    lhs_sparse,
+                    get_union_pattern(
+                        self.matrices.acceleration_operator,
+                        self.matrices.viscosity,
+                        self.matrices.elasticity,
+                    ),
+                )
+            self.solver_cache.lhs_sparse = lhs_sparse
+            self.solver_cache.lhs_sparse_jax = jxh.to_jax_sparse(lhs_sparse)
+            self.solver_cache.reset_lhs_preconditioner()
+
+        if self.with_schur:
+            self.set_schur_matrices()
+
+    def update_matrices(self, element_indices: np.ndarray, nodes: np.ndarray):
+        """
+        Adds change of contributions of elements with element_indices to matrices
+        in place; returns False if sparsity pattern would change
+        """
+        with trh.span("assembly"):
+            update = get_dynamics_update(
+                elements=self.elements,
+                old_nodes=self.assembled_nodes,
+                nodes=nodes,
+                body_prop=self.body_prop,
+                independent_indices=slice(self.nodes_count),
+                element_indices=element_indices,
             )
+            if not add_dynamics_update(self.matrices, update, element_indices):
+                return False
 
-            self.solver_cache.lhs_sparse_jax = jxh.to_jax_sparse(
-                self.solver_cache.lhs_sparse
+        self.solver_cache.lhs_acceleration_jax = jxh.replace_jax_sparse_data(
+            self.solver_cache.lhs_acceleration_jax, self.matrices.acceleration_operator
+        )
+        if self.with_temperature:
+            if not add_in_pattern(
+                self.solver_cache.lhs_temperature_sparse,
+                self.get_lhs_temperature(update),
+            ):
+                return False
+            self.solver_cache.lhs_temperature_sparse_jax = jxh.replace_jax_sparse_data(
+                self.solver_cache.lhs_temperature_sparse_jax,
+                self.solver_cache.lhs_temperature_sparse,
             )
-            # Calculating Jacobi preconditioner
-            # TODO: Check SSOR / Incomplete Cholesky
-            self.solver_cache.lhs_preconditioner_jax = jxh.to_jax_sparse(
-                jxh.to_inverse_diagonal(self.solver_cache.lhs_sparse)
+        if self.with_lhs_sparse:
+            if not add_in_pattern(self.solver_cache.lhs_sparse, self.get_lhs(update)):
+                return False
+            self.solver_cache.lhs_sparse_jax = jxh.replace_jax_sparse_data(
+                self.solver_cache.lhs_sparse_jax, self.solver_cache.lhs_sparse
             )
-
+            self.solver_cache.reset_lhs_preconditioner()
         if self.with_schur:
-            print("Creating Schur matrices...")
-            # lhs_dense = self.solver_cache.lhs_sparse.todense()
+            self.set_schur_matrices()
+        return True
+
+    def set_schur_matrices(self):
+        print("Creating Schur matrices...")
+        # lhs_dense = self.solver_cache.lhs_sparse.todense()
+        (
+            self.solver_cache.contact_x_contact,
+            self.solver_cache.free_x_contact,
+            self.solver_cache.contact_x_free,
+            self.solver_cache.free_x_free,
+            self.solver_cache.lhs_boundary,
+            self.solver_cache.free_x_free_inverted,
+        ) = SchurComplement.calculate_schur_complement_matrices_jax(
+            matrix=self.solver_cache.lhs_sparse,
+            dimension=self.dimension,
+            contact_indices=self.contact_indices,
+            free_indices=self.free_indices,  ###
+        )
+
+        free_x_free_inverted = jax.scipy.linalg.inv(
+            self.solver_cache.free_x_free.todense()
+        )
+        self.solver_cache.lhs_boundary = (
+            self.solver_cache.contact_x_contact.todense()
+            - self.solver_cache.contact_x_free.todense()
+            @ free_x_free_inverted
+            @ self.solver_cache.free_x_contact.todense()
+        )
+
+        if self.with_temperature:
             (
-                self.solver_cache.contact_x_contact,
-                self.solver_cache.free_x_contact,
-                self.solver_cache.contact_x_free,
-                self.solver_cache.free_x_free,
-                self.solver_cache.lhs_boundary,
-                self.solver_cache.free_x_free_inverted,
-            ) = SchurComplement.calculate_schur_complement_matrices_jax(
-                matrix=self.solver_cache.lhs_sparse,
-                dimension=self.dimension,
+                self.solver_cache.temperature_boundary,
+                self.solver_cache.temperature_free_x_contact,
+                self.solver_cache.temperature_contact_x_free,
+                self.solver_cache.temperature_free_x_free,
+                self.solver_cache.temperature_free_x_free_inv,
+            ) = SchurComplement.calculate_schur_complement_matrices_np(
+                matrix=self.solver_cache.lhs_temperature,
+                dimension=1,
                 contact_indices=self.contact_indices,
-                free_indices=self.free_indices,  ###
-            )
-
-            free_x_free_inverted = jax.scipy.linalg.inv(
-                self.solver_cache.free_x_free.todense()
+                free_indices=self.free_indices,
             )
-            self.solver_cache.lhs_boundary = (
-                self.solver_cache.contact_x_contact.todense()
-                - self.solver_cache.contact_x_free.todense()
-                @ free_x_free_inverted
-                @ self.solver_cache.free_x_contact.todense()
-            )
-
-            if self.with_temperature:
-                (
-                    self.solver_cache.temperature_boundary,
-                    self.solver_cache.temperature_free_x_contact,
-                    self.solver_cache.temperature_contact_x_free,
-                    self.solver_cache.temperature_free_x_free,
-                    self.solver_cache.temperature_free_x_free_inv,
-                ) = SchurComplement.calculate_schur_complement_matrices_np(
-                    matrix=self.solver_cache.lhs_temperature,
-                    dimension=1,
-                    contact_indices=self.contact_indices,
-                    free_indices=self.free_indices,
-                )
 
     @property
     def volume_at_nodes(self):
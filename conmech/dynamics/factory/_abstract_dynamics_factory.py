@@ -1,24 +1,60 @@
-from ctypes import ArgumentError
-from typing import Tuple
+from typing import List, Tuple
 
 import numba
 import numpy as np
+import scipy.sparse
 
 
 @numba.njit
-def get_coo_sparse_data_numba(keys, values):
-    size = len(values)
-    if size < 0:
-        raise ArgumentError
-    feature_matrix_count = len(values[0])
-    row = np.zeros(size, dtype=np.int64)
-    col = np.zeros(size, dtype=np.int64)
-    data = np.zeros((feature_matrix_count, size), dtype=np.float64)
-    for index in range(size):
-        row[index], col[index] = keys[index]
-        data[:, index] = values[index]
-        index += 1
-    return row, col, data
+def get_adjacency_numba(elements, nodes_count):
+    # sorted indices of nodes sharing element with every node, diagonal included
+    node_elements_indptr = np.zeros(nodes_count + 1, dtype=np.int64)
+    for node in elements.ravel():
+        node_elements_indptr[node + 1] += 1
+    node_elements_indptr = np.cumsum(node_elements_indptr)
+    node_elements = np.empty(node_elements_indptr[-1], dtype=np.int64)
+    filled = node_elements_indptr[:-1].copy()
+    for element_index, element in enumerate(elements):
+        for node in element:
+            node_elements[filled[node]] = element_index
+            filled[node] += 1
+
+    indptr = np.zeros(nodes_count + 1, dtype=np.int64)
+    marker = np.full(nodes_count, -1, dtype=np.int64)
+    for node in range(nodes_count):
+        count = 0
+        for index in range(node_elements_indptr[node], node_elements_indptr[node + 1]):
+            for other_node in elements[node_elements[index]]:
+                if marker[other_node] != node:
+                    marker[other_node] = node
+                    count += 1
+        indptr[node + 1] = indptr[node] + count
+
+    indices = np.empty(indptr[-1], dtype=np.int64)
+    marker[:] = -1
+    for node in range(nodes_count):
+        position = indptr[node]
+        for index in range(node_elements_indptr[node], node_elements_indptr[node + 1]):
+            for other_node in elements[node_elements[index]]:
+                if marker[other_node] != node:
+                    marker[other_node] = node
+                    indices[position] = other_node
+                    position += 1
+        indices[indptr[node] : position] = np.sort(indices[indptr[node] : position])
+    return indptr, indices
+
+
+def to_index_dtype(array: np.ndarray):
+    # indices of scipy sparse matrices, int32 when values fit
+    if len(array) == 0 or array.max() < np.iinfo(np.int32).max:
+        return array.astype(np.int32, copy=False)
+    return array
+
+
+@numba.njit
+def get_position_numba(indptr, indices, row, column):
+    start = indptr[row]
+    return start + np.searchsorted(indices[start : indptr[row + 1]], column)
 
 
 class AbstractDynamicsFactory:
@@ -26,9 +62,48 @@ class AbstractDynamicsFactory:
     def dimension(self) -> int:
         raise NotImplementedError()
 
-    def get_edges_features_dictionary(self, elements, nodes) -> Tuple:
+    def get_edges_features(self, elements, nodes, indptr, indices) -> Tuple:
         raise NotImplementedError()
 
+    def get_edges_features_matrices(
+        self, elements: np.ndarray, nodes: np.ndarray
+    ) -> Tuple[List[scipy.sparse.csr_matrix], np.ndarray, scipy.sparse.csr_matrix]:
+        """
+        Sparse matrix of every edge feature, volumes of elements and derivatives
+        of shape functions; elements are added one by one to data of CSR pattern
+        """
+        indptr, indices = get_adjacency_numba(elements, len(nodes))
+        edges_features, element_initial_volume, d_phi = self.get_edges_features(
+            elements, nodes, indptr, indices
+        )
+        # all matrices share index arrays
+        indptr, indices = to_index_dtype(indptr), to_index_dtype(indices)
+        shape = (len(nodes), len(nodes))
+        edges_features_matrices = [
+            scipy.sparse.csr_matrix((data, indices, indptr), shape=shape)
+            for data in edges_features
+        ]
+        return (
+            edges_features_matrices,
+            element_initial_volume,
+            self.to_dx_matrix(d_phi, elements, nodes_count=len(nodes)),
+        )
+
+    def to_dx_matrix(self, d_phi, elements, nodes_count: int):
+        # blocks of derivatives in every direction, row of element in every block
+        elements_count, element_size = elements.shape
+        rows_count = self.dimension * elements_count
+        dx_big = scipy.sparse.csr_matrix(
+            (
+                d_phi.reshape(-1),
+                to_index_dtype(np.tile(elements.reshape(-1), self.dimension)),
+                to_index_dtype(np.arange(rows_count + 1) * element_size),
+            ),
+            shape=(rows_count, nodes_count),
+        )
+        dx_big.sort_indices()
+        return dx_big
+
     def calculate_constitutive_matrices(self, W, mu, lambda_):
         raise NotImplementedError()
 
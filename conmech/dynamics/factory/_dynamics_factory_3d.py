@@ -4,7 +4,7 @@ import scipy.sparse
 
 from conmech.dynamics.factory._abstract_dynamics_factory import (
     AbstractDynamicsFactory,
-    get_coo_sparse_data_numba,
+    get_position_numba,
 )
 
 DIMENSION = 3
@@ -17,135 +17,47 @@ VOLUME_DIVIDER = 6
 
 
 @numba.njit
-def get_edges_features_dictionary_numba(elements, nodes):
+def get_edges_features_numba(elements, nodes, indptr, indices):
     # integral of phi over the element (in 2D: 1/3, in 3D: 1/4)
+    # features of edges added in place at positions of CSR pattern
     elements_count, element_size = elements.shape
 
-    edges_features_dict = {}
+    edges_features = np.zeros((FEATURE_MATRIX_COUNT, len(indices)))
     element_initial_volume = np.zeros(elements_count)
-    dx_dict = {}
+    d_phi = np.zeros((DIMENSION, elements_count, element_size))
 
     for element_index in range(elements_count):  # TODO: #65 prange?
         element = elements[element_index]
         element_nodes = nodes[element]
 
-        # TODO: #65 Get rid of repetition (?)
         for i in range(element_size):
             i_integrals = get_integral_parts_numba(element_nodes, i)
-            i_d_phi_vec = i_integrals[:DIMENSION]
-            element_volume = i_integrals[DIMENSION]
-            # TODO: #65 Avoid repetition
-            element_initial_volume[element_index] = element_volume
-            key = element_index, element[i]
-            dx_dict[key] = i_d_phi_vec
+            for k in range(DIMENSION):
+                d_phi[k, element_index, i] = i_integrals[k]
+            element_initial_volume[element_index] = i_integrals[DIMENSION]
+        element_volume = element_initial_volume[element_index]
 
-            for j in range(element_size):
-                j_integrals = get_integral_parts_numba(element_nodes, j)
-                j_d_phi_vec = j_integrals[:DIMENSION]
-
-                volume_at_nodes = (i != j) * (INT_PH / CONNECTED_EDGES_COUNT)
-                # divide by edge count - info about each triangle is "sent" to node via
-                # all connected edges (in 2D: 2, in 3D: 3) and summed (by dot product with matrix)
-                u = (1 + (i == j)) / U_DIVIDER
-                # in 3D: divide by 10 or 20, in 2D: divide by 6 or 12
-
-                v = [INT_PH * j_d_phi for j_d_phi in j_d_phi_vec]
-
-                w = [
-                    [i_d_phi * j_d_phi for j_d_phi in j_d_phi_vec]
-                    for i_d_phi in i_d_phi_vec
-                ]
-
-                result = element_volume * np.array(
-                    [
-                        volume_at_nodes,
-                        u,
-                        v[0],
-                        v[1],
-                        v[2],
-                        w[0][0],
-                        w[0][1],
-                        w[0][2],
-                        w[1][0],
-                        w[1][1],
-                        w[1][2],
-                        w[2][0],
-                        w[2][1],
-                        w[2][2],
-                    ]
-                )
-
-                key = element[i], element[j]
-                if key in edges_features_dict:
-                    edges_features_dict[key] += result
-                else:
-                    edges_features_dict[key] = result
-
-    return edges_features_dict, element_initial_volume, dx_dict
-
-
-@numba.njit
-def get_edges_features_matrix_numba(elements, nodes):
-    # integral of phi over the element (in 2D: 1/3, in 3D: 1/4)
-    nodes_count = len(nodes)
-    elements_count, element_size = elements.shape
-
-    edges_features_matrix = np.zeros(
-        (FEATURE_MATRIX_COUNT, nodes_count, nodes_count), dtype=np.double
-    )
-    element_initial_volume = np.zeros(elements_count)
-
-    for element_index in range(elements_count):  # TODO: #65 prange?
-        element = elements[element_index]
-        element_nodes = nodes[element]
-
-        # TODO: #65 Get rid of repetition (?)
         for i in range(element_size):
-            i_integrals = get_integral_parts_numba(element_nodes, i)
-            i_d_phi_vec = i_integrals[:3]
-            element_volume = i_integrals[3]
-            # TODO: #65 Avoid repetition
-            element_initial_volume[element_index] = element_volume
-
             for j in range(element_size):
-                j_integrals = get_integral_parts_numba(element_nodes, j)
-                j_d_phi_vec = j_integrals[:DIMENSION]
-
-                volume_at_nodes = (i != j) * (INT_PH / CONNECTED_EDGES_COUNT)
-                # divide by edge count - info about each triangle is "sent" to node via
+                position = get_position_numba(indptr, indices, element[i], element[j])
+                # divide by edge count - info about each element is "sent" to node via
                 # all connected edges (in 2D: 2, in 3D: 3) and summed (by dot product with matrix)
-                u = (1 + (i == j)) / U_DIVIDER
+                volume_at_nodes = (i != j) * (INT_PH / CONNECTED_EDGES_COUNT)
+                edges_features[0, position] += element_volume * volume_at_nodes
                 # in 3D: divide by 10 or 20, in 2D: divide by 6 or 12
+                u = (1 + (i == j)) / U_DIVIDER
+                edges_features[1, position] += element_volume * u
 
-                v = [INT_PH * j_d_phi for j_d_phi in j_d_phi_vec]
-
-                w = [
-                    [i_d_phi * j_d_phi for j_d_phi in j_d_phi_vec]
-                    for i_d_phi in i_d_phi_vec
-                ]
-
-                edges_features_matrix[
-                    :, element[i], element[j]
-                ] += element_volume * np.array(
-                    [
-                        volume_at_nodes,
-                        u,
-                        v[0],
-                        v[1],
-                        v[2],
-                        w[0][0],
-                        w[0][1],
-                        w[0][2],
-                        w[1][0],
-                        w[1][1],
-                        w[1][2],
-                        w[2][0],
-                        w[2][1],
-                        w[2][2],
-                    ]
-                )
+                for k in range(DIMENSION):
+                    v = INT_PH * d_phi[k, element_index, j]
+                    edges_features[2 + k, position] += element_volume * v
+                    for l in range(DIMENSION):
+                        w = d_phi[k, element_index, i] * d_phi[l, element_index, j]
+                        edges_features[2 + DIMENSION * (k + 1) + l, position] += (
+                            element_volume * w
+                        )
 
-    return edges_features_matrix, element_initial_volume
+    return edges_features, element_initial_volume, d_phi
 
 
 @numba.njit
@@ -221,27 +133,13 @@ def denominator_numba(x_i, x_j1, x_j2, x_j3):
 
 
 class DynamicsFactory3D(AbstractDynamicsFactory):
-    def get_edges_features_dictionary(self, elements, nodes):
-        return get_edges_features_dictionary_numba(elements, nodes)
+    def get_edges_features(self, elements, nodes, indptr, indices):
+        return get_edges_features_numba(elements, nodes, indptr, indices)
 
     @property
     def dimension(self) -> int:
         return DIMENSION
 
-    def to_dx_matrix(self, dx_dict: dict, elements_count: int, nodes_count: int):
-        _ = self
-        keys = np.array(list(dx_dict.keys()), dtype=np.int64)
-        values = np.array(list(dx_dict.values()), dtype=np.float64)
-        row, col, data = get_coo_sparse_data_numba(keys=keys, values=values)
-        shape = (nodes_count, elements_count)
-
-        dx_x = scipy.sparse.coo_matrix((data[0], (row, col)), shape=shape)
-        dx_y = scipy.sparse.coo_matrix((data[1], (row, col)), shape=shape)
-        dx_z = scipy.sparse.coo_matrix((data[2], (row, col)), shape=shape)
-
-        dx = scipy.sparse.bmat([[dx_x], [dx_y], [dx_z]], format="csr")
-        return dx
-
     def calculate_constitutive_matrices(self, W, mu, lambda_):
         A_11 = (2 * mu + lambda_) * W[0, 0] + mu * W[1, 1] + lambda_ * W[2, 2]
         A_22 = mu * W[0, 0] + (2 * mu + lambda_) * W[1, 1] + lambda_ * W[2, 2]
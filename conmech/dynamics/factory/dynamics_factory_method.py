@@ -1,12 +1,10 @@
 from dataclasses import dataclass
 
 import jax.experimental.sparse
+import numba
 import numpy as np
 import scipy.sparse
 
-from conmech.dynamics.factory._abstract_dynamics_factory import (
-    get_coo_sparse_data_numba,
-)
 from conmech.dynamics.factory._dynamics_factory_2d import DynamicsFactory2D
 from conmech.dynamics.factory._dynamics_factory_3d import DynamicsFactory3D
 from conmech.helpers import jxh
@@ -43,43 +41,25 @@ class ConstMatrices:
         self.acceleration_operator_jax = jxh.to_jax_sparse(self.acceleration_operator)
 
 
-def to_edges_features_matrix(edges_features_dict: dict, nodes_count: int):
-    keys = np.array(list(edges_features_dict.keys()), dtype=np.int64)
-    values = np.array(list(edges_features_dict.values()), dtype=np.float64)
-    row, col, data = get_coo_sparse_data_numba(keys=keys, values=values)
-    shape = (nodes_count, nodes_count)
-    edges_features_matrix = [
-        scipy.sparse.coo_matrix((i, (row, col)), shape=shape).tocsr() for i in data
-    ]
-    return edges_features_matrix
-
-
-def get_dynamics(
-    elements: np.ndarray,
-    nodes: np.ndarray,
-    body_prop: StaticBodyProperties,
-    independent_indices: slice,
-):
+def get_factory(elements: np.ndarray):
     dimension = len(elements[0]) - 1
     if dimension == 2:
-        factory = DynamicsFactory2D()
-    elif dimension == 3:
-        factory = DynamicsFactory3D()
-    else:
-        raise NotImplementedError()
-    result = ConstMatrices()
+        return DynamicsFactory2D()
+    if dimension == 3:
+        return DynamicsFactory3D()
+    raise NotImplementedError()
+
+
+def get_edges_features_matrices(elements: np.ndarray, nodes: np.ndarray):
+    return get_factory(elements).get_edges_features_matrices(elements, nodes)
+
 
+def get_features(factory, elements, nodes, independent_indices):
     (
-        edges_features_dict,
-        result.element_initial_volume,
-        dx_dict,
-    ) = factory.get_edges_features_dictionary(elements, nodes)
-    edges_features_matrix = to_edges_features_matrix(
-        edges_features_dict=edges_features_dict, nodes_count=len(nodes)
-    )
-    result.dx_big = factory.to_dx_matrix(
-        dx_dict, elements_count=len(nodes), nodes_count=len(elements)
-    )
+        edges_features_matrix,
+        element_initial_volume,
+        dx_big,
+    ) = factory.get_edges_features_matrices(elements, nodes)
 
     # Volumeie calculated also for Dirichletnodes, then their influence is removed in lhs for jax
     edges_features_matrix[0] = edges_features_matrix[0].tocsr()
@@ -88,7 +68,11 @@ def get_dynamics(
         edges_features_matrix[i] = edges_features_matrix[i].tocsr()[
             independent_indices, independent_indices
         ]
+    return edges_features_matrix, element_initial_volume, dx_big
 
+
+def set_body_matrices(result: ConstMatrices, factory, edges_features_matrix, body_prop):
+    # all matrices are linear in edges features
     result.volume_at_nodes = edges_features_matrix[0]
     U = edges_features_matrix[1]
 
@@ -96,8 +80,6 @@ def get_dynamics(
         U, body_prop.mass_density
     )
 
-    # return result
-
     V = np.asarray([edges_features_matrix[2 + j] for j in range(factory.dimension)])
     W = np.asarray(
         [
@@ -143,5 +125,182 @@ def get_dynamics(
         result.piezoelectricity = None
         result.permittivity = None
 
+
+def get_dynamics(
+    elements: np.ndarray,
+    nodes: np.ndarray,
+    body_prop: StaticBodyProperties,
+    independent_indices: slice,
+    complete_patterns: bool = False,
+):
+    factory = get_factory(elements)
+    result = ConstMatrices()
+    edges_features_matrix, result.element_initial_volume, result.dx_big = get_features(
+        factory, elements, nodes, independent_indices
+    )
+    set_body_matrices(result, factory, edges_features_matrix, body_prop)
+
+    if complete_patterns:
+        # random positive features give every entry which any element can change
+        random_generator = np.random.default_rng(0)
+        patterns = ConstMatrices()
+        set_body_matrices(
+            patterns,
+            factory,
+            [to_pattern(matrix, random_generator) for matrix in edges_features_matrix],
+            body_prop,
+        )
+        patterns.dx_big = to_pattern(result.dx_big)
+        for name in SPARSE_MATRICES:
+            if getattr(result, name) is not None:
+                setattr(
+                    result,
+                    name,
+                    complete_pattern(getattr(result, name), getattr(patterns, name)),
+                )
+
     result.initialize_sparse_jax()
     return result
+
+
+# matrices updated by get_dynamics_update
+SPARSE_MATRICES = [
+    "volume_at_nodes",
+    "acceleration_operator",
+    "elasticity",
+    "viscosity",
+    "thermal_expansion",
+    "thermal_conductivity",
+    "piezoelectricity",
+    "permittivity",
+    "dx_big",
+]
+
+
+def to_pattern(matrix, random_generator=None):
+    pattern = scipy.sparse.csr_matrix(matrix, copy=True)
+    pattern.sum_duplicates()
+    pattern.sort_indices()
+    pattern.data = (
+        np.ones(pattern.nnz)
+        if random_generator is None
+        else random_generator.uniform(1, 2, pattern.nnz)
+    )
+    return pattern
+
+
+def get_union_pattern(*matrices):
+    return to_pattern(sum(to_pattern(matrix) for matrix in matrices))
+
+
+def complete_pattern(matrix, pattern):
+    # matrix with explicit zeros on all entries of pattern
+    result = scipy.sparse.csr_matrix(
+        (np.zeros(pattern.nnz), pattern.indices.copy(), pattern.indptr.copy()),
+        shape=pattern.shape,
+    )
+    assert add_in_pattern(result, matrix)
+    return result
+
+
+@numba.njit
+def add_in_pattern_numba(
+    indptr, indices, data, other_indptr, other_indices, other_data
+):
+    for row in range(len(other_indptr) - 1):
+        start, stop = indptr[row], indptr[row + 1]
+        for position in range(other_indptr[row], other_indptr[row + 1]):
+            if other_data[position] == 0:
+                continue
+            column = other_indices[position]
+            index = start + np.searchsorted(indices[start:stop], column)
+            if index == stop or indices[index] != column:
+                return False
+            data[index] += other_data[position]
+    return True
+
+
+def add_in_pattern(matrix, other) -> bool:
+    """
+    Adds other to data of matrix in place; returns False if other has nonzero
+    entry outside of pattern of matrix, then matrix is partially updated
+    """
+    other = scipy.sparse.csr_matrix(other)
+    return add_in_pattern_numba(
+        matrix.indptr,
+        matrix.indices,
+        matrix.data,
+        other.indptr,
+        other.indices,
+        other.data,
+    )
+
+
+def get_changed_elements(
+    elements: np.ndarray, old_nodes: np.ndarray, nodes: np.ndarray
+):
+    changed_nodes = np.any(old_nodes != nodes, axis=1)
+    return np.flatnonzero(changed_nodes[elements].any(axis=1))
+
+
+def get_dynamics_update(
+    elements: np.ndarray,
+    old_nodes: np.ndarray,
+    nodes: np.ndarray,
+    body_prop: StaticBodyProperties,
+    independent_indices: slice,
+    element_indices: np.ndarray,
+):
+    """
+    Difference of matrices assembled on nodes and on old_nodes, computed only from
+    elements with element_indices; dx_big rows follow all elements
+    """
+    factory = get_factory(elements)
+    changed_elements = elements[element_indices]
+    edges_features_matrix, element_volume, dx_big = get_features(
+        factory, changed_elements, nodes, independent_indices
+    )
+    old_edges_features_matrix, _, old_dx_big = get_features(
+        factory, changed_elements, old_nodes, independent_indices
+    )
+    result = ConstMatrices()
+    result.element_initial_volume = element_volume
+    set_body_matrices(
+        result,
+        factory,
+        [
+            new - old
+            for new, old in zip(edges_features_matrix, old_edges_features_matrix)
+        ],
+        body_prop,
+    )
+    dx_big = (dx_big - old_dx_big).tocoo()
+    rows_block, rows_element = np.divmod(dx_big.row, len(element_indices))
+    result.dx_big = scipy.sparse.csr_matrix(
+        (
+            dx_big.data,
+            (rows_block * len(elements) + element_indices[rows_element], dx_big.col),
+        ),
+        shape=(factory.dimension * len(elements), len(nodes)),
+    )
+    return result
+
+
+def add_dynamics_update(
+    matrices: ConstMatrices, update: ConstMatrices, element_indices: np.ndarray
+) -> bool:
+    for name in SPARSE_MATRICES:
+        matrix = getattr(matrices, name)
+        if matrix is not None and not add_in_pattern(matrix, getattr(update, name)):
+            return False
+    matrices.element_initial_volume[element_indices] = update.element_initial_volume
+    matrices.dx_big_jax = jxh.replace_jax_sparse_data(
+        matrices.dx_big_jax, matrices.dx_big
+    )
+    matrices.volume_at_nodes_jax = jxh.replace_jax_sparse_data(
+        matrices.volume_at_nodes_jax, matrices.volume_at_nodes
+    )
+    matrices.acceleration_operator_jax = jxh.replace_jax_sparse_data(
+        matrices.acceleration_operator_jax, matrices.acceleration_operator
+    )
+    return True
@@ -2,6 +2,7 @@ from dataclasses import dataclass
 from typing import Optional
 
 import numpy as np
+import scipy.sparse
 
 from conmech.helpers import jxh
 
@@ -15,14 +16,31 @@ class Variables:
     time_step: Optional[float] = None
 
 
+def eliminate_sparse(matrix: scipy.sparse.spmatrix, indices: np.ndarray):
+    """Zeroes rows and columns of indices and puts ones on their diagonal"""
+    keep = np.ones(matrix.shape[0])
+    keep[indices] = 0.0
+    keep_diagonal = scipy.sparse.diags(keep)
+    return (
+        keep_diagonal @ matrix @ keep_diagonal + scipy.sparse.diags(1.0 - keep)
+    ).tocsr()
+
+
 class Statement:
-    def __init__(self, body, dimension):
+    def __init__(self, body, dimension, sparse=False):
         self.body = body
         self.dimension = dimension
+        self.sparse = sparse
         self.left_hand_side = None
         self.right_hand_side = None
         self.dirichlet_cond_name = "dirichlet"
 
+    def to_left_hand_side(self, matrix):
+        # Sparse statements keep CSR, dense ones are used by legacy numba solvers
+        if self.sparse:
+            return scipy.sparse.csr_matrix(matrix, dtype=np.float64, copy=True)
+        return jxh.to_dense_np(matrix)
+
     def update_left_hand_side(self, var: Variables):
         raise NotImplementedError()
 
@@ -34,20 +52,37 @@ class Statement:
         self.update_right_hand_side(var)
         self.apply_dirichlet_condition()
 
-    def apply_dirichlet_condition(self):
+    def get_dirichlet_values(self):
+        indices = []
+        values = []
         for dirichlet_cond in self.find_dirichlet_conditions():
             c = self.body.boundaries.boundaries[dirichlet_cond].node_condition
             node_count = self.body.nodes_count
             for i, j in self.body.boundaries.get_all_boundary_indices(
                 dirichlet_cond, node_count, self.dimension
             ):
-                self.right_hand_side[:] -= self.left_hand_side[:, i] @ c[j]
-                self.right_hand_side[i] = c[j]
+                indices.append(np.arange(i.start, i.stop))
+                values.append(c[j])
+        if not indices:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+        return np.concatenate(indices), np.concatenate(values)
+
+    def apply_dirichlet_condition(self):
+        indices, values = self.get_dirichlet_values()
+        if len(indices) == 0:
+            return
+        dirichlet_vector = np.zeros(self.left_hand_side.shape[1])
+        dirichlet_vector[indices] = values
+
+        self.right_hand_side[:] -= self.left_hand_side @ dirichlet_vector
+        self.right_hand_side[indices] = values
 
-                self.left_hand_side[:, i] = 0
-                self.left_hand_side[i, :] = 0
-                # have to be "[i][:, i]" instead of just a "[i, i]" because the i may be ndarray
-                self.left_hand_side[i][:, i] = np.eye(j.stop - j.start)
+        if self.sparse:
+            self.left_hand_side = eliminate_sparse(self.left_hand_side, indices)
+        else:
+            self.left_hand_side[:, indices] = 0
+            self.left_hand_side[indices, :] = 0
+            self.left_hand_side[indices, indices] = 1
 
     def find_dirichlet_conditions(self):
         boundaries = self.body.boundaries.boundaries
@@ -65,24 +100,24 @@ class Statement:
 
 
 class StaticDisplacementStatement(Statement):
-    def __init__(self, dynamics):
-        super().__init__(dynamics, 2)
+    def __init__(self, dynamics, sparse=False):
+        super().__init__(dynamics, 2, sparse=sparse)
 
     def update_left_hand_side(self, var: Variables):
-        self.left_hand_side = jxh.to_dense_np(self.body.matrices.elasticity)
+        self.left_hand_side = self.to_left_hand_side(self.body.matrices.elasticity)
 
     def update_right_hand_side(self, var: Variables):
         self.right_hand_side = self.body.get_integrated_forces_vector_np()
 
 
 class QuasistaticVelocityStatement(Statement):
-    def __init__(self, dynamics):
-        super().__init__(dynamics, 2)
+    def __init__(self, dynamics, sparse=False):
+        super().__init__(dynamics, 2, sparse=sparse)
 
     def update_left_hand_side(self, var: Variables):
         assert var.time_step is not None
 
-        self.left_hand_side = jxh.to_dense_np(
+        self.left_hand_side = self.to_left_hand_side(
             self.body.matrices.viscosity + self.body.matrices.elasticity * var.time_step
         )
 
@@ -96,13 +131,13 @@ class QuasistaticVelocityStatement(Statement):
 
 
 class DynamicVelocityStatement(Statement):
-    def __init__(self, dynamics):
-        super().__init__(dynamics, 2)
+    def __init__(self, dynamics, sparse=False):
+        super().__init__(dynamics, 2, sparse=sparse)
 
     def update_left_hand_side(self, var):
         assert var.time_step is not None
 
-        self.left_hand_side = jxh.to_dense_np(
+        self.left_hand_side = self.to_left_hand_side(
             self.body.matrices.viscosity
             + (1 / var.time_step) * self.body.matrices.acceleration_operator
             + self.body.matrices.elasticity * var.time_step
@@ -136,15 +171,15 @@ class DynamicVelocityWithTemperatureStatement(DynamicVelocityStatement):
 
 
 class TemperatureStatement(Statement):
-    def __init__(self, dynamics):
-        super().__init__(dynamics, 1)
+    def __init__(self, dynamics, sparse=False):
+        super().__init__(dynamics, 1, sparse=sparse)
 
     def update_left_hand_side(self, var):
         assert var.time_step is not None
 
         ind = self.body.nodes_count  # 1 dimensional
 
-        self.left_hand_side = jxh.to_dense_np(
+        self.left_hand_side = self.to_left_hand_side(
             (1 / var.time_step) * self.body.matrices.acceleration_operator[:ind, :ind]
             + self.body.matrices.thermal_conductivity[:ind, :ind]
         )
@@ -168,13 +203,13 @@ class TemperatureStatement(Statement):
 
 
 class PiezoelectricStatement(Statement):
-    def __init__(self, dynamics):
-        super().__init__(dynamics, 1)
+    def __init__(self, dynamics, sparse=False):
+        super().__init__(dynamics, 1, sparse=sparse)
         self.dirichlet_cond_name = "piezo_" + self.dirichlet_cond_name
 
     def update_left_hand_side(self, var):
         ind = self.body.nodes_count
-        self.left_hand_side = jxh.to_dense_np(
+        self.left_hand_side = self.to_left_hand_side(
             self.body.matrices.permittivity[:ind, :ind]
         )
 
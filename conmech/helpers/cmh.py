@@ -4,18 +4,21 @@ conmech helpers
 import cProfile
 import os
 import pickle
+import queue
 import shutil
 import sys
+import threading
 import time
 from glob import glob
 from pstats import Stats
 from typing import Callable, Iterable
 
-import psutil
-from tqdm import tqdm
-
+from conmech.helpers import lzh
 from conmech.helpers.config import Config
 
+psutil = lzh.lazy_import("psutil")
+tqdm = lzh.lazy_import("tqdm")
+
 
 def get_from_os(name):
     return name in os.environ and int(os.environ[name])
@@ -42,8 +45,49 @@ def get_timestamp(config: Config):
     return int(time.time() * config.timestamp_skip)
 
 
-def get_tqdm(iterable: Iterable, config: Config, desc=None, position=None) -> tqdm:
-    return tqdm(iterable, desc=desc, position=position, ascii=config.shell)
+def get_tqdm(
+    iterable: Iterable, config: Config, desc=None, position=None
+) -> "tqdm.tqdm":
+    return tqdm.tqdm(iterable, desc=desc, position=position, ascii=config.shell)
+
+
+def prefetch(iterable: Iterable, buffer_size: int = 2):
+    """Iterates in a background thread, keeping up to buffer_size items ready"""
+    items = queue.Queue(maxsize=buffer_size)
+    stop = threading.Event()
+    end = object()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def produce():
+        try:
+            for item in iterable:
+                put((item, None))
+                if stop.is_set():
+                    return
+            put((end, None))
+        except Exception as error:  # pylint: disable=broad-except
+            put((end, error))
+
+    thread = threading.Thread(target=produce, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item, error = items.get()
+            if error is not None:
+                raise error
+            if item is end:
+                return
+            yield item
+    finally:
+        stop.set()
+        thread.join()
 
 
 def create_folder(path):
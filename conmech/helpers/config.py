@@ -59,3 +59,4 @@ class Config:
     print_skip: float = 0.1  # 0.01
     plot_tests: bool = False
     output_catalog: str = "output"
+    mesh_generation_workers: int = 0  # persistent mesh pool, 0 builds in process
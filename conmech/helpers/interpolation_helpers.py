@@ -3,10 +3,23 @@ from ctypes import ArgumentError
 
 import numba
 import numpy as np
+import scipy.sparse
+import scipy.spatial
 
 from conmech.helpers import lnh, nph
-from conmech.helpers.spatial_hashing import initialize_hasher_numba, query_hasher_numba
-from conmech.helpers.tmh import Timer
+from conmech.helpers.spatial_hashing import (
+    get_spacing,
+    initialize_hasher_numba,
+    query_hasher_numba,
+)
+
+
+def seed_sample(*keys: int):
+    # generators used by sample generation are global, so seeding them per sample
+    # makes samples independent of order and process generating them
+    state = np.random.SeedSequence(keys).generate_state(2)
+    np.random.seed(state[0])
+    random.seed(int(state[1]))
 
 
 def decide(scale):
@@ -174,6 +187,56 @@ def approximate_internal(base_values, closest_nodes, closest_weights):
     ).sum(axis=1)
 
 
+def get_interpolation_matrix(closest_nodes, closest_weights, base_nodes_count: int):
+    # sparse form of approximate_internal, much faster to apply at every step
+    rows = np.repeat(np.arange(len(closest_nodes)), closest_nodes.shape[1])
+    return scipy.sparse.csr_matrix(
+        (closest_weights.reshape(-1), (rows, closest_nodes.reshape(-1))),
+        shape=(len(closest_nodes), base_nodes_count),
+    )
+
+
+def get_barycentric_weights(query_nodes, element_nodes):
+    # same convention as find_closest_nodes: last node completes weights to one
+    last_nodes = element_nodes[:, -1]
+    matrices = (element_nodes[:, :-1] - last_nodes[:, None]).transpose(0, 2, 1)
+    weights = np.linalg.solve(matrices, (query_nodes - last_nodes)[..., None])[..., 0]
+    return np.hstack((weights, 1 - weights.sum(axis=1, keepdims=True)))
+
+
+def get_closest_distances(base_nodes, query_nodes, closest_nodes):
+    return np.linalg.norm(base_nodes[closest_nodes] - query_nodes[:, None], axis=-1)
+
+
+def update_link_weights(
+    base_nodes,
+    query_nodes,
+    old_base_nodes,
+    old_query_nodes,
+    closest_nodes,
+    closest_weights,
+):
+    """
+    Updates link computed for old node positions; returns new weights and mask
+    of query nodes that left their element and have to be queried again
+    """
+    moved_base_nodes = np.any(base_nodes != old_base_nodes, axis=1)
+    changed = np.any(query_nodes != old_query_nodes, axis=1)
+    changed |= moved_base_nodes[closest_nodes].any(axis=1)
+    if moved_base_nodes.any():
+        # node outside of mesh may now be closer to any moved element
+        changed |= closest_weights.min(axis=1) < 0
+
+    new_weights = closest_weights.copy()
+    new_weights[changed] = get_barycentric_weights(
+        query_nodes=query_nodes[changed],
+        element_nodes=base_nodes[closest_nodes[changed]],
+    )
+    # element containing a node is unique, so nodes still inside keep it
+    stale_mask = changed & (new_weights.min(axis=1) < 0)
+    return new_weights, stale_mask
+
+
 # @numba.njit
 def get_interlayer_data_numba(
     base_nodes: np.ndarray,
@@ -245,8 +308,9 @@ def find_closest_nodes_numba(
     nodes_query,
     cell_starts,
     node_cell,
+    spacing,
 ):
-    spacing = 0.05  # 0.03  # element_ball_radiuses.mean()
+    dim = interpolated_nodes.shape[1]
 
     cell_starts, node_cell, spacing = initialize_hasher_numba(
         interpolated_nodes,
@@ -255,7 +319,7 @@ def find_closest_nodes_numba(
         node_cell=node_cell,
     )
     ready_nodes_mask[:] = False
-    node_weights = np.empty(4)
+    node_weights = np.empty(dim + 1)
     # max_m = 0
     for element_id, element in enumerate(base_elements):
         # close_nodes_mask = ((element_centers[element_id] - interpolated_nodes) ** 2).sum(
@@ -270,6 +334,7 @@ def find_closest_nodes_numba(
             cell_starts=cell_starts,
             node_cell=node_cell,
             spacing=spacing,
+            nodes=interpolated_nodes,
         )
 
         # m = close_nodes_mask.sum() / len(close_nodes_mask)
@@ -285,11 +350,11 @@ def find_closest_nodes_numba(
             # TODO: check why loop is slower than masking and why masking doesn't work with parallel
             # if(((element_center - node) ** 2).sum() > element_ball_radius_squared):
 
-            node_weights[:3] = np.linalg.solve(
+            node_weights[:dim] = np.linalg.solve(
                 element_nodes_matrices_T[element_id],
                 node - normalizing_element_nodes_T[element_id],
             )
-            node_weights[3] = 1 - node_weights[:3].sum()  # weights sum to one
+            node_weights[dim] = 1 - node_weights[:dim].sum()  # weights sum to one
 
             # looking for weights that are closest to positive
             smallest_weight = np.min(node_weights)
@@ -329,7 +394,7 @@ def get_interlayer_data_skinning_numba(
     element_nodes_matrices_T = (
         element_nodes[:, :dim] - element_nodes[:, [dim]]
     ).transpose(0, 2, 1)
-    normalizing_element_nodes_T = element_nodes[:, [dim]].reshape(-1, 3)
+    normalizing_element_nodes_T = element_nodes[:, [dim]].reshape(-1, dim)
 
     ready_nodes_mask = np.zeros(nodes_count, dtype=bool)
     nodes_query = np.zeros(nodes_count, dtype=np.int64)
@@ -338,32 +403,48 @@ def get_interlayer_data_skinning_numba(
     cell_starts = np.zeros(table_size + 1, dtype=np.int64)
     node_cell = np.zeros(nodes_count, dtype=np.int64)
 
-    np.save("./output/base_nodes", base_nodes)
-    np.save("./output/base_elements", base_elements)
-    np.save("./output/interpolated_nodes", interpolated_nodes)
+    find_closest_nodes_numba(
+        closest_nodes=closest_nodes,
+        closest_weights=closest_weights,
+        interpolated_nodes=interpolated_nodes,
+        base_elements=base_elements,
+        element_centers=element_centers,
+        element_ball_radiuses=element_ball_radiuses,
+        element_nodes_matrices_T=element_nodes_matrices_T,
+        normalizing_element_nodes_T=normalizing_element_nodes_T,
+        ready_nodes_mask=ready_nodes_mask,
+        nodes_query=nodes_query,
+        cell_starts=cell_starts,
+        node_cell=node_cell,
+        spacing=get_spacing(base_nodes, base_elements),
+    )
+    complete_unassigned_nodes(
+        closest_nodes=closest_nodes,
+        closest_weights=closest_weights,
+        base_nodes=base_nodes,
+        base_elements=base_elements,
+        interpolated_nodes=interpolated_nodes,
+    )
+    return closest_nodes, closest_distances, closest_weights
 
-    timer = Timer()
-    with timer["find_closest_nodes_numba"]:
-        m = find_closest_nodes_numba(
-            closest_nodes=closest_nodes,
-            closest_weights=closest_weights,
-            interpolated_nodes=interpolated_nodes,
-            base_elements=base_elements,
-            element_centers=element_centers,
-            element_ball_radiuses=element_ball_radiuses,
-            element_nodes_matrices_T=element_nodes_matrices_T,
-            normalizing_element_nodes_T=normalizing_element_nodes_T,
-            ready_nodes_mask=ready_nodes_mask,
-            nodes_query=nodes_query,
-            cell_starts=cell_starts,
-            node_cell=node_cell,
-        )
-    print(timer.to_dataframe())
-    print(m)
 
-    assert np.all(closest_nodes >= 0)  # For each node at least one element found
-    print("Min weight", closest_weights.min())
-    return closest_nodes, closest_distances, closest_weights
+def complete_unassigned_nodes(
+    closest_nodes, closest_weights, base_nodes, base_elements, interpolated_nodes
+):
+    # nodes outside of all element balls are extrapolated from element
+    # with closest center instead of being left without element
+    unassigned = np.flatnonzero(closest_nodes[:, 0] < 0)
+    if len(unassigned) == 0:
+        return
+    element_centers = base_nodes[base_elements].mean(axis=1)
+    _, element_ids = scipy.spatial.cKDTree(element_centers).query(
+        interpolated_nodes[unassigned]
+    )
+    closest_nodes[unassigned] = base_elements[element_ids]
+    closest_weights[unassigned] = get_barycentric_weights(
+        query_nodes=interpolated_nodes[unassigned],
+        element_nodes=base_nodes[closest_nodes[unassigned]],
+    )
 
 
 # pylint: disable=import-outside-toplevel
@@ -386,13 +467,10 @@ def get_interlayer_data_skinning_cython(
 
     dim = base_nodes.shape[1]
     nodes_count = len(interpolated_nodes)
-    elements_count = len(base_elements)
     closest_count = dim + 1
     # element_nodes_count = base_elements.shape[1]
 
-    spacing = 0.05
-    table_size = 2 * elements_count
-
+    spacing = get_spacing(base_nodes, base_elements)
     table_size_proportion = 2
     table_size = table_size_proportion * nodes_count
 
@@ -407,7 +485,6 @@ def get_interlayer_data_skinning_cython(
     nodes_query = np.zeros(nodes_count, dtype=int_type)
     # element_nodes = np.zeros((elements_count, 4, 3))
 
-    assert dim == 3  # Not implemeted for 2D
     # t = time()
     weights.find_closest_nodes_cython(
         closest_nodes=closest_nodes,
@@ -423,8 +500,14 @@ def get_interlayer_data_skinning_cython(
         element_radius_padding=element_radius_padding,
     )
     # stop = time() - t
+    complete_unassigned_nodes(
+        closest_nodes=closest_nodes,
+        closest_weights=closest_weights,
+        base_nodes=base_nodes,
+        base_elements=base_elements,
+        interpolated_nodes=interpolated_nodes,
+    )
 
-    # assert np.all(closest_nodes >= 0)  # For each node at least one element found
     # print("Min weight", closest_weights.min())
     # print("Time all ms: ", 1000 * stop)
     # print("Ready ", ready_nodes_mask.sum())
@@ -445,6 +528,15 @@ def interpolate_nodes(
     #     # padding: float,
     # )
 
+    try:
+        from cython_modules import weights  # pylint: disable=unused-import
+    except ImportError:
+        # extension not built (python setup.py build_ext --inplace in cython_modules)
+        return get_interlayer_data_skinning_numba(
+            base_nodes=base_nodes,
+            base_elements=base_elements,
+            interpolated_nodes=query_nodes,
+        )
     return get_interlayer_data_skinning_cython(
         base_nodes=base_nodes,
         base_elements=base_elements,
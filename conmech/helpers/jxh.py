@@ -1,7 +1,16 @@
 """
 jax helpers
 """
+import functools
+import os
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+import jax
 import jax.experimental.sparse
+import jax.monitoring
 import jax.numpy as jnp
 import jax.scipy
 import numpy as np
@@ -48,9 +57,244 @@ def to_jax_sparse(matrix):
     return result.sort_indices()
 
 
+def replace_jax_sparse_data(matrix_jax, matrix):
+    # matrix in canonical csr format with pattern of matrix_jax from to_jax_sparse
+    assert matrix.nnz == matrix_jax.nse
+    return jax.experimental.sparse.BCOO(
+        (jnp.asarray(matrix.data), matrix_jax.indices), shape=matrix_jax.shape
+    )
+
+
 def to_dense_np(array):
     return np.array(array.todense(), dtype=np.float64)
 
 
 def complete_data_with_zeros(data: np.ndarray, nodes_count):
     return jnp.pad(data, ((0, nodes_count - len(data)), (0, 0)), "constant")
+
+
+HOST_DEVICE_COUNT_FLAG = "--xla_force_host_platform_device_count"
+
+
+def use_host_devices(count: int):
+    """Splits CPU into count XLA devices, call before JAX initializes backends"""
+    flags = [
+        flag
+        for flag in os.environ.get("XLA_FLAGS", "").split()
+        if not flag.startswith(HOST_DEVICE_COUNT_FLAG)
+    ]
+    os.environ["XLA_FLAGS"] = " ".join(flags + [f"{HOST_DEVICE_COUNT_FLAG}={count}"])
+    jax.config.update("jax_platforms", "cpu")
+    assert jax.local_device_count() == count, "JAX backends already initialized"
+
+
+# Compilation monitor
+# Enable with CONMECH_JIT_MONITOR=1 (report) or CONMECH_JIT_MONITOR=strict
+# (fail on any trace or compilation after warm-up)
+JIT_MONITOR_ENV = "CONMECH_JIT_MONITOR"
+
+BACKEND_COMPILE_EVENT = "/jax/core/compile/backend_compile_duration"
+UNTRACKED = "<untracked>"
+
+
+class RecompilationError(RuntimeError):
+    pass
+
+
+@dataclass
+class CompilationRecord:
+    name: str
+    calls: int = 0
+    traces: int = 0
+    compiles: int = 0
+    signatures: List[Dict[str, str]] = field(default_factory=list)
+    triggers: List[str] = field(default_factory=list)
+
+
+def _describe_leaf(leaf):
+    if hasattr(leaf, "shape") and hasattr(leaf, "dtype"):
+        shape = ",".join(str(size) for size in leaf.shape)
+        weak = "~" if getattr(getattr(leaf, "aval", None), "weak_type", False) else ""
+        return f"{leaf.dtype}{weak}[{shape}]"
+    description = repr(leaf)
+    return description if len(description) < 80 else f"{description[:77]}..."
+
+
+def get_signature(args, kwargs) -> Dict[str, str]:
+    leaves, _ = jax.tree_util.tree_flatten_with_path((args, kwargs))
+    signature = {}
+    for path, leaf in leaves:
+        key = jax.tree_util.keystr(path)
+        # ((args), {kwargs}) -> args[i] / kwargs
+        key = key.replace("[0]", "args", 1) if key.startswith("[0]") else key[3:]
+        signature[key] = _describe_leaf(leaf)
+    return signature
+
+
+def describe_signature_change(old: Optional[Dict[str, str]], new: Dict[str, str]):
+    if old is None:
+        return "first trace"
+    changes = [
+        f"{key}: {old.get(key, '<missing>')} -> {new.get(key, '<missing>')}"
+        for key in sorted(set(old) | set(new))
+        if old.get(key) != new.get(key)
+    ]
+    if not changes:
+        return "same signature (cache miss, e.g. new function object or static hash)"
+    return "; ".join(changes)
+
+
+class CompilationMonitor:
+    def __init__(self):
+        self.enabled = False
+        self.strict = False
+        self.warm = False
+        self.records: Dict[str, CompilationRecord] = {}
+        self._local = threading.local()
+        self._listening = False
+
+    def start(self, strict: bool = False):
+        self.enabled = True
+        self.strict = strict
+        self.warm = False
+        self._listen_to_compilation()
+
+    def stop(self):
+        self.enabled = False
+        self.strict = False
+        self.warm = False
+
+    def reset(self):
+        self.records = {}
+
+    def finish_warm_up(self):
+        self.warm = True
+
+    @contextmanager
+    def strict_after_warm_up(self):
+        previous = (self.enabled, self.strict, self.warm)
+        self.start(strict=True)
+        self.finish_warm_up()
+        try:
+            yield self
+        finally:
+            self.enabled, self.strict, self.warm = previous
+
+    def get_record(self, name: str) -> CompilationRecord:
+        record = self.records.get(name)
+        if record is None:
+            record = CompilationRecord(name=name)
+            self.records[name] = record
+        return record
+
+    def _get_stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = []
+            self._local.stack = stack
+        return stack
+
+    @contextmanager
+    def calling(self, name: str):
+        self.get_record(name).calls += 1
+        stack = self._get_stack()
+        stack.append(name)
+        try:
+            yield
+        finally:
+            stack.pop()
+
+    def on_trace(self, name: str, args, kwargs):
+        record = self.get_record(name)
+        signature = get_signature(args, kwargs)
+        last = record.signatures[-1] if record.signatures else None
+        trigger = describe_signature_change(last, signature)
+        record.traces += 1
+        record.signatures.append(signature)
+        record.triggers.append(trigger)
+        if self.strict and self.warm:
+            raise RecompilationError(f"{name} retraced after warm-up: {trigger}")
+
+    def on_compile(self):
+        stack = self._get_stack()
+        name = stack[-1] if stack else UNTRACKED
+        self.get_record(name).compiles += 1
+        if self.strict and self.warm:
+            raise RecompilationError(f"{name} compiled after warm-up")
+
+    def _listen_to_compilation(self):
+        if self._listening:
+            return
+
+        def listener(event: str, duration_secs: float):
+            _ = duration_secs
+            if self.enabled and event == BACKEND_COMPILE_EVENT:
+                self.on_compile()
+
+        jax.monitoring.register_event_duration_secs_listener(listener)
+        self._listening = True
+
+    @property
+    def traces_count(self):
+        return sum(record.traces for record in self.records.values())
+
+    @property
+    def compiles_count(self):
+        return sum(record.compiles for record in self.records.values())
+
+    def report(self) -> str:
+        if not self.records:
+            return "No tracked compilations"
+        lines = []
+        for record in sorted(
+            self.records.values(), key=lambda r: (r.traces, r.compiles), reverse=True
+        ):
+            lines.append(
+                f"{record.name}: calls {record.calls} | traces {record.traces}"
+                + f" | compiles {record.compiles}"
+            )
+            for trigger in record.triggers[1:]:
+                lines.append(f"    retrace: {trigger}")
+        return "\n".join(lines)
+
+    def print_report(self):
+        print(self.report())
+
+
+MONITOR = CompilationMonitor()
+if os.environ.get(JIT_MONITOR_ENV, "0") not in ("", "0"):
+    MONITOR.start(strict=os.environ[JIT_MONITOR_ENV] == "strict")
+
+
+class TrackedJit:
+    """jax.jit created once, counting traces and compilations in MONITOR"""
+
+    def __init__(self, fun: Callable, name: Optional[str] = None, **jit_kwargs):
+        self.name = (
+            name if name is not None else getattr(fun, "__qualname__", repr(fun))
+        )
+        self.__wrapped__ = fun
+
+        @functools.wraps(fun)
+        def traced_fun(*args, **kwargs):
+            if MONITOR.enabled:
+                MONITOR.on_trace(self.name, args, kwargs)
+            return fun(*args, **kwargs)
+
+        self.jitted = jax.jit(traced_fun, **jit_kwargs)
+
+    def __call__(self, *args, **kwargs):
+        if not MONITOR.enabled:
+            return self.jitted(*args, **kwargs)
+        with MONITOR.calling(self.name):
+            return self.jitted(*args, **kwargs)
+
+    def lower(self, *args, **kwargs):
+        with MONITOR.calling(self.name):
+            return self.jitted.lower(*args, **kwargs)
+
+
+def jit(fun: Optional[Callable] = None, name: Optional[str] = None, **jit_kwargs):
+    if fun is None:
+        return functools.partial(jit, name=name, **jit_kwargs)
+    return TrackedJit(fun, name=name, **jit_kwargs)
@@ -0,0 +1,92 @@
+"""
+lazy import helpers
+"""
+import importlib
+import subprocess
+import sys
+import threading
+import types
+from typing import Dict, NamedTuple, Optional
+
+_LOCK = threading.RLock()
+
+
+class LazyModule(types.ModuleType):
+    """Module proxy importing the real module on first attribute access"""
+
+    def __init__(self, name: str, extra: Optional[str] = None):
+        super().__init__(name)
+        self.__dict__["_lazy_extra"] = extra
+        self.__dict__["_lazy_module"] = None
+
+    def _load(self):
+        module = self.__dict__["_lazy_module"]
+        if module is not None:
+            return module
+        with _LOCK:
+            module = self.__dict__["_lazy_module"]
+            if module is None:
+                try:
+                    module = importlib.import_module(self.__name__)
+                except ImportError as error:
+                    extra = self.__dict__["_lazy_extra"]
+                    if extra is None:
+                        raise
+                    raise ImportError(
+                        f"Optional dependency '{self.__name__}' is required for {extra}"
+                    ) from error
+                self.__dict__["_lazy_module"] = module
+        return module
+
+    def __getattr__(self, attribute: str):
+        return getattr(self._load(), attribute)
+
+    def __setattr__(self, attribute: str, value):
+        setattr(self._load(), attribute, value)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = "loaded" if self.__dict__["_lazy_module"] is not None else "not loaded"
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+
+def lazy_import(name: str, extra: Optional[str] = None) -> types.ModuleType:
+    if name in sys.modules:
+        return sys.modules[name]
+    return LazyModule(name, extra=extra)
+
+
+def is_loaded(module) -> bool:
+    if isinstance(module, LazyModule):
+        return module.__dict__["_lazy_module"] is not None
+    return True
+
+
+class ImportTime(NamedTuple):
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def get_import_times(
+    statement: str, python: str = sys.executable
+) -> Dict[str, ImportTime]:
+    """Runs statement in fresh interpreter with -X importtime and parses its report"""
+    result = subprocess.run(
+        [python, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    import_times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        indent = len(name) - len(name.lstrip()) - 1
+        import_times[name.strip()] = ImportTime(
+            self_us=int(self_us), cumulative_us=int(cumulative_us), depth=indent // 2
+        )
+    return import_times
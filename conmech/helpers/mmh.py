@@ -0,0 +1,124 @@
+"""
+memory-mapped dataset helpers
+"""
+import json
+import os
+from threading import Lock
+from typing import Dict, Optional
+
+import numpy as np
+
+META_FILE = "meta.json"
+
+
+def get_values_path(data_path: str, key: str):
+    return os.path.join(data_path, f"{key}.bin")
+
+
+def get_shapes_path(data_path: str, key: str):
+    return os.path.join(data_path, f"{key}.shapes")
+
+
+def load_meta(data_path: str) -> Optional[dict]:
+    try:
+        with open(os.path.join(data_path, META_FILE), "r", encoding="utf-8") as file:
+            return json.load(file)
+    except IOError:
+        return None
+
+
+def get_size(data_path: str) -> int:
+    if not os.path.isdir(data_path):
+        return 0
+    return sum(
+        os.path.getsize(os.path.join(data_path, name)) for name in os.listdir(data_path)
+    )
+
+
+def append_sample(
+    sample: Dict[str, np.ndarray], data_path: str, lock: Optional[Lock]
+) -> None:
+    """
+    Every key is stored as flat array of values and table of per-sample shapes,
+    so sample offsets are cumulative sums of shape products
+    """
+
+    def append_sample_internal():
+        os.makedirs(data_path, exist_ok=True)
+        meta = load_meta(data_path)
+        if meta is None:
+            meta = {
+                key: {"dtype": np.asarray(value).dtype.str, "ndim": np.ndim(value)}
+                for key, value in sample.items()
+            }
+            with open(
+                os.path.join(data_path, META_FILE), "w", encoding="utf-8"
+            ) as file:
+                json.dump(meta, file)
+        assert set(sample) == set(meta), "Sample keys differ from dataset keys"
+
+        for key, value in sample.items():
+            array = np.ascontiguousarray(value, dtype=meta[key]["dtype"])
+            assert array.ndim == meta[key]["ndim"] > 0, f"Wrong dimension of {key}"
+            with open(get_values_path(data_path, key), "ab") as file:
+                array.tofile(file)
+            with open(get_shapes_path(data_path, key), "ab") as file:
+                np.array(array.shape, dtype=np.int64).tofile(file)
+
+    if lock is None:
+        append_sample_internal()
+    else:
+        with lock:
+            append_sample_internal()
+
+
+class MemmapReader:
+    def __init__(self, data_path: str):
+        self.data_path = data_path
+        self.meta = load_meta(data_path) or {}
+        self.shapes = {}
+        self.offsets = {}
+        for key, key_meta in self.meta.items():
+            shapes = np.fromfile(get_shapes_path(data_path, key), dtype=np.int64)
+            self.shapes[key] = shapes.reshape(-1, key_meta["ndim"])
+            self.offsets[key] = np.concatenate(
+                ([0], np.cumsum(np.prod(self.shapes[key], axis=1)))
+            )
+        # interrupted append leaves some keys one sample ahead
+        self.samples_count = min((len(s) for s in self.shapes.values()), default=0)
+        self._values = None
+
+    def __len__(self):
+        return self.samples_count
+
+    @property
+    def values(self) -> Dict[str, np.ndarray]:
+        # Mapped on first access, so that every DataLoader worker maps files itself
+        # and all of them share the page cache; "c" gives writable views without
+        # ever writing to files
+        if self._values is None:
+            self._values = {}
+            for key, key_meta in self.meta.items():
+                path = get_values_path(self.data_path, key)
+                dtype = np.dtype(key_meta["dtype"])
+                self._values[key] = (
+                    np.memmap(path, dtype=dtype, mode="c")
+                    if os.path.getsize(path) > 0
+                    else np.empty(0, dtype=dtype)
+                )
+        return self._values
+
+    def __getitem__(self, index: int) -> Dict[str, np.ndarray]:
+        if not 0 <= index < self.samples_count:
+            raise IndexError(index)
+        return {
+            key: np.asarray(
+                values[self.offsets[key][index] : self.offsets[key][index + 1]]
+            ).reshape(self.shapes[key][index])
+            for key, values in self.values.items()
+        }
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_values"] = None
+        return state
@@ -2,13 +2,15 @@
 multiprocessing helpers
 """
 import sys
-from typing import Callable, Tuple
+from typing import Any, Callable, Iterable, Optional, Sequence, Tuple
 
-from multiprocess import Lock, Process, Queue  # multiprocessing
+from conmech.helpers import lzh, pkh
+
+multiprocess = lzh.lazy_import("multiprocess", extra="multiprocessing")  # dill pickling
 
 
 def get_lock():
-    return Lock()
+    return multiprocess.Lock()
 
 
 def is_supported():
@@ -20,11 +22,11 @@ if not is_supported():
 
 
 def get_queue():
-    return Queue()
+    return multiprocess.Queue()
 
 
-def start_process(function: Callable, queue: Queue):
-    process = Process(
+def start_process(function: Callable, queue: "multiprocess.Queue"):
+    process = multiprocess.Process(
         target=function,
         args=(queue,),
     )
@@ -37,9 +39,9 @@ def run_processes(function: Callable, num_workers: int, function_args: Tuple = (
         args = function_args + (1, 0)
         return function(*args)
 
-    queue = Queue()
+    queue = multiprocess.Queue()
     processes = [
-        Process(
+        multiprocess.Process(
             target=lambda *args: queue.put(function(*args)),
             args=function_args + (num_workers, process_id),
         )
@@ -59,15 +61,59 @@ def run_process(function):  # , args
     if not is_supported():
         return function()
 
-    queue = Queue()
+    queue = multiprocess.Queue()
 
     # wrapper = lambda *args : queue.put(function())
     def wrapper():
         return queue.put(function())
 
-    process = Process(target=wrapper)
+    process = multiprocess.Process(target=wrapper)
     process.start()
     process.join()
     result = queue.get()
 
     return result
+
+
+def generate_in_shards(
+    generate_sample: Callable[[int], Any],
+    data_path: str,
+    samples_count: int,
+    num_workers: int,
+    get_progress: Optional[Callable[[Sequence[int], int, int], Iterable[int]]] = None,
+    prepare: Optional[Callable[[Sequence[int]], None]] = None,
+) -> bool:
+    """
+    Every worker appends samples to its own shard of data_path; samples present
+    in shards left by interrupted run are not generated again. Shards are merged
+    in order of sample indices, so result does not depend on num_workers.
+    prepare is called by every worker with its samples before generating them
+    """
+    done_samples = pkh.get_shards_samples(data_path)
+    remaining_samples = [
+        sample_index
+        for sample_index in range(samples_count)
+        if sample_index not in done_samples
+    ]
+    first_shard_id = pkh.get_next_shard_id(data_path)
+
+    def generate_process(num_workers: int, process_id: int):
+        shard_path = pkh.get_shard_path(data_path, first_shard_id + process_id)
+        assigned_samples = remaining_samples[process_id::num_workers]
+        if prepare is not None:
+            prepare(assigned_samples)
+        if get_progress is not None:
+            assigned_samples = get_progress(assigned_samples, num_workers, process_id)
+        for sample_index in assigned_samples:
+            pkh.append_shard_data(
+                data=generate_sample(sample_index),
+                sample_index=sample_index,
+                shard_path=shard_path,
+            )
+        return True
+
+    if remaining_samples:
+        run_processes(
+            generate_process, num_workers=min(num_workers, len(remaining_samples))
+        )
+    return pkh.merge_shards(data_path=data_path, samples_count=samples_count)
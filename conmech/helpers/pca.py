@@ -4,10 +4,15 @@ from io import BufferedReader
 
 import jax
 import jax.numpy as jnp
+import numpy as np
 from tqdm import tqdm
 
 from conmech.helpers import cmh, nph
 
+PCA_PATH = "./output/PCA_npy"
+# projection pickled by older versions
+LEGACY_PCA_PATH = "./output/PCA"
+
 
 def get_all_indices(data_path):
     all_indices = []
@@ -33,14 +38,12 @@ def load_byte_index(byte_index: int, data_file: BufferedReader):
     return data
 
 
-def get_scenes():
-    input_path = "/home/michal/Desktop/conmech3d/output"
+def iterate_scenes(input_path="/home/michal/Desktop/conmech3d/output"):
     scene_files = cmh.find_files_by_extension(input_path, "scenes")  # scenes_data
     path_id = "/scenarios/"
     scene_files = [f for f in scene_files if path_id in f]
 
     # all_arrays_path = max(scene_files, key=os.path.getctime)
-    scenes = []
     for all_arrays_path in scene_files:
         all_arrays_name = os.path.basename(all_arrays_path).split("DATA")[0]
         print(f"FILE: {all_arrays_name}")
@@ -49,12 +52,14 @@ def get_scenes():
         scenes_file = open_file_read(all_arrays_path)
         with scenes_file:
             for byte_index in all_indices:
-                scene = load_byte_index(
+                yield load_byte_index(
                     byte_index=byte_index,
                     data_file=scenes_file,
                 )
-                scenes.append(scene)
-    return scenes
+
+
+def get_scenes():
+    return list(iterate_scenes())
 
 
 def get_projection(data, latent_dim=200):
@@ -65,6 +70,42 @@ def get_projection(data, latent_dim=200):
     return {"matrix": projection_matrix, "mean": projection_mean.reshape(-1, 1)}
 
 
+class StreamingPCA:
+    """
+    Incremental SVD: data is added in chunks of rows, only top singular vectors
+    are kept, so memory is O((rank + chunk size) * features) for any number of rows
+    """
+
+    def __init__(self, latent_dim=200, oversampling=10):
+        self.latent_dim = latent_dim
+        # spare components reduce truncation error of later updates
+        self.rank = latent_dim + oversampling
+        self.singular_values = None
+        self.components = None
+
+    def update(self, chunk):
+        chunk = np.asarray(chunk, dtype=np.float64).reshape(len(chunk), -1)
+        if self.components is not None:
+            chunk = np.vstack((self.singular_values[:, None] * self.components, chunk))
+        _, singular_values, components = np.linalg.svd(chunk, full_matrices=False)
+        self.singular_values = singular_values[: self.rank]
+        self.components = components[: self.rank]
+        return self
+
+    def get_projection(self):
+        # mean is zero as in get_projection
+        projection_matrix = self.components[: self.latent_dim].T.astype(np.float32)
+        projection_mean = np.zeros((len(projection_matrix), 1), dtype=np.float32)
+        return {"matrix": projection_matrix, "mean": projection_mean}
+
+
+def get_projection_streaming(data_chunks, latent_dim=200):
+    pca = StreamingPCA(latent_dim=latent_dim)
+    for chunk in data_chunks:
+        pca.update(chunk)
+    return pca.get_projection()
+
+
 def project_to_latent(projection, data_stack):
     data_stack_zeroed = data_stack - projection["mean"]
     latent = projection["matrix"].T @ data_stack_zeroed
@@ -85,15 +126,23 @@ def p_from_vector(projection, vector):
     return project_from_latent(projection, vector.reshape(-1, 1)).reshape(-1)
 
 
-def save_pca(projection, file_path="./output/PCA"):
-    with open(file_path, "wb") as file:
-        pickle.dump(projection, file)
+def save_pca(projection, file_path=PCA_PATH):
+    # arrays in separate .npy files, so they can be memory-mapped on load
+    os.makedirs(file_path, exist_ok=True)
+    for name, value in projection.items():
+        np.save(os.path.join(file_path, f"{name}.npy"), np.asarray(value))
 
 
-def load_pca(file_path="./output/PCA"):
-    with open(file_path, "rb") as file:
-        projection = pickle.load(file)
-    return projection
+def load_pca(file_path=PCA_PATH):
+    if not os.path.isdir(file_path):
+        if file_path == PCA_PATH:
+            file_path = LEGACY_PCA_PATH
+        with open(file_path, "rb") as file:
+            return pickle.load(file)
+    return {
+        name: np.load(os.path.join(file_path, f"{name}.npy"), mmap_mode="r")
+        for name in ["matrix", "mean"]
+    }
 
 
 def get_data_scenes(scenes):
@@ -108,6 +157,18 @@ def get_data_scenes(scenes):
     return data, u_stack, u
 
 
+def iterate_data_chunks(scenes, chunk_size=100):
+    chunk = []
+    for scene in scenes:
+        u = scene.get_last_displacement_step()
+        chunk.append(nph.stack_column(np.asarray(u)).reshape(-1))
+        if len(chunk) == chunk_size:
+            yield np.array(chunk)
+            chunk = []
+    if chunk:
+        yield np.array(chunk)
+
+
 def get_data_dataset(dataloader):
     data_list = []
     count = 1000
@@ -125,13 +186,14 @@ def get_data_dataset(dataloader):
 
 def run(dataloader):
     _ = dataloader
-    scenes = get_scenes()
-    data, sample_u_stack, sample_u = get_data_scenes(scenes)
     # data, sample_u_stack, sample_u = get_data_dataset(dataloader)
-
-    original_projection = get_projection(data)
+    original_projection = get_projection_streaming(
+        iterate_data_chunks(iterate_scenes())
+    )
     save_pca(original_projection)
 
+    sample_u = jnp.array(next(iterate_scenes()).get_last_displacement_step())
+    sample_u_stack = nph.stack_column(sample_u)
     projection = load_pca()
     latent = project_to_latent(projection, sample_u_stack)
     u_reprojected_stack = project_from_latent(projection, latent)
@@ -1,10 +1,12 @@
 """
 pickle helpers
 """
+import glob
+import os
 import pickle
 from io import BufferedReader
 from threading import Lock
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
 
 
 def open_files_write(path: str):
@@ -19,18 +21,22 @@ def open_file_read(path: str):
     return open(path, "rb")
 
 
-def get_all_indices(data_path):
-    all_indices = []
+def load_all(path: str) -> list:
+    all_data = []
     try:
-        with open(f"{data_path}_indices", "rb") as file:
+        with open(path, "rb") as file:
             try:
                 while True:
-                    all_indices.append(pickle.load(file))
-            except EOFError:
-                pass
+                    all_data.append(pickle.load(file))
+            except (EOFError, pickle.UnpicklingError):
+                pass  # end of file or record cut by interrupted append
     except IOError:
         pass
-    return all_indices
+    return all_data
+
+
+def get_all_indices(data_path):
+    return load_all(f"{data_path}_indices")
 
 
 def append_data(data, data_path: str, lock: Optional[Lock]) -> None:
@@ -52,3 +58,62 @@ def load_byte_index(byte_index: int, data_file: BufferedReader):
     data_file.seek(byte_index)
     data = pickle.load(data_file)
     return data
+
+
+def get_shard_path(data_path: str, shard_id: int):
+    return f"{data_path}.shard_{shard_id}"
+
+
+def get_shard_paths(data_path: str) -> List[str]:
+    return sorted(glob.glob(f"{glob.escape(data_path)}.shard_*[0-9]"))
+
+
+def get_next_shard_id(data_path: str) -> int:
+    shard_ids = [int(path.rsplit("_", 1)[1]) for path in get_shard_paths(data_path)]
+    return max(shard_ids, default=-1) + 1
+
+
+def append_shard_data(data, sample_index: int, shard_path: str) -> None:
+    append_data(data=data, data_path=shard_path, lock=None)
+    # written last, so interrupted append never leaves sample index without data
+    with open(f"{shard_path}_samples", "ab+") as file:
+        pickle.dump(sample_index, file, protocol=-1)
+
+
+def get_shards_samples(data_path: str) -> Dict[int, Tuple[str, int]]:
+    samples = {}
+    for shard_path in get_shard_paths(data_path):
+        sample_indices = load_all(f"{shard_path}_samples")
+        for sample_index, byte_index in zip(
+            sample_indices, get_all_indices(shard_path)
+        ):
+            samples[sample_index] = (shard_path, byte_index)
+    return samples
+
+
+def merge_shards(data_path: str, samples_count: int) -> bool:
+    """
+    Writes samples from all shards to data_path in order of sample indices
+    and removes shards; returns False and keeps shards if any sample is missing
+    """
+    samples = get_shards_samples(data_path)
+    if any(sample_index not in samples for sample_index in range(samples_count)):
+        return False
+
+    shard_files = {}
+    data_file, indices_file = open_files_write(data_path)
+    with data_file, indices_file:
+        for sample_index in range(samples_count):
+            shard_path, byte_index = samples[sample_index]
+            if shard_path not in shard_files:
+                shard_files[shard_path] = open_file_read(shard_path)
+            data = load_byte_index(byte_index, shard_files[shard_path])
+            pickle.dump(data_file.tell(), indices_file, protocol=-1)
+            pickle.dump(data, data_file, protocol=-1)
+
+    for shard_file in shard_files.values():
+        shard_file.close()
+    for shard_path in get_shard_paths(data_path):
+        for path in [shard_path, f"{shard_path}_indices", f"{shard_path}_samples"]:
+            os.remove(path)
+    return True
@@ -1,8 +1,12 @@
-import jax
+import itertools
+from typing import NamedTuple
+
 import jax.numpy as jnp
 import numba
 import numpy as np
 
+from conmech.helpers import jxh
+
 # class Hasher:
 #     def __init__(self, nodes, spacing=0.05, table_size_proportion=2):
 
@@ -34,7 +38,8 @@ def cell_coord_numba(node, spacing):
 @numba.njit()  # inline="always")
 def cell_hash_numba(node, spacing, table_size):
     cell = cell_coord_numba(node, spacing)
-    return custom_hash_numba(cell[0], cell[1], cell[2], table_size)
+    c3 = cell[2] if len(cell) == 3 else 0
+    return custom_hash_numba(cell[0], cell[1], c3, table_size)
 
 
 @numba.njit()  # inline="always")
@@ -42,6 +47,13 @@ def custom_hash_numba(c1, c2, c3, table_size):
     return abs((c1 * 92837111) ^ (c2 * 689287499) ^ (c3 * 283923481)) % table_size
 
 
+def get_spacing(nodes: np.ndarray, elements: np.ndarray):
+    # median edge length: element ball then covers few cells in each direction
+    pairs = np.array(list(itertools.combinations(range(elements.shape[1]), 2)))
+    edges = nodes[elements[:, pairs[:, 0]]] - nodes[elements[:, pairs[:, 1]]]
+    return float(np.median(np.linalg.norm(edges, axis=-1)))
+
+
 @numba.njit()
 def initialize_hasher_numba(
     nodes,
@@ -49,7 +61,6 @@ def initialize_hasher_numba(
     cell_starts,
     node_cell,
 ):  # TODO: reuse starts and entries
-    assert nodes.shape[1] == 3
     # self.max_objects_count = max_objects_count
     table_size = len(cell_starts) - 1
 
@@ -74,78 +85,125 @@ def initialize_hasher_numba(
 
 @numba.njit()
 def query_hasher_numba(
-    nodes_query, ready_nodes_mask, query_node, max_dist, cell_starts, node_cell, spacing
+    nodes_query,
+    ready_nodes_mask,
+    query_node,
+    max_dist,
+    cell_starts,
+    node_cell,
+    spacing,
+    nodes,
 ):
     # nodes_mask[:] = False
     table_size = len(cell_starts) - 1
-    # cell_min = cell_coord_numba(node=query_node - max_dist, spacing=spacing)
-    # cell_max = cell_coord_numba(node=query_node + max_dist, spacing=spacing)
+    # same rounding as in cell_coord_numba; third axis has one cell in 2D
+    cell_min = np.zeros(3, dtype=np.int64)
+    cell_max = np.zeros(3, dtype=np.int64)
+    cell_min[: len(query_node)] = cell_coord_numba(query_node - max_dist, spacing)
+    cell_max[: len(query_node)] = cell_coord_numba(query_node + max_dist, spacing)
 
     # get all points from cells
     query_size = 0
-    for c1 in range(
-        int((query_node[0] - max_dist) / spacing),
-        int((query_node[0] + max_dist) / spacing) + 1,
-    ):
-        for c2 in range(
-            int((query_node[1] - max_dist) / spacing),
-            int((query_node[1] + max_dist) / spacing) + 1,
-        ):
-            for c3 in range(
-                int((query_node[2] - max_dist) / spacing),
-                int((query_node[2] + max_dist) / spacing) + 1,
-            ):
+    for c1 in range(cell_min[0], cell_max[0] + 1):
+        for c2 in range(cell_min[1], cell_max[1] + 1):
+            for c3 in range(cell_min[2], cell_max[2] + 1):
                 h = custom_hash_numba(c1=c1, c2=c2, c3=c3, table_size=table_size)
                 start = cell_starts[h]
                 end = cell_starts[h + 1]
                 for i in range(start, end):
                     node_id = node_cell[i]
-                    if not ready_nodes_mask[node_id]:
-                        nodes_query[query_size] = node_id
-                        query_size += 1
+                    if ready_nodes_mask[node_id]:
+                        continue
+                    # skip nodes of other cells in bucket, so none is repeated
+                    cell = cell_coord_numba(nodes[node_id], spacing)
+                    if (
+                        cell[0] != c1
+                        or cell[1] != c2
+                        or (len(cell) == 3 and cell[2] != c3)
+                    ):
+                        continue
+                    nodes_query[query_size] = node_id
+                    query_size += 1
     return query_size
 
 
-###
+# JAX query on table built on host; hash wraps in uint32, so it is the same
+# in numpy and in JAX without 64-bit types
+
+HASH_PRIMES = (92837111, 689287499, 283923481)
+
 
+class SpatialHashTable(NamedTuple):
+    nodes: np.ndarray
+    cell_starts: np.ndarray
+    node_cell: np.ndarray
+    spacing: float
+    max_cell_size: int
 
-def cell_coord(node, spacing):
-    return jnp.floor(node / spacing).astype(np.int64)
 
+def custom_hash(cells, table_size: int, xnp=np):
+    cells = cells.astype(xnp.int32).astype(xnp.uint32)
+    result = xnp.zeros(cells.shape[:-1], dtype=xnp.uint32)
+    for axis in range(cells.shape[-1]):
+        result = result ^ (cells[..., axis] * xnp.uint32(HASH_PRIMES[axis]))
+    return (result % xnp.uint32(table_size)).astype(xnp.int32)
 
-def custom_hash(cell, table_size):
-    return (
-        abs(
-            (cell[..., 0] * 92837111)
-            ^ (cell[..., 1] * 689287499)
-            ^ (cell[..., 2] * 283923481)
-        )
-        % table_size
+
+def cell_coord(nodes, spacing, xnp=np):
+    return xnp.floor(nodes / spacing).astype(xnp.int32)
+
+
+def get_hash_table(nodes: np.ndarray, spacing: float, table_size_proportion: int = 2):
+    nodes = np.asarray(nodes, dtype=np.float32)
+    table_size = table_size_proportion * len(nodes)
+    hashes = custom_hash(cell_coord(nodes, spacing), table_size)
+    node_cell = np.argsort(hashes, kind="stable").astype(np.int32)
+    cell_starts = np.searchsorted(hashes[node_cell], np.arange(table_size + 1))
+    return SpatialHashTable(
+        nodes=nodes,
+        cell_starts=cell_starts.astype(np.int32),
+        node_cell=node_cell,
+        spacing=spacing,
+        max_cell_size=int(np.diff(cell_starts).max()),
     )
 
 
-# @numba.njit()
-def query_hasher_jax(nodes_mask, query_node, max_dist, cell_starts, node_cell, spacing):
-    nodes_mask = jnp.array(nodes_mask)
-    query_node = jnp.array(query_node)
-    # cell_starts = jnp.array(cell_starts)
-    node_cell = jnp.array(node_cell)
+def get_cells_radius(max_dist: float, spacing: float):
+    return int(np.ceil(max_dist / spacing))
 
-    nodes_mask.at[:].set(False)
+
+@jxh.jit(name="query_hasher_jax", static_argnames=("cells_radius", "max_cell_size"))
+def query_hasher_jax(
+    query_nodes,
+    max_dist,
+    nodes,
+    cell_starts,
+    node_cell,
+    spacing,
+    cells_radius: int,
+    max_cell_size: int,
+):
+    """
+    Indices of nodes within max_dist of each query node, padded with -1;
+    cells_radius * spacing has to be at least max_dist (see get_cells_radius)
+    """
+    dim = query_nodes.shape[-1]
     table_size = len(cell_starts) - 1
-    cell_min = jax.jit(cell_coord)(node=query_node - max_dist, spacing=spacing)
-    cell_max = jax.jit(cell_coord)(node=query_node + max_dist, spacing=spacing)
-    cell_max += 1
-
-    def body_fun(c3, cell):
-        cell.at[2].set(c3)
-        h = jax.jit(custom_hash)(cell=cell, table_size=table_size)
-        nodes_mask.at[node_cell[cell_starts[h] : cell_starts[h + 1]]].set(True)
-        return cell
-
-    cell = jnp.zeros(3, dtype=np.int64)
-    for c1 in range(cell_min[0], cell_max[0]):
-        cell.at[0].set(c1)
-        for c2 in range(cell_min[1], cell_max[1]):
-            cell.at[1].set(c2)
-            jax.lax.fori_loop(cell_min[2], cell_max[2], body_fun, cell)
+    offsets = jnp.array(
+        list(itertools.product(range(-cells_radius, cells_radius + 1), repeat=dim)),
+        dtype=jnp.int32,
+    )
+    cells = cell_coord(query_nodes, spacing, xnp=jnp)[:, None] + offsets
+    hashes = custom_hash(cells, table_size, xnp=jnp)
+    slots = cell_starts[hashes][..., None] + jnp.arange(max_cell_size)
+    valid = slots < cell_starts[hashes + 1][..., None]
+    candidates = node_cell[jnp.where(valid, slots, 0)]
+    candidate_nodes = nodes[candidates]
+
+    # hash collisions: candidate has to lie in visited cell, which also removes
+    # duplicates when two visited cells share a bucket
+    candidate_cells = cell_coord(candidate_nodes, spacing, xnp=jnp)
+    valid &= jnp.all(candidate_cells == cells[:, :, None], axis=-1)
+    distances = jnp.linalg.norm(candidate_nodes - query_nodes[:, None, None], axis=-1)
+    valid &= distances <= max_dist
+    return jnp.where(valid, candidates, -1).reshape(len(query_nodes), -1)
@@ -5,7 +5,10 @@ import time
 from contextlib import ContextDecorator
 from ctypes import ArgumentError
 from typing import Any
-import pandas as pd
+
+from conmech.helpers import lzh
+
+pd = lzh.lazy_import("pandas")
 
 # Inspired by https://github.com/realpython/codetiming
 
@@ -0,0 +1,335 @@
+"""
+tracing helpers
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+# Enable with CONMECH_TRACE=1; CONMECH_TRACE_PATH=<file.json> exports Chrome trace
+TRACE_ENV = "CONMECH_TRACE"
+TRACE_PATH_ENV = "CONMECH_TRACE_PATH"
+
+COMPILE_EVENT_PREFIX = "/jax/core/compile/"
+
+
+class SpanEvent(NamedTuple):
+    name: str
+    thread_id: int
+    start_ns: int
+    end_ns: int
+    self_ns: int
+    depth: int
+
+    @property
+    def duration_ns(self):
+        return self.end_ns - self.start_ns
+
+
+class PhaseSummary(NamedTuple):
+    name: str
+    count: int
+    total_s: float
+    self_s: float
+    mean_ms: float
+    share: float
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def __call__(self, function):
+        return function
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "start_ns", "annotation")
+
+    def __init__(self, tracer: "Tracer", name: str):
+        self.tracer = tracer
+        self.name = name
+        self.start_ns = 0
+        self.annotation = None
+
+    def __enter__(self):
+        if self.tracer.with_jax:
+            self.annotation = _get_trace_annotation()(self.name)
+            self.annotation.__enter__()
+        self.tracer._push()
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        end_ns = time.perf_counter_ns()
+        self.tracer._pop(self.name, self.start_ns, end_ns)
+        if self.annotation is not None:
+            self.annotation.__exit__(*exc_info)
+            self.annotation = None
+        return False
+
+
+def _get_trace_annotation():
+    # Imported on first enabled span, disabled tracing never touches jax.profiler
+    import jax.profiler  # pylint: disable=import-outside-toplevel
+
+    return jax.profiler.TraceAnnotation
+
+
+class Tracer:
+    def __init__(self, enabled: bool = False, with_jax: bool = True):
+        self.enabled = enabled
+        self.with_jax = with_jax
+        self.events: List[SpanEvent] = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._origin_ns = time.perf_counter_ns()
+        self._listening_to_jax = False
+
+    def span(self, name: str):
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name)
+
+    def traced(self, name: Optional[str] = None):
+        def decorator(function: Callable):
+            span_name = function.__qualname__ if name is None else name
+
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return function(*args, **kwargs)
+                with _Span(self, span_name):
+                    return function(*args, **kwargs)
+
+            wrapper.__name__ = function.__name__
+            wrapper.__qualname__ = function.__qualname__
+            wrapper.__doc__ = function.__doc__
+            wrapper.__wrapped__ = function
+            return wrapper
+
+        return decorator
+
+    def enable(self, with_jax: Optional[bool] = None):
+        self.enabled = True
+        if with_jax is not None:
+            self.with_jax = with_jax
+        self._listen_to_jax_compilation()
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        with self._lock:
+            self.events = []
+        self._origin_ns = time.perf_counter_ns()
+
+    def _get_stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = []
+            self._local.stack = stack
+        return stack
+
+    def _push(self):
+        # Accumulates time of children to compute exclusive (self) time
+        self._get_stack().append(0)
+
+    def _pop(self, name: str, start_ns: int, end_ns: int):
+        stack = self._get_stack()
+        children_ns = stack.pop()
+        duration_ns = end_ns - start_ns
+        if stack:
+            stack[-1] += duration_ns
+        self._append(
+            SpanEvent(
+                name=name,
+                thread_id=threading.get_ident(),
+                start_ns=start_ns,
+                end_ns=end_ns,
+                self_ns=duration_ns - children_ns,
+                depth=len(stack),
+            )
+        )
+
+    def _append(self, event: SpanEvent):
+        with self._lock:
+            self.events.append(event)
+
+    def _listen_to_jax_compilation(self):
+        if self._listening_to_jax or not self.with_jax:
+            return
+        import jax.monitoring  # pylint: disable=import-outside-toplevel
+
+        def listener(event: str, duration_secs: float):
+            if not self.enabled or not event.startswith(COMPILE_EVENT_PREFIX):
+                return
+            end_ns = time.perf_counter_ns()
+            start_ns = end_ns - int(duration_secs * 1e9)
+            # Compilation happens inside the calling span, so it is not subtracted
+            # from its self time - it is reported as separate "jax_compile" phase
+            name = "jax_compile/" + event[len(COMPILE_EVENT_PREFIX) :].replace(
+                "_duration", ""
+            )
+            self._append(
+                SpanEvent(
+                    name=name,
+                    thread_id=threading.get_ident(),
+                    start_ns=start_ns,
+                    end_ns=end_ns,
+                    self_ns=end_ns - start_ns,
+                    depth=len(self._get_stack()),
+                )
+            )
+
+        jax.monitoring.register_event_duration_secs_listener(listener)
+        self._listening_to_jax = True
+
+    def summary(self, root: Optional[str] = None) -> List[PhaseSummary]:
+        with self._lock:
+            events = list(self.events)
+
+        totals: Dict[str, List[int]] = {}
+        for event in events:
+            values = totals.setdefault(event.name, [0, 0, 0])
+            values[0] += 1
+            values[1] += event.duration_ns
+            values[2] += event.self_ns
+
+        if root is not None and root in totals:
+            reference_ns = totals[root][1]
+        else:
+            reference_ns = sum(e.duration_ns for e in events if e.depth == 0)
+
+        result = [
+            PhaseSummary(
+                name=name,
+                count=count,
+                total_s=total_ns * 1e-9,
+                self_s=self_ns * 1e-9,
+                mean_ms=total_ns * 1e-6 / count,
+                share=self_ns / reference_ns if reference_ns > 0 else 0.0,
+            )
+            for name, (count, total_ns, self_ns) in totals.items()
+        ]
+        result.sort(key=lambda phase: phase.self_s, reverse=True)
+        return result
+
+    def report(self, root: Optional[str] = None) -> str:
+        phases = self.summary(root=root)
+        if not phases:
+            return "No traced spans"
+        width = max(len("phase"), *[len(phase.name) for phase in phases])
+        lines = [
+            f"{'phase':<{width}} | {'count':>7} | {'total [s]':>10}"
+            + f" | {'self [s]':>10} | {'mean [ms]':>10} | {'share':>6}"
+        ]
+        lines.append("-" * len(lines[0]))
+        for phase in phases:
+            lines.append(
+                f"{phase.name:<{width}} | {phase.count:>7d} | {phase.total_s:>10.3f}"
+                + f" | {phase.self_s:>10.3f} | {phase.mean_ms:>10.3f}"
+                + f" | {100 * phase.share:>5.1f}%"
+            )
+        return "\n".join(lines)
+
+    def print_report(self, root: Optional[str] = None):
+        print(self.report(root=root))
+
+    def to_chrome_trace(self) -> dict:
+        with self._lock:
+            events = list(self.events)
+        pid = os.getpid()
+        return {
+            "traceEvents": [
+                {
+                    "name": event.name,
+                    "cat": "jax" if event.name.startswith("jax_compile") else "conmech",
+                    "ph": "X",
+                    "ts": (event.start_ns - self._origin_ns) / 1e3,
+                    "dur": event.duration_ns / 1e3,
+                    "pid": pid,
+                    "tid": event.thread_id,
+                    "args": {"self_us": event.self_ns / 1e3},
+                }
+                for event in events
+            ],
+            "displayTimeUnit": "ms",
+        }
+
+    def export_chrome_trace(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.to_chrome_trace(), file)
+        return path
+
+
+TRACER = Tracer()
+if os.environ.get(TRACE_ENV, "0") not in ("", "0"):
+    TRACER.enable()
+
+
+def span(name: str):
+    return TRACER.span(name)
+
+
+def traced(name: Optional[str] = None):
+    return TRACER.traced(name)
+
+
+def is_enabled():
+    return TRACER.enabled
+
+
+def enable(with_jax: Optional[bool] = None):
+    TRACER.enable(with_jax=with_jax)
+
+
+def disable():
+    TRACER.disable()
+
+
+def reset():
+    TRACER.reset()
+
+
+def summary(root: Optional[str] = None):
+    return TRACER.summary(root=root)
+
+
+def print_report(root: Optional[str] = None):
+    TRACER.print_report(root=root)
+
+
+def export_chrome_trace(path: Optional[str] = None):
+    if path is None:
+        path = os.environ.get(TRACE_PATH_ENV)
+    if path is None:
+        return None
+    return TRACER.export_chrome_trace(path)
+
+
+@contextmanager
+def trace_jax(log_dir: str, create_perfetto_link: bool = False):
+    """Spans plus device-level jax.profiler trace (TensorBoard / Perfetto)"""
+    import jax.profiler  # pylint: disable=import-outside-toplevel
+
+    was_enabled = TRACER.enabled
+    TRACER.enable(with_jax=True)
+    try:
+        with jax.profiler.trace(log_dir, create_perfetto_link=create_perfetto_link):
+            yield TRACER
+    finally:
+        if not was_enabled:
+            TRACER.disable()
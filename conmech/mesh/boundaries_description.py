@@ -4,7 +4,10 @@ import numpy as np
 
 
 class BoundariesDescription:
-    def __init__(self, **kwargs):
+    def __init__(self, vectorized: bool = False, **kwargs):
+        # indicators also accept coordinates arrays (x[0] is array of all first
+        # coordinates) and are evaluated once for all nodes
+        self.vectorized = vectorized
         self.indicators: Dict[str, Callable[[np.ndarray], bool]] = {
             "contact": lambda _: False,
             "dirichlet": lambda _: False,
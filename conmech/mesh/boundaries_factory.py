@@ -5,6 +5,8 @@ from typing import Callable, Tuple, Union
 
 import numba
 import numpy as np
+import scipy.sparse
+import scipy.sparse.csgraph
 
 from conmech.mesh.boundaries import Boundaries
 from conmech.mesh.boundaries_description import BoundariesDescription
@@ -29,13 +31,119 @@ def identify_surfaces_numba(sorted_elements):
     return surfaces, opposing_indices
 
 
+# open addressing hash table of faces; face seen second time is shared by two
+# elements and removed, so table holds only faces still open during scan
+FACE_EMPTY = -1
+FACE_REMOVED = -2
+FACE_HASH_MULTIPLIER = np.uint64(11400714819323198485)
+INITIAL_FACE_TABLE_BITS = 12
+
+
+@numba.njit(inline="always")
+def get_face_slot_numba(key, bits):
+    return np.int64((np.uint64(key) * FACE_HASH_MULTIPLIER) >> np.uint64(64 - bits))
+
+
+@numba.njit
+def toggle_face_numba(keys, opposing_indices, key, opposing_index, bits):
+    # returns change of live and used slots counts
+    mask = (1 << bits) - 1
+    slot = get_face_slot_numba(key, bits)
+    free_slot = -1
+    while keys[slot] != FACE_EMPTY:
+        if keys[slot] == key:
+            keys[slot] = FACE_REMOVED
+            return -1, 0
+        if keys[slot] == FACE_REMOVED and free_slot == -1:
+            free_slot = slot
+        slot = (slot + 1) & mask
+    if free_slot != -1:
+        keys[free_slot] = key
+        opposing_indices[free_slot] = opposing_index
+        return 1, 0
+    keys[slot] = key
+    opposing_indices[slot] = opposing_index
+    return 1, 1
+
+
+@numba.njit
+def rehash_faces_numba(keys, opposing_indices, bits):
+    new_keys = np.full(1 << bits, FACE_EMPTY, dtype=np.int64)
+    new_opposing_indices = np.zeros(1 << bits, dtype=np.int64)
+    for slot in range(len(keys)):
+        if keys[slot] >= 0:
+            toggle_face_numba(
+                new_keys, new_opposing_indices, keys[slot], opposing_indices[slot], bits
+            )
+    return new_keys, new_opposing_indices
+
+
+@numba.njit
+def count_faces_numba(sorted_elements, nodes_count, bits):
+    """
+    Packed keys of faces which belong to odd number of elements (boundary faces
+    of valid mesh) with nodes opposing them; face with nodes a < b < c has key
+    (a * nodes_count + b) * nodes_count + c
+    """
+    element_size = sorted_elements.shape[1]
+    keys = np.full(1 << bits, FACE_EMPTY, dtype=np.int64)
+    opposing_indices = np.zeros(1 << bits, dtype=np.int64)
+    live_count = 0
+    used_count = 0
+    for element in sorted_elements:
+        for j in range(element_size):
+            key = 0
+            for k in range(element_size):
+                if k != j:
+                    key = key * nodes_count + element[k]
+            live_change, used_change = toggle_face_numba(
+                keys, opposing_indices, key, element[j], bits
+            )
+            live_count += live_change
+            used_count += used_change
+            if 2 * used_count > len(keys):
+                # grow if live faces fill table, otherwise only clear removed
+                if 4 * live_count > len(keys):
+                    bits += 1
+                keys, opposing_indices = rehash_faces_numba(
+                    keys, opposing_indices, bits
+                )
+                used_count = live_count
+    live = keys >= 0
+    return keys[live], opposing_indices[live]
+
+
+def can_pack_faces(nodes_count: int, face_size: int):
+    return float(nodes_count) ** face_size < 2**63
+
+
+def unpack_faces(keys: np.ndarray, nodes_count: int, face_size: int):
+    faces = np.zeros((len(keys), face_size), dtype=np.int64)
+    for i in range(face_size - 1, -1, -1):
+        keys, faces[:, i] = np.divmod(keys, nodes_count)
+    return faces
+
+
 def get_boundary_surfaces(elements):
     elements.sort(axis=1)
-    surfaces, opposing_indices = identify_surfaces_numba(sorted_elements=elements)
-    # boundaries are created by unique surfaces
-    boundary_surfaces, boundary_internal_indices = extract_unique_elements(
-        surfaces, opposing_indices
-    )
+    nodes_count = int(elements.max()) + 1 if elements.size else 0
+    if not can_pack_faces(nodes_count, face_size=elements.shape[1] - 1):
+        surfaces, opposing_indices = identify_surfaces_numba(sorted_elements=elements)
+        boundary_surfaces, boundary_internal_indices = extract_unique_elements(
+            surfaces, opposing_indices
+        )
+    else:
+        keys, opposing_indices = count_faces_numba(
+            elements.astype(np.int64, copy=False),
+            nodes_count,
+            bits=INITIAL_FACE_TABLE_BITS,
+        )
+        # sorted keys give surfaces in lexicographic order, as np.unique
+        order = np.argsort(keys)
+        boundary_surfaces = unpack_faces(
+            keys[order], nodes_count, face_size=elements.shape[1] - 1
+        )
+        boundary_internal_indices = opposing_indices[order]
     boundary_indices = extract_unique_indices(boundary_surfaces)
     return boundary_surfaces, boundary_internal_indices, boundary_indices
 
@@ -54,7 +162,29 @@ def extract_unique_elements(elements: np.ndarray, opposing_indices: np.ndarray):
 
 @numba.njit
 def get_nodes_mask_numba(nodes: np.ndarray, predicate_numba: Callable):
-    return [predicate_numba(n) for n in nodes]
+    mask = np.empty(len(nodes), dtype=np.bool_)
+    for i, node in enumerate(nodes):
+        mask[i] = predicate_numba(node)
+    return mask
+
+
+def get_vectorized_mask(nodes: np.ndarray, predicate: Callable):
+    mask = np.asarray(predicate(nodes.T))
+    assert mask.dtype == bool, "Vectorized predicate should return boolean mask"
+    return np.broadcast_to(mask, len(nodes)).copy()
+
+
+def get_nodes_mask(
+    nodes: np.ndarray, predicate_numba: Callable, vectorized: bool = False
+):
+    """
+    Vectorized predicate is evaluated once on coordinates columns (x[0] is array
+    of all first coordinates), other node by node
+    """
+    if vectorized:
+        predicate = getattr(predicate_numba, "py_func", predicate_numba)
+        return get_vectorized_mask(nodes, predicate)
+    return get_nodes_mask_numba(nodes, predicate_numba)
 
 
 def get_surface_centers(surfaces: np.ndarray, nodes: np.ndarray):
@@ -69,6 +199,7 @@ def reorder_boundary_nodes(
     elements: np.ndarray,
     is_dirichlet_numba: Callable,
     is_contact_numba: Callable,
+    vectorized: bool = False,
 ):
     # move boundary nodes to the top
     nodes, elements, boundary_nodes_count = reorder(
@@ -81,11 +212,11 @@ def reorder_boundary_nodes(
     else:
         # then move contact nodes to the top
         nodes, elements, contact_nodes_count = reorder(
-            nodes, elements, is_contact_numba, to_top=True
+            nodes, elements, is_contact_numba, to_top=True, vectorized=vectorized
         )
         # finally move dirichlet nodes to the bottom
         nodes, elements, dirichlet_nodes_count = reorder(
-            nodes, elements, is_dirichlet_numba, to_top=False
+            nodes, elements, is_dirichlet_numba, to_top=False, vectorized=vectorized
         )
     return (
         nodes,
@@ -101,11 +232,14 @@ def reorder(
     unordered_elements: np.ndarray,
     predicate_numba: Callable,
     to_top: bool,
+    vectorized: bool = False,
 ):
     *_, boundary_indices = get_boundary_surfaces(unordered_elements)
     unordered_boundary_nodes = unordered_nodes[boundary_indices]
-    mask = get_nodes_mask_numba(
-        nodes=unordered_boundary_nodes, predicate_numba=predicate_numba
+    mask = get_nodes_mask(
+        nodes=unordered_boundary_nodes,
+        predicate_numba=predicate_numba,
+        vectorized=vectorized,
     )
     selected_indices = boundary_indices[mask]
     return reorder_numba(unordered_nodes, unordered_elements, selected_indices, to_top)
@@ -157,6 +291,36 @@ def reorder_numba(
     return nodes, elements, len(selected_indices)
 
 
+def get_bandwidth_reducing_order(
+    elements: np.ndarray, nodes_count: int, block_starts: np.ndarray
+):
+    """
+    Reverse Cuthill-McKee order of nodes graph, stable within consecutive blocks
+    starting at block_starts, so that contact, neumann, inner and dirichlet nodes
+    stay in their ranges
+    """
+    size = elements.shape[1]
+    rows = np.repeat(elements, size, axis=1).reshape(-1)
+    columns = np.tile(elements, size).reshape(-1)
+    adjacency = scipy.sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.int8), (rows, columns)),
+        shape=(nodes_count, nodes_count),
+    )
+    rcm_order = scipy.sparse.csgraph.reverse_cuthill_mckee(
+        adjacency, symmetric_mode=True
+    )
+    rank = np.empty(nodes_count, dtype=np.int64)
+    rank[rcm_order] = np.arange(nodes_count)
+    block = np.searchsorted(block_starts, np.arange(nodes_count), side="right")
+    return np.lexsort((rank, block))
+
+
+def apply_nodes_order(nodes: np.ndarray, elements: np.ndarray, order: np.ndarray):
+    new_indices = np.empty(len(order), dtype=np.int64)
+    new_indices[order] = np.arange(len(order))
+    return nodes[order], new_indices[elements]
+
+
 class BoundariesFactory:
     """
     Rules:
@@ -176,9 +340,10 @@ class BoundariesFactory:
         for name, indicator in boundaries_description.indicators.items():
             if name not in ("contact", "dirichlet"):
                 indicator_numba = numba.njit(indicator)
-                mask = get_nodes_mask_numba(
+                mask = get_nodes_mask(
                     nodes=boundary_surface_centers,
                     predicate_numba=indicator_numba,
+                    vectorized=boundaries_description.vectorized,
                 )
                 surfaces = boundary_surfaces[mask]
                 node_indices = np.unique(surfaces).sort()
@@ -213,13 +378,15 @@ class BoundariesFactory:
             boundary_surface_centers = get_surface_centers(
                 surfaces=boundary_surfaces, nodes=initial_nodes
             )
-            dirichlet_mask = get_nodes_mask_numba(
+            dirichlet_mask = get_nodes_mask(
                 nodes=boundary_surface_centers,
                 predicate_numba=is_dirichlet_numba,
+                vectorized=boundaries_description.vectorized,
             )
-            contact_mask = get_nodes_mask_numba(
+            contact_mask = get_nodes_mask(
                 nodes=boundary_surface_centers,
                 predicate_numba=is_contact_numba,
+                vectorized=boundaries_description.vectorized,
             )
             neumann_mask = np.logical_and(
                 np.logical_not(dirichlet_mask), np.logical_not(contact_mask)
@@ -247,6 +414,7 @@ class BoundariesFactory:
         unordered_nodes: np.ndarray,
         unordered_elements: np.ndarray,
         boundaries_description: BoundariesDescription,
+        reduce_bandwidth: bool = False,
     ) -> Tuple[np.ndarray, np.ndarray, Boundaries]:
         def get_numba_version(fun):
             return None if fun is None else numba.njit(fun)
@@ -265,12 +433,26 @@ class BoundariesFactory:
             elements=unordered_elements,
             is_dirichlet_numba=is_dirichlet_numba,
             is_contact_numba=is_contact_numba,
+            vectorized=boundaries_description.vectorized,
         )
 
         nodes_count = len(initial_nodes)
         neumann_nodes_count = (
             boundary_nodes_count - contact_nodes_count - dirichlet_nodes_count
         )
+        if reduce_bandwidth:
+            order = get_bandwidth_reducing_order(
+                elements=elements,
+                nodes_count=nodes_count,
+                block_starts=np.array(
+                    [
+                        contact_nodes_count,
+                        contact_nodes_count + neumann_nodes_count,
+                        nodes_count - dirichlet_nodes_count,
+                    ]
+                ),
+            )
+            initial_nodes, elements = apply_nodes_order(initial_nodes, elements, order)
         boundary_surfaces, boundary_internal_indices, *_ = get_boundary_surfaces(
             elements
         )
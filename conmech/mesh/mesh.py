@@ -1,7 +1,9 @@
+import itertools
+
 import numba
 import numpy as np
 
-from conmech.helpers import cmh
+from conmech.helpers import trh
 from conmech.mesh import mesh_builders
 from conmech.mesh.boundaries import Boundaries
 from conmech.mesh.boundaries_description import BoundariesDescription
@@ -11,27 +13,34 @@ from conmech.properties.mesh_properties import MeshProperties
 
 @numba.njit
 def remove_unconnected_nodes_numba(nodes, elements):
-    nodes_count = len(nodes)
-    present_nodes = np.zeros(nodes_count, dtype=numba.boolean)
+    present_nodes = np.zeros(len(nodes), dtype=numba.boolean)
     for element in elements:
         for node in element:
             present_nodes[node] = True
 
-    index = 0
-    removed = 0
-    while index < nodes_count:
-        if present_nodes[index + removed]:
-            index += 1
-        else:
-            # print("Removing node...")
-            nodes = np.vstack((nodes[:index], nodes[index + 1 :]))
-            for i in range(elements.shape[0]):
-                for j in range(elements.shape[1]):
-                    if elements[i, j] > index:
-                        elements[i, j] -= 1
-            removed += 1
-            nodes_count -= 1
-    return nodes, elements
+    # new index of each kept node is count of kept nodes before it
+    new_indices = np.cumsum(present_nodes.astype(np.int64)) - 1
+    new_elements = np.empty_like(elements)
+    for i in range(elements.shape[0]):
+        for j in range(elements.shape[1]):
+            new_elements[i, j] = new_indices[elements[i, j]]
+    return nodes[present_nodes], new_elements
+
+
+def get_directional_edges(elements: np.ndarray, nodes_count: int):
+    # unique undirected edges as packed int64 keys (lower * nodes_count + higher),
+    # then both directions, sorted by sender and receiver
+    sorted_elements = np.sort(elements, axis=1).astype(np.int64)
+    lower, higher = np.array(
+        list(itertools.combinations(range(elements.shape[1]), 2))
+    ).T
+    keys = np.unique(
+        sorted_elements[:, lower] * nodes_count + sorted_elements[:, higher]
+    )
+    lower, higher = keys // nodes_count, keys % nodes_count
+    keys = np.concatenate((keys, higher * nodes_count + lower))
+    keys.sort()
+    return np.stack((keys // nodes_count, keys % nodes_count), axis=1)
 
 
 # pylint: disable=R0904
@@ -50,13 +59,11 @@ class Mesh:
 
         self.boundaries: Boundaries
 
-        def fun_data():
+        with trh.span("mesh"):
             self.reinitialize_data(
                 mesh_prop, boundaries_description, create_in_subprocess
             )
 
-        cmh.profile(fun_data, baypass=True)
-
     def remesh(self, boundaries_description, create_in_subprocess):
         self.reinitialize_data(
             self.mesh_prop, boundaries_description, create_in_subprocess
@@ -83,23 +90,12 @@ class Mesh:
             unordered_nodes=unordered_nodes,
             unordered_elements=unordered_elements,
             boundaries_description=boundaries_description,
+            reduce_bandwidth=mesh_prop.reduce_bandwidth,
         )
         self.directional_edges = self.get_directional_edges()
 
     def get_directional_edges(self):
-        size = self.elements.shape[1]
-        directional_edges = np.array(
-            list(
-                {
-                    (e[i], e[j])
-                    for i, j in np.ndindex((size, size))
-                    if j != i
-                    for e in self.elements
-                }
-            ),
-            dtype=np.int64,
-        )  # j > i - non-directional edges
-        return directional_edges
+        return get_directional_edges(self.elements, nodes_count=self.nodes_count)
 
     @property
     def edges_number(self):
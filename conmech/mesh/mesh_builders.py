@@ -1,19 +1,21 @@
 from ctypes import ArgumentError
 from typing import Tuple
 
-import dmsh
 import numpy as np
-import pygmsh
 
-from conmech.helpers import interpolation_helpers, lnh
+from conmech.helpers import interpolation_helpers, lnh, lzh
 from conmech.mesh import (
     mesh_builders_2d,
     mesh_builders_3d,
     mesh_builders_helpers,
     mesh_builders_legacy,
+    mesh_pool,
 )
 from conmech.properties.mesh_properties import MeshProperties
 
+dmsh = lzh.lazy_import("dmsh", extra="dmsh meshes")
+pygmsh = lzh.lazy_import("pygmsh", extra="gmsh meshes")
+
 
 def build_mesh(
     mesh_prop: MeshProperties,
@@ -55,6 +57,11 @@ def build_initial_mesh(
     create_in_subprocess=False,
 ) -> Tuple[np.ndarray, np.ndarray]:
     # pylint: disable=too-many-return-statements,too-many-branches
+    if create_in_subprocess and mesh_pool.has_pool():
+        # persistent workers started with Config.mesh_generation_workers > 0,
+        # so imports are not repeated for every mesh
+        return mesh_pool.get_pool().build_mesh(mesh_prop)
+
     if "cross" in mesh_prop.mesh_type:
         return mesh_builders_legacy.get_cross_rectangle(mesh_prop)
 
@@ -1,12 +1,14 @@
 from ctypes import ArgumentError
 
-import meshzoo
 import numpy as np
-import pygmsh
 
+from conmech.helpers import lzh
 from conmech.mesh import mesh_builders_helpers
 from conmech.properties.mesh_properties import MeshProperties
 
+meshzoo = lzh.lazy_import("meshzoo", extra="meshzoo meshes")
+pygmsh = lzh.lazy_import("pygmsh", extra="gmsh meshes")
+
 
 def get_meshzoo_rectangle(mesh_prop: MeshProperties):
     # pylint: disable=no-member
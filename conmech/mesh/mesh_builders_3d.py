@@ -1,21 +1,20 @@
+import os
 from ctypes import ArgumentError
 
-import meshio
-import meshzoo
 import numpy as np
-import pygmsh
 
-from conmech.helpers import cmh, nph
-from conmech.mesh import mesh_builders_helpers
+from conmech.helpers import lzh, nph
+from conmech.mesh import mesh_builders_helpers, mesh_reader
 from conmech.properties.mesh_properties import MeshProperties
 
+meshzoo = lzh.lazy_import("meshzoo", extra="meshzoo meshes")
+pygmsh = lzh.lazy_import("pygmsh", extra="gmsh meshes")
 
-def read_mesh(path):
-    with cmh.HiddenPrints():
-        mesh = meshio.read(path)
-    if mesh is None:
+
+def read_mesh(path, cache=False):
+    if not os.path.isfile(path):
         raise ArgumentError
-    return mesh
+    return mesh_reader.read(path, cache=cache)
 
 
 def get_edges_from_surfaces(surfaces):
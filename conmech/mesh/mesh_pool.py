@@ -0,0 +1,259 @@
+"""
+Persistent pool of mesh generation workers: meshing libraries are imported once per
+worker, requests with MeshProperties go through queue and nodes and elements come
+back through shared memory
+"""
+import atexit
+import multiprocessing
+import os
+import pickle
+import queue
+from collections import deque
+from multiprocessing import resource_tracker, shared_memory
+from typing import Deque, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from conmech.properties.mesh_properties import MeshProperties
+
+# meshes prefetched per worker before they are requested
+PREFETCH_PER_WORKER = 2
+RESULT_TIMEOUT = 1.0
+
+SharedArray = Tuple[str, Tuple[int, ...], str]
+
+
+def is_supported():
+    return "fork" in multiprocessing.get_all_start_methods()
+
+
+def share_array(array: np.ndarray) -> SharedArray:
+    memory = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=memory.buf)[...] = array
+    memory.close()
+    # receiving process unlinks memory
+    resource_tracker.unregister(
+        memory._name, "shared_memory"  # pylint: disable=protected-access
+    )
+    return memory.name, array.shape, array.dtype.str
+
+
+def receive_array(shared_array: SharedArray) -> np.ndarray:
+    name, shape, dtype = shared_array
+    memory = shared_memory.SharedMemory(name=name)
+    array = np.ndarray(shape, dtype=dtype, buffer=memory.buf).copy()
+    memory.close()
+    memory.unlink()
+    return array
+
+
+def release(result):
+    # memory of mesh which will not be requested
+    if not isinstance(result, Exception):
+        for name, _, _ in result:
+            memory = shared_memory.SharedMemory(name=name)
+            memory.close()
+            memory.unlink()
+
+
+def preload():
+    # meshing libraries imported before first request; not installed ones are
+    # reported when mesh needing them is requested
+    # pylint: disable=import-outside-toplevel
+    from conmech.mesh import mesh_builders_2d
+
+    try:
+        _ = mesh_builders_2d.pygmsh.geo
+    except (ImportError, OSError):
+        pass
+
+
+def run_worker(requests: "multiprocessing.Queue", results: "multiprocessing.Queue"):
+    # pylint: disable=import-outside-toplevel
+    from conmech.mesh import mesh_builders
+
+    preload()
+    while True:
+        request = requests.get()
+        if request is None:
+            return
+        request_id, mesh_prop = request
+        try:
+            arrays = mesh_builders.build_initial_mesh(mesh_prop)
+            results.put((request_id, [share_array(np.asarray(a)) for a in arrays]))
+        except Exception as exception:  # pylint: disable=broad-except
+            results.put((request_id, exception))
+
+
+def get_key(mesh_prop: MeshProperties):
+    return pickle.dumps(mesh_prop)
+
+
+class MeshPool:
+    """
+    Meshes built by workers concurrently; prefetched meshes are built ahead in
+    order and returned by build_mesh called with equal MeshProperties. Next
+    prefetch or cancel_prefetch drops prefetched meshes which were not requested
+    """
+
+    def __init__(self, workers: int = 1, context: str = "fork"):
+        assert workers > 0
+        self.workers = workers
+        self.pid = os.getpid()
+        multiprocessing_context = multiprocessing.get_context(context)
+        self.requests = multiprocessing_context.Queue()
+        self.results = multiprocessing_context.Queue()
+        self.processes = [
+            multiprocessing_context.Process(
+                target=run_worker, args=(self.requests, self.results), daemon=True
+            )
+            for _ in range(workers)
+        ]
+        for process in self.processes:
+            process.start()
+
+        self.next_request_id = 0
+        self.outstanding = set()
+        self.cancelled = set()
+        self.received: Dict[int, object] = {}
+        self.waiting: Deque[Tuple[bytes, MeshProperties]] = deque()
+        self.prefetched: Dict[bytes, Deque[int]] = {}
+        self.prefetched_count = 0
+        self.built_count = 0
+
+    def submit(self, mesh_prop: MeshProperties) -> int:
+        request_id = self.next_request_id
+        self.next_request_id += 1
+        self.outstanding.add(request_id)
+        self.requests.put((request_id, mesh_prop))
+        return request_id
+
+    def receive(self):
+        while True:
+            try:
+                request_id, result = self.results.get(timeout=RESULT_TIMEOUT)
+                break
+            except queue.Empty as empty:
+                if not all(process.is_alive() for process in self.processes):
+                    raise RuntimeError("Mesh worker exited") from empty
+        self.outstanding.discard(request_id)
+        if request_id in self.cancelled:
+            self.cancelled.discard(request_id)
+            release(result)
+        else:
+            self.received[request_id] = result
+
+    def get(self, request_id: int) -> Tuple[np.ndarray, np.ndarray]:
+        while request_id not in self.received:
+            self.receive()
+        result = self.received.pop(request_id)
+        if isinstance(result, Exception):
+            raise result
+        self.built_count += 1
+        nodes, elements = [receive_array(shared_array) for shared_array in result]
+        return nodes, elements
+
+    def map(self, mesh_props: Iterable[MeshProperties]):
+        request_ids = [self.submit(mesh_prop) for mesh_prop in mesh_props]
+        return [self.get(request_id) for request_id in request_ids]
+
+    def prefetch(self, mesh_props: Iterable[MeshProperties]):
+        self.cancel_prefetch()
+        self.waiting.extend((get_key(mesh_prop), mesh_prop) for mesh_prop in mesh_props)
+        self.fill()
+
+    def fill(self):
+        limit = PREFETCH_PER_WORKER * self.workers
+        while self.waiting and self.prefetched_count < limit:
+            key, mesh_prop = self.waiting.popleft()
+            self.prefetched.setdefault(key, deque()).append(self.submit(mesh_prop))
+            self.prefetched_count += 1
+
+    def cancel_prefetch(self):
+        self.waiting.clear()
+        for request_ids in self.prefetched.values():
+            for request_id in request_ids:
+                if request_id in self.received:
+                    release(self.received.pop(request_id))
+                else:
+                    self.cancelled.add(request_id)
+        self.prefetched.clear()
+        self.prefetched_count = 0
+
+    def build_mesh(self, mesh_prop: MeshProperties) -> Tuple[np.ndarray, np.ndarray]:
+        key = get_key(mesh_prop)
+        if not self.prefetched.get(key):
+            # requested before its turn, submitted now
+            for index, (waiting_key, _) in enumerate(self.waiting):
+                if waiting_key == key:
+                    del self.waiting[index]
+                    break
+            return self.get(self.submit(mesh_prop))
+        request_id = self.prefetched[key].popleft()
+        if not self.prefetched[key]:
+            del self.prefetched[key]
+        self.prefetched_count -= 1
+        self.fill()
+        return self.get(request_id)
+
+    def close(self):
+        if os.getpid() != self.pid:
+            return
+        self.waiting.clear()
+        for _ in self.processes:
+            self.requests.put(None)
+        # unlink memory of meshes which were never requested
+        while self.outstanding:
+            try:
+                self.receive()
+            except RuntimeError:
+                break
+        for process in self.processes:
+            process.join()
+        for result in self.received.values():
+            release(result)
+        self.received.clear()
+        # results left in queue when worker exited before close
+        while True:
+            try:
+                _, result = self.results.get_nowait()
+            except queue.Empty:
+                break
+            release(result)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+# pool shared by mesh builders, separate for every process
+POOLS: Dict[int, MeshPool] = {}
+
+
+def close_pools():
+    pool = POOLS.pop(os.getpid(), None)
+    if pool is not None:
+        pool.close()
+
+
+atexit.register(close_pools)
+
+
+def has_pool():
+    return os.getpid() in POOLS
+
+
+def get_pool(workers: Optional[int] = None) -> MeshPool:
+    pool = POOLS.get(os.getpid())
+    if pool is None or (workers is not None and workers != pool.workers):
+        close_pools()
+        pool = MeshPool(workers=workers or 1)
+        POOLS[os.getpid()] = pool
+    return pool
+
+
+def prefetch_meshes(mesh_props: List[MeshProperties], workers: int):
+    if workers > 0 and is_supported():
+        get_pool(workers).prefetch(mesh_props)
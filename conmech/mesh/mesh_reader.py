@@ -0,0 +1,332 @@
+"""
+Fast import of mesh files straight into node and element arrays: binary PLY, STL and
+MSH 2.2 read with memory mapping, other files through meshio, optional native cache
+of arrays in .npy files memory-mapped on next runs
+"""
+import os
+from typing import Dict, NamedTuple
+
+import numba
+import numpy as np
+
+from conmech.helpers import cmh, lzh
+
+meshio = lzh.lazy_import("meshio", extra="reading mesh files")
+
+CACHE_SUFFIX = ".cache"
+DEDUPLICATED_SUFFIX = ".deduplicated"
+POINTS_FILE = "points.npy"
+NODE_HASH_MULTIPLIER = np.uint64(11400714819323198485)
+MSH_CELL_TYPES = {
+    15: ("vertex", 1),
+    1: ("line", 2),
+    2: ("triangle", 3),
+    4: ("tetra", 4),
+}
+PLY_TYPES = {
+    "char": "i1",
+    "int8": "i1",
+    "uchar": "u1",
+    "uint8": "u1",
+    "short": "i2",
+    "int16": "i2",
+    "ushort": "u2",
+    "uint16": "u2",
+    "int": "i4",
+    "int32": "i4",
+    "uint": "u4",
+    "uint32": "u4",
+    "float": "f4",
+    "float32": "f4",
+    "double": "f8",
+    "float64": "f8",
+}
+
+
+class UnsupportedMeshFormat(ValueError):
+    # file is read with meshio instead
+    pass
+
+
+class MeshData(NamedTuple):
+    # same fields as meshio.Mesh used by mesh builders
+    points: np.ndarray
+    cells_dict: Dict[str, np.ndarray]
+
+
+@numba.njit
+def get_unique_nodes_numba(nodes_bits):
+    """
+    Index of first node with the same coordinates bits for every node, found with
+    open addressing hash table
+    """
+    nodes_count, dim = nodes_bits.shape
+    bits = 1
+    while (1 << bits) < 2 * nodes_count:
+        bits += 1
+    mask = (1 << bits) - 1
+    table = np.full(1 << bits, -1, dtype=np.int64)
+    first_indices = np.empty(nodes_count, dtype=np.int64)
+    for i in range(nodes_count):
+        node_hash = np.uint64(0)
+        for axis in range(dim):
+            node_hash = (node_hash ^ np.uint64(nodes_bits[i, axis])) * (
+                NODE_HASH_MULTIPLIER
+            )
+        slot = np.int64(node_hash >> np.uint64(64 - bits))
+        while True:
+            j = table[slot]
+            if j == -1:
+                table[slot] = i
+                first_indices[i] = i
+                break
+            same = True
+            for axis in range(dim):
+                if nodes_bits[i, axis] != nodes_bits[j, axis]:
+                    same = False
+                    break
+            if same:
+                first_indices[i] = j
+                break
+            slot = (slot + 1) & mask
+    return first_indices
+
+
+def deduplicate_nodes(points: np.ndarray, cells_dict: Dict[str, np.ndarray]):
+    # +0.0 so that -0.0 and 0.0 have the same bits
+    points = np.ascontiguousarray(points, dtype=np.float64) + 0.0
+    first_indices = get_unique_nodes_numba(points.view(np.int64))
+    unique = first_indices == np.arange(len(points))
+    new_indices = np.cumsum(unique) - 1
+    new_indices = new_indices[first_indices]
+    return MeshData(
+        points=points[unique],
+        cells_dict={name: new_indices[cells] for name, cells in cells_dict.items()},
+    )
+
+
+def read_header(file, end: bytes):
+    lines = []
+    while True:
+        line = file.readline()
+        if not line:
+            raise UnsupportedMeshFormat("Unexpected end of header")
+        if line.strip() == end:
+            return lines, file.tell()
+        lines.append(line.decode("ascii").split())
+
+
+def read_ply(path: str):
+    with open(path, "rb") as file:
+        if file.readline().strip() != b"ply":
+            raise UnsupportedMeshFormat("Not a PLY file")
+        header, offset = read_header(file, end=b"end_header")
+    file_format = [line[1] for line in header if line[0] == "format"][0]
+    elements = []
+    for line in header:
+        if line[0] == "element":
+            elements.append((line[1], int(line[2]), []))
+        elif line[0] == "property":
+            elements[-1][2].append(line[1:])
+    names = [name for name, _, _ in elements]
+    if names[:2] != ["vertex", "face"] or len(elements[1][2]) != 1:
+        raise UnsupportedMeshFormat("Only vertices followed by faces are supported")
+    (_, vertices_count, vertex_properties), (
+        _,
+        faces_count,
+        face_properties,
+    ) = elements[:2]
+    if any(p[0] == "list" for p in vertex_properties):
+        raise UnsupportedMeshFormat("List properties of vertices are not supported")
+    _, count_type, index_type, _ = face_properties[0]
+
+    if file_format == "ascii":
+        # triangles only, counts are checked below
+        with open(path, "rb") as file:
+            file.seek(offset)
+            values = np.fromfile(file, sep=" ")
+        vertices_size = vertices_count * len(vertex_properties)
+        names = [p[1] for p in vertex_properties]
+        points = values[:vertices_size].reshape(vertices_count, -1)[
+            :, [names.index(axis) for axis in ["x", "y", "z"]]
+        ]
+        faces = values[vertices_size : vertices_size + 4 * faces_count]
+        faces = faces.reshape(faces_count, 4).astype(np.int64)
+    else:
+        byte_order = "<" if file_format == "binary_little_endian" else ">"
+        vertex_dtype = np.dtype(
+            [(p[1], byte_order + PLY_TYPES[p[0]]) for p in vertex_properties]
+        )
+        face_dtype = np.dtype(
+            [
+                ("count", byte_order + PLY_TYPES[count_type]),
+                ("indices", byte_order + PLY_TYPES[index_type], (3,)),
+            ]
+        )
+        vertices = np.memmap(
+            path, dtype=vertex_dtype, mode="r", offset=offset, shape=(vertices_count,)
+        )
+        faces_memmap = np.memmap(
+            path,
+            dtype=face_dtype,
+            mode="r",
+            offset=offset + vertices_count * vertex_dtype.itemsize,
+            shape=(faces_count,),
+        )
+        points = np.stack([vertices[axis] for axis in ["x", "y", "z"]], axis=1)
+        faces = np.column_stack(
+            (faces_memmap["count"], faces_memmap["indices"])
+        ).astype(np.int64)
+    if np.any(faces[:, 0] != 3):
+        raise UnsupportedMeshFormat("Only triangle faces are supported")
+    return MeshData(
+        points=points.astype(np.float64), cells_dict={"triangle": faces[:, 1:]}
+    )
+
+
+def read_stl(path: str):
+    if os.path.getsize(path) < 84:
+        raise UnsupportedMeshFormat("Not a binary STL file")
+    triangles_count = int(np.fromfile(path, dtype="<u4", count=1, offset=80)[0])
+    if os.path.getsize(path) != 84 + 50 * triangles_count:
+        raise UnsupportedMeshFormat("Not a binary STL file")
+    triangle_dtype = np.dtype(
+        [("normal", "<f4", (3,)), ("nodes", "<f4", (3, 3)), ("attribute", "<u2")]
+    )
+    triangles = np.memmap(
+        path, dtype=triangle_dtype, mode="r", offset=84, shape=(triangles_count,)
+    )
+    # every triangle has own copy of its nodes
+    points = triangles["nodes"].reshape(-1, 3)
+    cells = np.arange(len(points), dtype=np.int64).reshape(-1, 3)
+    return deduplicate_nodes(points, {"triangle": cells})
+
+
+def read_msh(path: str):
+    with open(path, "rb") as file:
+        file.readline()
+        version, file_type, _ = file.readline().split()
+        if version != b"2.2" or file_type != b"1":
+            raise UnsupportedMeshFormat("Only binary MSH 2.2 is supported")
+        if np.frombuffer(file.read(4), dtype=np.int32)[0] != 1:
+            raise UnsupportedMeshFormat("Byte order differs from native")
+        file.readline()
+        if file.readline().strip() != b"$EndMeshFormat":
+            raise UnsupportedMeshFormat("Unexpected MSH header")
+        if file.readline().strip() != b"$Nodes":
+            raise UnsupportedMeshFormat("Nodes expected after header")
+        nodes_count = int(file.readline())
+        nodes_offset = file.tell()
+
+    node_dtype = np.dtype([("id", "<i4"), ("coordinates", "<f8", (3,))])
+    nodes = np.memmap(
+        path, dtype=node_dtype, mode="r", offset=nodes_offset, shape=(nodes_count,)
+    )
+    node_ids = np.asarray(nodes["id"])
+    points = np.array(nodes["coordinates"])
+    indices = np.full(node_ids.max() + 1, -1, dtype=np.int64)
+    indices[node_ids] = np.arange(nodes_count)
+
+    with open(path, "rb") as file:
+        file.seek(nodes_offset + nodes_count * node_dtype.itemsize)
+        file.readline()
+        if file.readline().strip() != b"$EndNodes":
+            raise UnsupportedMeshFormat("Unexpected end of nodes")
+        if file.readline().strip() != b"$Elements":
+            raise UnsupportedMeshFormat("Elements expected after nodes")
+        elements_count = int(file.readline())
+        offset = file.tell()
+
+    cells = {}
+    while elements_count > 0:
+        cell_type, count, tags_count = np.fromfile(
+            path, dtype="<i4", count=3, offset=offset
+        )
+        if cell_type not in MSH_CELL_TYPES:
+            raise UnsupportedMeshFormat(f"Element type {cell_type} is not supported")
+        name, size = MSH_CELL_TYPES[cell_type]
+        block = np.memmap(
+            path,
+            dtype="<i4",
+            mode="r",
+            offset=offset + 12,
+            shape=(count, 1 + tags_count + size),
+        )
+        cells.setdefault(name, []).append(indices[block[:, 1 + tags_count :]])
+        offset += 12 + block.nbytes
+        elements_count -= count
+    return MeshData(
+        points=points,
+        cells_dict={name: np.concatenate(blocks) for name, blocks in cells.items()},
+    )
+
+
+READERS = {".ply": read_ply, ".stl": read_stl, ".msh": read_msh}
+
+
+def read_meshio(path: str):
+    with cmh.HiddenPrints():
+        mesh = meshio.read(path)
+    return MeshData(points=mesh.points, cells_dict=mesh.cells_dict)
+
+
+def read_arrays(path: str):
+    reader = READERS.get(os.path.splitext(path)[1].lower())
+    if reader is not None:
+        try:
+            return reader(path)
+        except UnsupportedMeshFormat:
+            pass
+    return read_meshio(path)
+
+
+def get_cache_path(path: str, deduplicate: bool = False):
+    # deduplicated and raw arrays differ, so they are cached separately
+    if deduplicate:
+        return path + DEDUPLICATED_SUFFIX + CACHE_SUFFIX
+    return path + CACHE_SUFFIX
+
+
+def save_cache(mesh: MeshData, cache_path: str):
+    os.makedirs(cache_path, exist_ok=True)
+    for name, cells in mesh.cells_dict.items():
+        np.save(os.path.join(cache_path, f"{name}.npy"), np.asarray(cells))
+    # points written last, they mark complete cache
+    np.save(os.path.join(cache_path, POINTS_FILE), np.asarray(mesh.points))
+
+
+def load_cache(path: str, cache_path: str):
+    points_path = os.path.join(cache_path, POINTS_FILE)
+    if not os.path.isfile(points_path):
+        return None
+    if os.path.getmtime(points_path) < os.path.getmtime(path):
+        return None
+    # copy on write, so that builders can scale loaded nodes in place
+    return MeshData(
+        points=np.load(points_path, mmap_mode="c"),
+        cells_dict={
+            os.path.splitext(name)[0]: np.load(
+                os.path.join(cache_path, name), mmap_mode="c"
+            )
+            for name in os.listdir(cache_path)
+            if name.endswith(".npy") and name != POINTS_FILE
+        },
+    )
+
+
+def read(path: str, cache: bool = False, deduplicate: bool = False):
+    """
+    Nodes and cells of mesh file; with cache arrays are saved next to the file
+    and loaded from there while they are newer than the file
+    """
+    cache_path = get_cache_path(path, deduplicate)
+    if cache:
+        mesh = load_cache(path, cache_path)
+        if mesh is not None:
+            return mesh
+    mesh = read_arrays(path)
+    if deduplicate:
+        mesh = deduplicate_nodes(mesh.points, mesh.cells_dict)
+    if cache:
+        save_cache(mesh, cache_path)
+    return mesh
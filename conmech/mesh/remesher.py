@@ -1,74 +1,63 @@
-import numba
-import numpy as np
-
-from conmech.helpers import nph
-
-
-@numba.njit
-def get_alpha_numba(x, p_1, p_2, p_3):
-    return (
-        (p_2[1] - p_3[1]) * (x[0] - p_3[0]) + (p_3[0] - p_2[0]) * (x[1] - p_3[1])
-    ) / ((p_2[1] - p_3[1]) * (p_1[0] - p_3[0]) + (p_3[0] - p_2[0]) * (p_1[1] - p_3[1]))
-
-
-@numba.njit
-def get_beta_numba(x, p_1, p_2, p_3):
-    return (
-        (p_3[1] - p_1[1]) * (x[0] - p_3[0]) + (p_1[0] - p_3[0]) * (x[1] - p_3[1])
-    ) / ((p_2[1] - p_3[1]) * (p_1[0] - p_3[0]) + (p_3[0] - p_2[0]) * (p_1[1] - p_3[1]))
-
-
-@numba.njit
-def bigger_or_zero(data):
-    return data > -1e-05
-
-
-# @numba.njit
-def approximate_one_numba(new_node, old_nodes, old_values, old_elements):
-    closest_element = 0
-    min_penality = None
-
-    for element in old_elements:
-        p_1, p_2, p_3 = old_nodes[element]
+"""
+Transfer of nodal fields from old to new mesh: new nodes placed at old node positions
+copy its values, other nodes are located in old elements with spatial hash and
+interpolated with barycentric weights; all fields go through one sparse product
+"""
+from typing import List, NamedTuple
 
-        alpha = get_alpha_numba(new_node, p_1, p_2, p_3)
-        beta = get_alpha_numba(new_node, p_1, p_2, p_3)
-        gamma = 1.0 - alpha - beta
-
-        if alpha > 0 and beta > 0 and gamma > 0:
-            closest_element = element
-            break
-
-        penality = -(alpha * (alpha < 0) + beta * (beta < 0) + gamma * (gamma < 0))
-        if min_penality is None or penality < min_penality:
-            min_penality = penality
-            closest_element = element
-
-    v1, v2, v3 = old_values[closest_element]
-    return alpha * v1 + beta * v2 + gamma * v3
-
-
-# @numba.njit
-def approximate_all_numba_old(old_values, old_elements, old_nodes, new_nodes):
-    new_values = np.zeros_like(new_nodes)
-
-    for i, new_node in enumerate(new_nodes):
-        new_value = approximate_one_numba(new_node, old_nodes, old_values, old_elements)
-        new_values[i] = new_value
-
-    return new_values
-
-
-@numba.njit
-def get_edges_numba(nodes, node_degree):
-    dimenasion = nodes.shape[1]
-    edges = np.zeros((len(nodes) * node_degree, dimenasion), dtype=numba.int64)
-    i = 0
-    for index, node in enumerate(nodes):
-        distances = nph.euclidean_norm_numba(node - nodes)
-        closest_nodes = distances.argsort()[1 : node_degree + 1]
-        for j in closest_nodes:
-            edges[i, :] = [index, j]
-            i += 1
-    assert i == len(edges)
-    return edges
+import numpy as np
+import scipy.sparse
+
+from conmech.helpers.interpolation_helpers import interpolate_nodes
+from conmech.mesh.mesh_reader import get_unique_nodes_numba
+
+
+class FieldTransfer(NamedTuple):
+    matrix: scipy.sparse.csr_matrix
+    reused_mask: np.ndarray
+
+
+def get_matching_nodes(old_nodes: np.ndarray, new_nodes: np.ndarray):
+    # index of old node with the same coordinates for every new node, -1 if none
+    nodes = np.ascontiguousarray(np.vstack((old_nodes, new_nodes)), dtype=np.float64)
+    first_indices = get_unique_nodes_numba((nodes + 0.0).view(np.int64))
+    matches = first_indices[len(old_nodes) :]
+    return np.where(matches < len(old_nodes), matches, -1)
+
+
+def get_field_transfer(
+    old_nodes: np.ndarray, old_elements: np.ndarray, new_nodes: np.ndarray
+):
+    matches = get_matching_nodes(old_nodes, new_nodes)
+    reused = np.flatnonzero(matches >= 0)
+    located = np.flatnonzero(matches < 0)
+    rows, columns, weights = [reused], [matches[reused]], [np.ones(len(reused))]
+    if len(located) > 0:
+        closest_nodes, _, closest_weights = interpolate_nodes(
+            base_nodes=old_nodes,
+            base_elements=old_elements,
+            query_nodes=new_nodes[located],
+        )
+        rows.append(np.repeat(located, closest_nodes.shape[1]))
+        columns.append(closest_nodes.reshape(-1))
+        weights.append(closest_weights.reshape(-1))
+    matrix = scipy.sparse.csr_matrix(
+        (np.concatenate(weights), (np.concatenate(rows), np.concatenate(columns))),
+        shape=(len(new_nodes), len(old_nodes)),
+    )
+    return FieldTransfer(matrix=matrix, reused_mask=matches >= 0)
+
+
+def transfer_fields(transfer: FieldTransfer, fields: List[np.ndarray]):
+    columns = [np.asarray(field).reshape(len(field), -1) for field in fields]
+    values = transfer.matrix @ np.hstack(columns)
+    splits = np.cumsum([column.shape[1] for column in columns])[:-1]
+    return [
+        part.reshape(len(values), *np.shape(field)[1:])
+        for part, field in zip(np.split(values, splits, axis=1), fields)
+    ]
+
+
+def approximate_all(old_values, old_elements, old_nodes, new_nodes):
+    transfer = get_field_transfer(old_nodes, old_elements, new_nodes)
+    return transfer_fields(transfer, [old_values])[0]
@@ -16,6 +16,7 @@ class MeshProperties:
     mean_at_origin: bool = False
     initial_nodes_corner_vectors: Optional[np.ndarray] = None
     mesh_corner_scalars: Optional[np.ndarray] = None
+    reduce_bandwidth: bool = False
 
     @staticmethod
     def _get_modulo(array, index):
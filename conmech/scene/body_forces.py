@@ -1,18 +1,17 @@
 from typing import Callable, Optional
 
-import jax
 import jax.numpy as jnp
 import numpy as np
 
 from conmech.dynamics.dynamics import Dynamics, DynamicsConfiguration
-from conmech.helpers import nph
+from conmech.helpers import jxh, nph
 from conmech.helpers.config import SimulationConfig
 from conmech.mesh.boundaries_description import BoundariesDescription
 from conmech.properties.body_properties import TimeDependentBodyProperties
 from conmech.properties.mesh_properties import MeshProperties
 from conmech.properties.schedule import Schedule
 from conmech.scene.energy_functions import _get_constant_boundary_integral
-from conmech.state.body_position import get_surface_per_boundary_node_jax
+from conmech.state.body_position import get_surface_per_boundary_node_jit
 
 
 def energy(value, solver_cache, rhs):
@@ -45,6 +44,16 @@ def get_integrated_forces_jax(
     return integrated_forces
 
 
+get_integrated_forces_jit = jxh.jit(
+    get_integrated_forces_jax, name="get_integrated_forces"
+)
+get_constant_boundary_integral_jit = jxh.jit(
+    _get_constant_boundary_integral,
+    name="get_constant_boundary_integral",
+    static_argnames="use_nonconvex_friction_law",
+)
+
+
 class BodyForces(Dynamics):
     def __init__(
         self,
@@ -103,10 +112,7 @@ class BodyForces(Dynamics):
         return self.normalized_inner_forces
 
     def get_normalized_integrated_outer_forces(self):
-        neumann_surfaces = jax.jit(
-            get_surface_per_boundary_node_jax,
-            static_argnames=["considered_nodes_count"],
-        )(
+        neumann_surfaces = get_surface_per_boundary_node_jit(
             moved_nodes=self.moved_nodes,  # normalized
             boundary_surfaces=self.neumann_boundary,
             considered_nodes_count=self.nodes_count,
@@ -127,17 +133,14 @@ class BodyForces(Dynamics):
         )
 
     def get_normalized_integrated_forces_column_for_jax(self, args):
-        integrated_forces = jax.jit(get_integrated_forces_jax)(
+        integrated_forces = get_integrated_forces_jit(
             volume_at_nodes_jax=self.matrices.volume_at_nodes_jax,
             normalized_inner_forces=self.normalized_inner_forces,
             integrated_outer_forces=self.get_normalized_integrated_outer_forces(),
         )
 
         if self.simulation_config.use_constant_contact_integral:
-            rhs_contact = jax.jit(
-                _get_constant_boundary_integral,
-                static_argnames="use_nonconvex_friction_law",
-            )(
+            rhs_contact = get_constant_boundary_integral_jit(
                 args=args,
                 use_nonconvex_friction_law=self.simulation_config.use_nonconvex_friction_law,
             )
@@ -1,6 +1,6 @@
 from ctypes import ArgumentError
 from dataclasses import dataclass
-from typing import NamedTuple
+from typing import NamedTuple, Optional
 
 import jax.numpy as jnp
 import numpy as np
@@ -8,6 +8,7 @@ import numpy as np
 from conmech.dynamics.dynamics import _get_deform_grad
 from conmech.helpers import jxh, nph
 from conmech.helpers.config import SimulationConfig
+from conmech.scene.self_collisions import SelfCollisionPairs
 
 
 def _get_penetration_positive(displacement_step, normals, initial_penetration):
@@ -76,6 +77,7 @@ class EnergyObstacleArguments(NamedTuple):
     base_velocity: np.ndarray
     base_energy_velocity: np.ndarray
     displacement_old: np.ndarray
+    self_collision_pairs: Optional[SelfCollisionPairs] = None
 
 
 class StaticEnergyArguments(NamedTuple):
@@ -183,22 +185,32 @@ def _get_boundary_integral(
     )
 
     boundary_values = resistance_normal + resistance_tangential
-    if True:  # with_self_collisions:
-        penetration_norm_self = _get_penetration_positive(
-            displacement_step=boundary_displacement_step,
-            normals=(-1) * args.boundary_obstacle_normals_self,
-            initial_penetration=args.initial_penetration_self,
-        )
-        resistance_normal_self = _obstacle_resistance_potential_normal(
-            penetration_norm=penetration_norm_self,
-            hardness=SELF_COLLISION_SCALAR * args.obstacle_prop.hardness,
-            time_step=args.time_step,
-        )
-        boundary_values += 0.0 * resistance_normal_self
     boundary_integral = (args.surface_per_boundary_node * boundary_values).sum()
+    if args.self_collision_pairs is not None:
+        boundary_integral += _get_self_collision_integral(
+            boundary_displacement_step=boundary_displacement_step, args=args
+        )
     return boundary_integral
 
 
+def _get_self_collision_integral(boundary_displacement_step, args):
+    # both nodes of pair move, penetration is measured along normal of target
+    pairs = args.self_collision_pairs
+    penetration_norm = _get_penetration_positive(
+        displacement_step=boundary_displacement_step[pairs.nodes]
+        - boundary_displacement_step[pairs.targets],
+        normals=(-1) * pairs.normals,
+        initial_penetration=pairs.initial_penetration,
+    )
+    resistance_normal = _obstacle_resistance_potential_normal(
+        penetration_norm=penetration_norm,
+        hardness=SELF_COLLISION_SCALAR * args.obstacle_prop.hardness,
+        time_step=args.time_step,
+    )
+    surface = args.surface_per_boundary_node[pairs.nodes]
+    return (pairs.mask * surface * resistance_normal).sum()
+
+
 def _get_strain_lin(deform_grad):
     dimension = deform_grad.shape[1]
     identity = jnp.eye(dimension, dtype=deform_grad.dtype)
@@ -394,7 +406,9 @@ class EnergyFunctions:
                 use_green_strain=static_args.use_green_strain,
             )
 
-        self.compute_displacement_energy = compute_displacement_energy
+        self.compute_displacement_energy = jxh.jit(
+            compute_displacement_energy, name="compute_displacement_energy"
+        )
 
         def compute_velocity_energy(
             velocity, dx_big_jax, element_initial_volume, body_prop
@@ -407,7 +421,9 @@ class EnergyFunctions:
                 use_green_strain=static_args.use_green_strain,
             )
 
-        self.compute_velocity_energy = compute_velocity_energy
+        self.compute_velocity_energy = jxh.jit(
+            compute_velocity_energy, name="compute_velocity_energy"
+        )
 
         self.mode = "automatic"
 
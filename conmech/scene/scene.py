@@ -1,6 +1,5 @@
 from typing import List, Optional
 
-import jax
 import jax.numpy as jnp
 import numba
 import numpy as np
@@ -9,8 +8,8 @@ from conmech.dynamics.dynamics import DynamicsConfiguration, SolverMatrices
 from conmech.dynamics.factory.dynamics_factory_method import ConstMatrices
 from conmech.helpers import jxh, lnh, nph
 from conmech.helpers.config import SimulationConfig
-from conmech.helpers.interpolation_helpers import interpolate_nodes
 from conmech.helpers.lnh import get_in_base
+from conmech.helpers.spatial_hashing import get_spacing
 from conmech.properties.body_properties import TimeDependentBodyProperties
 from conmech.properties.mesh_properties import MeshProperties
 from conmech.properties.obstacle_properties import ObstacleProperties
@@ -21,6 +20,7 @@ from conmech.scene.energy_functions import (
     _obstacle_resistance_potential_normal,
     _obstacle_resistance_potential_tangential,
 )
+from conmech.scene.self_collisions import SelfCollisionBroadphase, SelfCollisionPairs
 from conmech.solvers.optimization.schur_complement import SchurComplement
 from conmech.state.body_position import BodyPosition, mesh_normalization_decorator
 
@@ -70,11 +70,14 @@ class Scene(BodyForces):
         self.norm_lifted_new_displacement = None
         self.recentered_norm_lifted_new_displacement = None
 
-        self.boundary_obstacle_normals = np.zeros_like(self.boundary_nodes)
-        self.penetration_scalars = np.zeros((self.boundary_nodes_count, 1))
-        self.boundary_obstacle_normals_self = np.zeros_like(self.boundary_nodes)
-        self.penetration_scalars_self = np.zeros((self.boundary_nodes_count, 1))
-        self.self_collisions_mask = np.zeros(self.boundary_nodes_count, dtype=bool)
+        self.boundary_obstacle_normals: np.ndarray
+        self.penetration_scalars: np.ndarray
+        self.boundary_obstacle_normals_self: np.ndarray
+        self.penetration_scalars_self: np.ndarray
+        self.self_collisions_mask: np.ndarray
+        self.self_collisions_broadphase: Optional[SelfCollisionBroadphase] = None
+        self.self_collision_pairs: Optional[SelfCollisionPairs] = None
+        self.reset_boundary_data()
 
         self.clear_external_factors()
         assert not self.is_colliding()
@@ -133,22 +136,21 @@ class Scene(BodyForces):
             element_initial_volume=jnp.array(self.matrices.element_initial_volume),
             dx_big_jax=self.matrices.dx_big_jax,  # .todense(),
             base_displacement=args.base_displacement,
-            base_energy_displacement=jax.jit(
-                energy_functions.compute_displacement_energy
-            )(
+            base_energy_displacement=energy_functions.compute_displacement_energy(
                 displacement=args.base_displacement,
                 dx_big_jax=self.matrices.dx_big_jax,
                 element_initial_volume=self.matrices.element_initial_volume,
                 body_prop=args.body_prop,
             ),
             base_velocity=args.base_velocity,
-            base_energy_velocity=jax.jit(energy_functions.compute_velocity_energy)(
+            base_energy_velocity=energy_functions.compute_velocity_energy(
                 velocity=args.base_velocity,
                 dx_big_jax=self.matrices.dx_big_jax,
                 element_initial_volume=self.matrices.element_initial_volume,
                 body_prop=args.body_prop,
             ),
             displacement_old=args.displacement_old,
+            self_collision_pairs=args.self_collision_pairs,
         )
         return args
 
@@ -213,39 +215,60 @@ class Scene(BodyForces):
         if self.simulation_config.with_self_collisions:
             self.apply_self_colisions()
 
-    def apply_self_colisions(self):
+    def reset_boundary_data(self):
+        self.boundary_obstacle_normals = np.zeros_like(self.boundary_nodes)
+        self.penetration_scalars = np.zeros((self.boundary_nodes_count, 1))
         self.boundary_obstacle_normals_self = np.zeros_like(self.boundary_nodes)
         self.penetration_scalars_self = np.zeros((self.boundary_nodes_count, 1))
+        self.self_collisions_mask = np.zeros(self.boundary_nodes_count, dtype=bool)
+        self.self_collisions_broadphase = None
+        self.self_collision_pairs = None
+
+    def remesh(self, boundaries_description, create_in_subprocess):
+        super().remesh(boundaries_description, create_in_subprocess)
+        # boundary data and forces have old nodes count, set again in prepare
+        self.reset_boundary_data()
+        self.closest_obstacle_indices = None
+        self.lifted_acceleration = None
+        self.clear_external_factors()
 
-        scalar = 1.0
+    def get_self_collisions_broadphase(self):
+        if self.self_collisions_broadphase is None:
+            self.self_collisions_broadphase = SelfCollisionBroadphase(
+                boundary_surfaces=self.boundary_surfaces,
+                boundary_nodes_count=self.boundary_nodes_count,
+                max_dist=get_spacing(self.initial_nodes, self.elements),
+            )
+        return self.self_collisions_broadphase
 
-        closest_indices, _, closest_weights = interpolate_nodes(
-            base_nodes=self.moved_nodes,
-            base_elements=self.elements,
-            query_nodes=self.boundary_nodes,
+    def apply_self_colisions(self):
+        self.self_collision_pairs = self.get_self_collisions_broadphase().get_pairs(
+            nodes=self.boundary_nodes, normals=self.boundary_normals
         )
-        self.self_collisions_mask[:] = (closest_weights > 0.001).all(axis=1)
+        pairs = self.self_collision_pairs
 
-        if self.self_collisions_mask.any():
-            closest_boundary_indices = self.get_inside_data(
-                closest_indices, closest_weights, self.self_collisions_mask
-            )
-            self.penetration_scalars_self[self.self_collisions_mask] = (
-                scalar
-                * (-1)
-                * nph.elementwise_dot(
-                    (
-                        self.boundary_nodes[self.self_collisions_mask]
-                        - self.boundary_nodes[closest_boundary_indices]
-                    ),
-                    self.boundary_normals[closest_boundary_indices],
-                ).reshape(-1, 1)
-            )
-            # print(self.penetration_scalars_self.min(), self.penetration_scalars_self.max())
+        # deepest pair of each node (assigned last), for constant contact integral
+        valid = np.flatnonzero(pairs.mask[:, 0])
+        valid = valid[np.argsort(pairs.initial_penetration[valid, 0])]
+        self.boundary_obstacle_normals_self = np.zeros_like(self.boundary_nodes)
+        self.penetration_scalars_self = np.zeros((self.boundary_nodes_count, 1))
+        self.boundary_obstacle_normals_self[pairs.nodes[valid]] = pairs.normals[valid]
+        self.penetration_scalars_self[pairs.nodes[valid]] = pairs.initial_penetration[
+            valid
+        ]
+        self.self_collisions_mask[:] = self.penetration_scalars_self[:, 0] > 0
 
-            self.boundary_obstacle_normals_self[
-                self.self_collisions_mask
-            ] = self.boundary_normals[closest_boundary_indices]
+    def get_normalized_self_collision_pairs(self):
+        if self.self_collision_pairs is None:
+            return None
+        pairs = self.self_collision_pairs
+        return SelfCollisionPairs(
+            nodes=jnp.asarray(pairs.nodes),
+            targets=jnp.asarray(pairs.targets),
+            normals=jnp.asarray(self.normalize_rotate(pairs.normals)),
+            initial_penetration=jnp.asarray(pairs.initial_penetration),
+            mask=jnp.asarray(pairs.mask),
+        )
 
     def get_norm_boundary_obstacle_normals(self):
         return self.normalize_rotate(self.boundary_obstacle_normals)
@@ -253,18 +276,6 @@ class Scene(BodyForces):
     def get_norm_boundary_obstacle_normals_self(self):
         return self.normalize_rotate(self.boundary_obstacle_normals_self)
 
-    def get_inside_data(self, closest_indices, closest_weights, self_collisions_mask):
-        initial_inside_nodes = nph.elementwise_dot(
-            self.initial_nodes[closest_indices[self_collisions_mask]],
-            closest_weights[self_collisions_mask].reshape(
-                -1, self.mesh_prop.dimension + 1, 1
-            ),
-        )
-        closest_boundary_indices = get_closest_obstacle_to_boundary_numba(
-            initial_inside_nodes, self.initial_boundary_nodes
-        )
-        return closest_boundary_indices
-
     def get_penetration_positive(self):
         penetration = self.penetration_scalars
         return penetration * (penetration > 0)
@@ -490,6 +501,7 @@ class Scene(BodyForces):
             base_velocity=jnp.asarray(base_velocity),
             base_energy_velocity=None,
             displacement_old=jnp.asarray(self.displacement_old),
+            self_collision_pairs=self.get_normalized_self_collision_pairs(),
         )
         rhs_acceleration = self.get_normalized_integrated_forces_column_for_jax(args)
         if temperature is not None:
@@ -1,4 +1,3 @@
-import jax
 import jax.numpy as jnp
 import numpy as np
 
@@ -46,6 +45,11 @@ def integrate_boundary_temperature(
     return result
 
 
+integrate_boundary_temperature_jit = jxh.jit(
+    integrate_boundary_temperature, name="integrate_boundary_temperature"
+)
+
+
 class SceneTemperature(Scene):
     def __init__(
         self,
@@ -92,6 +96,13 @@ class SceneTemperature(Scene):
     def set_temperature_old(self, temperature):
         self.t_old = temperature
 
+    def get_node_fields(self):
+        return super().get_node_fields() + [self.t_old]
+
+    def set_node_fields(self, fields):
+        super().set_node_fields(fields[:-1])
+        self.set_temperature_old(fields[-1])
+
     def iterate_self(self, acceleration, temperature=None):
         self.set_temperature_old(temperature)
         return super().iterate_self(acceleration=acceleration)
@@ -139,7 +150,7 @@ class SceneTemperature(Scene):
         surface_per_boundary_node = self.get_surface_per_boundary_node_jax()
         if self.has_no_obstacles:
             return np.zeros_like(surface_per_boundary_node)
-        return jax.jit(integrate_boundary_temperature)(
+        return integrate_boundary_temperature_jit(
             boundary_obstacle_normals=self.boundary_obstacle_normals,
             boundary_velocity_new=boundary_velocity_new,
             initial_penetration=self.penetration_scalars,
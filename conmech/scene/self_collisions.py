@@ -0,0 +1,207 @@
+"""
+Self-collision broadphase of boundary nodes: persistent spatial hash refitted only
+for nodes that changed cells, candidate pairs reused while all nodes stay within half
+of the skin (Verlet list) and exclusion of pairs close in boundary topology
+"""
+import itertools
+from typing import NamedTuple, Optional
+
+import numba
+import numpy as np
+import scipy.sparse
+
+from conmech.helpers import nph
+from conmech.helpers.spatial_hashing import cell_coord, custom_hash
+
+# pairs are padded to powers of two, so jitted energy compiles for few sizes only
+MINIMUM_PAIRS_COUNT = 64
+
+
+class SelfCollisionPairs(NamedTuple):
+    nodes: np.ndarray
+    targets: np.ndarray
+    normals: np.ndarray
+    initial_penetration: np.ndarray
+    mask: np.ndarray
+
+
+def get_excluded_neighbours(
+    boundary_surfaces: np.ndarray, nodes_count: int, rings: int
+):
+    # nodes within rings edges on boundary (with node itself), sorted in each row
+    rows = np.repeat(boundary_surfaces, boundary_surfaces.shape[1], axis=1).reshape(-1)
+    columns = np.tile(boundary_surfaces, boundary_surfaces.shape[1]).reshape(-1)
+    adjacency = scipy.sparse.csr_matrix(
+        (np.ones(len(rows), dtype=bool), (rows, columns)),
+        shape=(nodes_count, nodes_count),
+    )
+    adjacency = adjacency + scipy.sparse.identity(nodes_count, dtype=bool, format="csr")
+    excluded = adjacency
+    for _ in range(rings - 1):
+        excluded = excluded @ adjacency
+    excluded = excluded.tocsr()
+    excluded.sort_indices()
+    return excluded.indptr.astype(np.int64), excluded.indices.astype(np.int64)
+
+
+@numba.njit
+def get_candidate_pairs_numba(
+    nodes,
+    cells,
+    offsets,
+    neighbour_hashes,
+    order,
+    cell_starts,
+    max_dist,
+    excluded_indptr,
+    excluded_indices,
+):
+    dim = nodes.shape[1]
+    pairs = np.empty((4 * len(nodes) + 16, 2), dtype=np.int64)
+    pairs_count = 0
+    for i in range(len(nodes)):
+        excluded = excluded_indices[excluded_indptr[i] : excluded_indptr[i + 1]]
+        for k in range(len(offsets)):
+            cell_hash = neighbour_hashes[i, k]
+            for slot in range(cell_starts[cell_hash], cell_starts[cell_hash + 1]):
+                j = order[slot]
+                if j <= i:
+                    continue
+                # hash collisions: candidate has to lie in visited cell
+                in_cell = True
+                for axis in range(dim):
+                    if cells[j, axis] != cells[i, axis] + offsets[k, axis]:
+                        in_cell = False
+                if not in_cell:
+                    continue
+                distance = 0.0
+                for axis in range(dim):
+                    distance += (nodes[i, axis] - nodes[j, axis]) ** 2
+                if distance > max_dist**2:
+                    continue
+                position = np.searchsorted(excluded, j)
+                if position < len(excluded) and excluded[position] == j:
+                    continue
+                if pairs_count == len(pairs):
+                    pairs = np.concatenate((pairs, np.empty_like(pairs)))
+                pairs[pairs_count, 0] = i
+                pairs[pairs_count, 1] = j
+                pairs_count += 1
+    return pairs[:pairs_count]
+
+
+def get_padded_count(count: int):
+    return max(MINIMUM_PAIRS_COUNT, 1 << int(np.ceil(np.log2(max(count, 1)))))
+
+
+class SelfCollisionBroadphase:
+    """
+    Candidate pairs of boundary nodes closer than max_dist (excluding nodes within
+    excluded_rings edges on boundary); boundary_surfaces index boundary nodes
+    """
+
+    def __init__(
+        self,
+        boundary_surfaces: np.ndarray,
+        boundary_nodes_count: int,
+        max_dist: float,
+        skin: Optional[float] = None,
+        excluded_rings: int = 2,
+        table_size_proportion: int = 2,
+    ):
+        self.max_dist = max_dist
+        self.skin = max_dist if skin is None else skin
+        self.cell_size = self.max_dist + self.skin
+        self.table_size = table_size_proportion * boundary_nodes_count
+        self.excluded_indptr, self.excluded_indices = get_excluded_neighbours(
+            boundary_surfaces, boundary_nodes_count, rings=excluded_rings
+        )
+
+        self.cells: Optional[np.ndarray] = None
+        self.node_hash: Optional[np.ndarray] = None
+        self.order: Optional[np.ndarray] = None
+        self.cell_starts: Optional[np.ndarray] = None
+        self.reference_nodes: Optional[np.ndarray] = None
+        self.candidates = np.empty((0, 2), dtype=np.int64)
+
+        self.steps = 0
+        self.rebuilds = 0
+        self.refitted_nodes = 0
+
+    def refit(self, nodes: np.ndarray):
+        cells = cell_coord(nodes, self.cell_size)
+        node_hash = custom_hash(cells, self.table_size)
+        if self.order is None:
+            order = np.argsort(node_hash, kind="stable")
+        else:
+            # nodes which stayed in their cells keep their sorted order, moved
+            # nodes are merged in without sorting the whole table again
+            moved = np.any(cells != self.cells, axis=1)
+            self.refitted_nodes += int(moved.sum())
+            moved_nodes = np.flatnonzero(moved)
+            moved_nodes = moved_nodes[np.argsort(node_hash[moved_nodes], kind="stable")]
+            kept_nodes = self.order[~moved[self.order]]
+            positions = np.searchsorted(node_hash[kept_nodes], node_hash[moved_nodes])
+            order = np.insert(kept_nodes, positions, moved_nodes)
+
+        self.cells, self.node_hash, self.order = cells, node_hash, order
+        self.cell_starts = np.searchsorted(
+            node_hash[order], np.arange(self.table_size + 1)
+        )
+
+    def get_candidates(self, nodes: np.ndarray):
+        self.steps += 1
+        if self.reference_nodes is not None:
+            displacement = nph.euclidean_norm_numba(nodes - self.reference_nodes)
+            if displacement.max() <= 0.5 * self.skin:
+                return self.candidates
+
+        self.rebuilds += 1
+        self.refit(nodes)
+        dim = nodes.shape[1]
+        offsets = np.array(list(itertools.product([-1, 0, 1], repeat=dim)))
+        neighbour_hashes = custom_hash(self.cells[:, None] + offsets, self.table_size)
+        self.candidates = get_candidate_pairs_numba(
+            nodes=nodes,
+            cells=self.cells.astype(np.int64),
+            offsets=offsets,
+            neighbour_hashes=neighbour_hashes,
+            order=self.order,
+            cell_starts=self.cell_starts,
+            max_dist=self.cell_size,
+            excluded_indptr=self.excluded_indptr,
+            excluded_indices=self.excluded_indices,
+        )
+        self.reference_nodes = nodes.copy()
+        return self.candidates
+
+    def get_pairs(self, nodes: np.ndarray, normals: np.ndarray):
+        """
+        Both orientations of candidates closer than max_dist with opposing normals,
+        penetration of node measured along normal of target
+        """
+        candidates = self.get_candidates(nodes)
+        candidates = np.vstack((candidates, candidates[:, ::-1]))
+        node_ids, target_ids = candidates.T
+        offset = nodes[node_ids] - nodes[target_ids]
+        close = nph.euclidean_norm_numba(offset) <= self.max_dist
+        opposing = nph.elementwise_dot(normals[node_ids], normals[target_ids]) < 0
+        node_ids, target_ids = node_ids[close & opposing], target_ids[close & opposing]
+
+        pairs_count = len(node_ids)
+        padding = get_padded_count(pairs_count) - pairs_count
+        node_ids = np.pad(node_ids, (0, padding))
+        target_ids = np.pad(target_ids, (0, padding))
+        target_normals = normals[target_ids]
+        initial_penetration = (-1) * nph.elementwise_dot(
+            nodes[node_ids] - nodes[target_ids], target_normals, keepdims=True
+        )
+        mask = np.zeros((len(node_ids), 1))
+        mask[:pairs_count] = 1.0
+        return SelfCollisionPairs(
+            nodes=node_ids,
+            targets=target_ids,
+            normals=target_normals,
+            initial_penetration=initial_penetration * mask,
+            mask=mask,
+        )
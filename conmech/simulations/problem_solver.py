@@ -49,6 +49,9 @@ from conmech.state.state import PiezoelectricState, State, TemperatureState
 
 
 class ProblemSolver:
+    # Statements keep CSR matrices, dense ones only for comparison with old results
+    sparse_statements: bool = True
+
     def __init__(self, setup: Problem, body_properties: BodyProperties):
         """Solves general Contact Mechanics problem.
 
@@ -112,17 +115,27 @@ class ProblemSolver:
 
         # TODO: #65 fixed solvers to avoid: th_coef, ze_coef = mu_coef, la_coef
         if isinstance(self.setup, StaticProblem):
-            statement = StaticDisplacementStatement(self.body)
+            statement = StaticDisplacementStatement(
+                self.body, sparse=self.sparse_statements
+            )
             time_step = 1
         elif isinstance(self.setup, (QuasistaticProblem, DynamicProblem)):
             if isinstance(self.setup, PiezoelectricQuasistaticProblem):
-                statement = QuasistaticVelocityWithPiezoelectricStatement(self.body)
+                statement = QuasistaticVelocityWithPiezoelectricStatement(
+                    self.body, sparse=self.sparse_statements
+                )
             elif isinstance(self.setup, QuasistaticProblem):
-                statement = QuasistaticVelocityStatement(self.body)
+                statement = QuasistaticVelocityStatement(
+                    self.body, sparse=self.sparse_statements
+                )
             elif isinstance(self.setup, TemperatureDynamicProblem):
-                statement = DynamicVelocityWithTemperatureStatement(self.body)
+                statement = DynamicVelocityWithTemperatureStatement(
+                    self.body, sparse=self.sparse_statements
+                )
             else:
-                statement = DynamicVelocityStatement(self.body)
+                statement = DynamicVelocityStatement(
+                    self.body, sparse=self.sparse_statements
+                )
             time_step = self.setup.time_step
         else:
             raise ValueError(f"Unknown problem class: {self.setup.__class__}")
@@ -136,7 +149,7 @@ class ProblemSolver:
         )
         if isinstance(self.setup, TemperatureTimeDependentProblem):
             self.second_step_solver = solver_class(
-                TemperatureStatement(self.body),
+                TemperatureStatement(self.body, sparse=self.sparse_statements),
                 self.body,
                 time_step,
                 self.setup.contact_law,
@@ -144,7 +157,7 @@ class ProblemSolver:
             )
         elif isinstance(self.setup, PiezoelectricTimeDependentProblem):
             self.second_step_solver = second_solver_class(
-                PiezoelectricStatement(self.body),
+                PiezoelectricStatement(self.body, sparse=self.sparse_statements),
                 self.body,
                 time_step,
                 self.setup.contact_law,
@@ -1,21 +1,27 @@
 import copy
 import json
 import os
+import time
 from ctypes import ArgumentError
 from dataclasses import dataclass
 from functools import partial
 from typing import Callable, Optional, Tuple
 
-from conmech.helpers import cmh, pkh
+from conmech.helpers import cmh, jxh, lzh, pkh, trh
 from conmech.helpers.config import Config
-from conmech.helpers.tmh import Timer
-from conmech.plotting import plotter_functions
+from conmech.mesh import mesh_pool
 from conmech.scenarios.scenarios import Scenario
 from conmech.scene.energy_functions import EnergyFunctions
 from conmech.scene.scene import Scene
 from conmech.scene.scene_temperature import SceneTemperature
 from conmech.solvers.calculator import Calculator
 
+# Plotting pulls in matplotlib, loaded only when results are drawn
+plotter_functions = lzh.lazy_import("conmech.plotting.plotter_functions")
+
+# Steps after which jxh.MONITOR in strict mode forbids any retracing
+JIT_WARM_UP_STEPS = 2
+
 
 def get_solve_function(simulation_config):
     if simulation_config.mode == "normal":
@@ -49,14 +55,13 @@ def get_solve_function(simulation_config):
             return partial(
                 model_jax.solve_compare, apply_net=model_jax.get_apply_net(state)
             )
-        return partial(model_jax.solve, apply_net=model_jax.get_apply_net(state))
+        return model_jax.get_solve_jitted(state)
 
     raise ArgumentError
 
 
-def create_scene(scenario):
+def create_scene(scenario, create_in_subprocess: bool = False):
     print("Creating scene...")
-    create_in_subprocess = False
 
     def get_scene():
         if scenario.simulation_config.mode == "normal":
@@ -116,10 +121,8 @@ def create_scene(scenario):
         )
         return scene
 
-    scene = cmh.profile(
-        get_scene,
-        baypass=True,
-    )
+    with trh.span("create_scene"):
+        scene = get_scene()
     # np.save("./pt-jax/bunny_boundary_nodes2.npy", scene.boundary_nodes)
     # np.save("./pt-jax/contact_boundary2.npy", scene.boundaries.contact_boundary)
     return scene
@@ -134,6 +137,10 @@ def run_examples(
     save_all=False,
 ):
     scenes = []
+    mesh_pool.prefetch_meshes(
+        [scenario.mesh_prop for scenario in all_scenarios],
+        workers=config.mesh_generation_workers,
+    )
     for i, scenario in enumerate(all_scenarios):
         print(f"-----EXAMPLE {i + 1}/{len(all_scenarios)}-----")
         catalog = os.path.splitext(os.path.basename(file))[0].upper()
@@ -148,7 +155,9 @@ def run_examples(
                 simulate_dirty_data=simulate_dirty_data,
                 plot_animation=plot_animation,
             ),
-            scene=create_scene(scenario),
+            scene=create_scene(
+                scenario, create_in_subprocess=config.mesh_generation_workers > 0
+            ),
         )
         scenes.append(scene)
         print()
@@ -251,15 +260,16 @@ def run_scenario(
                 scene=scene, step=step[0], folder=f"{final_catalog}/three/{label}"
             )
         if run_config.save_all or plot_index:
-            save_scene(
-                scene=scene, scenes_path=scenes_path, save_animation=save_animation
-            )
-            if with_reduced:
+            with trh.span("save"):
                 save_scene(
-                    scene=scene.reduced,
-                    scenes_path=scenes_path_reduced,
-                    save_animation=save_animation,
+                    scene=scene, scenes_path=scenes_path, save_animation=save_animation
                 )
+                if with_reduced:
+                    save_scene(
+                        scene=scene.reduced,
+                        scenes_path=scenes_path_reduced,
+                        save_animation=save_animation,
+                    )
         if plot_index:
             plot_scenes_count[0] += 1
         step[0] += 1
@@ -361,39 +371,41 @@ def simulate(
     acceleration, temperature = (None,) * 2
     time_tqdm = scenario.get_tqdm(desc="Simulating", config=config)
     steps = len(time_tqdm)
-    timer = Timer()
+    start_time = time.perf_counter()
 
     for time_step in time_tqdm:
         current_time = (time_step) * scene.time_step
+        if time_step == JIT_WARM_UP_STEPS and jxh.MONITOR.enabled:
+            jxh.MONITOR.finish_warm_up()
 
-        with timer["all_prepare"]:
-            prepare(scenario, scene, current_time, with_temperature)
-
-        with timer["all_solver"]:
-            scene.exact_acceleration, temperature = solve_function(
-                scene=scene,
-                energy_functions=energy_functions,
-                initial_a=acceleration,
-                initial_t=temperature,
-                timer=timer,
-            )
+        with trh.span("step"):
+            with trh.span("prepare"):
+                prepare(scenario, scene, current_time, with_temperature)
 
-        if simulate_dirty_data:
-            scene.make_dirty()
+            with trh.span("solver"):
+                scene.exact_acceleration, temperature = solve_function(
+                    scene=scene,
+                    energy_functions=energy_functions,
+                    initial_a=acceleration,
+                    initial_t=temperature,
+                )
 
-        with timer["all_operation"]:
-            if operation is not None:
-                operation(scene=scene)  # (current_time, scene, a, base_a)
+            if simulate_dirty_data:
+                scene.make_dirty()
 
-        with timer["all_iterate"]:
-            scene.iterate_self(scene.exact_acceleration, temperature=temperature)
+            with trh.span("operation"):
+                if operation is not None:
+                    operation(scene=scene)  # (current_time, scene, a, base_a)
 
-    for key in timer:
-        all_time = timer.dt[key].sum()
-        print(f" {key}: {all_time:.2f}s | {(steps/all_time):.2f}it/s")
+            with trh.span("iterate"):
+                scene.iterate_self(scene.exact_acceleration, temperature=temperature)
 
-    # print("Saving timings")
-    # fig = timer.dt["all_solver"].plot.hist(bins=100).get_figure()
-    # fig.savefig(f"log/timing-{cmh.get_timestamp(config)}.png")
+    all_time = time.perf_counter() - start_time
+    print(f" simulation: {all_time:.2f}s | {(steps/all_time):.2f}it/s")
+    if trh.is_enabled():
+        trh.print_report(root="step")
+        trh.export_chrome_trace()
+    if jxh.MONITOR.enabled:
+        jxh.MONITOR.print_report()
 
     return scene
@@ -11,8 +11,7 @@ import jax.scipy.optimize
 # import jaxopt
 import numpy as np
 
-from conmech.helpers import cmh, jxh, nph
-from conmech.helpers.tmh import Timer
+from conmech.helpers import cmh, jxh, nph, trh
 from conmech.scene.body_forces import energy
 from conmech.scene.energy_functions import EnergyFunctions
 from conmech.scene.scene import Scene
@@ -28,16 +27,23 @@ def get_backend():
     return os.environ[key] if key in os.environ else None
 
 
-def get_optimization_function(fun, hes_inv):
+def get_optimization_function(fun, hes_inv, name="minimize_lbfgs"):
     def opti_with_fun(x0, args):
         return minimize_lbfgs_jax(fun, hes_inv, x0, args)
 
-    return jax.jit(opti_with_fun, backend=get_backend())
+    return jxh.jit(opti_with_fun, name=name, backend=get_backend())
 
 
-def _get_compiled_optimization_function(fun, hes_inv, sample_x0, sample_args):
+cg_jit = jxh.jit(jax.scipy.sparse.linalg.cg, name="cg")
+
+
+def _get_compiled_optimization_function(
+    fun, hes_inv, sample_x0, sample_args, name="minimize_lbfgs"
+):
     return (
-        get_optimization_function(fun, hes_inv).lower(sample_x0, sample_args).compile()
+        get_optimization_function(fun, hes_inv, name)
+        .lower(sample_x0, sample_args)
+        .compile()
     )
 
 
@@ -47,12 +53,14 @@ def set_compiled_optimization_functions(energy_functions, hes_inv, x0, args):
         hes_inv=hes_inv,
         sample_x0=x0,
         sample_args=args,
+        name="minimize_lbfgs_free",
     )
     energy_functions.opti_colliding = _get_compiled_optimization_function(
         fun=energy_functions.energy_obstacle_colliding,
         hes_inv=hes_inv,
         sample_x0=x0,
         sample_args=args,
+        name="minimize_lbfgs_colliding",
     )
 
 
@@ -84,10 +92,9 @@ class Calculator:
         else:
             opti_fun = set_and_get_opti_fun(energy_functions, scene, hes_inv, x0, args)
 
-        state = cmh.profile(
-            lambda: opti_fun(x0, args),
-            baypass=True,
-        )
+        with trh.span("lbfgs"):
+            state = opti_fun(x0, args)
+            jax.block_until_ready(state.x_k)
 
         # if cmh.get_from_os("JAX_ENABLE_X64"):
         #     assert state.converged
@@ -129,7 +136,6 @@ class Calculator:
         energy_functions: EnergyFunctions,
         initial_a,
         initial_t=None,
-        timer=Timer(),
     ):
         _ = initial_a, initial_t
         # energy_functions = (
@@ -138,20 +144,18 @@ class Calculator:
 
         dense_path = cmh.get_base_for_comarison()
 
-        with timer["dense_solver"]:
+        with trh.span("dense_solver"):
             if dense_path is None:
                 print("UPDATE")
                 # scene.reduced.exact_acceleration, _ = Calculator.solve(
                 #     scene=scene.reduced,
                 #     energy_functions=energy_functions[1],
                 #     initial_a=scene.reduced.exact_acceleration,
-                #     timer=timer,
                 # )
                 scene.exact_acceleration, _ = Calculator.solve(
                     scene=scene,
                     energy_functions=energy_functions[0],
                     initial_a=scene.exact_acceleration,
-                    timer=timer,
                 )
                 scene.reduced.exact_acceleration = (
                     scene.lift_acceleration_from_position(scene.exact_acceleration)
@@ -164,7 +168,7 @@ class Calculator:
 
             scene.reduced.lifted_acceleration = scene.reduced.exact_acceleration
 
-        with timer["lower_data"]:
+        with trh.span("lower_data"):
             scene.lifted_acceleration = np.array(
                 scene.lower_acceleration_from_position(
                     scene.reduced.lifted_acceleration
@@ -205,7 +209,6 @@ class Calculator:
         energy_functions: EnergyFunctions,
         initial_a,
         initial_t=None,
-        timer=Timer(),
     ):
         _ = initial_a, initial_t
         energy_functions = (
@@ -213,15 +216,14 @@ class Calculator:
             if hasattr(energy_functions, "__len__")
             else energy_functions
         )
-        with timer["reduced_solver"]:
+        with trh.span("reduced_solver"):
             exact_acceleration, _ = Calculator.solve(
                 scene=scene,
                 energy_functions=energy_functions,
                 initial_a=scene.exact_acceleration,
-                timer=timer,
             )
             scene.lifted_acceleration = exact_acceleration
-        with timer["lift_data"]:
+        with trh.span("lift_data"):
             scene.reduced.exact_acceleration = scene.lift_acceleration_from_position(
                 exact_acceleration
             )
@@ -259,14 +261,12 @@ class Calculator:
         energy_functions: EnergyFunctions,
         initial_a,
         initial_t,
-        timer=Timer(),
         reorient_to_reduced=False,
     ):
         scene.reduced.exact_acceleration, _ = Calculator.solve(
             scene=scene.reduced,
             energy_functions=energy_functions[0],
             initial_a=scene.reduced.exact_acceleration,
-            timer=timer,
         )
         scene.reduced.lifted_acceleration = scene.reduced.exact_acceleration
 
@@ -287,8 +287,7 @@ class Calculator:
         vector = normalized_rhs
         initial_point = initial_t
 
-        solver = jax.jit(jax.scipy.sparse.linalg.cg)
-        t_vector, _ = solver(A=matrix, b=vector, x0=initial_point)
+        t_vector, _ = cg_jit(A=matrix, b=vector, x0=initial_point)
         return np.array(t_vector)
 
     @staticmethod
@@ -315,11 +314,11 @@ class Calculator:
         # np.linalg.cond(A_) ~ 646
         # np.linalg.cond(M_ @ A_) ~ 421
 
-        solver = jax.jit(jax.scipy.sparse.linalg.cg)
-        normalized_a_vector, _ = cmh.profile(
-            lambda: solver(A=matrix, b=vector, x0=initial_point, M=preconditioner),
-            baypass=True,
-        )
+        with trh.span("linear_solve"):
+            normalized_a_vector, _ = cg_jit(
+                A=matrix, b=vector, x0=initial_point, M=preconditioner
+            )
+            jax.block_until_ready(normalized_a_vector)
         normalized_a = np.array(nph.unstack(normalized_a_vector, scene.dimension))
         # assert info == 0
         # assert np.allclose(A @ normalized_a_vector_jax - b.reshape(-1), 0)
@@ -334,14 +333,13 @@ class Calculator:
         energy_functions: EnergyFunctions,
         initial_a: Optional[np.ndarray] = None,
         initial_t: Optional[np.ndarray] = None,
-        timer: Timer = Timer(),
     ) -> np.ndarray:
-        with timer["calc_optimize"]:
+        with trh.span("optimize"):
             normalized_a = Calculator.solve_acceleration_normalized(
-                scene, energy_functions, initial_a=initial_a, timer=timer
+                scene, energy_functions, initial_a=initial_a
             )
         normalized_cleaned_a = scene.clean_acceleration(normalized_a)
-        with timer["calc_denormalize"]:
+        with trh.span("denormalize"):
             cleaned_a = Calculator.denormalize(scene, normalized_cleaned_a)
         return cleaned_a, initial_t
 
@@ -351,9 +349,7 @@ class Calculator:
         energy_functions: EnergyFunctions,
         initial_a: Optional[np.ndarray] = None,
         initial_t: Optional[np.ndarray] = None,
-        timer: Timer = Timer(),
     ):
-        _ = timer
         uzawa = False
         max_iter = 10
         i = 0
@@ -371,12 +367,14 @@ class Calculator:
             and not np.allclose(last_t, temperature)
         ):
             last_normalized_a, last_t = normalized_a, temperature
-            normalized_a = Calculator.solve_acceleration_normalized(
-                scene, energy_functions, temperature, initial_a
-            )
-            temperature = Calculator.solve_temperature_normalized(
-                scene, energy_functions, normalized_a, initial_t
-            )
+            with trh.span("optimize"):
+                normalized_a = Calculator.solve_acceleration_normalized(
+                    scene, energy_functions, temperature, initial_a
+                )
+            with trh.span("temperature"):
+                temperature = Calculator.solve_temperature_normalized(
+                    scene, energy_functions, normalized_a, initial_t
+                )
             i += 1
             if i >= max_iter:
                 raise ArgumentError(
@@ -406,7 +404,6 @@ class Calculator:
         energy_functions: EnergyFunctions,
         temperature=None,
         initial_a: Optional[np.ndarray] = None,
-        timer: Timer = Timer(),
     ) -> np.ndarray:
         if scene.simulation_config.use_linear_solver:
             return Calculator.solve_acceleration_normalized_function(
@@ -419,7 +416,6 @@ class Calculator:
             energy_functions=energy_functions,
             temperature=temperature,
             initial_a=initial_a,
-            timer=timer,
         )
 
     @staticmethod
@@ -445,7 +441,6 @@ class Calculator:
         energy_functions: EnergyFunctions,
         temperature=None,
         initial_a=None,
-        timer: Timer = Timer(),
     ):
         energy_functions = (
             energy_functions[0]
@@ -457,30 +452,22 @@ class Calculator:
         else:
             initial_a_vector = nph.stack(initial_a)
 
-        with timer["__get_energy_obstacle_args"]:
-            args = cmh.profile(
-                lambda: scene.get_energy_obstacle_args_for_jax(
-                    energy_functions, temperature
-                ),
-                baypass=True,
-            )
+        with trh.span("energy_args"):
+            args = scene.get_energy_obstacle_args_for_jax(energy_functions, temperature)
         hes_inv = (
             None
             if not scene.simulation_config.use_lhs_preconditioner
             else scene.solver_cache.lhs_preconditioner_jax
         )
 
-        with timer["__minimize_jax"]:
-            normalized_a_vector_np = cmh.profile(
-                lambda: Calculator.minimize_jax(  # _displacement(
-                    # solver= energy_functions.get_solver(scene),
-                    initial_vector=initial_a_vector,
-                    args=args,
-                    hes_inv=hes_inv,
-                    scene=scene,
-                    energy_functions=energy_functions,
-                ),
-                baypass=True,
+        with trh.span("minimize"):
+            normalized_a_vector_np = Calculator.minimize_jax(  # _displacement(
+                # solver= energy_functions.get_solver(scene),
+                initial_vector=initial_a_vector,
+                args=args,
+                hes_inv=hes_inv,
+                scene=scene,
+                energy_functions=energy_functions,
             )
 
         normalized_a_vector = normalized_a_vector_np.reshape(-1, 1)
@@ -515,6 +502,7 @@ class Calculator:
                     hes_inv=None,
                     sample_x0=initial_t_vector,
                     sample_args=normalized_t_rhs,
+                    name="minimize_lbfgs_temperature",
                 )
             )
 
@@ -7,6 +7,7 @@ import numpy as np
 import scipy.optimize
 
 from conmech.dynamics.statement import PiezoelectricStatement, TemperatureStatement
+from conmech.scenarios.problems import ContactLaw
 from conmech.solvers.solver import Solver
 from conmech.solvers.solver_methods import (
     make_cost_functional,
@@ -15,7 +16,19 @@ from conmech.solvers.solver_methods import (
 )
 
 
+def get_derivative(contact_law, name: str):
+    # ContactLaw derivatives raise NotImplementedError unless law overrides them
+    method = getattr(contact_law, name)
+    if getattr(method, "__func__", method) is getattr(ContactLaw, name):
+        return None
+    return method
+
+
 class Optimization(Solver):
+    # Cost functionals provide gradients if contact law gives derivatives,
+    # so quasi-Newton method does not need finite differences of the functional
+    method = "L-BFGS-B"
+
     def __init__(
         self,
         statement,
@@ -32,22 +45,34 @@ class Optimization(Solver):
             friction_bound,
         )
         if statement.dimension == 2:  # TODO
-            self.loss = make_cost_functional(
+            with_tangential = hasattr(contact_law, "potential_tangential_direction")
+            self.loss, self.loss_gradient = make_cost_functional(
                 jn=contact_law.potential_normal_direction,
                 jt=contact_law.potential_tangential_direction
-                if hasattr(contact_law, "potential_tangential_direction")
+                if with_tangential
                 else None,
                 h_functional=friction_bound,
+                jn_subderivative=get_derivative(
+                    contact_law, "subderivative_normal_direction"
+                ),
+                jt_subderivative=get_derivative(
+                    contact_law, "regularized_subderivative_tangential_direction"
+                )
+                if with_tangential
+                else None,
             )
         elif isinstance(statement, TemperatureStatement):
-            self.loss = make_cost_functional_temperature(
+            self.loss, self.loss_gradient = make_cost_functional_temperature(
                 h_functional=contact_law.h_temp,
                 hn=contact_law.h_nu,
                 ht=contact_law.h_tau,
                 heat_exchange=contact_law.temp_exchange,
+                heat_exchange_derivative=contact_law.temp_exchange_derivative
+                if hasattr(contact_law, "temp_exchange_derivative")
+                else None,
             )
         elif isinstance(statement, PiezoelectricStatement):
-            self.loss = make_cost_functional_piezoelectricity(
+            self.loss, self.loss_gradient = make_cost_functional_piezoelectricity(
                 h_functional=contact_law.h_temp,
                 hn=contact_law.h_nu,
                 ht=contact_law.h_tau,
@@ -82,6 +107,7 @@ class Optimization(Solver):
         old_solution = np.squeeze(initial_guess.copy().reshape(1, -1))
         disp = kwargs.get("disp", False)
         maxiter = kwargs.get("maxiter", len(initial_guess) * 1e5)
+        method = kwargs.get("method", self.method)
 
         while norm >= fixed_point_abs_tol:
             result = scipy.optimize.minimize(
@@ -95,7 +121,8 @@ class Optimization(Solver):
                     displacement,
                     self.time_step,
                 ),
-                method="BFGS",
+                jac=self.loss_gradient,
+                method=method,
                 options={"disp": disp, "maxiter": maxiter},
                 tol=1e-12,
             )
@@ -131,6 +131,50 @@ class SchurComplement(Optimization):
             free_x_free_inverted,
         )
 
+    @staticmethod
+    def calculate_schur_complement_matrices_sparse(
+        matrix: scipy.sparse.spmatrix,
+        dimension: int,
+        contact_indices: slice,
+        free_indices: slice,
+    ):
+        size = matrix.shape[0] // dimension
+        nodes = np.arange(size)
+
+        def get_indices(indices):
+            return np.concatenate(
+                [nodes[indices] + dim * size for dim in range(dimension)]
+            )
+
+        contact = get_indices(contact_indices)
+        free = get_indices(free_indices)
+        matrix_free_rows = matrix[free]
+        matrix_contact_rows = matrix[contact]
+        free_x_free = matrix_free_rows[:, free].tocsc()
+        free_x_contact = matrix_free_rows[:, contact].tocsr()
+        contact_x_free = matrix_contact_rows[:, free].tocsr()
+        contact_x_contact = matrix_contact_rows[:, contact].tocsr()
+
+        # Factorization replaces the dense inverse, applied with "@" like a matrix
+        factorization = scipy.sparse.linalg.splu(free_x_free)
+        free_x_free_inverted = scipy.sparse.linalg.LinearOperator(
+            shape=free_x_free.shape,
+            matvec=factorization.solve,
+            matmat=factorization.solve,
+            dtype=free_x_free.dtype,
+        )
+        lhs_boundary = contact_x_contact.toarray() - contact_x_free @ (
+            factorization.solve(free_x_contact.toarray())
+        )
+
+        return (
+            lhs_boundary,
+            free_x_contact,
+            contact_x_free,
+            free_x_free.tocsr(),
+            free_x_free_inverted,
+        )
+
     @staticmethod
     def calculate_schur_complement_vector(
         vector: np.ndarray,
@@ -151,7 +195,11 @@ class SchurComplement(Optimization):
         return vector_boundary, vector_free
 
     def recalculate_displacement(self):
-        return SchurComplement.calculate_schur_complement_matrices_np(
+        if scipy.sparse.issparse(self.statement.left_hand_side):
+            calculate = SchurComplement.calculate_schur_complement_matrices_sparse
+        else:
+            calculate = SchurComplement.calculate_schur_complement_matrices_np
+        return calculate(
             matrix=self.statement.left_hand_side,
             dimension=self.statement.dimension,
             contact_indices=self.contact_ids,
@@ -38,17 +38,6 @@ def interpolate_node_between(node_id_0, node_id_1, vector, dimension=DIMENSION):
     return result
 
 
-# TODO #97
-@numba.njit(inline="always")
-def interpolate_node_between_2023(node_id_0, _node_id_1, vector, dimension=DIMENSION):
-    result = np.zeros(dimension)
-    offset = len(vector) // dimension
-    for i in range(dimension):
-        if node_id_0 < offset:  # exclude dirichlet nodes (and inner nodes in schur)
-            result[i] += vector[i * offset + node_id_0]
-    return result
-
-
 def make_equation(jn, jt, h_functional):
     jn = numba.njit(jn)
     jt = numba.njit(jt)
@@ -104,15 +93,51 @@ def make_equation(jn, jt, h_functional):
 
         return contact_vector
 
-    @numba.njit()
     def equation(u_vector, vertices, contact_boundary, lhs, rhs):
+        # lhs can be dense or scipy.sparse, only the contact part is compiled
         c_part = contact_part(u_vector, vertices, contact_boundary)
-        result = np.dot(lhs, u_vector) + c_part - rhs
+        result = lhs @ u_vector + c_part - rhs
         return result
 
     return equation
 
 
+def quadratic_part(vector, lhs, rhs):
+    # 0.5 x^T A x - b^T x for dense or scipy.sparse lhs
+    return 0.5 * np.dot(lhs @ vector, vector) - np.dot(rhs, vector)
+
+
+def quadratic_part_gradient(vector, lhs, rhs):
+    return 0.5 * (lhs @ vector + lhs.T @ vector) - rhs
+
+
+def make_cost_functional_with_gradient(
+    contact_part: Callable, contact_part_gradient: Optional[Callable] = None
+):
+    """
+    Gradient is None if contact law does not provide derivatives of its terms
+    """
+
+    def cost_functional(vector, nodes, contact_boundary, lhs, rhs, other, dt):
+        result = quadratic_part(vector, lhs, rhs) + contact_part(
+            vector, nodes, contact_boundary, other, dt
+        )
+        result = np.asarray(result).ravel()
+        return result
+
+    if contact_part_gradient is None:
+        return cost_functional, None
+
+    def cost_functional_gradient(vector, nodes, contact_boundary, lhs, rhs, other, dt):
+        result = quadratic_part_gradient(vector, lhs, rhs) + contact_part_gradient(
+            vector, nodes, contact_boundary, other, dt
+        )
+        # schur complement lhs is np.matrix
+        return np.asarray(result).ravel()
+
+    return cost_functional, cost_functional_gradient
+
+
 def njit(func: Optional[Callable], value: Optional[Any] = 0) -> Callable:
     if func is None:
 
@@ -124,215 +149,304 @@ def njit(func: Optional[Callable], value: Optional[Any] = 0) -> Callable:
     return numba.njit(func)
 
 
-def make_cost_functional(
-    jn: Callable, jt: Optional[Callable] = None, h_functional: Optional[Callable] = None
-):
-    jn = njit(jn)
-    jt = njit(jt)
-    h_functional = njit(h_functional)
+def vectorize(func: Optional[Callable]) -> Callable:
+    """
+    Maps law of scalar or tangential vector argument over contact edges
+    """
+    func = njit(func)
 
     @numba.njit()
-    def contact_cost_functional(u_vector, u_vector_old, nodes, contact_boundary):
-        cost = 0
-        offset = len(u_vector) // DIMENSION
-
-        for edge in contact_boundary:
-            n_id_0 = edge[0]
-            n_id_1 = edge[1]
-            n_0 = nodes[n_id_0]
-            n_1 = nodes[n_id_1]
-
-            # ASSUMING `u_vector` and `nodes` have the same order!
-            um = interpolate_node_between(n_id_0, n_id_1, u_vector)
-            um_old = interpolate_node_between(n_id_0, n_id_1, u_vector_old)
+    def vectorized(arguments):
+        result = np.empty(len(arguments))
+        for i in range(len(arguments)):
+            result[i] = func(arguments[i])
+        return result
 
-            normal_vector = n_down(n_0, n_1)
+    return vectorized
 
-            um_normal = (um * normal_vector).sum()
-            um_old_normal = (um_old * normal_vector).sum()
-            um_tangential = um - um_normal * normal_vector
 
-            if n_id_0 < offset and n_id_1 < offset:
-                cost += nph.length(n_0, n_1) * (
-                    jn(um_normal) + h_functional(um_old_normal) * jt(um_tangential)
-                )
-        return cost
+def vectorize_subderivative(subderivative: Callable) -> Callable:
+    """
+    Derivative of law of scalar argument from its subderivative
+    """
+    subderivative = numba.njit(subderivative)
 
-    # pylint: disable=unused-argument # 'dt'
     @numba.njit()
-    def cost_functional(u_vector, nodes, contact_boundary, lhs, rhs, u_vector_old, dt):
-        ju = contact_cost_functional(u_vector, u_vector_old, nodes, contact_boundary)
-        result = (
-            0.5 * np.dot(np.dot(lhs, u_vector), u_vector) - np.dot(rhs, u_vector) + ju
-        )
-        result = np.asarray(result).ravel()
+    def vectorized(arguments):
+        result = np.empty(len(arguments))
+        for i in range(len(arguments)):
+            result[i] = subderivative(arguments[i], 1.0)
         return result
 
-    return cost_functional
+    return vectorized
 
 
-def make_cost_functional_2023(  # TODO #97
-    jn: Callable, jt: Optional[Callable] = None, h_functional: Optional[Callable] = None
-):
-    jn = njit(jn)
-    jt = njit(jt)
-    h_functional = njit(h_functional)
+def vectorize_gradient(subderivative: Callable) -> Callable:
+    """
+    Gradient of law of tangential vector from its subderivatives along axes
+    """
+    subderivative = numba.njit(subderivative)
 
     @numba.njit()
-    def contact_cost_functional(v_vector, u_vector_old, nodes, contact_boundary):
-        cost = 0
-        offset = len(v_vector) // DIMENSION
+    def vectorized(arguments):
+        result = np.empty_like(arguments)
+        direction = np.zeros(arguments.shape[1])
+        for i in range(len(arguments)):
+            for j in range(arguments.shape[1]):
+                direction[j] = 1.0
+                result[i, j] = subderivative(arguments[i], direction)
+                direction[j] = 0.0
+        return result
 
-        for edge in contact_boundary:
-            n_id_0 = edge[0]
-            n_id_1 = edge[1]
-            n_0 = nodes[n_id_0]
-            n_1 = nodes[n_id_1]
+    return vectorized
 
-            # ASSUMING `u_vector` and `nodes` have the same order!
-            vm = interpolate_node_between_2023(n_id_0, n_id_1, v_vector)
-            vm_2 = interpolate_node_between_2023(n_id_1, n_id_0, v_vector)
-            um_old = interpolate_node_between_2023(n_id_0, n_id_1, u_vector_old)
-            um_old_2 = interpolate_node_between_2023(n_id_1, n_id_0, u_vector_old)
 
-            normal_vector = n_down(n_0, n_1)
+def get_contact_edges(nodes, contact_boundary, offset):
+    """
+    Contact edges with both nodes in vector (no dirichlet nodes and no inner
+    nodes in schur) with their normals, as `n_down`, and lengths
+    """
+    contact_boundary = np.asarray(contact_boundary).reshape(-1, 2)
+    edges = contact_boundary[np.all(contact_boundary < offset, axis=1)]
+    difference = nodes[edges[:, 0]] - nodes[edges[:, 1]]
+    lengths = np.sqrt(difference[:, 0] ** 2 + difference[:, 1] ** 2)
+    normals = np.column_stack((difference[:, 1], -difference[:, 0])) / lengths[:, None]
+    normals[normals[:, 1] > 0] *= -1
+    return edges, normals, lengths
 
-            vm_normal = (vm * normal_vector).sum()
-            um_old_normal = (um_old * normal_vector).sum()
-            vm_tangential = vm - vm_normal * normal_vector
-            vm_normal_2 = (vm_2 * normal_vector).sum()
-            um_old_normal_2 = (um_old_2 * normal_vector).sum()
-            vm_tangential_2 = vm_2 - vm_normal * normal_vector
-
-            if n_id_0 < offset and n_id_1 < offset:
-                cost += (
-                    0.5
-                    * nph.length(n_0, n_1)
-                    * (
-                        jn(um_old_normal) * vm_normal
-                        + h_functional(um_old_normal) * jt(vm_tangential)
-                        + jn(um_old_normal_2) * vm_normal_2
-                        + h_functional(um_old_normal_2) * jt(vm_tangential_2)
-                    )
-                )
-        return cost
 
-    @numba.njit()
-    def cost_functional(v_vector, nodes, contact_boundary, lhs, rhs, u_vector_old, dt):
-        u_vector = u_vector_old + dt * v_vector
-        ju = contact_cost_functional(v_vector, u_vector, nodes, contact_boundary)
-        result = (
-            0.5 * np.dot(np.dot(lhs, v_vector), v_vector) - np.dot(rhs, v_vector) + ju
-        )
-        result = np.asarray(result).ravel()
-        return result
+def get_edge_values(vector, edges, dimension=DIMENSION):
+    # values only at nodes of edges, shape (edges, 2, dimension)
+    # ASSUMING `vector` and `nodes` have the same order!
+    return vector.reshape(dimension, -1)[:, edges].transpose(1, 2, 0)
 
-    return cost_functional
 
+def add_edge_values(edge_values, edges, size, dimension=DIMENSION):
+    result = np.zeros((dimension, size // dimension))
+    np.add.at(
+        result,
+        (slice(None), edges),
+        np.broadcast_to(edge_values, (*edges.shape, dimension)).transpose(2, 0, 1),
+    )
+    return result.reshape(-1)
 
-def make_cost_functional_temperature(
-    hn: Callable,
-    ht: Optional[Callable] = None,
-    h_functional: Optional[Callable] = None,
-    heat_exchange: Optional[Callable] = None,
-):
-    _hn = njit(hn)  # TODO #48
-    _ht = njit(ht)
-    h_functional = numba.njit(h_functional)
-    heat_exchange = njit(heat_exchange)
 
-    @numba.njit()
-    def contact_cost_functional(u_vector, nodes, contact_boundary, temp_vector):
-        cost = 0
-        offset = len(u_vector) // DIMENSION
+def project_tangential(vectors, normals):
+    return vectors - (vectors * normals).sum(axis=-1)[..., None] * normals
 
-        for edge in contact_boundary:
-            n_id_0 = edge[0]
-            n_id_1 = edge[1]
-            n_0 = nodes[n_id_0]
-            n_1 = nodes[n_id_1]
 
-            # ASSUMING `u_vector` and `nodes` have the same order!
-            um = interpolate_node_between(n_id_0, n_id_1, u_vector)
-            temp_m = interpolate_node_between(n_id_0, n_id_1, temp_vector, dimension=1)
+def make_cost_functional(
+    jn: Callable,
+    jt: Optional[Callable] = None,
+    h_functional: Optional[Callable] = None,
+    jn_subderivative: Optional[Callable] = None,
+    jt_subderivative: Optional[Callable] = None,
+):
+    jn_values = vectorize(jn)
+    jt_values = vectorize(jt)
+    h_values = vectorize(h_functional)
 
-            normal_vector = n_down(n_0, n_1)
+    def get_edges_state(u_vector, nodes, contact_boundary, u_vector_old):
+        edges, normals, lengths = get_contact_edges(
+            nodes, contact_boundary, len(u_vector) // DIMENSION
+        )
+        um = get_edge_values(u_vector, edges).mean(axis=1)
+        um_old = get_edge_values(u_vector_old, edges).mean(axis=1)
+        um_normal = (um * normals).sum(axis=1)
+        um_old_normal = (um_old * normals).sum(axis=1)
+        um_tangential = um - um_normal[:, None] * normals
+        return edges, normals, lengths, um_normal, um_old_normal, um_tangential
 
-            um_normal = (um * normal_vector).sum()
-            um_tangential = um - um_normal * normal_vector
+    # pylint: disable=unused-argument # 'dt'
+    def contact_part(u_vector, nodes, contact_boundary, u_vector_old, dt):
+        _, _, lengths, um_normal, um_old_normal, um_tangential = get_edges_state(
+            u_vector, nodes, contact_boundary, u_vector_old
+        )
+        return np.sum(
+            lengths
+            * (
+                jn_values(um_normal)
+                + h_values(um_old_normal) * jt_values(um_tangential)
+            )
+        )
 
-            if n_id_0 < offset and n_id_1 < offset:
-                # cost += edgeLength * (hn(uNmL, tmL)
-                #      + h(np.linalg.norm(np.asarray((uTmLx, uTmLy)))) * ht(uNmL, tmL))
-                cost += nph.length(n_0, n_1) * (
-                    h_functional(np.linalg.norm(um_tangential))
-                    - heat_exchange(temp_m[0])
-                )
-        return cost
+    if jn_subderivative is None or (jt is not None and jt_subderivative is None):
+        return make_cost_functional_with_gradient(contact_part)
+    jn_derivatives = vectorize_subderivative(jn_subderivative)
+    jt_gradients = None if jt is None else vectorize_gradient(jt_subderivative)
 
     # pylint: disable=unused-argument # 'dt'
-    @numba.njit()
-    def cost_functional(temp_vector, nodes, contact_boundary, lhs, rhs, u_vector, dt):
-        result = (
-            0.5 * np.dot(np.dot(lhs, temp_vector), temp_vector)
-            - np.dot(rhs, temp_vector)
-            - contact_cost_functional(u_vector, nodes, contact_boundary, temp_vector)
-        )
-        result = np.asarray(result).ravel()
-        return result
+    def contact_part_gradient(u_vector, nodes, contact_boundary, u_vector_old, dt):
+        (
+            edges,
+            normals,
+            lengths,
+            um_normal,
+            um_old_normal,
+            um_tangential,
+        ) = get_edges_state(u_vector, nodes, contact_boundary, u_vector_old)
+        um_gradient = jn_derivatives(um_normal)[:, None] * normals
+        if jt_gradients is not None:
+            um_gradient += h_values(um_old_normal)[:, None] * project_tangential(
+                jt_gradients(um_tangential), normals
+            )
+        # `um` is mean of values at both nodes of edge
+        edge_gradient = 0.5 * lengths[:, None, None] * um_gradient[:, None]
+        return add_edge_values(edge_gradient, edges, len(u_vector))
 
-    return cost_functional
+    return make_cost_functional_with_gradient(contact_part, contact_part_gradient)
 
 
-def make_cost_functional_piezoelectricity(
-    hn: Callable,
-    ht: Optional[Callable] = None,
+def make_cost_functional_2023(  # TODO #97
+    jn: Callable,
+    jt: Optional[Callable] = None,
     h_functional: Optional[Callable] = None,
-    electric_charge_exchange: Optional[Callable] = None,
+    jn_subderivative: Optional[Callable] = None,
+    jt_subderivative: Optional[Callable] = None,
+    h_derivative: Optional[Callable] = None,
 ):
-    _hn = njit(hn)  # TODO #48
-    _ht = njit(ht)
-    h_functional = numba.njit(h_functional)
-    electric_charge_exchange = njit(electric_charge_exchange)
+    jn_values = vectorize(jn)
+    jt_values = vectorize(jt)
+    h_values = vectorize(h_functional)
+
+    def get_nodes_state(v_vector, nodes, contact_boundary, u_vector_old, dt):
+        # laws at both nodes of each edge, shape (edges, 2)
+        edges, normals, lengths = get_contact_edges(
+            nodes, contact_boundary, len(v_vector) // DIMENSION
+        )
+        v = get_edge_values(v_vector, edges)
+        u = get_edge_values(u_vector_old, edges) + dt * v
+        normals = normals[:, None]
+        v_normal = (v * normals).sum(axis=2)
+        u_normal = (u * normals).sum(axis=2)
+        v_tangential = v - v_normal[..., None] * normals
+        return edges, normals, lengths, v_normal, u_normal, v_tangential
+
+    def contact_part(v_vector, nodes, contact_boundary, u_vector_old, dt):
+        _, _, lengths, v_normal, u_normal, v_tangential = get_nodes_state(
+            v_vector, nodes, contact_boundary, u_vector_old, dt
+        )
+        u_normal = u_normal.ravel()
+        values = jn_values(u_normal) * v_normal.ravel() + h_values(
+            u_normal
+        ) * jt_values(v_tangential.reshape(-1, DIMENSION))
+        return np.sum(0.5 * lengths * values.reshape(-1, 2).sum(axis=1))
+
+    if jn_subderivative is None or (
+        jt is not None and (jt_subderivative is None or h_derivative is None)
+    ):
+        return make_cost_functional_with_gradient(contact_part)
+    jn_derivatives = vectorize_subderivative(jn_subderivative)
+    jt_gradients = None if jt is None else vectorize_gradient(jt_subderivative)
+    h_derivatives = vectorize(h_derivative)
+
+    def contact_part_gradient(v_vector, nodes, contact_boundary, u_vector_old, dt):
+        (
+            edges,
+            normals,
+            lengths,
+            v_normal,
+            u_normal,
+            v_tangential,
+        ) = get_nodes_state(v_vector, nodes, contact_boundary, u_vector_old, dt)
+        shape = v_normal.shape
+        u_normal = u_normal.ravel()
+        v_tangential = v_tangential.reshape(-1, DIMENSION)
+        # `u` depends on `v` through `dt`
+        normal_part = (
+            jn_values(u_normal) + dt * jn_derivatives(u_normal) * v_normal.ravel()
+        )
+        tangential_part = np.zeros_like(v_tangential)
+        if jt_gradients is not None:
+            normal_part += dt * h_derivatives(u_normal) * jt_values(v_tangential)
+            tangential_part = h_values(u_normal)[:, None] * jt_gradients(v_tangential)
+        v_gradient = normal_part.reshape(shape)[..., None] * normals
+        v_gradient += project_tangential(
+            tangential_part.reshape(v_gradient.shape), normals
+        )
+        edge_gradient = 0.5 * lengths[:, None, None] * v_gradient
+        return add_edge_values(edge_gradient, edges, len(v_vector))
 
-    @numba.njit()
-    def contact_cost_functional(u_vector, nodes, contact_boundary, temp_vector):
-        cost = 0
-        offset = len(u_vector) // DIMENSION
+    return make_cost_functional_with_gradient(contact_part, contact_part_gradient)
 
-        for edge in contact_boundary:
-            n_id_0 = edge[0]
-            n_id_1 = edge[1]
-            n_0 = nodes[n_id_0]
-            n_1 = nodes[n_id_1]
-
-            # ASSUMING `u_vector` and `nodes` have the same order!
-            um = interpolate_node_between(n_id_0, n_id_1, u_vector)
-            temp_m = interpolate_node_between(n_id_0, n_id_1, temp_vector, dimension=1)
 
-            normal_vector = n_down(n_0, n_1)
+def make_exchange_cost_functional(
+    h_functional: Optional[Callable],
+    exchange: Optional[Callable],
+    exchange_derivative: Optional[Callable],
+):
+    """
+    Cost functional of temperature or electric potential exchanged on contact
+    """
+    h_values = vectorize(h_functional)
+    exchange_values = vectorize(exchange)
+
+    def get_edges_state(temp_vector, nodes, contact_boundary, u_vector):
+        edges, normals, lengths = get_contact_edges(
+            nodes, contact_boundary, len(u_vector) // DIMENSION
+        )
+        um = get_edge_values(u_vector, edges).mean(axis=1)
+        temp_m = get_edge_values(temp_vector, edges, dimension=1).mean(axis=1)[:, 0]
+        return edges, normals, lengths, um, temp_m
 
-            um_normal = (um * normal_vector).sum()
-            um_tangential = um - um_normal * normal_vector
+    # pylint: disable=unused-argument # 'dt'
+    def contact_part(temp_vector, nodes, contact_boundary, u_vector, dt):
+        _, normals, lengths, um, temp_m = get_edges_state(
+            temp_vector, nodes, contact_boundary, u_vector
+        )
+        um_tangential = project_tangential(um, normals)
+        # cost += edgeLength * (hn(uNmL, tmL)
+        #      + h(np.linalg.norm(np.asarray((uTmLx, uTmLy)))) * ht(uNmL, tmL))
+        return -np.sum(
+            lengths
+            * (
+                h_values(np.sqrt((um_tangential * um_tangential).sum(axis=1)))
+                - exchange_values(temp_m)
+            )
+        )
 
-            if n_id_0 < offset and n_id_1 < offset:
-                # cost += edgeLength * (hn(uNmL, tmL)
-                #      + h(np.linalg.norm(np.asarray((uTmLx, uTmLy)))) * ht(uNmL, tmL))
-                cost += nph.length(n_0, n_1) * (
-                    h_functional(np.linalg.norm(um_tangential))
-                    - electric_charge_exchange(temp_m[0])
-                )
-        return cost
+    if exchange is not None and exchange_derivative is None:
+        return make_cost_functional_with_gradient(contact_part)
+    exchange_derivatives = vectorize(exchange_derivative)
 
     # pylint: disable=unused-argument # 'dt'
-    @numba.njit()
-    def cost_functional(temp_vector, nodes, contact_boundary, lhs, rhs, u_vector, dt):
-        result = (
-            0.5 * np.dot(np.dot(lhs, temp_vector), temp_vector)
-            - np.dot(rhs, temp_vector)
-            - contact_cost_functional(u_vector, nodes, contact_boundary, temp_vector)
+    def contact_part_gradient(temp_vector, nodes, contact_boundary, u_vector, dt):
+        edges, _, lengths, _, temp_m = get_edges_state(
+            temp_vector, nodes, contact_boundary, u_vector
         )
-        result = np.asarray(result).ravel()
-        return result
+        edge_gradient = 0.5 * lengths * exchange_derivatives(temp_m)
+        return add_edge_values(
+            edge_gradient[:, None, None], edges, len(temp_vector), dimension=1
+        )
+
+    return make_cost_functional_with_gradient(contact_part, contact_part_gradient)
+
 
-    return cost_functional
+# pylint: disable=unused-argument # 'hn', 'ht' TODO #48
+def make_cost_functional_temperature(
+    hn: Callable,
+    ht: Optional[Callable] = None,
+    h_functional: Optional[Callable] = None,
+    heat_exchange: Optional[Callable] = None,
+    heat_exchange_derivative: Optional[Callable] = None,
+):
+    return make_exchange_cost_functional(
+        h_functional=h_functional,
+        exchange=heat_exchange,
+        exchange_derivative=heat_exchange_derivative,
+    )
+
+
+# pylint: disable=unused-argument # 'hn', 'ht' TODO #48
+def make_cost_functional_piezoelectricity(
+    hn: Callable,
+    ht: Optional[Callable] = None,
+    h_functional: Optional[Callable] = None,
+    electric_charge_exchange: Optional[Callable] = None,
+    electric_charge_exchange_derivative: Optional[Callable] = None,
+):
+    return make_exchange_cost_functional(
+        h_functional=h_functional,
+        exchange=electric_charge_exchange,
+        exchange_derivative=electric_charge_exchange_derivative,
+    )
@@ -4,7 +4,6 @@ Created at 18.02.2021
 
 import numpy as np
 
-from conmech.helpers import jxh
 from conmech.solvers.solver_methods import make_equation
 
 
@@ -24,7 +23,7 @@ class Validator:
                 solution,
                 state.body.initial_nodes,
                 state.body.contact_boundary,
-                jxh.to_dense_np(self.elasticity),
+                self.elasticity,
                 state.body.get_integrated_forces_vector_np(),
             )
         )
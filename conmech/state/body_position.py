@@ -7,6 +7,7 @@ import jax.numpy as jnp
 import numpy as np
 
 from conmech.helpers import jxh, lnh, nph
+from conmech.mesh import remesher
 from conmech.mesh.boundaries_description import BoundariesDescription
 from conmech.mesh.mesh import Mesh
 from conmech.properties.mesh_properties import MeshProperties
@@ -124,6 +125,18 @@ def get_surface_per_boundary_node_jax(
     return nph.stack_column(surface_per_boundary_node)
 
 
+get_boundary_normals_jit = jxh.jit(
+    _get_boundary_normals_jax,
+    name="get_boundary_normals",
+    static_argnames=["considered_nodes_count"],
+)
+get_surface_per_boundary_node_jit = jxh.jit(
+    get_surface_per_boundary_node_jax,
+    name="get_surface_per_boundary_node",
+    static_argnames=["considered_nodes_count"],
+)
+
+
 def mesh_normalization_decorator(func: Callable):
     def inner(self, *args, **kwargs):
         saved_normalize = self.normalize
@@ -171,6 +184,27 @@ class BodyPosition:
         _ = inner_forces
         self.set_boundary_normals_jax()
 
+    def get_node_fields(self):
+        # fields defined on nodes, interpolated to new mesh in remesh
+        return [self.displacement_old, self.velocity_old, self.exact_acceleration]
+
+    def set_node_fields(self, fields):
+        displacement, velocity, self.exact_acceleration = fields
+        # rotation in dynamics needs matrices of new mesh, it is updated after them
+        BodyPosition.set_displacement_old(self, displacement)
+        self.set_velocity_old(velocity)
+
+    def remesh(self, boundaries_description, create_in_subprocess):
+        old_nodes, old_elements = self.initial_nodes, self.elements
+        fields = self.get_node_fields()
+        self.mesh.remesh(boundaries_description, create_in_subprocess)
+        transfer = remesher.get_field_transfer(
+            old_nodes=old_nodes, old_elements=old_elements, new_nodes=self.initial_nodes
+        )
+        self.set_node_fields(remesher.transfer_fields(transfer, fields))
+        self.boundary_normals = np.zeros_like(self.boundary_nodes)
+        self.set_boundary_normals_jax()
+
     def _normalize_shift(self, vectors):
         _ = self
         if not self.normalize:
@@ -408,9 +442,7 @@ class BodyPosition:
         return self.normalized_nodes - self.normalized_initial_nodes
 
     def set_boundary_normals_jax(self):
-        self.boundary_normals[:] = jax.jit(
-            _get_boundary_normals_jax, static_argnames=["considered_nodes_count"]
-        )(
+        self.boundary_normals[:] = get_boundary_normals_jit(
             moved_nodes=self.moved_nodes,
             boundary_surfaces=self.boundary_surfaces,
             boundary_internal_indices=self.boundary_internal_indices,
@@ -418,10 +450,7 @@ class BodyPosition:
         )
 
     def get_surface_per_boundary_node_jax(self):
-        return jax.jit(
-            get_surface_per_boundary_node_jax,
-            static_argnames=["considered_nodes_count"],
-        )(
+        return get_surface_per_boundary_node_jit(
             moved_nodes=self.moved_nodes,
             boundary_surfaces=self.boundary_surfaces,
             considered_nodes_count=self.boundary_nodes_count,
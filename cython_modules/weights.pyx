@@ -11,7 +11,7 @@ ctypedef double Float
 # ctypedef int Int
 # ctypedef float Float
 
-from libc.math cimport sqrt
+from libc.math cimport floor, sqrt
 
 # @cython.boundscheck(False)
 # @cython.wraparound(False)
@@ -26,13 +26,15 @@ cdef inline Int custom_hash(Int* cell, Int table_size) nogil:
     return get_abs((cell[0] * 92837111) ^ (cell[1] * 689287499) ^ (cell[2] * 283923481)) % table_size
 
 
-cdef inline void cell_coord(Int* cell, Float* node, Float spacing_inv, Float move = 0) nogil:
-    for i in range(3):
-        cell[i] = <Int>((node[i] + move) * spacing_inv)
+cdef inline void cell_coord(Int* cell, Float* node, Float spacing_inv, int size, Float move = 0) nogil:
+    # third coordinate of 2D cell is always 0
+    cell[2] = 0
+    for i in range(size):
+        cell[i] = <Int>floor((node[i] + move) * spacing_inv)
 
-cdef inline Int cell_hash(Float* node, Float spacing_inv, Int table_size) nogil:
+cdef inline Int cell_hash(Float* node, Float spacing_inv, Int table_size, int size) nogil:
     cdef Int[3] cell
-    cell_coord(cell, node, spacing_inv)
+    cell_coord(cell, node, spacing_inv, size)
     return custom_hash(cell, table_size)
 
 
@@ -75,6 +77,20 @@ cdef Float get_det(Float* matrix) nogil:
 #         - matrix[0][1]*matrix[1][0]*matrix[2][2] - matrix[0][0]*matrix[1][2]*matrix[2][1]
 
 
+cdef void set_matrix_inverse_2d(Float* result, Float* matrix) nogil:
+    cdef Float det = matrix[0] * matrix[3] - matrix[1] * matrix[2]
+    if (det == 0.0):
+        for i in range(4):
+            result[i] = 0.
+        return
+    cdef Float det_inv = 1.0 / det
+
+    result[0] = matrix[3] * det_inv
+    result[1] = -matrix[1] * det_inv
+    result[2] = -matrix[2] * det_inv
+    result[3] = matrix[0] * det_inv
+
+
 cdef void set_matrix_inverse(Float* result, Float* matrix) nogil:
     cdef Float det = get_det(matrix)
     if (det == 0.0):
@@ -124,7 +140,8 @@ cdef void initialize_hasher(
     Int[::1] cell_starts,
     Int[::1] node_cell,
     Int table_size,
-    Int nodes_count
+    Int nodes_count,
+    int size
 ) nogil:
     cell_starts[:] = 0
     cdef Float* node
@@ -132,7 +149,7 @@ cdef void initialize_hasher(
     cdef int h
     for i in range(nodes_count):
         node = &nodes[i, 0]
-        h = cell_hash(node=node, spacing_inv=spacing_inv, table_size=table_size)
+        h = cell_hash(node=node, spacing_inv=spacing_inv, table_size=table_size, size=size)
         cell_starts[h] += 1
 
     cdef Int start = 0
@@ -145,7 +162,7 @@ cdef void initialize_hasher(
     i = 0
     for i in range(nodes_count):
         node = &nodes[i, 0]
-        h = cell_hash(node=node, spacing_inv=spacing_inv, table_size=table_size)
+        h = cell_hash(node=node, spacing_inv=spacing_inv, table_size=table_size, size=size)
         cell_starts[h] -= 1
         node_cell[cell_starts[h]] = i
 
@@ -159,13 +176,15 @@ cdef Int query_hasher(
     Int[::1] cell_starts,
     Int[::1] node_cell,
     Int table_size,
-    Float spacing_inv) nogil:
+    Float spacing_inv,
+    Float[:, ::1] nodes,
+    int size) nogil:
 
     cdef Int h, start, end, node_id
-    cdef Int[3] cell_start, cell_stop, cell
+    cdef Int[3] cell_start, cell_stop, cell, node_cell_coord
 
-    cell_coord(cell=&cell_start[0], node=&query_node[0], spacing_inv=spacing_inv, move = -max_dist)
-    cell_coord(cell=&cell_stop[0], node=&query_node[0], spacing_inv=spacing_inv, move = +max_dist)
+    cell_coord(cell=&cell_start[0], node=&query_node[0], spacing_inv=spacing_inv, size=size, move = -max_dist)
+    cell_coord(cell=&cell_stop[0], node=&query_node[0], spacing_inv=spacing_inv, size=size, move = +max_dist)
 
     cdef Int query_count = 0
     for c1 in range(cell_start[0], cell_stop[0]+1):
@@ -180,9 +199,14 @@ cdef Int query_hasher(
                 end = cell_starts[h + 1]
                 for i in range(start, end):
                     node_id = node_cell[i]
-                    if not ready_nodes_mask[node_id]:
-                        query_nodes[query_count] = node_id
-                        query_count += 1
+                    if ready_nodes_mask[node_id]:
+                        continue
+                    # skip nodes of other cells in bucket, so none is repeated
+                    cell_coord(cell=&node_cell_coord[0], node=&nodes[node_id, 0], spacing_inv=spacing_inv, size=size)
+                    if node_cell_coord[0] != c1 or node_cell_coord[1] != c2 or node_cell_coord[2] != c3:
+                        continue
+                    query_nodes[query_count] = node_id
+                    query_count += 1
     return query_count
 
 
@@ -196,22 +220,22 @@ cdef void set_element_center(Float* element_center, Float* nodes, Int* element,
     cdef Int node_start = 0, i = 0, j = 0
     for i in range(size):
         element_center[i] = 0.
-    for j in range(4):
+    for j in range(size + 1):
         node_start = size * element[j]
         for i in range(size):
             element_center[i] += nodes[node_start + i]
     for i in range(size):
-        element_center[i] = element_center[i] / 4.
+        element_center[i] = element_center[i] / (size + 1)
 
 
 cdef void set_element_matrix_and_node(Float* element_matrix, Float* element_normalizing_node,
-            Float* nodes, Int* element) nogil:
+            Float* nodes, Int* element, int size) nogil:
     cdef Int i = 0, n = 0
-    for i in range(3):
-        element_normalizing_node[i] = nodes[3 * element[3] + i]
-    for n in range(3):
-        for i in range(3):
-            element_matrix[3 * i + n] = nodes[3 * element[n] + i] - element_normalizing_node[i]
+    for i in range(size):
+        element_normalizing_node[i] = nodes[size * element[size] + i]
+    for n in range(size):
+        for i in range(size):
+            element_matrix[size * i + n] = nodes[size * element[n] + i] - element_normalizing_node[i]
 
 
 cdef void complete_to_one(Float* weights, int size) nogil:
@@ -224,10 +248,10 @@ cdef Float get_element_radius(Float* element_center, Float* nodes, Int* element,
     cdef Float maximal_radius = 0, radius
     cdef Float[3] vector
 
-    for j in range(4):
+    for j in range(size + 1):
         node_start = size * element[j]
-        set_diff(result=vector, v1=&element_center[0], v2=&nodes[node_start], size=3)
-        radius = get_norm(vector=vector, size=3)
+        set_diff(result=vector, v1=&element_center[0], v2=&nodes[node_start], size=size)
+        radius = get_norm(vector=vector, size=size)
         if radius > maximal_radius:
             maximal_radius = radius
 
@@ -251,8 +275,10 @@ cpdef void find_closest_nodes_cython(
     cdef Int elements_count = len(base_elements)
     cdef Int table_size = len(cell_starts) - 1
     cdef Float spacing_inv = 1 / spacing
+    # 2D (triangles) or 3D (tetrahedra)
+    cdef int dim = base_nodes.shape[1]
 
-    initialize_hasher(nodes=interpolated_nodes, spacing_inv=spacing_inv, cell_starts=cell_starts, node_cell=node_cell, table_size=table_size, nodes_count=nodes_count)
+    initialize_hasher(nodes=interpolated_nodes, spacing_inv=spacing_inv, cell_starts=cell_starts, node_cell=node_cell, table_size=table_size, nodes_count=nodes_count, size=dim)
     
     cdef Float[4] weights
     cdef Float[3] vector, element_center, element_normalizing_node
@@ -272,11 +298,14 @@ cpdef void find_closest_nodes_cython(
 
         # make a function
         
-        set_element_center(element_center=&element_center[0], nodes=&base_nodes[0][0], element=&base_elements[element_id][0], size=3)
-        element_radius = get_element_radius(element_center=&element_center[0], nodes=&base_nodes[0][0], element=&base_elements[element_id][0], size=3)
-
-        set_element_matrix_and_node(element_matrix, element_normalizing_node, nodes=&base_nodes[0][0], element=&base_elements[element_id][0])
-        set_matrix_inverse(element_matrix_inv, element_matrix)
+        set_element_center(element_center=&element_center[0], nodes=&base_nodes[0][0], element=&base_elements[element_id][0], size=dim)
+        element_radius = get_element_radius(element_center=&element_center[0], nodes=&base_nodes[0][0], element=&base_elements[element_id][0], size=dim)
+
+        set_element_matrix_and_node(element_matrix, element_normalizing_node, nodes=&base_nodes[0][0], element=&base_elements[element_id][0], size=dim)
+        if dim == 2:
+            set_matrix_inverse_2d(element_matrix_inv, element_matrix)
+        else:
+            set_matrix_inverse(element_matrix_inv, element_matrix)
         # set_matrix_inverse(element_matrix_inv, &element_nodes_matrices_T[element_id][0][0])
         # set_matrix_inverse(matrix, element_nodes_matrices_T[element_id])
 
@@ -288,7 +317,9 @@ cpdef void find_closest_nodes_cython(
             cell_starts=cell_starts,
             node_cell=node_cell,
             table_size=table_size,
-            spacing_inv=spacing_inv
+            spacing_inv=spacing_inv,
+            nodes=interpolated_nodes,
+            size=dim
         )
 
         # with parallel():
@@ -297,19 +328,19 @@ cpdef void find_closest_nodes_cython(
             node_id = query_nodes[query_id]
 
             # set_diff(result=vector, v1=&interpolated_nodes[node_id][0], v2=&normalizing_element_nodes_T[element_id][0], size=3)
-            set_diff(result=vector, v1=&interpolated_nodes[node_id][0], v2=element_normalizing_node, size=3)
-            set_dot(result=weights, matrix=element_matrix_inv, vector=vector, size=3)
+            set_diff(result=vector, v1=&interpolated_nodes[node_id][0], v2=element_normalizing_node, size=dim)
+            set_dot(result=weights, matrix=element_matrix_inv, vector=vector, size=dim)
                     
             # weights sum to one
-            complete_to_one(weights=&weights[0], size=3)
+            complete_to_one(weights=&weights[0], size=dim)
 
             # looking for weights that are closest to positive
-            smallest_weight = get_min(vector=&weights[0], size=4)
-            smallest_current_weight = get_min(vector=&closest_weights[node_id][0], size=4)
+            smallest_weight = get_min(vector=&weights[0], size=dim + 1)
+            smallest_current_weight = get_min(vector=&closest_weights[node_id][0], size=dim + 1)
 
             # better weight found
             if smallest_weight > smallest_current_weight:
-                for i in range(4):
+                for i in range(dim + 1):
                     closest_weights[node_id, i] = weights[i]
                     closest_nodes[node_id, i] = base_elements[element_id][i]
             if smallest_weight >= 0:
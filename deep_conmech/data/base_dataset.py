@@ -1,7 +1,7 @@
 import copy
 import os
 from ctypes import ArgumentError
-from typing import Callable, Iterable
+from typing import Callable, Dict, Iterable, Optional
 
 import numpy as np
 import torch
@@ -9,15 +9,13 @@ from torch.utils.data import get_worker_info
 from torch.utils.data.distributed import DistributedSampler
 from torch_geometric.loader import DataLoader
 
-from conmech.helpers import cmh, mph, pkh
-from conmech.plotting.plotter_functions import plot_setting
-from deep_conmech.data.data_classes import GraphData
-from deep_conmech.data.dataset_statistics import (
-    FeaturesStatistics,
-    FeaturesStatisticsPandas,
-)
+from conmech.helpers import cmh, lzh, mmh, mph, pkh, trh
+from deep_conmech.data.data_classes import GraphData, MeshLayerData, TargetData
+from deep_conmech.data.dataset_statistics import StreamingStatistics
 from deep_conmech.training_config import TrainingConfig
 
+plotter_functions = lzh.lazy_import("conmech.plotting.plotter_functions")
+
 
 def print_dataset(dataset, cutoff, timestamp, description):
     _ = timestamp
@@ -28,6 +26,107 @@ def print_dataset(dataset, cutoff, timestamp, description):
     _ = iterations
 
 
+STATISTICS_LABELS = [
+    "sparse_nodes",
+    "sparse_edges",
+    "multilayer_edges",
+    "dense_nodes",
+    "dense_edges",
+    "target_normalized_new_displacement",
+]
+
+
+def get_statistics_features(graph_data: GraphData):
+    dense_layer, sparse_layer = graph_data.layer_list
+    return {
+        "sparse_nodes": sparse_layer.x,
+        "sparse_edges": sparse_layer.edge_attr,
+        "multilayer_edges": sparse_layer.edge_attr_to_down,
+        "dense_nodes": dense_layer.x,
+        "dense_edges": dense_layer.edge_attr,
+        "target_normalized_new_displacement": (
+            graph_data.target_data.normalized_new_displacement
+        ),
+    }
+
+
+def get_empty_statistics(bins: Optional[int], histogram_ranges: Optional[dict]):
+    return {
+        label: StreamingStatistics(
+            label=label,
+            bins=bins,
+            histogram_range=histogram_ranges[label] if histogram_ranges else (-1, 1),
+        )
+        for label in STATISTICS_LABELS
+    }
+
+
+class StatisticsChunks:
+    def __init__(
+        self,
+        dataset: "BaseDataset",
+        bins: Optional[int],
+        histogram_ranges: Optional[dict],
+        chunk_size: int = 64,
+    ):
+        self.dataset = dataset
+        self.bins = bins
+        self.histogram_ranges = histogram_ranges
+        self.chunk_size = chunk_size
+
+    def __len__(self):
+        return -(-self.dataset.data_count // self.chunk_size)
+
+    def __getitem__(self, chunk_id: int):
+        statistics = get_empty_statistics(self.bins, self.histogram_ranges)
+        start = chunk_id * self.chunk_size
+        for index in range(
+            start, min(start + self.chunk_size, self.dataset.data_count)
+        ):
+            graph_data = self.dataset.get_features_and_targets_data(index)
+            for label, data in get_statistics_features(graph_data).items():
+                statistics[label].update(data)
+        return statistics
+
+
+def to_memmap_sample(graph_data: GraphData) -> Dict[str, np.ndarray]:
+    sample = {}
+    for layer_number, layer_data in enumerate(graph_data.layer_list):
+        for key, value in layer_data.to_dict().items():
+            sample[f"layer_{layer_number}.{key}"] = value.numpy()
+    for key, value in graph_data.target_data.to_dict().items():
+        sample[f"target.{key}"] = value.numpy()
+    return sample
+
+
+def from_memmap_sample(sample: Dict[str, np.ndarray]) -> GraphData:
+    layers = {}
+    target_data = TargetData()
+    for name, value in sample.items():
+        group, key = name.split(".", 1)
+        tensor = torch.from_numpy(value)  # no copy, shares mapped pages
+        if group == "target":
+            target_data[key] = tensor
+        else:
+            layer_number = int(group.split("_")[1])
+            layers.setdefault(layer_number, MeshLayerData())[key] = tensor
+    return GraphData(
+        layer_list=[layers[number] for number in sorted(layers)],
+        target_data=target_data,
+        scene=None,
+    )
+
+
+def convert_features_to_memmap(features_path: str, memmap_path: str):
+    cmh.clear_folder(memmap_path)
+    with pkh.open_file_read(features_path) as file:
+        for byte_index in pkh.get_all_indices(features_path):
+            graph_data = pkh.load_byte_index(byte_index=byte_index, data_file=file)
+            mmh.append_sample(
+                sample=to_memmap_sample(graph_data), data_path=memmap_path, lock=None
+            )
+
+
 def get_print_dataloader(dataset: "BaseDataset", rank: int, world_size: int):
     return get_dataloader(
         dataset=dataset,
@@ -83,7 +182,7 @@ def get_dataloader(
         num_workers=num_workers,
         # shuffle=shuffle,
         sampler=sampler,
-        pin_memory=True,
+        pin_memory=torch.cuda.is_available(),
         persistent_workers=num_workers > 0,
         worker_init_fn=worker_init_fn if load_data else None,
         # prefetch_factor=10,
@@ -129,6 +228,7 @@ class BaseDataset:
         self.world_size = world_size
         self.file = None
         self.loaded_data = None
+        self.features_reader = None
         self.data_file = None
         self.device_count = device_count
         self.item_fn = item_fn
@@ -174,17 +274,29 @@ class BaseDataset:
         return f"{self.main_directory}/DATA.scenes"
 
     @property
-    def features_data_path(self):
+    def is_memmap(self):
+        return self.config.features_format == "memmap"
+
+    @property
+    def pickled_features_data_path(self):
         return f"{self.tmp_directory}/DATASET.feat"
 
+    @property
+    def features_data_path(self):
+        if self.is_memmap:
+            return f"{self.tmp_directory}/DATASET.mmap"
+        return self.pickled_features_data_path
+
     def unload_and_clear_indices(self):
         self.features_indices = None
+        self.features_reader = None
         cmh.clear_folder(self.tmp_directory)
         cmh.create_folder(self.tmp_directory)
 
     def initialize_data(self):
         print(f"----NODE {self.rank}: INITIALIZING DATASET ({self.data_id})----")
         self.create_folders()
+        self.convert_pickled_features()
         self.load_indices()
 
         if self.check_indices():
@@ -222,16 +334,19 @@ class BaseDataset:
             )
             return
 
-        print("Clearing old data")
-        cmh.clear_folder(self.main_directory)
-        self.create_folders()
+        # shards of interrupted generation are kept to resume it
+        if not pkh.get_shard_paths(self.scenes_data_path):
+            print("Clearing old data")
+            cmh.clear_folder(self.main_directory)
+            self.create_folders()
 
         self.generate_data()
 
         if self.with_scenes_file:
             self.scene_indices = self.get_all_scene_indices()
             assert self.data_count == len(self.scene_indices)
-            cmh.profile(self.initialize_features_and_targets_process, baypass=True)
+            with trh.span("features_and_targets"):
+                self.initialize_features_and_targets_process()
             # mph.run_processes(
             #     self.initialize_features_and_targets_process, num_workers=self.num_workers
             # )
@@ -262,11 +377,27 @@ class BaseDataset:
         return self.data_count == len(self.features_indices)
 
     def load_indices(self):
-        self.features_indices = pkh.get_all_indices(self.features_data_path)[
-            : self.data_count
-        ]
+        if self.is_memmap:
+            self.features_reader = mmh.MemmapReader(self.features_data_path)
+            all_indices = list(range(len(self.features_reader)))
+        else:
+            all_indices = pkh.get_all_indices(self.features_data_path)
+        self.features_indices = all_indices[: self.data_count]
+
+    def convert_pickled_features(self):
+        if not self.is_memmap or mmh.load_meta(self.features_data_path) is not None:
+            return
+        if len(pkh.get_all_indices(self.pickled_features_data_path)) < self.data_count:
+            return
+        print("Converting pickled features to memory-mapped format")
+        convert_features_to_memmap(
+            features_path=self.pickled_features_data_path,
+            memmap_path=self.features_data_path,
+        )
 
     def get_size(self, data_path):
+        if os.path.isdir(data_path):
+            return mmh.get_size(data_path) / 1024**3
         return os.path.getsize(data_path) / 1024**3
 
     def save_features_and_target(self, scene):
@@ -279,6 +410,13 @@ class BaseDataset:
         graph_data = GraphData(
             layer_list=layers_list, target_data=target_data, scene=None
         )
+        if self.is_memmap:
+            mmh.append_sample(
+                sample=to_memmap_sample(graph_data),
+                data_path=self.features_data_path,
+                lock=self.files_lock,
+            )
+            return
         pkh.append_data(
             data=graph_data,
             data_path=self.features_data_path,
@@ -299,150 +437,33 @@ class BaseDataset:
             self.save_features_and_target(scene)
         return True
 
-    def get_statistics(self):
-        saved_device_count = self.device_count
-        self.device_count = 1
-
-        dataloader = get_dataloader(
-            dataset=self,
-            rank=0,
-            world_size=1,
-            batch_size=32,  # 32,  # 1,  # self.config.td.batch_size,
-            num_workers=0,
-            shuffle=True,
-            load_data=True,
-        )
-
-        statistics = {
-            "sparse_nodes": FeaturesStatistics(),
-            "sparse_edges": FeaturesStatistics(),
-            "multilayer_edges": FeaturesStatistics(),
-            "dense_nodes": FeaturesStatistics(),
-            "dense_edges": FeaturesStatistics(),
-            "target_normalized_new_displacement": FeaturesStatistics(),
-        }
-        # return statistics
-
-        for graph_data in cmh.get_tqdm(
-            dataloader, config=self.config, desc="Calculating dataset mean and max abs"
-        ):
-            assert len(graph_data) == 1
-            (dense_layer, sparse_layer), target_layer = graph_data[0]
-            statistics["sparse_nodes"].set_mean_and_max_abs(sparse_layer.x)
-            statistics["sparse_edges"].set_mean_and_max_abs(sparse_layer.edge_attr)
-            statistics["multilayer_edges"].set_mean_and_max_abs(
-                sparse_layer.edge_attr_to_down
-            )
-            statistics["dense_nodes"].set_mean_and_max_abs(dense_layer.x)
-            statistics["dense_edges"].set_mean_and_max_abs(dense_layer.edge_attr)
-            statistics["target_normalized_new_displacement"].set_mean_and_max_abs(
-                target_layer.normalized_new_displacement
-            )
-
-        for key in statistics.keys():
-            statistics[key].finalaze_mean()
-
-        for graph_data in cmh.get_tqdm(
-            dataloader, config=self.config, desc="Calculating dataset variance"
-        ):
-            assert len(graph_data) == 1
-            (dense_layer, sparse_layer), target_layer = graph_data[0]
-            statistics["sparse_nodes"].set_variance(sparse_layer.x)
-            statistics["sparse_edges"].set_variance(sparse_layer.edge_attr)
-            statistics["multilayer_edges"].set_variance(sparse_layer.edge_attr_to_down)
-            statistics["dense_nodes"].set_variance(dense_layer.x)
-            statistics["dense_edges"].set_variance(dense_layer.edge_attr)
-            statistics["target_normalized_new_displacement"].set_variance(
-                target_layer.normalized_new_displacement
-            )
-
-        for key in statistics.keys():
-            statistics[key].finalize_variance()
-
-        self.device_count = saved_device_count
-
-        return statistics
-
-    def get_statistics_pandas(self):
-        saved_device_count = self.device_count
-        self.device_count = 1
-
-        dataloader = get_dataloader(
-            dataset=self,
-            rank=0,
-            world_size=1,
-            batch_size=32,
-            num_workers=0,
-            shuffle=True,
-            load_data=True,
+    def get_statistics(self, bins: Optional[int] = None, histogram_ranges=None):
+        """
+        Every DataLoader worker accumulates statistics of chunks of samples
+        in one pass, chunks are merged in main process
+        """
+        dataloader = torch.utils.data.DataLoader(
+            dataset=StatisticsChunks(
+                dataset=self, bins=bins, histogram_ranges=histogram_ranges
+            ),
+            batch_size=None,
+            num_workers=self.config.dataloader_workers,
         )
-
-        sparse_nodes_data = None
-        sparse_edges_data = None
-        multilayer_edges_data = None
-        dense_nodes_data = None
-        dense_edges_data = None
-        target_data = None
-
-        for graph_data in cmh.get_tqdm(
+        statistics = get_empty_statistics(bins, histogram_ranges)
+        for chunk_statistics in cmh.get_tqdm(
             dataloader, config=self.config, desc="Calculating dataset statistics"
         ):
-            assert len(graph_data) == 1
-            example = graph_data[0]
-            dense_layer = example[0][0]
-            sparse_layer = example[0][1]
-            target_layer = example[1]
-
-            def cat(data, new_data):
-                # new_data = torch.mean(new_data, axis=0, keepdim=True)
-                if data is None:
-                    return new_data
-                return torch.cat((data, new_data))
-
-            sparse_nodes_data = cat(sparse_nodes_data, sparse_layer.x)
-            sparse_edges_data = cat(sparse_edges_data, sparse_layer.edge_attr)
-            multilayer_edges_data = cat(
-                multilayer_edges_data, sparse_layer.edge_attr_to_down
-            )
-
-            dense_nodes_data = cat(dense_nodes_data, dense_layer.x)
-            dense_edges_data = cat(dense_edges_data, dense_layer.edge_attr)
-
-            target_data = cat(target_data, target_layer.normalized_new_displacement)
-            # count -= 1
-            # if count == 0:
-            #     break
+            for label, label_statistics in chunk_statistics.items():
+                statistics[label].merge(label_statistics)
+        return statistics
 
-        self.device_count = saved_device_count
-        statistics = {
-            "sparse_nodes": FeaturesStatisticsPandas(
-                label="sparse_nodes",
-                data=sparse_nodes_data,
-                # columns=SceneInput.get_nodes_data_description_sparse(self.dimension)
-            ),
-            "sparse_edges": FeaturesStatisticsPandas(
-                label="sparse_edges", data=sparse_edges_data
-            ),
-            "multilayer_edges": FeaturesStatisticsPandas(
-                label="multilayer_edges", data=multilayer_edges_data
-            ),
-            "dense_nodes": FeaturesStatisticsPandas(
-                label="dense_nodes", data=dense_nodes_data
-            ),
-            "dense_edges": FeaturesStatisticsPandas(
-                label="dense_edges", data=dense_edges_data
-            ),
-            "target_normalized_new_displacement": FeaturesStatisticsPandas(
-                label="target_normalized_new_displacement", data=target_data
-            ),
+    def get_histogram_statistics(self, bins: int = 100):
+        statistics = self.statistics or self.get_statistics()
+        histogram_ranges = {
+            label: (-label_statistics.max_abs, label_statistics.max_abs)
+            for label, label_statistics in statistics.items()
         }
-        return statistics
-        # edges_statistics = FeaturesStatistics(
-        #     edges_data, #SceneInput.get_edges_data_description(self.dimension)
-        # )
-        # target_statistics = FeaturesStatistics(
-        #     target_data, [f"exact_acceleration_{i}" for i in range(self.dimension)]
-        # )
+        return self.get_statistics(bins=bins, histogram_ranges=histogram_ranges)
 
     def get_worker_data_range(self):
         worker_info = get_worker_info()
@@ -451,7 +472,8 @@ class BaseDataset:
         return range(total_id, self.data_count, all_ids)
 
     def load_data(self):
-        if self.loaded_data is not None or not self.load_data_to_ram:
+        # memory-mapped features are shared by workers without copying
+        if self.loaded_data is not None or not self.load_data_to_ram or self.is_memmap:
             return
         worker_data_range = self.get_worker_data_range()
 
@@ -472,6 +494,8 @@ class BaseDataset:
         if self.loaded_data is not None:
             shifted_index = index % len(self.loaded_data)
             return self.loaded_data[shifted_index]
+        if self.is_memmap:
+            return from_memmap_sample(self.features_reader[index])
         with pkh.open_file_read(self.features_data_path) as file:
             return pkh.load_byte_index(
                 byte_index=self.features_indices[index], data_file=file
@@ -507,7 +531,7 @@ class BaseDataset:
         cmh.create_folders(catalog)
         extension = "png"  # pdf
         path = f"{catalog}/{filename}.{extension}"
-        plot_setting(
+        plotter_functions.plot_setting(
             current_time=current_time,
             scene=scene,
             path=path,
@@ -555,9 +579,13 @@ class BaseDataset:
 
         return scene, scene.exact_acceleration
 
-    def safe_save_scene(self, scene, data_path: str):
+    def get_scene_to_save(self, scene):
         scene_copy = copy.copy(scene)  ###
         scene_copy.prepare_to_save()
+        return scene_copy
+
+    def safe_save_scene(self, scene, data_path: str):
+        scene_copy = self.get_scene_to_save(scene)
         pkh.append_data(
             data=scene_copy,
             data_path=data_path,
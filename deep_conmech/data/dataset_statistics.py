@@ -1,10 +1,13 @@
-from dataclasses import dataclass
-from typing import List
+from typing import Optional, Tuple
 
 import numpy as np
-import pandas as pd
+from numpy.typing import ArrayLike
 import torch
 
+from conmech.helpers import lzh
+
+pd = lzh.lazy_import("pandas")
+
 
 class FeaturesStatisticsPandas:
     def __init__(self, label, data, columns=None):
@@ -107,3 +110,111 @@ class FeaturesStatistics:
 
     def finalize_variance(self):
         self.std = self.var.sqrt()
+
+
+class StreamingStatistics:
+    """
+    Single-pass statistics of features (columns), mergeable across DataLoader
+    workers and dataset shards with parallel variance update of Chan et al.
+    Histograms need common range (scalars or per feature) to be mergeable;
+    values outside of it are counted in border bins
+    """
+
+    def __init__(
+        self,
+        label: str = "",
+        bins: Optional[int] = None,
+        histogram_range: Tuple[ArrayLike, ArrayLike] = (-1.0, 1.0),
+    ):
+        self.label = label
+        self.bins = bins
+        self.histogram_range = histogram_range
+        self.size = 0
+        self.mean = None
+        self.m2 = None
+        self.min = None
+        self.max = None
+        self.histogram = None
+
+    @property
+    def var(self):
+        return self.m2 / self.size
+
+    @property
+    def std(self):
+        return np.sqrt(self.var)
+
+    @property
+    def max_abs(self):
+        return np.maximum(np.abs(self.min), np.abs(self.max))
+
+    @property
+    def bin_edges(self):
+        low, high = np.broadcast_arrays(*self.histogram_range, self.mean)[:2]
+        return np.linspace(low, high, self.bins + 1, axis=1)
+
+    def update(self, new_data):
+        data = np.asarray(new_data, dtype=np.float64)
+        if len(data) == 0:
+            return self
+        batch = StreamingStatistics(
+            label=self.label, bins=self.bins, histogram_range=self.histogram_range
+        )
+        batch.size = len(data)
+        batch.mean = data.mean(axis=0)
+        batch.m2 = ((data - batch.mean) ** 2).sum(axis=0)
+        batch.min = data.min(axis=0)
+        batch.max = data.max(axis=0)
+        if self.bins is not None:
+            batch.histogram = self._get_histogram(data)
+        return self.merge(batch)
+
+    def _get_histogram(self, data):
+        low, high = np.asarray(self.histogram_range[0]), self.histogram_range[1]
+        width = np.where(high > low, high - low, 1.0)
+        bin_ids = np.clip(
+            ((data - low) * (self.bins / width)).astype(np.int64),
+            0,
+            self.bins - 1,
+        )
+        columns = data.shape[1]
+        return np.bincount(
+            (bin_ids + np.arange(columns) * self.bins).ravel(),
+            minlength=columns * self.bins,
+        ).reshape(columns, self.bins)
+
+    def merge(self, other: "StreamingStatistics"):
+        if other.size == 0:
+            return self
+        if self.size == 0:
+            self.size = other.size
+            self.mean = other.mean.copy()
+            self.m2 = other.m2.copy()
+            self.min = other.min.copy()
+            self.max = other.max.copy()
+            self.histogram = None if other.histogram is None else other.histogram.copy()
+            return self
+        assert self.bins == other.bins
+        assert all(map(np.array_equal, self.histogram_range, other.histogram_range))
+        size = self.size + other.size
+        delta = other.mean - self.mean
+        self.mean = self.mean + delta * (other.size / size)
+        self.m2 = self.m2 + other.m2 + delta**2 * (self.size * other.size / size)
+        self.min = np.minimum(self.min, other.min)
+        self.max = np.maximum(self.max, other.max)
+        if self.histogram is not None:
+            self.histogram = self.histogram + other.histogram
+        self.size = size
+        return self
+
+    def describe(self):
+        return pd.DataFrame(
+            [
+                np.full(len(self.mean), self.size),
+                self.mean,
+                self.std,
+                self.min,
+                self.max,
+            ],
+            index=["count", "mean", "std", "min", "max"],
+        )
@@ -4,6 +4,7 @@ from typing import Callable, List, Optional
 import numpy as np
 
 from conmech.helpers import cmh, interpolation_helpers, mph
+from conmech.mesh import mesh_pool
 from conmech.plotting.plotter_functions import save_three
 from conmech.scenarios.scenarios import Scenario
 from conmech.scene.energy_functions import EnergyFunctions
@@ -80,7 +81,7 @@ class ScenariosDataset(BaseDataset):
             obstacle_prop=scenario.obstacle_prop,
             schedule=scenario.schedule,
             simulation_config=scenario.simulation_config,
-            create_in_subprocess=False,
+            create_in_subprocess=config.mesh_generation_workers > 0,
         )
         scene.set_randomization(config)
 
@@ -108,6 +109,10 @@ class ScenariosDataset(BaseDataset):
 
     def generate_data_process(self, num_workers: int = 1, process_id: int = 0):
         assigned_scenarios = self.get_assigned_scenarios(num_workers, process_id)
+        mesh_pool.prefetch_meshes(
+            [scenario.mesh_prop for scenario in assigned_scenarios],
+            workers=self.config.mesh_generation_workers,
+        )
         tqdm_description = f"Generating data - process {process_id+1}/{num_workers}"
         simulation_data_count = np.sum(
             [s.schedule.episode_steps for s in assigned_scenarios]
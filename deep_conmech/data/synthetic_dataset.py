@@ -1,13 +1,15 @@
-from queue import Empty
-from typing import Callable
+import zlib
+from typing import Callable, Sequence
 
 import numpy as np
 
 import conmech.helpers.interpolation_helpers as interpolation_helpers
 from conmech.helpers import cmh, lnh, mph, nph
+from conmech.mesh import mesh_pool
 from conmech.properties.mesh_properties import MeshProperties
 from conmech.properties.schedule import Schedule
 from conmech.scenarios import scenarios
+from conmech.scene.energy_functions import EnergyFunctions
 from conmech.scene.scene import Scene
 from conmech.solvers.calculator import Calculator
 from deep_conmech.data.base_dataset import BaseDataset
@@ -29,7 +31,7 @@ def generate_mesh_type(config: TrainingConfig):
         )
 
 
-def generate_base_scene(base: np.ndarray, config: TrainingConfig):
+def generate_mesh_prop(base: np.ndarray, config: TrainingConfig):
     initial_nodes_corner_vectors = interpolation_helpers.generate_corner_vectors(
         dimension=config.td.dimension, scale=config.td.initial_corners_scale
     )
@@ -41,23 +43,27 @@ def generate_base_scene(base: np.ndarray, config: TrainingConfig):
         )
     )
     switch_orientation = interpolation_helpers.decide(0.5)
+    return MeshProperties(
+        dimension=config.td.dimension,
+        mesh_type=generate_mesh_type(config),
+        mesh_density=[config.td.mesh_density],
+        scale=[config.td.train_scale],
+        initial_base=base,
+        mean_at_origin=True,
+        switch_orientation=switch_orientation,
+        initial_nodes_corner_vectors=initial_nodes_corner_vectors,
+        mesh_corner_scalars=mesh_corner_scalars,
+    )
+
+
+def generate_base_scene(base: np.ndarray, config: TrainingConfig):
     scene = SceneInput(
-        mesh_prop=MeshProperties(
-            dimension=config.td.dimension,
-            mesh_type=generate_mesh_type(config),
-            mesh_density=[config.td.mesh_density],
-            scale=[config.td.train_scale],
-            initial_base=base,
-            mean_at_origin=True,
-            switch_orientation=switch_orientation,
-            initial_nodes_corner_vectors=initial_nodes_corner_vectors,
-            mesh_corner_scalars=mesh_corner_scalars,
-        ),
+        mesh_prop=generate_mesh_prop(base=base, config=config),
         body_prop=scenarios.default_body_prop,
         obstacle_prop=scenarios.default_obstacle_prop,
         schedule=Schedule(final_time=config.td.final_time),
-        create_in_subprocess=False,
-        with_schur=False,
+        simulation_config=config.sc,
+        create_in_subprocess=config.mesh_generation_workers > 0,
     )
     scene.unset_randomization()
     return scene
@@ -162,53 +168,68 @@ class SyntheticDataset(BaseDataset):
 
         scene.update_reduced()
 
-        scene, acceleration = self.solve_and_prepare_scene(scene, forces)
+        energy_functions = EnergyFunctions(simulation_config=scene.simulation_config)
+        scene, _ = self.solve_and_prepare_scene(
+            scene=scene,
+            forces=forces,
+            energy_functions=energy_functions,
+            reduced_energy_functions=energy_functions,
+        )
         return scene
 
-    def generate_data(self):
-        self.generate_data_process()
-        # mph.run_process(self.generate_data_process)
-        # done = mph.run_processes(self.generate_data_process, num_workers=self.num_workers)
-        # if not done:
-        #     print("NOT DONE")
-
-    def generate_data_process(self, num_workers: int = 1, process_id: int = 0):
-        assigned_data_range = range(process_id, self.data_count, num_workers)
-
-        tqdm_description = f"Process {process_id+1}/{num_workers} - generating data"
-        step_tqdm = cmh.get_tqdm(
-            assigned_data_range,
-            desc=tqdm_description,
+    def seed_sample(self, index: int):
+        # seeded by index and description, so train and validation sets differ
+        # and every sample is the same for any number of workers
+        interpolation_helpers.seed_sample(
+            self.config.synthetic_generation_seed,
+            zlib.crc32(self.description.encode()),
+            index,
+        )
+
+    def prefetch_meshes(self, sample_indices: Sequence[int]):
+        # mesh properties are first draws of sample, so they are drawn again
+        # when sample is generated
+        mesh_props = []
+        for index in sample_indices:
+            self.seed_sample(index)
+            base = lnh.generate_base(self.config.td.dimension)
+            mesh_props.append(generate_mesh_prop(base=base, config=self.config))
+        mesh_pool.prefetch_meshes(
+            mesh_props, workers=self.config.mesh_generation_workers
+        )
+
+    def generate_sample(self, index: int):
+        self.seed_sample(index)
+        scene = self.generate_scene()
+        images_count = self.config.dataset_images_count
+        if images_count is not None:
+            plot_index_skip = max(1, int(self.data_count / images_count))
+            if index % plot_index_skip == 0:
+                self.plot_data_scene(scene, index, self.images_directory, 0.0)
+        return self.get_scene_to_save(scene)
+
+    def get_generation_progress(
+        self, sample_indices: Sequence[int], num_workers: int, process_id: int
+    ):
+        return cmh.get_tqdm(
+            sample_indices,
+            desc=f"Process {process_id+1}/{num_workers} - generating data",
             config=self.config,
             position=process_id,
         )
 
-        def generate_data_inner(queue):
-            while not self.is_synthetic_generation_memory_overflow:
-                queue.put(self.generate_scene())
-
-        up_queue = mph.get_queue()
-        # inner_process = mph.start_process(generate_data_inner, up_queue)
-        for index in step_tqdm:
-            scene = self.generate_scene()
-            while False:  # True:
-                try:
-                    scene = up_queue.get(timeout=30.0)
-                    break
-                except Empty:
-                    if not inner_process.is_alive():
-                        print("Process terminated, restarting...")
-                        inner_process = mph.start_process(generate_data_inner, up_queue)
-
-            self.safe_save_scene(scene=scene, data_path=self.scenes_data_path)
-            self.check_and_print(
-                all_data_count=self.data_count,
-                current_index=index,
-                scene=scene,
-                step_tqdm=step_tqdm,
-                tqdm_description=tqdm_description,
-            )
-        # inner_process.kill()
-
-        step_tqdm.set_description(f"{step_tqdm.desc} - done")
-        return True
+    def generate_data(self):
+        done = mph.generate_in_shards(
+            generate_sample=self.generate_sample,
+            data_path=self.scenes_data_path,
+            samples_count=self.data_count,
+            num_workers=self.num_workers
+            if self.config.generate_data_in_subprocesses
+            else 1,
+            get_progress=self.get_generation_progress,
+            prepare=self.prefetch_meshes
+            if self.config.mesh_generation_workers > 0
+            else None,
+        )
+        if not done:
+            print("NOT DONE")
@@ -1,15 +1,16 @@
 import json
 
 import torch
-from matplotlib import pyplot as plt
-from pandas import DataFrame
 from torch.profiler import ProfilerActivity, profile
-from torch.utils.tensorboard.writer import SummaryWriter
 
+from conmech.helpers import lzh
 from deep_conmech.data import base_dataset
-from deep_conmech.data.dataset_statistics import FeaturesStatistics
+from deep_conmech.data.dataset_statistics import StreamingStatistics
 from deep_conmech.training_config import TrainingConfig
 
+plt = lzh.lazy_import("matplotlib.pyplot")
+tensorboard_writer = lzh.lazy_import("torch.utils.tensorboard.writer", extra="logging")
+
 
 class Logger:
     def __init__(
@@ -19,15 +20,15 @@ class Logger:
     ):
         self.dataset = dataset
         self.config = config
-        self.writer = SummaryWriter(self.current_log_catalog)
+        self.writer = tensorboard_writer.SummaryWriter(self.current_log_catalog)
 
     def save_parameters_and_statistics(self):
         print("Saving parameters...")
         self.save_parameters()
         if self.config.log_dataset_stats:
             print("Saving histogram...")
-            statistics = self.dataset.get_statistics_pandas()
-            for st in statistics.data:
+            statistics = self.dataset.get_histogram_statistics()
+            for st in statistics.values():
                 self.save_hist_and_json(st=st)
 
     def save_parameters(self):
@@ -44,7 +45,7 @@ class Logger:
         with open(file_path, "w", encoding="utf-8") as file:
             file.write(data_str)
 
-    def save_hist_and_json(self, st: FeaturesStatistics):
+    def save_hist_and_json(self, st: StreamingStatistics):
         self.save_hist(st)
         # normalized_df = (df - df.mean()) / df.std()
         # self.save_hist(df=normalized_df, name=f"{name}_normalized")
@@ -53,25 +54,23 @@ class Logger:
             f"{self.config.current_time}_{st.label}.txt", data_str, global_step=0
         )
 
-    def save_hist(self, st: FeaturesStatistics):
-        # pandas_axs = st.pandas_data.hist(figsize=(20, 10))  # , ec="k")
-        df = st.pandas_data
+    def save_hist(self, st: StreamingStatistics):
+        columns_count = len(st.mean)
         columns = self.config.td.dimension + 1
         scale = 7
-        rows = (df.columns.size // columns) + df.columns.size % columns
+        rows = (columns_count // columns) + columns_count % columns
         fig, axs = plt.subplots(
             rows,
             columns,
             figsize=(columns * scale, rows * scale),
-            sharex="all",
             sharey="row",
-        )  # , sharex="col", sharey="row"
+        )
         axs = axs.flatten()
+        bin_edges = st.bin_edges
         for i in range(rows * columns):
-            if i < df.columns.size:
-                df.hist(
-                    column=df.columns[i], bins=100, ax=axs[i]
-                )  # bins=12 , figsize=(20, 18)
+            if i < columns_count:
+                axs[i].stairs(st.histogram[i], bin_edges[i], fill=True)
+                axs[i].set_title(str(i))
             else:
                 axs[i].axis("off")
 
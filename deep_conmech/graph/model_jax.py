@@ -1,37 +1,41 @@
 import gc
 import time
+import weakref
 from functools import partial
-from typing import Any, Callable, List, Optional
+from typing import TYPE_CHECKING, Any, Callable, List, NamedTuple, Optional
 
 import flax
 import flax.jax_utils
 import jax
 import jax.numpy as jnp
 import numpy as np
-import optax
-import orbax.checkpoint
-import tensorflow as tf
-import torch
-import torch.utils
 from flax.training import train_state
 from jax import lax
-from jax.experimental import jax2tf
-from torch_geometric.data.batch import Data
 
-from conmech.helpers import cmh
-from conmech.helpers.tmh import Timer
+from conmech.dynamics.dynamics import get_rotation_jax
+from conmech.helpers import cmh, jxh, lzh, trh
 from conmech.scenarios.scenarios import Scenario
 from conmech.scene.energy_functions import EnergyFunctions
 from conmech.simulations import simulation_runner
 from conmech.solvers.calculator import Calculator
 from deep_conmech.data import base_dataset
-from deep_conmech.data.dataset_statistics import FeaturesStatistics
+from deep_conmech.data.dataset_statistics import StreamingStatistics
 from deep_conmech.graph.logger import Logger
 from deep_conmech.graph.loss_raport import LossRaport
+from deep_conmech.graph import net_numpy, padding
 from deep_conmech.graph.net_jax import CustomGraphNetJax, GraphNetArguments
 from deep_conmech.helpers import thh
-from deep_conmech.scene.scene_input import SceneInput
-from deep_conmech.training_config import TrainingConfig
+from deep_conmech.scene.scene_input import SceneInput, get_edges_column
+from deep_conmech.training_config import CLOSEST_COUNT, TrainingConfig
+
+if TYPE_CHECKING:
+    from torch_geometric.data.batch import Data
+
+jax2tf = lzh.lazy_import("jax.experimental.jax2tf", extra="TensorFlow Lite export")
+optax = lzh.lazy_import("optax", extra="training")
+orbax_checkpoint = lzh.lazy_import("orbax.checkpoint", extra="checkpoints")
+tf = lzh.lazy_import("tensorflow", extra="TensorFlow Lite export")
+torch = lzh.lazy_import("torch")
 
 SCALE = 1e3
 
@@ -69,7 +73,7 @@ class GraphModelDynamicJax:
         all_validation_datasets,
         print_scenarios: List[Scenario],
         config: TrainingConfig,
-        statistics: Optional[dict[str, FeaturesStatistics]] = None,
+        statistics: Optional[dict[str, StreamingStatistics]] = None,
     ):
         print("----CREATING MODEL----")
         self.config = config
@@ -81,7 +85,7 @@ class GraphModelDynamicJax:
         self.train_state = None
 
         self.logger = Logger(dataset=self.train_dataset, config=config)
-        self.checkpointer = orbax.checkpoint.PyTreeCheckpointer()
+        self.checkpointer = orbax_checkpoint.PyTreeCheckpointer()
         self.epoch = 0
         self.examples_seen = 0
 
@@ -100,6 +104,8 @@ class GraphModelDynamicJax:
         ]
 
         train_devices = jax.local_devices()
+        if not jxh.MONITOR.enabled:
+            jxh.MONITOR.start()  # counting compiles per epoch
         validate = len(self.all_validation_datasets) > 0
         if validate:
             validation_devices_count = self.all_validation_datasets[0].device_count
@@ -129,52 +135,65 @@ class GraphModelDynamicJax:
         # plot_weights(state.params['ProcessorLayer_1']['ForwardNet_1']['Dense_0']['bias'], "ProcessorBias1")
         ###
 
-        while (
-            self.config.max_epoch_number is None
-            or self.epoch < self.config.max_epoch_number
-        ):
-            self.epoch += 1
-
-            train_states = sync_batch_stats(train_states)
-
-            def training_fun():
-                return self.iterate_dataset(
-                    states=train_states,
-                    dataloader=train_dataloader,
-                    train=True,
-                    tqdm_description=f"GPUS: {len(train_devices)} EPOCH: {self.epoch}",  # , lr: {self.lr:.6f}",
-                    raport_description="Training",
-                    devices=train_devices,
-                )
-
-            if self.config.profile_training:
-                # https://github.com/google/jax/issues/13009
-                with jax.profiler.trace("./log", create_perfetto_link=True):
-                    train_states = training_fun()
-            else:
-                train_states = training_fun()
-
-            if self.is_at_skip(self.config.td.save_at_epochs):
-                self.save_checkpoint(states=train_states)
-
-            if self.is_at_skip(self.config.td.validate_at_epochs) and validate:
-                validation_states = rereplicate_states(train_states, validation_devices)
-                for dataloader in all_valid_dataloaders:
-                    _ = self.iterate_dataset(
-                        states=validation_states,
-                        dataloader=dataloader,
-                        train=False,
-                        tqdm_description=f"GPUS: {len(validation_devices)} VAL:",
-                        raport_description=dataloader.dataset.description,
-                        devices=validation_devices,
+        try:
+            while (
+                self.config.max_epoch_number is None
+                or self.epoch < self.config.max_epoch_number
+            ):
+                self.epoch += 1
+
+                train_states = sync_batch_stats(train_states)
+
+                def training_fun():
+                    return self.iterate_dataset(
+                        states=train_states,
+                        dataloader=train_dataloader,
+                        train=True,
+                        tqdm_description=f"GPUS: {len(train_devices)} EPOCH: {self.epoch}",  # , lr: {self.lr:.6f}",
+                        raport_description="Training",
+                        devices=train_devices,
                     )
 
-                # TODO: Check if needed, add assert
-                print("----REREPLICATING TRAIN STATE----")
-                train_states = rereplicate_states(train_states, train_devices)
-
-                # if self.is_at_skip(self.config.td.validate_scenarios_at_epochs):
-                #     self.validate_all_scenarios_raport()
+                if self.config.profile_training:
+                    # https://github.com/google/jax/issues/13009
+                    with trh.trace_jax("./log", create_perfetto_link=True):
+                        with trh.span("train_epoch"):
+                            train_states = training_fun()
+                    trh.print_report(root="train_epoch")
+                    trh.export_chrome_trace(f"./log/trace_epoch_{self.epoch}.json")
+                    # next report and trace show only spans of next epoch
+                    trh.reset()
+                else:
+                    with trh.span("train_epoch"):
+                        train_states = training_fun()
+
+                if self.is_at_skip(self.config.td.save_at_epochs):
+                    with trh.span("save_checkpoint"):
+                        self.save_checkpoint(states=train_states)
+
+                if self.is_at_skip(self.config.td.validate_at_epochs) and validate:
+                    with trh.span("validation"):
+                        validation_states = rereplicate_states(
+                            train_states, validation_devices
+                        )
+                        for dataloader in all_valid_dataloaders:
+                            _ = self.iterate_dataset(
+                                states=validation_states,
+                                dataloader=dataloader,
+                                train=False,
+                                tqdm_description=f"GPUS: {len(validation_devices)} VAL:",
+                                raport_description=dataloader.dataset.description,
+                                devices=validation_devices,
+                            )
+
+                        # TODO: Check if needed, add assert
+                        print("----REREPLICATING TRAIN STATE----")
+                        train_states = rereplicate_states(train_states, train_devices)
+        finally:
+            # training usually ends by interruption when max_epoch_number is None
+            if trh.is_enabled():
+                trh.print_report()
+                trh.export_chrome_trace()
 
     def save_checkpoint(self, states):
         print("----SAVING CHECKPOINT----")
@@ -193,7 +212,7 @@ class GraphModelDynamicJax:
     @staticmethod
     def load_checkpointed_net(path: str):
         print("----LOADING NET----")
-        state = orbax.checkpoint.PyTreeCheckpointer().restore(directory=path)
+        state = orbax_checkpoint.PyTreeCheckpointer().restore(directory=path)
         return state
 
     def load_checkpoint(self, path: str):
@@ -231,11 +250,11 @@ class GraphModelDynamicJax:
         print("----PLOTTING----")
         start_time = time.time()
 
-        apply_net = get_apply_net(state)
+        solve_function = get_solve_jitted(state)
 
         for scene in print_scenarios:
             simulation_runner.run_scenario(
-                solve_function=partial(solve, apply_net=apply_net),
+                solve_function=solve_function,
                 scene=scene,
                 config=config,
                 run_config=simulation_runner.RunScenarioConfig(
@@ -268,17 +287,33 @@ class GraphModelDynamicJax:
             dataloader.sampler.set_epoch(self.epoch)
 
         mean_loss_raport = LossRaport()
+        padding_raport = padding.PaddingRaport()
+        compiles_count = jxh.MONITOR.compiles_count
+        examples_count = 0
+        start_time = time.time()
 
         gc.disable()
 
-        for batch_id, batch_data in enumerate(batch_tqdm):
-            states, loss_raport = self.calculate_loss(
-                states, batch_data=batch_data, devices=devices, train=train
-            )
+        # next batches are built on host while the current step runs on devices
+        prepared_batches = cmh.prefetch(
+            (
+                self.prepare_batch(
+                    batch_data, devices=devices, padding_raport=padding_raport
+                )
+                for batch_data in batch_tqdm
+            ),
+            buffer_size=self.config.prefetch_batches,
+        )
+        for batch_id, batch in enumerate(prepared_batches):
+            with trh.span("batch"):
+                states, loss_raport = self.calculate_loss(
+                    states, batch=batch, train=train
+                )
 
             # TODO: Check / assert state consistency across GPUs
             # TODO: Check if data are randomized
             mean_loss_raport.add(loss_raport)
+            examples_count += loss_raport.count
             if train:
                 self.examples_seen += loss_raport.count  # * self.world_size
 
@@ -294,8 +329,35 @@ class GraphModelDynamicJax:
             batch_tqdm.set_description(loss_description)
 
         gc.enable()
+        self.save_performance_raport(
+            description=raport_description,
+            compiles_count=jxh.MONITOR.compiles_count - compiles_count,
+            padding_overhead=padding_raport.overhead,
+            samples_per_second=examples_count / (time.time() - start_time),
+        )
         return states
 
+    def save_performance_raport(
+        self,
+        description: str,
+        compiles_count: int,
+        padding_overhead: float,
+        samples_per_second: float,
+    ):
+        print(
+            f"{description} - compiles: {compiles_count}"
+            + f" | padding overhead: {100 * padding_overhead:.1f}%"
+            + f" | samples/s: {samples_per_second:.2f}"
+        )
+        for key, value in [
+            ("compiles", compiles_count),
+            ("padding_overhead", padding_overhead),
+            ("samples_per_second", samples_per_second),
+        ]:
+            self.logger.writer.add_scalar(
+                f"Performance/{description}/{key}", value, self.epoch
+            )
+
     def should_raport_training(self, batch_id: int, batches_count: int):
         return (
             batch_id == batches_count - 1
@@ -350,61 +412,116 @@ class GraphModelDynamicJax:
             f"--Validating scenarios time: {int((time.time() - start_time) / 60)} min"
         )
 
-    def calculate_loss(self, states, batch_data: List[List[Data]], devices, train):
+    def prepare_batch(
+        self,
+        batch_data: List[List["Data"]],
+        devices,
+        padding_raport: Optional[padding.PaddingRaport] = None,
+    ):
         devices_count = len(devices)
 
-        data = [get_layer_list_and_target_data(bd) for bd in batch_data]
+        with trh.span("convert_to_jax"):
+            data = [get_layer_list_and_target_data(bd) for bd in batch_data]
 
         compare = False
 
         all_target_data = [
             data[d][1].normalized_new_displacement for d in range(devices_count)
         ]  ### NO AS TYPE .astype(np.float32)
-        sharded_targets = jax.device_put_sharded(
-            all_target_data, devices
-        )  # TODO: check order with pmap
 
-        if not compare:
+        batch_main_layer = data[0][0][0]
+        graph_sizes_base = get_graph_sizes(batch_main_layer)
+        graphs_count = len(graph_sizes_base) * devices_count
+
+        if compare:
+            other_target_data = [
+                data[d][1].normalized_new_displacement_skinning
+                for d in range(devices_count)
+            ]
+            return PreparedBatch(
+                sharded_args=None,
+                sharded_targets=jax.device_put_sharded(all_target_data, devices),
+                graphs_count=graphs_count,
+                sharded_other_targets=jax.device_put_sharded(
+                    other_target_data, devices
+                ),
+            )
+
+        with trh.span("device_put"):
             all_args = [
                 prepare_input(layer_list)
                 for layer_list in [data[d][0] for d in range(devices_count)]
             ]
-            sharded_args = jax.device_put_sharded(all_args, devices)
-
-            if train:
-                states, losses = apply_model_train(
-                    states, sharded_args, sharded_targets
-                )
-            else:
-                losses = apply_model_test(states, sharded_args, sharded_targets)
+            sharded_args, sharded_targets = shard_batch(
+                all_args,
+                all_target_data,
+                devices,
+                growth=self.config.td.padding_bucket_growth,
+                padding_raport=padding_raport,
+            )
+            return PreparedBatch(
+                sharded_args=sharded_args,
+                sharded_targets=sharded_targets,  # TODO: check order with pmap
+                graphs_count=graphs_count,
+            )
 
+    def calculate_loss(self, states, batch: "PreparedBatch", train):
+        if batch.sharded_other_targets is None:
+            with trh.span("apply_model"):
+                if train:
+                    with jxh.MONITOR.calling("apply_model_train"):
+                        states, losses = apply_model_train(
+                            states, batch.sharded_args, batch.sharded_targets
+                        )
+                else:
+                    with jxh.MONITOR.calling("apply_model_test"):
+                        losses = apply_model_test(
+                            states, batch.sharded_args, batch.sharded_targets
+                        )
+                jax.block_until_ready(losses)
         else:
-            other_target_data = [
-                data[d][1].normalized_new_displacement_skinning
-                for d in range(devices_count)
-            ]
-            sharded_other_targets = jax.device_put_sharded(other_target_data, devices)
             losses = apply_model_compare(
-                sharded_targets=sharded_targets,
-                sharded_other_targets=sharded_other_targets,
+                sharded_targets=batch.sharded_targets,
+                sharded_other_targets=batch.sharded_other_targets,
             )
 
         displacement_loss = jnp.mean(losses) / SCALE
         # print(displacement_loss)
 
-        batch_main_layer = data[0][0][0]
-        graph_sizes_base = get_graph_sizes(batch_main_layer)
-        num_graphs = len(graph_sizes_base) * devices_count
-
         loss_raport = LossRaport(
             main=displacement_loss.item(),
             displacement_loss=displacement_loss.item(),
-            _count=num_graphs,
+            _count=batch.graphs_count,
         )
 
         return states, loss_raport
 
 
+class PreparedBatch(NamedTuple):
+    sharded_args: Optional[GraphNetArguments]
+    sharded_targets: jnp.ndarray
+    graphs_count: int
+    sharded_other_targets: Optional[jnp.ndarray] = None
+
+
+def shard_batch(
+    all_args,
+    all_target_data,
+    devices,
+    growth: Optional[float],
+    padding_raport: Optional[padding.PaddingRaport] = None,
+):
+    # one graph batch per device, padded to common bucket
+    if growth is not None:
+        all_args, all_target_data = padding.pad_batch(
+            all_args, all_target_data, growth, raport=padding_raport
+        )
+    return (
+        jax.device_put_sharded(all_args, devices),
+        jax.device_put_sharded(all_target_data, devices),
+    )
+
+
 def get_sample_args(dataloader):
     sample_batch_data = next(iter(dataloader))
     sample_layer_list, _ = get_layer_list_and_target_data(
@@ -466,25 +583,14 @@ def convert_to_jax(layer_list, target_data=None):
     return layer_list, target_data
 
 
-# TODO: all in Jax?
-def solve(
-    apply_net,
-    scene: SceneInput,
-    energy_functions: EnergyFunctions,
-    initial_a,
-    initial_t,
-    timer=Timer(),
-):
-    _ = initial_a, initial_t
-
+def solve_reduced(scene: SceneInput, energy_functions: EnergyFunctions):
     dense_path = cmh.get_base_for_comarison()
-    with timer["jax_calculator"]:
+    with trh.span("jax_calculator"):
         if dense_path is None:
             scene.reduced.exact_acceleration, _ = Calculator.solve(
                 scene=scene.reduced,
                 energy_functions=energy_functions[1],  # 0],
                 initial_a=scene.reduced.lifted_acceleration,  # scene.reduced.exact_acceleration, #initial_reduced,
-                timer=timer,
             )
         else:
             (
@@ -493,27 +599,36 @@ def solve(
             ) = cmh.get_exact_acceleration(scene=scene, path=dense_path)
 
         scene.reduced.lifted_acceleration = scene.reduced.exact_acceleration
+    return dense_path
+
+
+def solve(
+    apply_net,
+    scene: SceneInput,
+    energy_functions: EnergyFunctions,
+    initial_a,
+    initial_t,
+):
+    _ = initial_a, initial_t
+
+    dense_path = solve_reduced(scene=scene, energy_functions=energy_functions)
 
     device_number = 0  # using GPU 0
 
-    with timer["jax_features_constructon"]:
-        layers_list_0 = cmh.profile(
-            lambda: scene.get_features_data(layer_number=0), baypass=True
-        )
-        layers_list_1 = cmh.profile(
-            lambda: scene.get_features_data(layer_number=1), baypass=True
-        )
+    with trh.span("jax_features_constructon"):
+        layers_list_0 = scene.get_features_data(layer_number=0)
+        layers_list_1 = scene.get_features_data(layer_number=1)
         layers_list = [layers_list_0, layers_list_1]
 
-    with timer["jax_data_movement"]:
+    with trh.span("jax_data_movement"):
         args = prepare_input(convert_to_jax(layers_list))
         args = jax.device_put(args, jax.local_devices()[device_number])
         # TODO: ADD STOP GRADIENT
 
-    with timer["jax_net"]:
+    with trh.span("jax_net"):
         scene.norm_lifted_new_displacement = apply_net(args) / SCALE
 
-    with timer["jax_translation"]:
+    with trh.span("jax_translation"):
         scene.recentered_norm_lifted_new_displacement = scene.recenter_by_reduced(
             new_displacement=scene.norm_lifted_new_displacement,
             reduced_exact_acceleration=scene.reduced.exact_acceleration,
@@ -527,6 +642,154 @@ def solve(
     return scene.exact_acceleration, None
 
 
+class InferenceArguments(NamedTuple):
+    reduced_displacement_old: jnp.ndarray
+    reduced_velocity_old: jnp.ndarray
+    reduced_exact_acceleration: jnp.ndarray
+    displacement_old: jnp.ndarray
+    velocity_old: jnp.ndarray
+    time_step: float
+
+
+def get_inference_function(scene: SceneInput, variables):
+    # Features that depend only on the mesh are computed once and closed over,
+    # the jitted function gets only state of both meshes
+    link = scene.all_layers[1].to_base
+    initial_nodes = scene.centered_initial_nodes
+    reduced_initial_nodes = scene.reduced.centered_initial_nodes
+    sparse_edges = scene.reduced.mesh.directional_edges
+    dense_edges = scene.mesh.directional_edges
+    dx_big = scene.matrices.dx_big_jax
+    reduced_dx_big = scene.reduced.matrices.dx_big_jax
+
+    def to_input(data):
+        return jnp.asarray(data, dtype=jnp.float32)
+
+    sparse_initial_column = to_input(
+        get_edges_column(reduced_initial_nodes, reduced_initial_nodes, sparse_edges)
+    )
+    constant_args = dict(
+        dense_x=jnp.zeros((scene.nodes_count, scene.dimension + 1), dtype=jnp.float32),
+        dense_edge_attr=to_input(
+            get_edges_column(initial_nodes, initial_nodes, dense_edges)
+        ),
+        multilayer_edge_attr=to_input(
+            get_edges_column(reduced_initial_nodes, initial_nodes, link.edges_index)
+        ),
+        sparse_edge_index=sparse_edges.T,
+        dense_edge_index=dense_edges.T,
+        multilayer_edge_index=link.edges_index.T,
+    )
+
+    def get_sparse_column(data):
+        return get_edges_column(data, data, sparse_edges)
+
+    @jxh.jit(name="graph_inference")
+    def inference(args: InferenceArguments):
+        time_step = args.time_step
+        reduced_displacement_new = args.reduced_displacement_old + time_step * (
+            args.reduced_velocity_old + time_step * args.reduced_exact_acceleration
+        )
+
+        # SceneInput.get_features_data in normalized reduced coordinates
+        reduced_base, success_old = get_rotation_jax(
+            args.reduced_displacement_old, reduced_dx_big
+        )
+        reduced_moved_nodes = reduced_initial_nodes + args.reduced_displacement_old
+        reduced_mean = jnp.mean(reduced_moved_nodes, axis=0)
+
+        def normalize(moved_nodes):
+            return (moved_nodes - reduced_mean) @ reduced_base.T - reduced_initial_nodes
+
+        new_displacement = normalize(reduced_initial_nodes + reduced_displacement_new)
+        net_args = GraphNetArguments(
+            sparse_x=to_input(jxh.append_euclidean_norm(new_displacement)),
+            sparse_edge_attr=to_input(
+                jnp.hstack(
+                    (
+                        sparse_initial_column,
+                        get_sparse_column(normalize(reduced_moved_nodes)),
+                        get_sparse_column(args.reduced_velocity_old @ reduced_base.T),
+                    )
+                )
+            ),
+            **constant_args,
+        )
+        net_displacement = (
+            CustomGraphNetJax().apply(variables, net_args, train=False) / SCALE
+        )
+
+        # SceneLayers.recenter_by_reduced and from_displacement
+        new_reduced_base, success_new = get_rotation_jax(
+            reduced_displacement_new, reduced_dx_big
+        )
+        position = jnp.mean(reduced_displacement_new, axis=0)
+        base, success = get_rotation_jax(net_displacement, dx_big)
+        nodes = initial_nodes + net_displacement
+        centered_nodes = (nodes - jnp.mean(nodes, axis=0)) @ base.T
+        displacement = (
+            centered_nodes @ jnp.linalg.inv(new_reduced_base).T
+            + position
+            - initial_nodes
+        )
+        velocity = (displacement - args.displacement_old) / time_step
+        acceleration = (velocity - args.velocity_old) / time_step
+        return (
+            net_displacement,
+            displacement,
+            acceleration,
+            success_old & success_new & success,
+        )
+
+    return inference
+
+
+def get_solve_jitted(state):
+    variables = {"params": state["params"], "batch_stats": state["batch_stats"]}
+    inference_functions = weakref.WeakKeyDictionary()
+
+    def solve_jitted(
+        scene: SceneInput,
+        energy_functions: EnergyFunctions,
+        initial_a,
+        initial_t,
+    ):
+        _ = initial_a, initial_t
+
+        dense_path = solve_reduced(scene=scene, energy_functions=energy_functions)
+
+        # static features are replaced on remesh, so this compiles again
+        if scene.static_features not in inference_functions:
+            inference_functions[scene.static_features] = get_inference_function(
+                scene=scene, variables=variables
+            )
+        with trh.span("jax_inference"):
+            (
+                scene.norm_lifted_new_displacement,
+                scene.recentered_norm_lifted_new_displacement,
+                lifted_acceleration,
+                success,
+            ) = inference_functions[scene.static_features](
+                InferenceArguments(
+                    reduced_displacement_old=scene.reduced.displacement_old,
+                    reduced_velocity_old=scene.reduced.velocity_old,
+                    reduced_exact_acceleration=scene.reduced.exact_acceleration,
+                    displacement_old=scene.displacement_old,
+                    velocity_old=scene.velocity_old,
+                    time_step=scene.time_step,
+                )
+            )
+            if not success:
+                raise Exception("Error calculating rotation")
+            scene.lifted_acceleration = np.array(lifted_acceleration, dtype=np.float64)
+
+        if dense_path is None:
+            return scene.lifted_acceleration, None
+        return scene.exact_acceleration, None
+
+    return solve_jitted
+
+
 def prepare_input(layer_list):
     def unpack(layer):
         return layer["x"], layer.edge_attr, layer.edge_index
@@ -578,7 +841,7 @@ def create_train_state(rng, sample_args, learning_rate, statistics):
 def get_apply_net(state):
     variables = {"params": state["params"], "batch_stats": state["batch_stats"]}
 
-    @jax.jit
+    @jxh.jit(name="apply_net")
     def apply_net(args):
         args = jax.lax.stop_gradient(args)
         return CustomGraphNetJax().apply(variables, args, train=False)
@@ -586,12 +849,15 @@ def get_apply_net(state):
     return apply_net
 
 
-def MSE(predicted, exact):
-    return jnp.mean(jnp.linalg.norm(predicted - exact, axis=-1) ** 2)
+def MSE(predicted, exact, mask=None):
+    squared_errors = jnp.linalg.norm(predicted - exact, axis=-1) ** 2
+    if mask is None:
+        return jnp.mean(squared_errors)
+    return jnp.sum(mask * squared_errors) / jnp.sum(mask)
 
 
-def RMSE(predicted, exact):
-    return jnp.sqrt(MSE(predicted, exact))
+def RMSE(predicted, exact, mask=None):
+    return jnp.sqrt(MSE(predicted, exact, mask))
 
 
 def get_loss_function(states, sharded_args, sharded_targets, train):
@@ -600,7 +866,9 @@ def get_loss_function(states, sharded_args, sharded_targets, train):
         sharded_net_result, non_trainable_params = states.apply_fn(
             variables, sharded_args, train
         )
-        losses = RMSE(sharded_net_result, sharded_targets)
+        losses = RMSE(
+            sharded_net_result, sharded_targets, sharded_args.dense_nodes_mask
+        )
         new_batch_stats = non_trainable_params["batch_stats"]
         ###
         # new_batch_stats = flax.core.frozen_dict.unfreeze(new_batch_stats)
@@ -643,6 +911,18 @@ def apply_model_train(states, sharded_args, sharded_targets):
     return states, losses
 
 
+def save_numpy_model(model_path, state, net: CustomGraphNetJax, quantization="float32"):
+    # message passes of trained net, which may differ from defaults
+    net_numpy.export_weights(
+        model_path,
+        variables={"params": state["params"], "batch_stats": state["batch_stats"]},
+        message_passes_sparse=net.message_passes_sparse,
+        message_passes_dense=net.message_passes_dense,
+        closest_count=CLOSEST_COUNT,
+        quantization=quantization,
+    )
+
+
 def save_tf_model(model_path, state, dataset):
     apply_net = get_apply_net(state)
 
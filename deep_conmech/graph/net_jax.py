@@ -10,7 +10,7 @@ import jax.numpy as jnp
 import numpy as np
 from flax import linen as nn
 
-from deep_conmech.data.dataset_statistics import FeaturesStatistics
+from deep_conmech.data.dataset_statistics import StreamingStatistics
 from deep_conmech.helpers import thh
 from deep_conmech.scene.scene_input import SceneInput
 from deep_conmech.training_config import CLOSEST_COUNT, TrainingData
@@ -80,6 +80,7 @@ class MessagePassingJax(nn.Module):
         edge_latents,
         edge_index,
         receivers_count,
+        edge_mask=None,
     ):
         senders, receivers = edge_index
         node_latents_senders = node_latents_from.at[senders].get()
@@ -95,6 +96,7 @@ class MessagePassingJax(nn.Module):
             new_edge_latents=new_edge_latents,
             receivers=receivers,
             receivers_count=receivers_count,
+            edge_mask=edge_mask,
         )
 
         new_node_latents = self.update(
@@ -112,8 +114,8 @@ class MessagePassingJax(nn.Module):
     def message(self, edge_inputs):
         return edge_inputs
 
-    def aggregate(self, new_edge_latents, receivers, receivers_count):
-        _ = receivers, receivers_count
+    def aggregate(self, new_edge_latents, receivers, receivers_count, edge_mask):
+        _ = receivers, receivers_count, edge_mask
         return new_edge_latents
 
     def update(self, node_latents_to, aggregated_edge_latents):
@@ -127,13 +129,16 @@ class ProcessorLayer(MessagePassingJax):
     train: bool
 
     @nn.compact
-    def __call__(self, node_latents, edge_latents, edge_index, receivers_count):
+    def __call__(
+        self, node_latents, edge_latents, edge_index, receivers_count, edge_mask=None
+    ):
         new_node_latents, new_edge_latents = self.propagate(
             node_latents_from=node_latents,
             node_latents_to=node_latents,
             edge_latents=edge_latents,
             edge_index=edge_index,
             receivers_count=receivers_count,
+            edge_mask=edge_mask,
         )
         return new_node_latents, new_edge_latents
 
@@ -152,7 +157,9 @@ class ProcessorLayer(MessagePassingJax):
         )(edge_inputs, train=self.train)
         return new_edge_latents
 
-    def aggregate(self, new_edge_latents, receivers, receivers_count):
+    def aggregate(self, new_edge_latents, receivers, receivers_count, edge_mask):
+        if edge_mask is not None:  # padded edges
+            new_edge_latents = new_edge_latents * edge_mask[:, None]
         # alpha = self.attention(new_edge_latents, index)
         # TODO: check if sorted is needed, add degree normalizarion: https://pytorch-geometric.readthedocs.io/en/latest/notes/create_gnn.html
         aggregated_edge_latents = (
@@ -209,8 +216,8 @@ class LinkProcessorLayer(MessagePassingJax):
         )(edge_inputs, train=self.train)
         return new_edge_latents
 
-    def aggregate(self, new_edge_latents, receivers, receivers_count):
-        _ = receivers, receivers_count
+    def aggregate(self, new_edge_latents, receivers, receivers_count, edge_mask):
+        _ = receivers, receivers_count, edge_mask
         latent_dim = new_edge_latents.shape[-1]
         # assuming special ordering (tested empirically)
         result = new_edge_latents.reshape(-1, CLOSEST_COUNT * latent_dim)
@@ -236,16 +243,25 @@ class GraphNetArguments(NamedTuple):
     dense_edge_index: np.ndarray
     multilayer_edge_index: np.ndarray
 
+    # set for batches padded to bucket sizes
+    sparse_edges_mask: Optional[np.ndarray] = None
+    dense_edges_mask: Optional[np.ndarray] = None
+    dense_nodes_mask: Optional[np.ndarray] = None
+
 
 class CustomGraphNetJax(nn.Module):
-    statistics: Optional[dict[str, FeaturesStatistics]] = None
+    statistics: Optional[dict[str, StreamingStatistics]] = None
+    latent_dimension: int = 128  # 128 64
+    internal_layer_count: int = 0  # 0 1
+    message_passes_sparse: int = 18  # 1 8 12
+    message_passes_dense: int = 18  # 1 8 12
 
     @nn.compact
     def __call__(self, args: GraphNetArguments, train: bool):
-        latent_dimension = 128  # 128 64
-        internal_layer_count = 0  # 0 1
-        message_passes_sparse = 18  # 1 8 12
-        message_passes_dense = 18  # 1 8 12
+        latent_dimension = self.latent_dimension
+        internal_layer_count = self.internal_layer_count
+        message_passes_sparse = self.message_passes_sparse
+        message_passes_dense = self.message_passes_dense
         dim = 3
         input_batch_norm = False  # True
         # layer_norm=True
@@ -257,13 +273,14 @@ class CustomGraphNetJax(nn.Module):
             edge_index,
             receivers_count,
             message_passes,
+            edge_mask,
         ):
             for _ in range(message_passes):
                 node_latents, edge_latents = ProcessorLayer(
                     latent_dimension=latent_dimension,
                     internal_layer_count=internal_layer_count,
                     train=train,
-                )(node_latents, edge_latents, edge_index, receivers_count)
+                )(node_latents, edge_latents, edge_index, receivers_count, edge_mask)
             return node_latents
 
         def move_to_dense(
@@ -336,6 +353,7 @@ class CustomGraphNetJax(nn.Module):
             edge_index=args.sparse_edge_index,
             receivers_count=node_latents_sparse.shape[0],
             message_passes=message_passes_sparse,
+            edge_mask=args.sparse_edges_mask,
         )
 
         # net_output_sparse = ForwardNet(
@@ -362,6 +380,7 @@ class CustomGraphNetJax(nn.Module):
             edge_index=args.dense_edge_index,
             receivers_count=updated_node_latents_dense.shape[0],
             message_passes=message_passes_dense,
+            edge_mask=args.dense_edges_mask,
         )
 
         net_output_dense = ForwardNet(
@@ -0,0 +1,302 @@
+"""
+CPU inference of CustomGraphNetJax with numpy and scipy only, from a self-contained
+weights file exported with export_weights (message passing layers optionally stored
+as float16 or int8; kernels are dequantized to float32 on load, so quantization
+reduces file size, not memory or inference time)
+"""
+import json
+from collections.abc import Mapping
+from typing import List
+
+import numpy as np
+import scipy.sparse
+
+FORMAT_VERSION = 1
+QUANTIZATIONS = ["float32", "float16", "int8"]
+DATA_LABELS = [
+    "sparse_nodes",
+    "sparse_edges",
+    "multilayer_edges",
+    "dense_nodes",
+    "dense_edges",
+]
+# matches segment sum scaling in ProcessorLayer.aggregate
+AGGREGATION_SCALE = 0.1
+
+
+def flatten_variables(variables: Mapping, prefix: str = ""):
+    flat = {}
+    for key, value in variables.items():
+        path = f"{prefix}/{key}" if prefix else key
+        if isinstance(value, Mapping):
+            flat.update(flatten_variables(value, prefix=path))
+        else:
+            flat[path] = np.asarray(value, dtype=np.float32)
+    return flat
+
+
+def quantize_int8(kernel: np.ndarray):
+    # symmetric, one scale for each output channel
+    scale = np.abs(kernel).max(axis=0) / 127.0
+    scale[scale == 0] = 1.0
+    return np.round(kernel / scale).astype(np.int8), scale.astype(np.float32)
+
+
+def fold_data_norm(kernel: np.ndarray, bias: np.ndarray, mean, std):
+    # (x - mean) / std @ kernel + bias == x @ kernel' + bias'
+    # constant features (std == 0) are zeroed; DataNorm gives the same 0 (nan_to_num
+    # of 0 / 0) only for inputs equal to mean, other inputs become huge finite values
+    inverse_std = np.divide(1.0, std, out=np.zeros_like(std), where=std != 0)
+    folded_kernel = kernel * inverse_std[:, None]
+    return folded_kernel, bias - mean @ folded_kernel
+
+
+def get_engine_name(flax_path: str, message_passes_sparse: int):
+    # ForwardNet_0-4 encode DATA_LABELS, ForwardNet_5 decodes, ProcessorLayer_i
+    # are numbered in call order: sparse passes first, then dense passes
+    module, *rest = flax_path.split("/")
+    module_type, module_id = module.rsplit("_", 1)
+    module_id = int(module_id)
+    if module_type == "ForwardNet":
+        if module_id < len(DATA_LABELS):
+            return "/".join([f"encoder/{DATA_LABELS[module_id]}", *rest])
+        return "/".join(["decoder", *rest])
+    if module_type == "ProcessorLayer":
+        if module_id < message_passes_sparse:
+            prefix = f"sparse/{module_id}"
+        else:
+            prefix = f"dense/{module_id - message_passes_sparse}"
+    elif module_type == "LinkProcessorLayer":
+        prefix = "link"
+    else:
+        raise ValueError(f"Export of layer {flax_path} is not supported")
+    forward_net, *rest = rest
+    part = {"ForwardNet_0": "message", "ForwardNet_1": "update"}[forward_net]
+    return "/".join([prefix, part, *rest])
+
+
+def export_weights(
+    path: str,
+    variables: Mapping,
+    message_passes_sparse: int,
+    message_passes_dense: int,
+    closest_count: int,
+    quantization: str = "float32",
+):
+    assert quantization in QUANTIZATIONS
+    params = flatten_variables(variables["params"])
+    batch_stats = flatten_variables(variables["batch_stats"])
+
+    processor_layers = {
+        path.split("/")[0] for path in params if path.startswith("ProcessorLayer_")
+    }
+    if len(processor_layers) != message_passes_sparse + message_passes_dense:
+        raise ValueError(
+            f"Weights have {len(processor_layers)} message passing layers, not"
+            f" {message_passes_sparse} sparse and {message_passes_dense} dense"
+        )
+
+    weights = {}
+    for flax_path, value in params.items():
+        name = get_engine_name(flax_path, message_passes_sparse)
+        layer_type = name.split("/")[-2].rsplit("_", 1)[0]
+        if layer_type != "Dense":
+            raise ValueError(f"Export of layer {flax_path} is not supported")
+        weights[name.replace("Dense_", "")] = value
+
+    # dataset statistics of DataNorm are folded into first layers of encoders
+    for data_norm_id, label in enumerate(DATA_LABELS):
+        name = f"encoder/{label}/0"
+        weights[f"{name}/kernel"], weights[f"{name}/bias"] = fold_data_norm(
+            kernel=weights[f"{name}/kernel"],
+            bias=weights[f"{name}/bias"],
+            mean=batch_stats[f"DataNorm_{data_norm_id}/mean"],
+            std=batch_stats[f"DataNorm_{data_norm_id}/std"],
+        )
+
+    # encoders and decoder are small and sensitive to precision, so only
+    # message passing layers are quantized
+    for name in list(weights):
+        if not name.endswith("kernel") or name.startswith(("encoder", "decoder")):
+            continue
+        if quantization == "int8":
+            weights[name], weights[name.replace("kernel", "scale")] = quantize_int8(
+                weights[name]
+            )
+        elif quantization == "float16":
+            weights[name] = weights[name].astype(np.float16)
+
+    metadata = dict(
+        format_version=FORMAT_VERSION,
+        quantization=quantization,
+        message_passes_sparse=message_passes_sparse,
+        message_passes_dense=message_passes_dense,
+        closest_count=closest_count,
+    )
+    with open(path, "wb") as file:
+        np.savez(file, metadata=np.array(json.dumps(metadata)), **weights)
+
+
+class DenseNumpy:
+    def __init__(self, kernel, bias, scale=None):
+        # dequantized once, not in every call
+        self.kernel = kernel.astype(np.float32)
+        if scale is not None:
+            self.kernel *= scale
+        self.bias = bias
+
+    @property
+    def nbytes(self):
+        return self.kernel.nbytes + self.bias.nbytes
+
+
+class ForwardNetNumpy:
+    def __init__(self, layers: List[DenseNumpy]):
+        self.layers = layers
+
+    def __call__(self, x):
+        return self.call_concatenated([(x, None)])
+
+    def call_concatenated(self, parts):
+        # first layer over hstack of parts, each optionally gathered by index;
+        # projecting before gathering needs a matmul per node instead of per edge
+        kernel = self.layers[0].kernel
+        x = self.layers[0].bias
+        start = 0
+        for data, index in parts:
+            end = start + data.shape[1]
+            projected = data @ kernel[start:end]
+            x = x + (projected if index is None else projected[index])
+            start = end
+        assert start == len(kernel)
+        for layer in self.layers[1:]:
+            x = np.maximum(x, 0.0) @ layer.kernel + layer.bias
+        return x
+
+    @property
+    def nbytes(self):
+        return sum(layer.nbytes for layer in self.layers)
+
+
+def get_aggregation_matrix(receivers, receivers_count: int, edge_mask=None):
+    values = np.full(len(receivers), AGGREGATION_SCALE, dtype=np.float32)
+    if edge_mask is not None:
+        values *= edge_mask
+    return scipy.sparse.csr_matrix(
+        (values, (receivers, np.arange(len(receivers)))),
+        shape=(receivers_count, len(receivers)),
+    )
+
+
+class GraphNetNumpy:
+    def __init__(self, weights: Mapping, metadata: dict):
+        assert metadata["format_version"] == FORMAT_VERSION
+        self.metadata = metadata
+
+        def get_net(prefix):
+            layers = []
+            while f"{prefix}/{len(layers)}/kernel" in weights:
+                name = f"{prefix}/{len(layers)}"
+                scale = weights.get(f"{name}/scale")
+                layers.append(
+                    DenseNumpy(
+                        weights[f"{name}/kernel"], weights[f"{name}/bias"], scale
+                    )
+                )
+            assert layers, f"Missing weights of {prefix}"
+            return ForwardNetNumpy(layers)
+
+        self.encoders = {label: get_net(f"encoder/{label}") for label in DATA_LABELS}
+        self.decoder = get_net("decoder")
+        self.link = (get_net("link/message"), get_net("link/update"))
+        self.sparse_layers = [
+            (get_net(f"sparse/{i}/message"), get_net(f"sparse/{i}/update"))
+            for i in range(metadata["message_passes_sparse"])
+        ]
+        self.dense_layers = [
+            (get_net(f"dense/{i}/message"), get_net(f"dense/{i}/update"))
+            for i in range(metadata["message_passes_dense"])
+        ]
+
+    @staticmethod
+    def load(path: str):
+        with np.load(path, allow_pickle=False) as data:
+            weights = {name: data[name] for name in data.files}
+        metadata = json.loads(str(weights.pop("metadata")))
+        return GraphNetNumpy(weights=weights, metadata=metadata)
+
+    @property
+    def nets(self) -> List[ForwardNetNumpy]:
+        layers = [self.link, *self.sparse_layers, *self.dense_layers]
+        return [
+            *self.encoders.values(),
+            self.decoder,
+            *[net for layer in layers for net in layer],
+        ]
+
+    @property
+    def nbytes(self):
+        return sum(net.nbytes for net in self.nets)
+
+    @staticmethod
+    def propagate_messages(
+        layers, node_latents, edge_latents, edge_index, edge_mask=None
+    ):
+        senders, receivers = edge_index
+        aggregation = get_aggregation_matrix(receivers, len(node_latents), edge_mask)
+        for message_net, update_net in layers:
+            messages = message_net.call_concatenated(
+                [
+                    (node_latents, senders),
+                    (edge_latents, None),
+                    (node_latents, receivers),
+                ]
+            )
+            node_latents = node_latents + update_net.call_concatenated(
+                [(node_latents, None), (aggregation @ messages, None)]
+            )
+        return node_latents
+
+    def __call__(self, args):
+        """Same result as CustomGraphNetJax applied to GraphNetArguments args"""
+        inputs = [
+            args.sparse_x,
+            args.sparse_edge_attr,
+            args.multilayer_edge_attr,
+            args.dense_x,
+            args.dense_edge_attr,
+        ]
+        latents = {
+            label: self.encoders[label](np.asarray(data, dtype=np.float32))
+            for label, data in zip(DATA_LABELS, inputs)
+        }
+        node_latents_sparse = latents["sparse_nodes"] + self.propagate_messages(
+            self.sparse_layers,
+            node_latents=latents["sparse_nodes"],
+            edge_latents=latents["sparse_edges"],
+            edge_index=np.asarray(args.sparse_edge_index),
+            edge_mask=getattr(args, "sparse_edges_mask", None),
+        )
+
+        senders, receivers = np.asarray(args.multilayer_edge_index)
+        link_message_net, link_update_net = self.link
+        messages = link_message_net.call_concatenated(
+            [
+                (node_latents_sparse, senders),
+                (latents["multilayer_edges"], None),
+                (latents["dense_nodes"], receivers),
+            ]
+        )
+        # CLOSEST_COUNT consecutive edges for each dense node, as in LinkProcessorLayer
+        node_latents_dense = link_update_net(
+            messages.reshape(-1, self.metadata["closest_count"] * messages.shape[1])
+        )
+
+        node_latents_dense = node_latents_dense + self.propagate_messages(
+            self.dense_layers,
+            node_latents=node_latents_dense,
+            edge_latents=latents["dense_edges"],
+            edge_index=np.asarray(args.dense_edge_index),
+            edge_mask=getattr(args, "dense_edges_mask", None),
+        )
+        return self.decoder(node_latents_dense)
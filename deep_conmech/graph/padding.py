@@ -0,0 +1,124 @@
+"""
+Padding of graph batches to a fixed set of sizes (buckets), so that jitted steps
+compile once per bucket instead of once per combination of nodes and edges counts
+"""
+import math
+from dataclasses import dataclass
+from typing import List, NamedTuple
+
+import numpy as np
+
+from deep_conmech.graph.net_jax import GraphNetArguments
+from deep_conmech.training_config import CLOSEST_COUNT
+
+MINIMUM_BUCKET_SIZE = 64
+
+
+class GraphSizes(NamedTuple):
+    sparse_nodes: int
+    sparse_edges: int
+    dense_nodes: int
+    dense_edges: int
+
+
+def get_sizes(args: GraphNetArguments):
+    return GraphSizes(
+        sparse_nodes=len(args.sparse_x),
+        sparse_edges=len(args.sparse_edge_attr),
+        dense_nodes=len(args.dense_x),
+        dense_edges=len(args.dense_edge_attr),
+    )
+
+
+def get_bucket_size(size: int, growth: float, minimum: int = MINIMUM_BUCKET_SIZE):
+    # Geometric buckets: padding is below (growth - 1) of size and count of buckets
+    # grows as log(size range) / log(growth), so growth trades waste for compiles
+    if size <= minimum:
+        return minimum
+    exponent = math.floor(math.log(size / minimum, growth))
+    bucket_size = math.ceil(minimum * growth**exponent)
+    while bucket_size < size:
+        exponent += 1
+        bucket_size = math.ceil(minimum * growth**exponent)
+    return bucket_size
+
+
+def get_bucket(all_sizes: List[GraphSizes], growth: float):
+    # all devices get the same shapes, as required by pmap
+    return GraphSizes(
+        *[get_bucket_size(max(sizes), growth) for sizes in zip(*all_sizes)]
+    )
+
+
+def pad_rows(data, rows: int):
+    data = np.asarray(data)
+    return np.pad(data, ((0, rows - len(data)), (0, 0)))
+
+
+def pad_edge_index(edge_index, count: int, receivers=None):
+    # padded edges connect node 0 with itself and are masked in aggregation
+    padding = np.zeros((2, count - edge_index.shape[1]), dtype=edge_index.dtype)
+    if receivers is not None:
+        padding[1] = receivers
+    return np.hstack((edge_index, padding))
+
+
+def get_mask(size: int, count: int):
+    mask = np.zeros(count, dtype=np.float32)
+    mask[:size] = 1.0
+    return mask
+
+
+def pad_args(args: GraphNetArguments, target, bucket: GraphSizes):
+    sizes = get_sizes(args)
+    assert args.multilayer_edge_index.shape[1] == sizes.dense_nodes * CLOSEST_COUNT
+
+    # LinkProcessorLayer expects CLOSEST_COUNT consecutive edges for each dense node
+    padded_dense_nodes = np.arange(sizes.dense_nodes, bucket.dense_nodes)
+    padded_args = GraphNetArguments(
+        sparse_x=pad_rows(args.sparse_x, bucket.sparse_nodes),
+        sparse_edge_attr=pad_rows(args.sparse_edge_attr, bucket.sparse_edges),
+        dense_x=pad_rows(args.dense_x, bucket.dense_nodes),
+        dense_edge_attr=pad_rows(args.dense_edge_attr, bucket.dense_edges),
+        multilayer_edge_attr=pad_rows(
+            args.multilayer_edge_attr, bucket.dense_nodes * CLOSEST_COUNT
+        ),
+        sparse_edge_index=pad_edge_index(args.sparse_edge_index, bucket.sparse_edges),
+        dense_edge_index=pad_edge_index(args.dense_edge_index, bucket.dense_edges),
+        multilayer_edge_index=pad_edge_index(
+            args.multilayer_edge_index,
+            bucket.dense_nodes * CLOSEST_COUNT,
+            receivers=np.repeat(padded_dense_nodes, CLOSEST_COUNT),
+        ),
+        sparse_edges_mask=get_mask(sizes.sparse_edges, bucket.sparse_edges),
+        dense_edges_mask=get_mask(sizes.dense_edges, bucket.dense_edges),
+        dense_nodes_mask=get_mask(sizes.dense_nodes, bucket.dense_nodes),
+    )
+    return padded_args, pad_rows(target, bucket.dense_nodes)
+
+
+def pad_batch(all_args, all_targets, growth: float, raport=None):
+    all_sizes = [get_sizes(args) for args in all_args]
+    bucket = get_bucket(all_sizes, growth=growth)
+    if raport is not None:
+        raport.add(all_sizes, bucket)
+    padded = [
+        pad_args(args, target, bucket) for args, target in zip(all_args, all_targets)
+    ]
+    return [args for args, _ in padded], [target for _, target in padded]
+
+
+@dataclass
+class PaddingRaport:
+    real_size: int = 0
+    padded_size: int = 0
+
+    def add(self, all_sizes: List[GraphSizes], bucket: GraphSizes):
+        self.real_size += sum(sum(sizes) for sizes in all_sizes)
+        self.padded_size += sum(bucket) * len(all_sizes)
+
+    @property
+    def overhead(self):
+        if self.real_size == 0:
+            return 0.0
+        return self.padded_size / self.real_size - 1.0
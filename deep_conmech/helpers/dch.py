@@ -4,11 +4,13 @@ deep_conmech helpers
 import os
 import resource
 
-import pandas
 import torch.multiprocessing
 
+from conmech.helpers import lzh
 from deep_conmech.training_config import TrainingConfig
 
+pandas = lzh.lazy_import("pandas")
+
 
 def print_pandas(data):
     name = f"{data}=".split("=")[0]
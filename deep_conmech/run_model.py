@@ -15,7 +15,7 @@ import torch.distributed as dist
 import torch.multiprocessing
 from dotenv import load_dotenv
 
-from conmech.helpers import cmh, pca
+from conmech.helpers import cmh, jxh, pca
 from conmech.helpers.config import Config, SimulationConfig
 from conmech.scenarios import scenarios
 from conmech.scenarios.scenarios import bunny_fall_3d
@@ -24,7 +24,12 @@ from conmech.solvers.calculator import Calculator
 from deep_conmech.data import base_dataset
 from deep_conmech.data.calculator_dataset import CalculatorDataset
 from deep_conmech.data.synthetic_dataset import SyntheticDataset
-from deep_conmech.graph.model_jax import GraphModelDynamicJax, save_tf_model
+from deep_conmech.graph.model_jax import (
+    GraphModelDynamicJax,
+    save_numpy_model,
+    save_tf_model,
+)
+from deep_conmech.graph.net_numpy import QUANTIZATIONS
 from deep_conmech.graph.net_jax import CustomGraphNetJax
 from deep_conmech.helpers import dch
 from deep_conmech.training_config import TrainingConfig, TrainingData, get_train_config
@@ -37,7 +42,8 @@ def setup_distributed(rank: int, world_size: int):
     free_port = "12348"
     os.environ["MASTER_PORT"] = free_port
     # os.environ["TORCH_DISTRIBUTED_DEBUG"] = "DETAIL"
-    dist.init_process_group("nccl", rank=rank, world_size=world_size)
+    backend = "nccl" if torch.cuda.is_available() else "gloo"
+    dist.init_process_group(backend, rank=rank, world_size=world_size)
 
 
 def cleanup_distributed():
@@ -142,6 +148,14 @@ def visualize(config: TrainingConfig):
     netron.start(model_path)
 
 
+def export(config: TrainingConfig, quantization: str):
+    checkpoint_path = get_newest_checkpoint_path(config)
+    model_path = f"log/jax_model_{quantization}.npz"
+    state = GraphModelDynamicJax.load_checkpointed_net(path=checkpoint_path)
+    save_numpy_model(model_path, state, quantization=quantization)
+    print(f"Saved {model_path}")
+
+
 def plot(config: TrainingConfig):
     if config.td.use_dataset_statistics:
         train_dataset = get_train_dataset(config.td.dataset, config=config)
@@ -280,6 +294,8 @@ def get_newest_checkpoint_path(config: TrainingConfig):
 
 
 def main(args: Namespace):
+    if args.cpu_devices is not None:
+        jxh.use_host_devices(args.cpu_devices)
     cmh.print_jax_configuration()
     print(f"MODE: {args.mode}, PID: {os.getpid()}")
     # dch.cuda_launch_blocking()
@@ -287,6 +303,9 @@ def main(args: Namespace):
     # print(numba.cuda.gpus)
 
     config = get_train_config(shell=args.shell, mode="normal")
+    if args.cpu_devices is not None:
+        config.device = "cpu"
+        config.cpu_devices = args.cpu_devices
 
     # dch.set_torch_sharing_strategy()
     dch.set_memory_limit(config=config)
@@ -303,6 +322,8 @@ def main(args: Namespace):
         visualize(config)
     if args.mode == "pca":
         run_pca(config)
+    if args.mode == "export":
+        export(config, quantization=args.quantization)
 
 
 if __name__ == "__main__":
@@ -311,13 +332,26 @@ if __name__ == "__main__":
     parser.add_argument(
         "--mode",
         type=str,
-        choices=["train", "plot", "profile", "visualize", "pca"],
+        choices=["train", "plot", "profile", "visualize", "pca", "export"],
         default="plot",
         help="Running mode of aplication",
     )
     parser.add_argument(
         "--shell", action=argparse.BooleanOptionalAction, default=False
     )  # Python 3.9+
+    parser.add_argument(
+        "--cpu-devices",
+        type=int,
+        default=None,
+        help="Train on CPU split into this many XLA devices",
+    )
+    parser.add_argument(
+        "--quantization",
+        type=str,
+        choices=QUANTIZATIONS,
+        default="float32",
+        help="Weights of message passing layers in exported model",
+    )
     args = parser.parse_args()
     # with jax.disable_jit():
     load_dotenv()
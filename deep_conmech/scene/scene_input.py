@@ -1,4 +1,4 @@
-from typing import List
+from typing import Callable, List
 
 import jax
 import jax.numpy as jnp
@@ -47,6 +47,38 @@ def get_edges_column(data_from, data_to, directional_edges):
     return jnp.hstack((column, nph.euclidean_norm(column, keepdims=True)))
 
 
+prepare_node_data_jit = jxh.jit(
+    prepare_node_data,
+    name="prepare_node_data",
+    static_argnames=["add_norm", "nodes_count"],
+)
+get_edges_column_jit = jxh.jit(get_edges_column, name="get_edges_column")
+
+
+def get_nbytes(value):
+    if isinstance(value, (tuple, list)):
+        return sum(get_nbytes(item) for item in value)
+    if isinstance(value, torch.Tensor):
+        return value.element_size() * value.nelement()
+    return value.nbytes
+
+
+class StaticFeatures:
+    """Features depending only on initial meshes, replaced on remesh"""
+
+    def __init__(self):
+        self.features = {}
+
+    def get(self, name: str, compute: Callable):
+        if name not in self.features:
+            self.features[name] = compute()
+        return self.features[name]
+
+    @property
+    def nbytes(self):
+        return sum(get_nbytes(value) for value in self.features.values())
+
+
 class SceneInput(SceneRandomized):
     def __init__(
         self,
@@ -65,6 +97,11 @@ class SceneInput(SceneRandomized):
             simulation_config=simulation_config,
             create_in_subprocess=create_in_subprocess,
         )
+        self.static_features = StaticFeatures()
+
+    def remesh(self, boundaries_description, create_in_subprocess):
+        super().remesh(boundaries_description, create_in_subprocess)
+        self.static_features = StaticFeatures()
 
     @mesh_normalization_decorator
     def get_edges_data(self, directional_edges, reduced=False):
@@ -72,7 +109,7 @@ class SceneInput(SceneRandomized):
 
         def get_column(data):
             data_jax = jnp.array(data)
-            return jax.jit(get_edges_column)(
+            return get_edges_column_jit(
                 data_from=data_jax,
                 data_to=data_jax,
                 directional_edges=directional_edges,
@@ -83,7 +120,10 @@ class SceneInput(SceneRandomized):
             if reduced:
                 return jnp.hstack(
                     (
-                        get_column(scene.input_initial_nodes),  # cached
+                        self.static_features.get(
+                            "sparse_edges_initial_nodes",
+                            lambda: get_column(scene.input_initial_nodes),
+                        ),
                         get_column(scene.input_displacement_old),
                         get_column(scene.input_velocity_old),
                         # get_column(scene.input_forces),
@@ -104,7 +144,7 @@ class SceneInput(SceneRandomized):
         # velocity_old_dense = self.input_velocity_old
 
         def get_column(data_sparse, data_dense):
-            return jax.jit(get_edges_column)(
+            return get_edges_column_jit(
                 data_from=jnp.array(data_sparse),
                 data_to=jnp.array(data_dense),
                 directional_edges=directional_edges,
@@ -129,9 +169,7 @@ class SceneInput(SceneRandomized):
         scene = self.reduced if reduced else self
 
         def prepare_nodes(data):
-            return jax.jit(
-                prepare_node_data, static_argnames=["add_norm", "nodes_count"]
-            )(
+            return prepare_node_data_jit(
                 data=data,
                 add_norm=True,
                 nodes_count=scene.nodes_count,
@@ -232,10 +270,16 @@ class SceneInput(SceneRandomized):
         layer_data = self.all_layers[layer_number]
         scene = layer_data.mesh
 
+        def get_static(name, compute):
+            return self.static_features.get(f"layer_{layer_number}.{name}", compute)
+
         data = MeshLayerData(
             edge_number=torch.tensor([scene.edges_number]),
             layer_number=torch.tensor([layer_number]),
-            pos=thh.to_torch_set_precision(scene.normalized_initial_nodes),
+            pos=get_static(
+                "pos",
+                lambda: thh.to_torch_set_precision(scene.normalized_initial_nodes),
+            ),
             x=thh.convert_jax_to_tensor_set_precision(
                 self.get_nodes_data(reduced=reduced)
             ),
@@ -253,11 +297,24 @@ class SceneInput(SceneRandomized):
                 data.edge_index_to_down,
                 data.edge_attr_to_down,
                 data.closest_nodes_to_down,
-            ) = self.get_multilayer_edges_with_data(link=layer_data.to_base)
+            ) = get_static(  # only initial nodes are used
+                "edges_to_down",
+                lambda: self.get_multilayer_edges_with_data(link=layer_data.to_base),
+            )
+
+        data.edge_index = get_static(
+            "edge_index",
+            lambda: thh.get_contiguous_torch(scene.mesh.directional_edges),
+        )
+
+        def get_edges_data():
+            return thh.convert_jax_to_tensor_set_precision(
+                self.get_edges_data(scene.mesh.directional_edges, reduced=reduced)
+            )
 
-        data.edge_index = thh.get_contiguous_torch(scene.mesh.directional_edges)
-        data.edge_attr = thh.convert_jax_to_tensor_set_precision(
-            self.get_edges_data(scene.mesh.directional_edges, reduced=reduced)
+        # dense edges data contains only initial nodes
+        data.edge_attr = (
+            get_edges_data() if reduced else get_static("edge_attr", get_edges_data)
         )
         _ = """
         transform = T.Compose(
@@ -1,10 +1,13 @@
 import copy
+import hashlib
+from collections import OrderedDict
 from ctypes import ArgumentError
 from dataclasses import dataclass
 from typing import List, Optional
 
 import numba
 import numpy as np
+import scipy.sparse
 
 from conmech.helpers import cmh, interpolation_helpers, jxh, lnh
 from conmech.helpers.config import SimulationConfig
@@ -39,6 +42,7 @@ class MeshLayerLinkData:
     closest_weights_boundary: np.ndarray
     closest_distances_boundary: np.ndarray
     edges_index: np.ndarray
+    interpolation_matrix: Optional[scipy.sparse.csr_matrix] = None
 
 
 @dataclass
@@ -48,6 +52,132 @@ class AllMeshLayerLinkData:
     to_base: Optional[MeshLayerLinkData]
 
 
+def get_topology_key(mesh: Mesh):
+    elements = np.ascontiguousarray(mesh.elements)
+    digest = hashlib.blake2b(elements.tobytes(), digest_size=16).hexdigest()
+    return mesh.nodes_count, elements.shape, digest
+
+
+@dataclass
+class LinkCacheEntry:
+    from_nodes: np.ndarray
+    to_nodes: np.ndarray
+    link: MeshLayerLinkData
+
+
+class LinkCache:
+    """
+    Links between meshes, keyed by topology of both meshes and mesh layer proportion;
+    when nodes moved since the last link, only nodes that left their element
+    are queried again
+    """
+
+    def __init__(self, max_size: int = 16):
+        self.max_size = max_size
+        self.entries: OrderedDict[tuple, LinkCacheEntry] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.requeried_nodes = 0
+
+    def get_link(self, from_mesh: Mesh, to_mesh: Mesh, mesh_layer_proportion: int):
+        key = (
+            get_topology_key(from_mesh),
+            get_topology_key(to_mesh),
+            mesh_layer_proportion,
+        )
+        from_nodes = from_mesh.initial_nodes
+        to_nodes = to_mesh.initial_nodes
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            closest_nodes, _, closest_weights = interpolation_helpers.interpolate_nodes(
+                base_nodes=from_nodes,
+                base_elements=from_mesh.elements,
+                query_nodes=to_nodes,
+            )
+            link = get_link_data(
+                closest_nodes=closest_nodes,
+                closest_distances=interpolation_helpers.get_closest_distances(
+                    base_nodes=from_nodes,
+                    query_nodes=to_nodes,
+                    closest_nodes=closest_nodes,
+                ),
+                closest_weights=closest_weights,
+                base_nodes_count=from_mesh.nodes_count,
+            )
+        else:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            link = self.relink(entry, from_mesh, to_mesh)
+
+        self.entries[key] = LinkCacheEntry(
+            from_nodes=from_nodes.copy(), to_nodes=to_nodes.copy(), link=link
+        )
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+        return link
+
+    def relink(self, entry: LinkCacheEntry, from_mesh: Mesh, to_mesh: Mesh):
+        from_nodes = from_mesh.initial_nodes
+        to_nodes = to_mesh.initial_nodes
+        if np.array_equal(from_nodes, entry.from_nodes) and np.array_equal(
+            to_nodes, entry.to_nodes
+        ):
+            return entry.link
+
+        closest_nodes = entry.link.closest_nodes.copy()
+        closest_weights, stale_mask = interpolation_helpers.update_link_weights(
+            base_nodes=from_nodes,
+            query_nodes=to_nodes,
+            old_base_nodes=entry.from_nodes,
+            old_query_nodes=entry.to_nodes,
+            closest_nodes=closest_nodes,
+            closest_weights=entry.link.closest_weights,
+        )
+        if stale_mask.any():
+            self.requeried_nodes += stale_mask.sum()
+            (
+                closest_nodes[stale_mask],
+                _,
+                closest_weights[stale_mask],
+            ) = interpolation_helpers.interpolate_nodes(
+                base_nodes=from_nodes,
+                base_elements=from_mesh.elements,
+                query_nodes=to_nodes[stale_mask],
+            )
+        # all nodes moved relative to their linked nodes, not only requeried ones
+        return get_link_data(
+            closest_nodes=closest_nodes,
+            closest_distances=interpolation_helpers.get_closest_distances(
+                base_nodes=from_nodes, query_nodes=to_nodes, closest_nodes=closest_nodes
+            ),
+            closest_weights=closest_weights,
+            base_nodes_count=from_mesh.nodes_count,
+        )
+
+
+def get_link_data(
+    closest_nodes, closest_distances, closest_weights, base_nodes_count: int
+):
+    return MeshLayerLinkData(
+        closest_nodes=closest_nodes,
+        closest_distances=closest_distances,
+        closest_weights=closest_weights,
+        closest_boundary_nodes=None,
+        closest_distances_boundary=None,
+        closest_weights_boundary=None,
+        edges_index=get_multilayer_edges_numba(closest_nodes),
+        interpolation_matrix=interpolation_helpers.get_interpolation_matrix(
+            closest_nodes=closest_nodes,
+            closest_weights=closest_weights,
+            base_nodes_count=base_nodes_count,
+        ),
+    )
+
+
+LINK_CACHE = LinkCache()
+
+
 class SceneLayers(Scene):
     def __init__(
         self,
@@ -157,39 +287,18 @@ class SceneLayers(Scene):
         )
         self.all_layers.append(mesh_layer_data)
 
+    def remesh(self, boundaries_description, create_in_subprocess):
+        super().remesh(boundaries_description, create_in_subprocess)
+        self.set_reduced()
+
     def get_link(self, from_mesh: Mesh, to_mesh: Mesh, with_weights: bool):
-        (
-            closest_nodes,
-            closest_distances,
-            closest_weights,
-        ) = interpolation_helpers.interpolate_nodes(  # get_interlayer_data_numba
-            base_nodes=from_mesh.initial_nodes,
-            base_elements=from_mesh.elements,
-            query_nodes=to_mesh.initial_nodes,
-            # closest_count=CLOSEST_COUNT,
-            # with_weights=with_weights,
-            # padding = 0.1
-        )
-        # (
-        #     closest_boundary_nodes,
-        #     closest_distances_boundary,
-        #     closest_weights_boundary,
-        # ) = interpolation_helpers.get_interlayer_data_numba(
-        #     base_nodes=from_mesh.initial_boundary_nodes,
-        #     base_elements=from_mesh.elements,
-        #     interpolated_nodes=to_mesh.initial_boundary_nodes,
-        #     closest_count=CLOSEST_BOUNDARY_COUNT,
-        #     with_weights=with_weights,
-        # )
-        edges_index = get_multilayer_edges_numba(closest_nodes)
-        return MeshLayerLinkData(
-            closest_nodes=closest_nodes,
-            closest_distances=closest_distances,
-            closest_weights=closest_weights,
-            closest_boundary_nodes=None,  # closest_boundary_nodes,
-            closest_distances_boundary=None,  # closest_distances_boundary,
-            closest_weights_boundary=None,  # closest_weights_boundary,
-            edges_index=edges_index,
+        _ = with_weights
+        # boundary links (get_interlayer_data_numba with CLOSEST_BOUNDARY_COUNT)
+        # are not computed, closest_boundary_* stay None
+        return LINK_CACHE.get_link(
+            from_mesh=from_mesh,
+            to_mesh=to_mesh,
+            mesh_layer_proportion=self.simulation_config.mesh_layer_proportion,
         )
 
     @property
@@ -304,6 +413,8 @@ class SceneLayers(Scene):
             raise ArgumentError
 
         if len(base_values) == self.nodes_count:
+            if link.interpolation_matrix is not None:
+                return link.interpolation_matrix @ base_values
             closest_nodes = link.closest_nodes
             closest_weights = link.closest_weights
 
@@ -332,6 +443,8 @@ class SceneLayers(Scene):
             raise ArgumentError
 
         if len(reduced_values) == reduced_scene.nodes_count:
+            if link.interpolation_matrix is not None:
+                return link.interpolation_matrix @ reduced_values
             closest_nodes = link.closest_nodes
             closest_weights = link.closest_weights
 
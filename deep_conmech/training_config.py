@@ -48,6 +48,9 @@ class TrainingData:
     validate_scenarios_at_epochs: Optional[int] = None  # 30  # None 3
 
     batch_size: int = 1  # 4  # 8  # 1  # 16  # 32  # 16  # 32 # 256
+    # batches padded to sizes growing geometrically by this factor (None - no padding)
+    # lower - less padding, higher - fewer compilations
+    padding_bucket_growth: Optional[float] = 1.25
     dataset_size: int = 32  # 256 * (1 if TEST else 1) #8)  # 2048)
 
     use_dataset_statistics: bool = True
@@ -81,8 +84,11 @@ class TrainingConfig(Config):
     #:" + ",".join(map(str, DEVICE_IDS)))  # torch.cuda.is_available()
 
     dataloader_workers = 4
+    prefetch_batches = 2  # batches prepared ahead of device step
+    cpu_devices: Optional[int] = None  # train on CPU split into XLA host devices
     generate_data_in_subprocesses = False  # True
     synthetic_generation_workers = 4
+    synthetic_generation_seed = 0
     scenario_generation_workers = 2
 
     total_memory_gb = psutil.virtual_memory().total / 1024**3
@@ -104,6 +110,7 @@ class TrainingConfig(Config):
 
     load_training_data_to_ram: bool = False
     load_validation_data_to_ram: bool = False
+    features_format: str = "memmap"  # "pickle"
     profile_training: bool = False
 
 
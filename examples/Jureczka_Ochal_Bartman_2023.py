@@ -37,13 +37,21 @@ def make_contact_law(limit_value, limit):
 
         @staticmethod
         def subderivative_normal_direction(u_nu: float, v_nu: float) -> float:
-            return 0
+            if u_nu <= 0:
+                return 0.0
+            if u_nu < limit:
+                return limit_value * v_nu
+            return 0.0
 
         @staticmethod
         def regularized_subderivative_tangential_direction(
             u_tau: np.ndarray, v_tau: np.ndarray, rho=1e-7
         ) -> float:
-            return 0
+            norm = np.sum(u_tau * u_tau) ** 0.5
+            regularization = (0.3 * np.exp(-norm) + 0.7) / np.sqrt(
+                np.sum(u_tau * u_tau) + rho**2
+            )
+            return regularization * np.sum(u_tau * v_tau)
 
     return JureczkaOchalBartman2023
 
@@ -27,19 +27,21 @@ class JureczkaOchal2019(ContactLaw):
 
     @staticmethod
     def subderivative_normal_direction(u_nu: float, v_nu: float) -> float:
-        return 0
+        if u_nu <= 0:
+            return 0.0
+        if u_nu < 0.1:
+            return 20 * u_nu * v_nu
+        return 0.0
 
     @staticmethod
     def regularized_subderivative_tangential_direction(
         u_tau: np.ndarray, v_tau: np.ndarray, rho=1e-7
     ) -> float:
-        """
-        Coulomb regularization
-        """
-        return 0
-        # regularization = 1 / np.sqrt(u_tau[0] * u_tau[0] + u_tau[1] * u_tau[1] + rho ** 2)
-        # result = regularization * (u_tau[0] * v_tau[0] + u_tau[1] * v_tau[1])
-        # return result
+        regularization = 1 / (
+            (np.sum(u_tau * u_tau) ** 0.5 + 1)
+            * np.sqrt(np.sum(u_tau * u_tau) + rho**2)
+        )
+        return regularization * np.sum(u_tau * v_tau)
 
 
 @dataclass()
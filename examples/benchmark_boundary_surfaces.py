@@ -0,0 +1,116 @@
+"""
+Time and peak memory of boundary surfaces identification counting all faces with
+np.unique and with hash table of packed faces; time of boundary masks evaluated
+node by node and vectorized on coordinates arrays
+Usage: PYTHONPATH=. python examples/benchmark_boundary_surfaces.py [--sizes 20 60 100]
+"""
+import argparse
+import os
+import time
+
+import numba
+import numpy as np
+
+from conmech.mesh.boundaries_factory import (
+    extract_unique_elements,
+    get_boundary_surfaces,
+    get_nodes_mask,
+    identify_surfaces_numba,
+)
+from examples.benchmark_helpers import get_kuhn_cube, measure_in_process
+
+MODELS = {
+    "bunny": "models/bunny/bun_zipper_res3_.msh",
+    "armadillo": "models/armadillo/armadillo.msh",
+}
+
+
+def get_shuffled_kuhn_cube(size: int):
+    # elements in random order
+    nodes, elements = get_kuhn_cube(size)
+    return nodes, np.random.default_rng(0).permutation(elements)
+
+
+def read_model(path: str):
+    import meshio  # pylint: disable=import-outside-toplevel
+
+    mesh = meshio.read(path)
+    return mesh.points, mesh.cells_dict["tetra"].astype(np.int64)
+
+
+def counting_all_faces(elements):
+    surfaces, opposing_indices = identify_surfaces_numba(
+        sorted_elements=np.sort(elements, axis=1)
+    )
+    return extract_unique_elements(surfaces, opposing_indices)[0]
+
+
+def hashing_open_faces(elements):
+    return get_boundary_surfaces(elements.copy())[0]
+
+
+def count_surfaces(method, elements):
+    return len(method(elements))
+
+
+def get_meshes(sizes):
+    for name, path in MODELS.items():
+        if not os.path.exists(path):
+            print(f"Skipping {name}: {path} not found")
+            continue
+        yield name, read_model(path)
+    for size in sizes:
+        yield f"cube {size}", get_shuffled_kuhn_cube(size)
+
+
+def main(sizes):
+    # compile before forking
+    _, small_elements = get_kuhn_cube(2)
+    for method in [counting_all_faces, hashing_open_faces]:
+        method(small_elements)
+
+    print(
+        f"{'mesh':>10} | {'elements':>9} | {'surfaces':>8} | {'method':>18} |"
+        f" {'time [s]':>8} | {'peak RSS increase [MB]':>22}"
+    )
+    meshes = list(get_meshes(sizes))
+    for name, (_, elements) in meshes:
+        for method in [counting_all_faces, hashing_open_faces]:
+            surfaces_count, elapsed, peak = measure_in_process(
+                count_surfaces, method, elements
+            )
+            print(
+                f"{name:>10} | {len(elements):>9} | {surfaces_count:>8} |"
+                f" {method.__name__:>18} | {elapsed:>8.2f} | {peak / 2**20:>22.0f}"
+            )
+
+    nodes = meshes[-1][1][0]
+    predicates = {
+        "plane": lambda x: x[2] == 0.0,
+        "ball": lambda x: (x[0] - 0.5) ** 2 + (x[1] - 0.5) ** 2 <= 0.1,
+        "interval": lambda x: (0.2 <= x[0]) & (x[0] <= 0.6),
+    }
+    print(f"\nBoundary masks of {len(nodes)} nodes (first call compiles predicate)")
+    print(
+        f"{'predicate':>10} | {'vectorized':>10} | {'first call [ms]':>15} |"
+        f" {'next call [ms]':>14}"
+    )
+    for name, predicate in predicates.items():
+        for vectorized in [False, True]:
+            predicate_numba = numba.njit(predicate)
+            times = []
+            for _ in range(2):
+                start = time.perf_counter()
+                get_nodes_mask(nodes, predicate_numba, vectorized=vectorized)
+                times.append(1000 * (time.perf_counter() - start))
+            print(
+                f"{name:>10} | {str(vectorized):>10} | {times[0]:>15.1f} |"
+                f" {times[1]:>14.1f}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare boundary surfaces")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20, 60, 100])
+    args = parser.parse_args()
+    main(sizes=args.sizes)
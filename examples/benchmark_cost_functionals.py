@@ -0,0 +1,69 @@
+"""
+Optimization solver with and without gradient of the cost functional
+on the contact law from Jureczka_Ochal_Bartman_2023
+Usage: PYTHONPATH=. python examples/benchmark_cost_functionals.py [--sizes 4 8]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from conmech.mesh.boundaries_description import BoundariesDescription
+from conmech.simulations.problem_solver import TimeDependent as QuasistaticProblemSolver
+from examples.Jureczka_Ochal_Bartman_2023 import make_contact_law, make_setup
+
+
+def measure(size: int, solving_method: str, gradient: bool, steps: int):
+    setup = make_setup(
+        mesh_type_="cross",
+        boundaries_=BoundariesDescription(
+            contact=lambda x: x[1] == 0, dirichlet=lambda x: x[0] == 0
+        ),
+        contact_law_=make_contact_law(limit_value=10, limit=0.01),
+        elements_number_=(size, 2 * size),
+        friction_bound_=1,
+    )
+    runner = QuasistaticProblemSolver(setup, solving_method=solving_method)
+    if not gradient:
+        runner.step_solver.loss_gradient = None
+        runner.step_solver.method = "BFGS"
+    # compile numba functionals outside of the measured time
+    initial = {
+        "initial_displacement": setup.initial_displacement,
+        "initial_velocity": setup.initial_velocity,
+    }
+    runner.solve(n_steps=1, **initial)
+
+    start = time.perf_counter()
+    state = runner.solve(n_steps=steps, **initial)[-1]
+    return (
+        runner.body.nodes_count,
+        (time.perf_counter() - start) / steps,
+        state.displacement,
+    )
+
+
+def main(sizes, solving_method: str, steps: int):
+    print(f"{'nodes':>7} | {'gradient':>8} | {'step [ms]':>10} | {'max diff':>9}")
+    for size in sizes:
+        nodes_count, reference_time, reference = measure(
+            size, solving_method, gradient=False, steps=steps
+        )
+        _, step_time, displacement = measure(
+            size, solving_method, gradient=True, steps=steps
+        )
+        difference = np.max(np.abs(displacement - reference))
+        print(f"{nodes_count:>7} | {'no':>8} | {1e3 * reference_time:>10.1f} |")
+        print(
+            f"{nodes_count:>7} | {'yes':>8} | {1e3 * step_time:>10.1f}"
+            + f" | {difference:>9.2e}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare cost functional gradients")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[4, 8])
+    parser.add_argument("--solving-method", default="schur")
+    parser.add_argument("--steps", type=int, default=4)
+    args = parser.parse_args()
+    main(sizes=args.sizes, solving_method=args.solving_method, steps=args.steps)
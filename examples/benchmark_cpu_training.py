@@ -0,0 +1,88 @@
+"""
+Training throughput on a CPU with the batch split across host XLA devices
+(one per core), gradients all-reduced with pmean and batches prefetched
+Usage: PYTHONPATH=. python examples/benchmark_cpu_training.py [--devices 1 2 4]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+
+def run(devices_count: int, batches_count: int, graphs_count: int):
+    from conmech.helpers import jxh
+
+    jxh.use_host_devices(devices_count)
+
+    import jax
+    import numpy as np
+
+    from conmech.helpers import cmh
+    from deep_conmech.graph.model_jax import apply_model_train, shard_batch
+    from examples.benchmark_padded_batching import get_random_batch, get_states
+
+    devices = jax.local_devices()
+    random = np.random.default_rng(0)
+    batches = [
+        [get_random_batch(random, graphs_count) for _ in devices]
+        for _ in range(batches_count)
+    ]
+
+    def prepare(batch):
+        all_args, all_targets = zip(*batch)
+        return shard_batch(list(all_args), list(all_targets), devices, growth=1.25)
+
+    states = get_states(batches[0][0][0], devices)
+    # first step compiles
+    states, losses = apply_model_train(states, *prepare(batches[0]))
+    jax.block_until_ready(losses)
+
+    start = time.perf_counter()
+    for sharded_args, sharded_targets in cmh.prefetch(map(prepare, batches)):
+        states, losses = apply_model_train(states, sharded_args, sharded_targets)
+    jax.block_until_ready(losses)
+    elapsed = time.perf_counter() - start
+    print(batches_count * len(devices) * graphs_count / elapsed)
+
+
+def main(devices_list, batches_count: int, graphs_count: int):
+    print(f"{os.cpu_count()} cores, {graphs_count} graphs per device")
+    print(f"{'devices':>7} | {'samples/s':>9} | {'speedup':>7}")
+    reference = None
+    for devices_count in devices_list:
+        result = subprocess.run(
+            [
+                sys.executable,
+                __file__,
+                "--run",
+                f"--devices={devices_count}",
+                f"--batches={batches_count}",
+                f"--graphs={graphs_count}",
+            ],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        throughput = float(result.stdout.strip().splitlines()[-1])
+        reference = reference or throughput
+        print(
+            f"{devices_count:>7} | {throughput:>9.2f} | {throughput / reference:>7.2f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure CPU data-parallel training")
+    parser.add_argument("--devices", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--batches", type=int, default=50)
+    parser.add_argument("--graphs", type=int, default=2)
+    parser.add_argument("--run", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.run:
+        run(args.devices[0], args.batches, args.graphs)
+    else:
+        main(
+            devices_list=args.devices,
+            batches_count=args.batches,
+            graphs_count=args.graphs,
+        )
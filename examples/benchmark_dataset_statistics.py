@@ -0,0 +1,65 @@
+"""
+Time and peak memory of dataset statistics implementations
+Usage: PYTHONPATH=. python examples/benchmark_dataset_statistics.py [--samples 2000]
+"""
+import argparse
+
+import torch
+
+from deep_conmech.data.dataset_statistics import (
+    FeaturesStatistics,
+    FeaturesStatisticsPandas,
+    StreamingStatistics,
+)
+from examples.benchmark_helpers import measure_in_process
+
+
+def get_batches(samples: int, rows: int, columns: int):
+    generator = torch.Generator().manual_seed(0)
+    for _ in range(samples):
+        yield torch.randn((rows, columns), generator=generator)
+
+
+def two_pass(batches):
+    statistics = FeaturesStatistics()
+    for batch in batches():
+        statistics.set_mean_and_max_abs(batch)
+    statistics.finalaze_mean()
+    for batch in batches():
+        statistics.set_variance(batch)
+    statistics.finalize_variance()
+
+
+def concatenated(batches):
+    data = None
+    for batch in batches():
+        data = batch if data is None else torch.cat((data, batch))
+    FeaturesStatisticsPandas(label="", data=data).describe()
+
+
+def streaming(batches):
+    statistics = StreamingStatistics(bins=100, histogram_range=(-5.0, 5.0))
+    for batch in batches():
+        statistics.update(batch)
+    statistics.describe()
+
+
+def compute(method, samples: int, rows: int, columns: int):
+    method(lambda: get_batches(samples, rows, columns))
+
+
+def main(samples: int, rows: int, columns: int):
+    print(f"{samples} samples of {rows}x{columns} features")
+    print(f"{'method':>12} | {'time [s]':>8} | {'peak RSS increase [MB]':>22}")
+    for method in [two_pass, concatenated, streaming]:
+        _, elapsed, peak = measure_in_process(compute, method, samples, rows, columns)
+        print(f"{method.__name__:>12} | {elapsed:>8.2f} | {peak / 2**20:>22.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare dataset statistics")
+    parser.add_argument("--samples", type=int, default=2000)
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--columns", type=int, default=12)
+    args = parser.parse_args()
+    main(samples=args.samples, rows=args.rows, columns=args.columns)
@@ -0,0 +1,44 @@
+"""
+Time and peak memory of sparse edges features assembly against node count, with
+size of dense array of all features (as before) for comparison
+Usage: PYTHONPATH=. python examples/benchmark_edges_features.py [--sizes 10 20 40 100]
+"""
+import argparse
+
+from conmech.dynamics.factory.dynamics_factory_method import (
+    get_edges_features_matrices,
+)
+from examples.benchmark_helpers import get_kuhn_cube, measure_in_process
+
+FEATURE_MATRIX_COUNT = 14
+
+
+def assemble(elements, nodes):
+    edges_features_matrix, _, _ = get_edges_features_matrices(elements, nodes)
+    return edges_features_matrix[0].nnz
+
+
+def main(sizes):
+    # compile numba functions
+    nodes, elements = get_kuhn_cube(1)
+    get_edges_features_matrices(elements, nodes)
+    print(
+        f"{'nodes':>8} | {'nonzeros':>9} | {'time [s]':>8} | {'peak [MB]':>9} |"
+        f" {'bytes/node':>10} | {'dense [GB]':>10}"
+    )
+    for size in sizes:
+        nodes, elements = get_kuhn_cube(size)
+        nodes_count = len(nodes)
+        nnz, elapsed, peak = measure_in_process(assemble, elements, nodes)
+        dense = FEATURE_MATRIX_COUNT * nodes_count**2 * 8
+        print(
+            f"{nodes_count:>8} | {nnz:>9} | {elapsed:>8.2f} | {peak / 2**20:>9.0f} |"
+            f" {peak / nodes_count:>10.0f} | {dense / 2**30:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure edges features assembly")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 20, 40, 100])
+    args = parser.parse_args()
+    main(sizes=args.sizes)
@@ -0,0 +1,96 @@
+"""
+Latency of a single network simulation step: torch feature path vs jitted path
+Usage: PYTHONPATH=. python examples/benchmark_gnn_inference.py [--mesh-density 16]
+"""
+import argparse
+import time
+from functools import partial
+
+import jax
+import numpy as np
+
+from conmech.scenarios.scenarios import bunny_rotate_3d
+from conmech.simulations import simulation_runner
+from deep_conmech.data.dataset_statistics import StreamingStatistics
+from deep_conmech.graph import model_jax
+from deep_conmech.graph.model_jax import GraphModelDynamicJax
+from deep_conmech.graph.net_jax import CustomGraphNetJax
+from deep_conmech.training_config import get_train_config
+
+
+def get_scene(mesh_density: int):
+    config = get_train_config(shell=False, mode="net")
+    scenario = bunny_rotate_3d(
+        mesh_density=mesh_density, scale=1, final_time=1, simulation_config=config.sc
+    )
+    scene = GraphModelDynamicJax.get_scene_function(scenario=scenario, config=config)
+    simulation_runner.prepare(scenario, scene, 0, with_temperature=False)
+    scene.reduced.exact_acceleration = np.zeros_like(scene.reduced.initial_nodes)
+    energy_functions = simulation_runner.prepare_energy_functions(
+        scenario, scene, None, with_temperature=False, precompile=False
+    )
+    return scene, energy_functions
+
+
+def get_random_state(scene):
+    # statistics of a single sample are enough to initialize DataNorm
+    layers_list = [scene.get_features_data(layer_number=i) for i in range(2)]
+    sample_args = model_jax.prepare_input(model_jax.convert_to_jax(layers_list))
+    statistics = {
+        label: StreamingStatistics(label=label).update(data)
+        for label, data in [
+            ("sparse_nodes", sample_args.sparse_x),
+            ("sparse_edges", sample_args.sparse_edge_attr),
+            ("multilayer_edges", sample_args.multilayer_edge_attr),
+            ("dense_nodes", sample_args.dense_x),
+            ("dense_edges", sample_args.dense_edge_attr),
+        ]
+    }
+    params, batch_stats = CustomGraphNetJax(statistics=statistics).get_params(
+        sample_args, jax.random.PRNGKey(0)
+    )
+    return {"params": params, "batch_stats": batch_stats}
+
+
+def measure(step_function, steps: int):
+    # the same scene every step, jitted path compiles once per mesh
+    times = []
+    for _ in range(steps + 1):
+        start = time.perf_counter()
+        step_function()
+        times.append(time.perf_counter() - start)
+    return 1000 * np.median(times[1:])  # first step compiles
+
+
+def main(mesh_density: int, steps: int):
+    scene, energy_functions = get_scene(mesh_density)
+    state = get_random_state(scene)
+    print(f"Nodes: {scene.nodes_count} | Reduced nodes: {scene.reduced.nodes_count}")
+
+    calculator = measure(
+        partial(model_jax.solve_reduced, scene, energy_functions), steps
+    )
+    print(f"{'path':>8} | {'step [ms]':>9} | {'without calculator [ms]':>23}")
+    for name, solve_function in [
+        ("torch", partial(model_jax.solve, apply_net=model_jax.get_apply_net(state))),
+        ("jitted", model_jax.get_solve_jitted(state)),
+    ]:
+        step = measure(
+            partial(
+                solve_function,
+                scene=scene,
+                energy_functions=energy_functions,
+                initial_a=None,
+                initial_t=None,
+            ),
+            steps,
+        )
+        print(f"{name:>8} | {step:>9.1f} | {step - calculator:>23.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure network inference latency")
+    parser.add_argument("--mesh-density", type=int, default=16)
+    parser.add_argument("--steps", type=int, default=20)
+    args = parser.parse_args()
+    main(mesh_density=args.mesh_density, steps=args.steps)
@@ -0,0 +1,50 @@
+"""
+Helpers shared by benchmarks and tests
+"""
+import itertools
+import multiprocessing
+import resource
+import time
+
+import numpy as np
+
+
+def get_kuhn_grid(cells_counts, lengths=(1.0, 1.0, 1.0)):
+    """Box grid split into six tetrahedra per cube, without mesh generator"""
+    shape = tuple(count + 1 for count in cells_counts)
+    index = np.arange(np.prod(shape)).reshape(shape)
+    corners = index[:-1, :-1, :-1].reshape(-1)
+    steps = np.array([shape[1] * shape[2], shape[2], 1])
+    elements = []
+    for permutation in itertools.permutations(range(3)):
+        offsets = np.cumsum(np.concatenate(([0], steps[list(permutation)])))
+        elements.append(corners[:, None] + offsets)
+    nodes = np.stack(np.unravel_index(index.reshape(-1), shape), axis=1)
+    return nodes * np.array(lengths) / np.array(cells_counts), np.vstack(elements)
+
+
+def get_kuhn_cube(size: int):
+    return get_kuhn_grid((size, size, size))
+
+
+def run_measured(function, args, queue):
+    start_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    result = function(*args)
+    elapsed = time.perf_counter() - start
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    queue.put((result, elapsed, max(peak_kb - start_kb, 0) * 1024))
+
+
+def measure_in_process(function, *args, start_method: str = "fork"):
+    """
+    Result, time [s] and peak RSS increase [bytes] of function run in fresh
+    process, so peak memory is not shared between measurements
+    """
+    context = multiprocessing.get_context(start_method)
+    queue = context.Queue()
+    process = context.Process(target=run_measured, args=(function, args, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
@@ -0,0 +1,78 @@
+"""
+Startup cost of conmech entry points measured with python -X importtime
+Usage: PYTHONPATH=. python examples/benchmark_import_time.py [--repeats 5] [--top 15]
+"""
+import argparse
+from typing import Dict
+
+from conmech.helpers import lzh
+
+ENTRY_POINTS = [
+    "conmech.helpers.cmh",
+    "conmech.mesh.mesh_builders",
+    "conmech.simulations.simulation_runner",
+    "conmech.plotting.plotter_functions",
+    "deep_conmech.graph.model_jax",
+]
+
+OPTIONAL_BACKENDS = [
+    "dmsh",
+    "flax",
+    "gmsh",
+    "matplotlib",
+    "meshio",
+    "meshzoo",
+    "optax",
+    "orbax",
+    "pandas",
+    "pygmsh",
+    "tensorboard",
+    "tensorflow",
+    "torch",
+    "torch_geometric",
+]
+
+
+def get_best_import_times(module: str, repeats: int) -> Dict[str, lzh.ImportTime]:
+    best = None
+    for _ in range(repeats):
+        import_times = lzh.get_import_times(f"import {module}")
+        if (
+            best is None
+            or import_times[module].cumulative_us < best[module].cumulative_us
+        ):
+            best = import_times
+    return best
+
+
+def get_package_times(import_times: Dict[str, lzh.ImportTime]):
+    packages = {}
+    for name, import_time in import_times.items():
+        package = name.split(".")[0]
+        packages[package] = packages.get(package, 0) + import_time.self_us
+    return sorted(packages.items(), key=lambda item: item[1], reverse=True)
+
+
+def main(repeats: int, top: int):
+    for module in ENTRY_POINTS:
+        try:
+            import_times = get_best_import_times(module=module, repeats=repeats)
+        except Exception as error:  # pylint: disable=broad-exception-caught
+            print(f"{module}: import failed ({type(error).__name__})\n")
+            continue
+        loaded = sorted(
+            {name.split(".")[0] for name in import_times} & set(OPTIONAL_BACKENDS)
+        )
+        print(f"{module}: {import_times[module].cumulative_us / 1e3:.0f} ms")
+        print(f"  optional backends loaded: {', '.join(loaded) if loaded else '-'}")
+        for package, self_us in get_package_times(import_times)[:top]:
+            print(f"  {package:<24} {self_us / 1e3:>8.1f} ms")
+        print()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure import time of entry points")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+    main(repeats=args.repeats, top=args.top)
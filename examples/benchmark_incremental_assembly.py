@@ -0,0 +1,143 @@
+"""
+Time of matrices reassembly after nodes of some elements moved: full assembly with
+LHS and its Jacobi preconditioner (as before) and update of changed elements added
+to CSR values in place, preconditioner left to first use
+Usage: PYTHONPATH=. python examples/benchmark_incremental_assembly.py [--size 20]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from conmech.dynamics.factory.dynamics_factory_method import (
+    add_dynamics_update,
+    add_in_pattern,
+    complete_pattern,
+    get_changed_elements,
+    get_dynamics,
+    get_dynamics_update,
+    get_union_pattern,
+)
+from conmech.helpers import jxh
+from conmech.scenarios.scenarios import default_temp_body_prop
+from examples.benchmark_helpers import get_kuhn_cube
+
+TIME_STEP = 0.01
+
+
+def get_lhs(matrices):
+    return (
+        matrices.acceleration_operator
+        + (matrices.viscosity + matrices.elasticity * TIME_STEP) * TIME_STEP
+    )
+
+
+def move_nodes(nodes, size: int, fraction: float):
+    # nodes in corner region of cube, about fraction of elements touch them
+    moved_nodes = nodes.copy()
+    mask = np.all(nodes <= fraction ** (1 / 3) + 0.5 / size, axis=1)
+    moved_nodes[mask] += 0.1 / size * np.sin(7 * nodes[mask])
+    return moved_nodes
+
+
+def full_assembly(elements, nodes):
+    matrices = get_dynamics(
+        elements=elements,
+        nodes=nodes,
+        body_prop=default_temp_body_prop,
+        independent_indices=slice(len(nodes)),
+    )
+    lhs = get_lhs(matrices)
+    lhs_jax = jxh.to_jax_sparse(lhs)
+    preconditioner = jxh.to_jax_sparse(jxh.to_inverse_diagonal(lhs))
+    preconditioner.data.block_until_ready()
+    return lhs_jax
+
+
+def prepare_incremental(elements, nodes):
+    matrices = get_dynamics(
+        elements=elements,
+        nodes=nodes,
+        body_prop=default_temp_body_prop,
+        independent_indices=slice(len(nodes)),
+        complete_patterns=True,
+    )
+    lhs = complete_pattern(
+        get_lhs(matrices),
+        get_union_pattern(
+            matrices.acceleration_operator, matrices.viscosity, matrices.elasticity
+        ),
+    )
+    return matrices, lhs, jxh.to_jax_sparse(lhs)
+
+
+def incremental_assembly(elements, old_nodes, nodes, state):
+    matrices, lhs, lhs_jax = state
+    element_indices = get_changed_elements(elements, old_nodes, nodes)
+    update = get_dynamics_update(
+        elements=elements,
+        old_nodes=old_nodes,
+        nodes=nodes,
+        body_prop=default_temp_body_prop,
+        independent_indices=slice(len(nodes)),
+        element_indices=element_indices,
+    )
+    assert add_dynamics_update(matrices, update, element_indices)
+    assert add_in_pattern(lhs, get_lhs(update))
+    return jxh.replace_jax_sparse_data(lhs_jax, lhs)
+
+
+def main(size: int, fractions):
+    nodes, elements = get_kuhn_cube(size)
+    # compile numba functions
+    small_nodes, small_elements = get_kuhn_cube(2)
+    incremental_assembly(
+        small_elements,
+        small_nodes,
+        move_nodes(small_nodes, 2, 0.1),
+        prepare_incremental(small_elements, small_nodes),
+    )
+    print(f"{len(nodes)} nodes, {len(elements)} elements")
+    print(
+        f"{'changed':>7} | {'full [s]':>8} | {'incremental [s]':>15} |"
+        f" {'max lhs error':>13}"
+    )
+    for fraction in fractions:
+        moved_nodes = move_nodes(nodes, size, fraction)
+        changed = len(get_changed_elements(elements, nodes, moved_nodes))
+        state = prepare_incremental(elements, nodes)
+
+        start = time.perf_counter()
+        full_assembly(elements, moved_nodes)
+        full_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        updated_lhs_jax = incremental_assembly(elements, nodes, moved_nodes, state)
+        updated_lhs_jax.data.block_until_ready()
+        incremental_time = time.perf_counter() - start
+
+        error = np.abs(
+            state[1]
+            - get_lhs(
+                get_dynamics(
+                    elements=elements,
+                    nodes=moved_nodes,
+                    body_prop=default_temp_body_prop,
+                    independent_indices=slice(len(nodes)),
+                )
+            )
+        ).max()
+        print(
+            f"{changed / len(elements):>7.1%} | {full_time:>8.2f} |"
+            f" {incremental_time:>15.3f} | {error:>13.1e}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare matrices reassembly")
+    parser.add_argument("--size", type=int, default=20)
+    parser.add_argument(
+        "--fractions", type=float, nargs="+", default=[0.001, 0.01, 0.1, 0.3, 0.6]
+    )
+    args = parser.parse_args()
+    main(size=args.size, fractions=args.fractions)
@@ -0,0 +1,137 @@
+"""
+Loader throughput and memory of pickled and memory-mapped feature datasets
+Usage: PYTHONPATH=. python examples/benchmark_memmap_dataset.py [--samples 2000] [--workers 4]
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+
+import numpy as np
+import psutil
+
+from conmech.helpers import mmh, pkh
+
+
+def get_sample(random, nodes_count: int):
+    edges_count = 6 * nodes_count
+    return {
+        "layer_0.x": random.random((nodes_count, 16), dtype=np.float32),
+        "layer_0.edge_index": random.integers(0, nodes_count, (2, edges_count)),
+        "layer_0.edge_attr": random.random((edges_count, 12), dtype=np.float32),
+        "target.normalized_new_displacement": random.random((nodes_count, 2)),
+    }
+
+
+def write_datasets(directory: str, samples: int, nodes_count: int):
+    random = np.random.default_rng(0)
+    pickle_path = f"{directory}/DATASET.feat"
+    memmap_path = f"{directory}/DATASET.mmap"
+    for _ in range(samples):
+        sample = get_sample(
+            random, nodes_count=random.integers(nodes_count // 2, nodes_count)
+        )
+        pkh.append_data(data=sample, data_path=pickle_path, lock=None)
+        mmh.append_sample(sample=sample, data_path=memmap_path, lock=None)
+    return pickle_path, memmap_path
+
+
+def get_anonymous_memory():
+    # pages that cannot be shared with other workers (mapped files can)
+    with open("/proc/self/status", "r", encoding="utf-8") as file:
+        for line in file:
+            if line.startswith("RssAnon:"):
+                return int(line.split()[1]) * 1024
+    return 0
+
+
+def run_worker(mode, path, samples, worker_id, workers, epochs, queue):
+    # loading is part of the measured time, as in DataLoader worker_init_fn
+    start = time.perf_counter()
+    worker_range = range(worker_id, samples, workers)
+    if mode == "memmap":
+        reader = mmh.MemmapReader(path)
+        get_item = reader.__getitem__
+    else:
+        indices = pkh.get_all_indices(path)
+        if mode == "pickle in RAM":
+            with pkh.open_file_read(path) as file:
+                loaded = {
+                    i: pkh.load_byte_index(indices[i], file) for i in worker_range
+                }
+            get_item = loaded.__getitem__
+        else:
+
+            def get_item(index):
+                with pkh.open_file_read(path) as file:
+                    return pkh.load_byte_index(indices[index], file)
+
+    checksum = 0.0
+    for _ in range(epochs):
+        for index in worker_range:
+            # touch all values, as collate does
+            checksum += sum(float(value.sum()) for value in get_item(index).values())
+    elapsed = time.perf_counter() - start
+    rss = psutil.Process().memory_info().rss
+    queue.put((epochs * len(worker_range) / elapsed, rss, get_anonymous_memory()))
+
+
+def measure(mode: str, path: str, samples: int, workers: int, epochs: int):
+    context = multiprocessing.get_context("fork")
+    queue = context.Queue()
+    processes = [
+        context.Process(
+            target=run_worker,
+            args=(mode, path, samples, worker_id, workers, epochs, queue),
+        )
+        for worker_id in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    results = [queue.get() for _ in processes]
+    for process in processes:
+        process.join()
+    throughput = sum(result[0] for result in results)
+    rss = np.mean([result[1] for result in results])
+    anonymous = np.mean([result[2] for result in results])
+    return throughput, rss, anonymous
+
+
+def main(samples: int, nodes_count: int, workers: int, epochs: int):
+    with tempfile.TemporaryDirectory() as directory:
+        pickle_path, memmap_path = write_datasets(directory, samples, nodes_count)
+        print(
+            f"{samples} samples, {workers} workers, on disk: pickle"
+            + f" {os.path.getsize(pickle_path) / 1024**2:.0f} MB,"
+            + f" memmap {mmh.get_size(memmap_path) / 1024**2:.0f} MB"
+        )
+        print(
+            f"{'format':>14} | {'samples/s':>10} | {'RSS/worker [MB]':>15}"
+            + f" | {'anonymous/worker [MB]':>21}"
+        )
+        for mode, path in [
+            ("pickle", pickle_path),
+            ("pickle in RAM", pickle_path),
+            ("memmap", memmap_path),
+        ]:
+            throughput, rss, anonymous = measure(mode, path, samples, workers, epochs)
+            print(
+                f"{mode:>14} | {throughput:>10.0f} | {rss / 1024**2:>15.1f}"
+                + f" | {anonymous / 1024**2:>21.1f}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare feature dataset formats")
+    parser.add_argument("--samples", type=int, default=2000)
+    parser.add_argument("--nodes", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--epochs", type=int, default=3)
+    args = parser.parse_args()
+    main(
+        samples=args.samples,
+        nodes_count=args.nodes,
+        workers=args.workers,
+        epochs=args.epochs,
+    )
@@ -0,0 +1,86 @@
+"""
+Import time and peak memory of large binary MSH (tetrahedra) and STL (triangles) files
+read with meshio, with memory-mapped readers and from native cache
+Usage: PYTHONPATH=. python examples/benchmark_mesh_import.py [--size 80]
+"""
+import argparse
+import os
+import tempfile
+
+import meshio
+import numpy as np
+
+from conmech.mesh import mesh_reader
+from examples.benchmark_helpers import get_kuhn_cube, measure_in_process
+
+
+def get_height_field(size: int):
+    x, y = np.meshgrid(np.linspace(0, 1, size + 1), np.linspace(0, 1, size + 1))
+    nodes = np.stack((x, y, 0.1 * np.sin(6 * x) * np.cos(6 * y)), axis=-1)
+    index = np.arange((size + 1) ** 2).reshape(size + 1, size + 1)
+    corners = index[:-1, :-1].reshape(-1)
+    triangles = np.vstack(
+        (
+            np.stack((corners, corners + 1, corners + size + 2), axis=1),
+            np.stack((corners, corners + size + 2, corners + size + 1), axis=1),
+        )
+    )
+    return nodes.reshape(-1, 3), triangles
+
+
+def with_meshio(path):
+    mesh = meshio.read(path)
+    return mesh.points, mesh.cells_dict
+
+
+def with_reader(path):
+    mesh = mesh_reader.read(path)
+    return mesh.points, mesh.cells_dict
+
+
+def with_cache(path):
+    mesh = mesh_reader.read(path, cache=True)
+    # touch all data, as memory-mapped arrays are read lazily
+    return mesh.points.sum(), {name: c.sum() for name, c in mesh.cells_dict.items()}
+
+
+def main(size: int):
+    with tempfile.TemporaryDirectory() as directory:
+        nodes, elements = get_kuhn_cube(size)
+        msh_path = os.path.join(directory, "cube.msh")
+        meshio.write(
+            msh_path,
+            meshio.Mesh(nodes, [("tetra", elements)]),
+            file_format="gmsh22",
+            binary=True,
+        )
+        nodes, triangles = get_height_field(10 * size)
+        stl_path = os.path.join(directory, "surface.stl")
+        meshio.write(
+            stl_path, meshio.Mesh(nodes, [("triangle", triangles)]), binary=True
+        )
+
+        # compile hashing and fill cache before forking
+        for path in [msh_path, stl_path]:
+            mesh_reader.read(path, cache=True)
+
+        print(
+            f"{'file':>12} | {'elements':>9} | {'MB':>5} | {'method':>12} |"
+            f" {'time [s]':>8} | {'peak RSS increase [MB]':>22}"
+        )
+        for path, count in [(msh_path, len(elements)), (stl_path, len(triangles))]:
+            megabytes = os.path.getsize(path) / 2**20
+            for method in [with_meshio, with_reader, with_cache]:
+                _, elapsed, peak = measure_in_process(method, path)
+                print(
+                    f"{os.path.basename(path):>12} | {count:>9} | {megabytes:>5.0f} |"
+                    f" {method.__name__:>12} | {elapsed:>8.2f} |"
+                    f" {peak / 2**20:>22.0f}"
+                )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare mesh import")
+    parser.add_argument("--size", type=int, default=80)
+    args = parser.parse_args()
+    main(size=args.size)
@@ -0,0 +1,68 @@
+"""
+Meshes per second built in process, in fresh subprocess for every mesh (as before
+persistent pool) and by persistent pool of mesh workers with prefetching
+Usage: PYTHONPATH=. python examples/benchmark_mesh_pool.py [--meshes 32] [--workers 1 2 4]
+"""
+import argparse
+import time
+
+from conmech.mesh import mesh_builders, mesh_pool
+from conmech.properties.mesh_properties import MeshProperties
+
+# mesh types which do not need gmsh library
+MESH_TYPES = [("pygmsh_bunny_3d", 16), ("pygmsh_bunny_3d", 8), ("meshzoo_ball_3d", 8)]
+
+
+def get_mesh_props(meshes: int):
+    return [
+        MeshProperties(
+            dimension=3,
+            mesh_type=MESH_TYPES[index % len(MESH_TYPES)][0],
+            mesh_density=[MESH_TYPES[index % len(MESH_TYPES)][1]],
+            scale=[1.0],
+        )
+        for index in range(meshes)
+    ]
+
+
+def in_process(mesh_props, _workers):
+    for mesh_prop in mesh_props:
+        mesh_builders.build_initial_mesh(mesh_prop)
+
+
+def fresh_subprocess(mesh_props, _workers):
+    for mesh_prop in mesh_props:
+        with mesh_pool.MeshPool(workers=1) as pool:
+            pool.build_mesh(mesh_prop)
+
+
+def persistent_pool(mesh_props, workers):
+    with mesh_pool.MeshPool(workers=workers) as pool:
+        pool.prefetch(mesh_props)
+        for mesh_prop in mesh_props:
+            pool.build_mesh(mesh_prop)
+
+
+def main(meshes: int, workers_counts):
+    mesh_props = get_mesh_props(meshes)
+    print(f"{meshes} meshes: {', '.join(f'{t} {d}' for t, d in MESH_TYPES)}")
+    print(f"{'method':>16} | {'workers':>7} | {'time [s]':>8} | {'meshes/s':>8}")
+    runs = [(in_process, 1), (fresh_subprocess, 1)] + [
+        (persistent_pool, workers) for workers in workers_counts
+    ]
+    for method, workers in runs:
+        start = time.perf_counter()
+        method(mesh_props, workers)
+        elapsed = time.perf_counter() - start
+        print(
+            f"{method.__name__:>16} | {workers:>7} | {elapsed:>8.2f} |"
+            f" {meshes / elapsed:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare mesh generation")
+    parser.add_argument("--meshes", type=int, default=32)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+    main(meshes=args.meshes, workers_counts=args.workers)
@@ -0,0 +1,111 @@
+"""
+Scaling of unconnected nodes removal and directional edges extraction in Mesh
+setup against previous vstack and set based implementations
+Usage: PYTHONPATH=. python examples/benchmark_mesh_setup.py [--sizes 10 20 40 70]
+"""
+import argparse
+import time
+
+import numba
+import numpy as np
+
+from conmech.mesh import mesh
+from examples.benchmark_helpers import get_kuhn_cube
+
+
+@numba.njit
+def remove_unconnected_nodes_vstack_numba(nodes, elements):
+    nodes_count = len(nodes)
+    present_nodes = np.zeros(nodes_count, dtype=numba.boolean)
+    for element in elements:
+        for node in element:
+            present_nodes[node] = True
+
+    index = 0
+    removed = 0
+    while index < nodes_count:
+        if present_nodes[index + removed]:
+            index += 1
+        else:
+            nodes = np.vstack((nodes[:index], nodes[index + 1 :]))
+            for i in range(elements.shape[0]):
+                for j in range(elements.shape[1]):
+                    if elements[i, j] > index:
+                        elements[i, j] -= 1
+            removed += 1
+            nodes_count -= 1
+    return nodes, elements
+
+
+def get_directional_edges_set(elements):
+    size = elements.shape[1]
+    return np.array(
+        list(
+            {
+                (e[i], e[j])
+                for i, j in np.ndindex((size, size))
+                if j != i
+                for e in elements
+            }
+        ),
+        dtype=np.int64,
+    )
+
+
+def get_mesh(size: int, unconnected_proportion: float):
+    # Kuhn split of size^3 cube grid, unconnected nodes spread among mesh nodes
+    connected_nodes, elements = get_kuhn_cube(size)
+    nodes_count = int(len(connected_nodes) * (1 + unconnected_proportion))
+    connected = np.sort(
+        np.random.default_rng(0).choice(
+            nodes_count, len(connected_nodes), replace=False
+        )
+    )
+    return np.random.default_rng(1).uniform(size=(nodes_count, 3)), connected[elements]
+
+
+def measure(function, *args):
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+def main(sizes, unconnected_proportion: float, reference_limit: int):
+    small_nodes, small_elements = get_mesh(2, unconnected_proportion)
+    remove_unconnected_nodes_vstack_numba(small_nodes, small_elements.copy())
+    mesh.remove_unconnected_nodes_numba(small_nodes, small_elements.copy())
+
+    columns = ["remove vstack", "remove", "edges set", "edges"]
+    print(
+        f"{'nodes':>8} | {'elements':>8} | " + " | ".join(f"{c:>13}" for c in columns)
+    )
+    for size in sizes:
+        nodes, elements = get_mesh(size, unconnected_proportion)
+        times = {}
+        with_reference = len(nodes) <= reference_limit
+        if with_reference:
+            times["remove vstack"] = measure(
+                remove_unconnected_nodes_vstack_numba, nodes, elements.copy()
+            )
+        times["remove"] = measure(mesh.remove_unconnected_nodes_numba, nodes, elements)
+        _, elements = mesh.remove_unconnected_nodes_numba(nodes, elements)
+        if with_reference:
+            times["edges set"] = measure(get_directional_edges_set, elements)
+        times["edges"] = measure(
+            mesh.get_directional_edges, elements, elements.max() + 1
+        )
+        row = [f"{times[c]:>13.3f}" if c in times else f"{'-':>13}" for c in columns]
+        print(f"{len(nodes):>8} | {len(elements):>8} | " + " | ".join(row))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare mesh setup steps")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 20, 40, 70])
+    parser.add_argument("--unconnected-proportion", type=float, default=0.01)
+    parser.add_argument("--reference-limit", type=int, default=100000)
+    args = parser.parse_args()
+    main(
+        sizes=args.sizes,
+        unconnected_proportion=args.unconnected_proportion,
+        reference_limit=args.reference_limit,
+    )
@@ -0,0 +1,102 @@
+"""
+Bandwidth, envelope factorization fill and per-step solve time of LHS assembled on
+3D mesh with nodes in generator (shuffled) order and after bandwidth reduction
+Usage: PYTHONPATH=. python examples/benchmark_node_reordering.py [--size 16]
+"""
+import argparse
+import time
+
+import jax
+import numpy as np
+import scipy.sparse
+import scipy.sparse.linalg
+
+from conmech.dynamics.factory.dynamics_factory_method import get_dynamics
+from conmech.helpers import jxh
+from conmech.mesh.boundaries_description import BoundariesDescription
+from conmech.mesh.boundaries_factory import BoundariesFactory
+from conmech.scenarios.scenarios import default_body_prop_3d
+from examples.benchmark_helpers import get_kuhn_cube
+
+TIME_STEP = 0.01
+
+
+def get_shuffled_cube(size: int):
+    # Kuhn split of size^3 cube grid, nodes in random order as from mesh generator
+    nodes, elements = get_kuhn_cube(size)
+    order = np.random.default_rng(0).permutation(len(nodes))
+    return nodes[order], np.argsort(order)[elements]
+
+
+def get_lhs(nodes, elements):
+    matrices = get_dynamics(
+        elements=elements,
+        nodes=nodes,
+        body_prop=default_body_prop_3d,
+        independent_indices=slice(len(nodes)),
+    )
+    return (
+        matrices.acceleration_operator
+        + (matrices.viscosity + matrices.elasticity * TIME_STEP) * TIME_STEP
+    ).tocsr()
+
+
+def get_solve_time(lhs, repetitions: int):
+    rhs = np.random.default_rng(0).normal(size=lhs.shape[0])
+    start = time.perf_counter()
+    for _ in range(repetitions):
+        scipy.sparse.linalg.cg(lhs, rhs, maxiter=50)
+    return (time.perf_counter() - start) / repetitions
+
+
+def get_matvec_time(lhs, repetitions: int):
+    lhs_jax = jxh.to_jax_sparse(lhs)
+    matvec = jax.jit(lambda matrix, vector: matrix @ vector)
+    vector = np.ones(lhs.shape[0])
+    matvec(lhs_jax, vector).block_until_ready()
+    start = time.perf_counter()
+    for _ in range(repetitions):
+        matvec(lhs_jax, vector).block_until_ready()
+    return (time.perf_counter() - start) / repetitions
+
+
+def main(size: int, repetitions: int):
+    unordered_nodes, unordered_elements = get_shuffled_cube(size)
+    boundaries_description = BoundariesDescription(
+        contact=lambda x: x[2] == 0, dirichlet=lambda x: x[0] == 0
+    )
+    print(f"{len(unordered_nodes)} nodes, {len(unordered_elements)} elements")
+    print(
+        f"{'order':>9} | {'bandwidth':>9} | {'mean span':>9} | {'fill':>9} | "
+        f"{'CG [ms]':>8} | {'matvec [ms]':>11}"
+    )
+    for reduce_bandwidth in [False, True]:
+        nodes, elements, _ = BoundariesFactory.identify_boundaries_and_reorder_nodes(
+            unordered_nodes,
+            unordered_elements.copy(),
+            boundaries_description=boundaries_description,
+            reduce_bandwidth=reduce_bandwidth,
+        )
+        lhs = get_lhs(nodes, elements)
+        # node blocks of LHS for each dimension, as stacked by assembly
+        node_lhs = lhs[: len(nodes), : len(nodes)].tocoo()
+        span = np.abs(node_lhs.row - node_lhs.col)
+        # envelope (skyline) Cholesky factor keeps all entries from first nonzero
+        # of each row to diagonal, so its size over nnz of matrix measures fill
+        first_column = np.full(len(nodes), len(nodes))
+        np.minimum.at(first_column, node_lhs.row, node_lhs.col)
+        fill = np.sum(np.arange(len(nodes)) - first_column + 1) / node_lhs.nnz
+        print(
+            f"{'rcm' if reduce_bandwidth else 'generator':>9} | {span.max():>9} | "
+            f"{span.mean():>9.1f} | {fill:>9.1f} | "
+            f"{1000 * get_solve_time(lhs, repetitions):>8.1f} | "
+            f"{1000 * get_matvec_time(lhs, repetitions):>11.2f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare node orderings")
+    parser.add_argument("--size", type=int, default=16)
+    parser.add_argument("--repetitions", type=int, default=20)
+    args = parser.parse_args()
+    main(size=args.size, repetitions=args.repetitions)
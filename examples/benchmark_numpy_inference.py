@@ -0,0 +1,69 @@
+"""
+Latency, weights memory and accuracy of numpy inference engine with float32,
+float16 and int8 weights against float32 reference CustomGraphNetJax
+Usage: PYTHONPATH=. python examples/benchmark_numpy_inference.py [--repeats 20]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import jax
+import numpy as np
+
+from deep_conmech.graph import net_numpy
+from deep_conmech.graph.model_jax import save_numpy_model
+from deep_conmech.graph.net_jax import CustomGraphNetJax
+from examples.benchmark_padded_batching import get_random_batch, get_states
+
+
+def measure_latency(function, args, repeats: int):
+    jax.block_until_ready(function(args))
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        jax.block_until_ready(function(args))
+        times.append(time.perf_counter() - start)
+    return 1000 * np.median(times)
+
+
+def main(repeats: int, graphs_count: int):
+    args, _ = get_random_batch(np.random.default_rng(0), graphs_count)
+    state = jax.tree_util.tree_map(
+        lambda x: x[0], get_states(args, jax.local_devices()[:1])
+    )
+    variables = {"params": state.params, "batch_stats": state.batch_stats}
+    apply_net = jax.jit(lambda args: CustomGraphNetJax().apply(variables, args, False))
+    expected = np.array(apply_net(args))
+    weights_nbytes = sum(x.nbytes for x in jax.tree_util.tree_leaves(variables))
+
+    print(f"{len(args.dense_x)} dense nodes, {len(args.sparse_x)} sparse nodes")
+    print(
+        f"{'engine':>13} | {'latency [ms]':>12} | {'weights [MB]':>12}"
+        + f" | {'file [MB]':>9} | relative error"
+    )
+    latency = measure_latency(apply_net, args, repeats)
+    print(f"{'jax float32':>13} | {latency:>12.1f} | {weights_nbytes / 2**20:>12.2f}")
+    with tempfile.TemporaryDirectory() as directory:
+        for quantization in net_numpy.QUANTIZATIONS:
+            path = os.path.join(directory, f"{quantization}.npz")
+            save_numpy_model(
+                path, variables, CustomGraphNetJax(), quantization=quantization
+            )
+            net = net_numpy.GraphNetNumpy.load(path)
+            latency = measure_latency(net, args, repeats)
+            result = net(args)
+            error = np.linalg.norm(result - expected) / np.linalg.norm(expected)
+            print(
+                f"{'numpy ' + quantization:>13} | {latency:>12.1f}"
+                + f" | {net.nbytes / 2**20:>12.2f}"
+                + f" | {os.path.getsize(path) / 2**20:>9.2f} | {error:.2e}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure numpy inference engine")
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--graphs", type=int, default=1)
+    args = parser.parse_args()
+    main(repeats=args.repeats, graphs_count=args.graphs)
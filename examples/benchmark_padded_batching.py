@@ -0,0 +1,112 @@
+"""
+Compilations, padding overhead and throughput of GNN training steps
+on batches of varying sizes, with and without padding to size buckets
+Usage: PYTHONPATH=. python examples/benchmark_padded_batching.py [--batches 100]
+"""
+import argparse
+import time
+
+import flax.jax_utils
+import jax
+import numpy as np
+
+from conmech.helpers import jxh
+from deep_conmech.data.dataset_statistics import StreamingStatistics
+from deep_conmech.graph import padding
+from deep_conmech.graph.model_jax import apply_model_train, create_train_state
+from deep_conmech.graph.net_jax import GraphNetArguments
+from deep_conmech.training_config import CLOSEST_COUNT
+
+
+def get_edge_index(random, nodes_from: int, nodes_to: int, count: int):
+    return np.vstack(
+        (random.integers(0, nodes_from, count), random.integers(0, nodes_to, count))
+    )
+
+
+def get_random_batch(random, graphs_count: int):
+    # meshes of a batch differ in size, as in randomized training datasets
+    dense_nodes = int(random.integers(200, 400, graphs_count).sum())
+    sparse_nodes = dense_nodes // 8
+    sparse_edges, dense_edges = 12 * sparse_nodes, 12 * dense_nodes
+    args = GraphNetArguments(
+        sparse_x=random.normal(size=(sparse_nodes, 4)).astype(np.float32),
+        sparse_edge_attr=random.normal(size=(sparse_edges, 12)).astype(np.float32),
+        dense_x=random.normal(size=(dense_nodes, 4)).astype(np.float32),
+        dense_edge_attr=random.normal(size=(dense_edges, 4)).astype(np.float32),
+        multilayer_edge_attr=random.normal(
+            size=(dense_nodes * CLOSEST_COUNT, 4)
+        ).astype(np.float32),
+        sparse_edge_index=get_edge_index(
+            random, sparse_nodes, sparse_nodes, sparse_edges
+        ),
+        dense_edge_index=get_edge_index(random, dense_nodes, dense_nodes, dense_edges),
+        multilayer_edge_index=np.vstack(
+            (
+                random.integers(0, sparse_nodes, dense_nodes * CLOSEST_COUNT),
+                np.repeat(np.arange(dense_nodes), CLOSEST_COUNT),
+            )
+        ),
+    )
+    target = random.normal(size=(dense_nodes, 3)).astype(np.float32)
+    return args, target
+
+
+def get_states(args: GraphNetArguments, devices):
+    statistics = {
+        label: StreamingStatistics(label=label).update(data)
+        for label, data in [
+            ("sparse_nodes", args.sparse_x),
+            ("sparse_edges", args.sparse_edge_attr),
+            ("multilayer_edges", args.multilayer_edge_attr),
+            ("dense_nodes", args.dense_x),
+            ("dense_edges", args.dense_edge_attr),
+        ]
+    }
+    state = create_train_state(jax.random.PRNGKey(0), args, 1e-4, statistics)
+    return flax.jax_utils.replicate(state, devices=devices)
+
+
+def measure(batches, growth, devices):
+    states = get_states(batches[0][0], devices)
+    raport = padding.PaddingRaport()
+    jxh.MONITOR.reset()
+    start = time.perf_counter()
+    for args, target in batches:
+        all_args, all_targets = [args], [target]
+        if growth is not None:
+            all_args, all_targets = padding.pad_batch(
+                all_args, all_targets, growth, raport=raport
+            )
+        with jxh.MONITOR.calling("apply_model_train"):
+            states, losses = apply_model_train(
+                states,
+                jax.device_put_sharded(all_args, devices),
+                jax.device_put_sharded(all_targets, devices),
+            )
+        jax.block_until_ready(losses)
+    elapsed = time.perf_counter() - start
+    return jxh.MONITOR.compiles_count, raport.overhead, len(batches) / elapsed
+
+
+def main(batches_count: int, graphs_count: int, growths):
+    random = np.random.default_rng(0)
+    batches = [get_random_batch(random, graphs_count) for _ in range(batches_count)]
+    devices = jax.local_devices()[:1]
+    jxh.MONITOR.start()
+    print(f"{'growth':>6} | {'compiles':>8} | {'padding':>7} | {'batches/s':>9}")
+    for growth in [None, *growths]:
+        compiles, overhead, throughput = measure(batches, growth, devices)
+        print(
+            f"{str(growth):>6} | {compiles:>8} | {100 * overhead:>6.1f}%"
+            + f" | {throughput:>9.2f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure padded batching")
+    parser.add_argument("--batches", type=int, default=100)
+    parser.add_argument("--graphs", type=int, default=4)
+    parser.add_argument("--growths", type=float, nargs="+", default=[1.1, 1.25, 1.5])
+    args = parser.parse_args()
+    main(batches_count=args.batches, graphs_count=args.graphs, growths=args.growths)
@@ -0,0 +1,89 @@
+"""
+Time and peak memory of full SVD and streaming PCA on displacement data read from disk
+Usage: PYTHONPATH=. python examples/benchmark_pca.py [--scenes 2000 --nodes 5000]
+"""
+import argparse
+import os
+import tempfile
+
+import numpy as np
+
+from conmech.helpers import pca
+from examples.benchmark_helpers import measure_in_process
+
+
+def write_data(path: str, scenes: int, features: int, rank: int, chunk_size: int):
+    # low rank displacements with noise, written in chunks
+    random = np.random.default_rng(0)
+    modes = random.normal(size=(rank, features)).astype(np.float32)
+    data = np.lib.format.open_memmap(
+        path, mode="w+", dtype=np.float32, shape=(scenes, features)
+    )
+    for start in range(0, scenes, chunk_size):
+        rows = min(chunk_size, scenes - start)
+        weights = random.normal(size=(rows, rank)).astype(np.float32)
+        noise = 0.01 * random.normal(size=(rows, features)).astype(np.float32)
+        data[start : start + rows] = weights @ modes + noise
+    data.flush()
+
+
+def full(path: str, latent_dim: int, chunk_size: int):
+    _ = chunk_size
+    return pca.get_projection(np.load(path), latent_dim=latent_dim)
+
+
+def streaming(path: str, latent_dim: int, chunk_size: int):
+    data = np.load(path, mmap_mode="r")
+    chunks = (
+        data[start : start + chunk_size] for start in range(0, len(data), chunk_size)
+    )
+    return pca.get_projection_streaming(chunks, latent_dim=latent_dim)
+
+
+def get_error(path: str, projection, chunk_size: int):
+    data = np.load(path, mmap_mode="r")
+    squared_error, squared_norm = 0.0, 0.0
+    for start in range(0, len(data), chunk_size):
+        chunk = np.asarray(data[start : start + chunk_size]).T
+        latent = pca.project_to_latent(projection, chunk)
+        squared_error += np.sum(
+            (pca.project_from_latent(projection, latent) - chunk) ** 2
+        )
+        squared_norm += np.sum(chunk**2)
+    return np.sqrt(squared_error / squared_norm)
+
+
+def main(scenes: int, nodes: int, latent_dim: int, chunk_size: int):
+    features = 3 * nodes
+    print(f"{scenes} scenes of {nodes} nodes, {latent_dim} components")
+    print(
+        f"{'method':>9} | {'time [s]':>8} | {'peak RSS increase [MB]':>22}"
+        + " | relative error"
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "data.npy")
+        write_data(path, scenes, features, rank=latent_dim // 2, chunk_size=chunk_size)
+        for method in [full, streaming]:
+            projection, elapsed, peak = measure_in_process(
+                method, path, latent_dim, chunk_size, start_method="spawn"
+            )
+            error = get_error(path, projection, chunk_size)
+            print(
+                f"{method.__name__:>9} | {elapsed:>8.2f} | {peak / 2**20:>22.0f}"
+                + f" | {error:.2e}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare PCA implementations")
+    parser.add_argument("--scenes", type=int, default=2000)
+    parser.add_argument("--nodes", type=int, default=5000)
+    parser.add_argument("--latent-dim", type=int, default=200)
+    parser.add_argument("--chunk-size", type=int, default=200)
+    args = parser.parse_args()
+    main(
+        scenes=args.scenes,
+        nodes=args.nodes,
+        latent_dim=args.latent_dim,
+        chunk_size=args.chunk_size,
+    )
@@ -0,0 +1,90 @@
+"""
+Time of field transfer after remeshing against node count: new nodes located with
+scan over all old elements (as before spatial index) and with spatial hash, fields
+(displacement, velocity, temperature) moved by one sparse product; mesh of next
+size and reordered copy of old mesh (all nodes reused)
+Usage: PYTHONPATH=. python examples/benchmark_remesh_transfer.py [--sizes 8 16 32]
+"""
+import argparse
+import itertools
+import time
+
+import numpy as np
+
+from conmech.helpers.interpolation_helpers import get_barycentric_weights
+from conmech.mesh import remesher
+from examples.benchmark_helpers import get_kuhn_cube
+
+
+def scanning_elements(old_nodes, old_elements, new_nodes, fields):
+    element_nodes = old_nodes[old_elements]
+    new_fields = [np.zeros((len(new_nodes), *field.shape[1:])) for field in fields]
+    for index, node in enumerate(new_nodes):
+        weights = get_barycentric_weights(
+            query_nodes=np.repeat(node[None], len(old_elements), axis=0),
+            element_nodes=element_nodes,
+        )
+        element = np.argmax(weights.min(axis=1))
+        for field, new_field in zip(fields, new_fields):
+            new_field[index] = weights[element] @ field[old_elements[element]]
+    return new_fields
+
+
+def spatial_index(old_nodes, old_elements, new_nodes, fields):
+    transfer = remesher.get_field_transfer(old_nodes, old_elements, new_nodes)
+    return remesher.transfer_fields(transfer, fields)
+
+
+def get_fields(nodes):
+    displacement = 0.01 * np.sin(nodes)
+    velocity = np.cos(nodes)
+    temperature = nodes[:, :1] ** 2
+    return [displacement, velocity, temperature]
+
+
+def measure(method, old_nodes, old_elements, new_nodes):
+    fields = get_fields(old_nodes)
+    start = time.perf_counter()
+    new_fields = method(old_nodes, old_elements, new_nodes, fields)
+    elapsed = time.perf_counter() - start
+    error = max(
+        np.abs(new - expected).max()
+        for new, expected in zip(new_fields, get_fields(new_nodes))
+    )
+    return elapsed, error
+
+
+def main(sizes, scan_limit: int):
+    # compile numba functions
+    spatial_index(
+        *get_kuhn_cube(2), get_kuhn_cube(3)[0], get_fields(get_kuhn_cube(2)[0])
+    )
+    print(
+        f"{'case':>9} | {'old nodes':>9} | {'new nodes':>9} | {'method':>17} |"
+        f" {'time [s]':>8} | {'max error':>9}"
+    )
+    for size in sizes:
+        old_nodes, old_elements = get_kuhn_cube(size)
+        order = np.random.default_rng(0).permutation(len(old_nodes))
+        cases = [
+            ("next size", get_kuhn_cube(size + 1)[0]),
+            ("reordered", old_nodes[order]),
+        ]
+        for (case, new_nodes), method in itertools.product(
+            cases, [scanning_elements, spatial_index]
+        ):
+            if method is scanning_elements and len(new_nodes) > scan_limit:
+                continue
+            elapsed, error = measure(method, old_nodes, old_elements, new_nodes)
+            print(
+                f"{case:>9} | {len(old_nodes):>9} | {len(new_nodes):>9} |"
+                f" {method.__name__:>17} | {elapsed:>8.3f} | {error:>9.2e}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare remeshing field transfer")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[8, 16, 32])
+    parser.add_argument("--scan-limit", type=int, default=6000)
+    args = parser.parse_args()
+    main(sizes=args.sizes, scan_limit=args.scan_limit)
@@ -0,0 +1,93 @@
+"""
+Link setup and per-step lift_data / lower_data time of SceneLayers with link cache
+and sparse interpolation matrices
+Usage: PYTHONPATH=. python examples/benchmark_scene_layers.py [--mesh-density 16]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from conmech.helpers import interpolation_helpers
+from conmech.scenarios.scenarios import bunny_rotate_3d
+from deep_conmech.scene import scene_layers
+from deep_conmech.scene.scene_layers import SceneLayers
+from deep_conmech.training_config import get_train_config
+
+
+def get_scene(mesh_density: int):
+    config = get_train_config(shell=False, mode="skinning")
+    scenario = bunny_rotate_3d(
+        mesh_density=mesh_density, scale=1, final_time=1, simulation_config=config.sc
+    )
+    start = time.perf_counter()
+    scene = SceneLayers(
+        mesh_prop=scenario.mesh_prop,
+        body_prop=scenario.body_prop,
+        obstacle_prop=scenario.obstacle_prop,
+        schedule=scenario.schedule,
+        simulation_config=scenario.simulation_config,
+        create_in_subprocess=False,
+    )
+    return scene, time.perf_counter() - start
+
+
+def measure_links(scene: SceneLayers, steps: int):
+    times = []
+    for _ in range(steps):
+        start = time.perf_counter()
+        scene.set_reduced()
+        times.append(time.perf_counter() - start)
+    return 1000 * np.median(times)
+
+
+def measure_step(scene: SceneLayers, steps: int, with_matrix: bool):
+    link_from, link_to = scene.all_layers[1].from_base, scene.all_layers[1].to_base
+    values = np.random.default_rng(0).normal(size=(scene.nodes_count, 3))
+    times = []
+    for _ in range(steps):
+        start = time.perf_counter()
+        if with_matrix:
+            reduced_values = scene.lift_data(values)
+            scene.lower_data(reduced_values)
+        else:
+            reduced_values = interpolation_helpers.approximate_internal(
+                values, link_from.closest_nodes, link_from.closest_weights
+            )
+            interpolation_helpers.approximate_internal(
+                reduced_values, link_to.closest_nodes, link_to.closest_weights
+            )
+        times.append(time.perf_counter() - start)
+    return 1000 * np.median(times)
+
+
+def main(mesh_density: int, steps: int):
+    scene, first_time = get_scene(mesh_density)
+    print(f"Nodes: {scene.nodes_count} | Reduced nodes: {scene.reduced.nodes_count}")
+    _, second_time = get_scene(mesh_density)
+    print(f"Scene setup: {first_time:.2f} s first, {second_time:.2f} s cached links")
+
+    scene_layers.LINK_CACHE.entries.clear()
+    uncached = measure_links(scene, steps=1)
+    cached = measure_links(scene, steps)
+    print(f"set_reduced: {uncached:.1f} ms uncached, {cached:.1f} ms cached")
+    print(
+        f"Link cache: {scene_layers.LINK_CACHE.hits} hits,"
+        + f" {scene_layers.LINK_CACHE.misses} misses,"
+        + f" {scene_layers.LINK_CACHE.requeried_nodes} requeried nodes"
+    )
+
+    gathered = measure_step(scene, steps, with_matrix=False)
+    sparse = measure_step(scene, steps, with_matrix=True)
+    print(
+        f"lift_data + lower_data: {gathered:.2f} ms gathered,"
+        + f" {sparse:.2f} ms sparse matrix ({gathered / sparse:.1f}x)"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure SceneLayers links")
+    parser.add_argument("--mesh-density", type=int, default=16)
+    parser.add_argument("--steps", type=int, default=20)
+    args = parser.parse_args()
+    main(mesh_density=args.mesh_density, steps=args.steps)
@@ -0,0 +1,134 @@
+"""
+Per-step self-collision detection time on 3D bar closing into ring (and twisted),
+full interpolate_nodes query against broadphase rebuilt every step and broadphase
+with persistent hash and candidate pairs reused within skin
+Usage: PYTHONPATH=. python examples/benchmark_self_collisions.py [--density 8]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from conmech.helpers.interpolation_helpers import interpolate_nodes
+from conmech.helpers.spatial_hashing import get_spacing
+from conmech.mesh.boundaries_factory import get_boundary_surfaces
+from conmech.scene.self_collisions import SelfCollisionBroadphase
+from conmech.state.body_position import get_boundary_normals_jit
+from examples.benchmark_helpers import get_kuhn_grid
+
+LENGTH = 4.0
+
+
+def get_bar(density: int):
+    # Kuhn split of hexahedral grid into tetrahedra, boundary nodes first
+    lengths = [LENGTH, 0.5, 0.25]
+    nodes, elements = get_kuhn_grid(
+        [int(size * density) for size in lengths], lengths=lengths
+    )
+    *_, boundary_indices = get_boundary_surfaces(elements.copy())
+    internal_indices = np.setdiff1d(np.arange(len(nodes)), boundary_indices)
+    permutation = np.concatenate((boundary_indices, internal_indices))
+    elements = np.argsort(permutation)[elements]
+    surfaces, internal, _ = get_boundary_surfaces(elements.copy())
+    return nodes[permutation], elements, surfaces, internal, len(boundary_indices)
+
+
+def deform(nodes, bend_angle: float, twist_angle: float):
+    # twist around bar axis, then roll bar around y axis into ring
+    psi = twist_angle * nodes[:, 0] / LENGTH
+    y, z = nodes[:, 1] - 0.25, nodes[:, 2] - 0.125
+    y, z = y * np.cos(psi) - z * np.sin(psi), y * np.sin(psi) + z * np.cos(psi)
+    if bend_angle == 0:
+        return np.stack((nodes[:, 0], y, z), axis=1)
+    radius = LENGTH / bend_angle
+    phi = bend_angle * nodes[:, 0] / LENGTH
+    distance = radius + z
+    return np.stack(
+        (distance * np.sin(phi), y, radius - distance * np.cos(phi)), axis=1
+    )
+
+
+def get_frames(nodes, steps: int, twist: bool):
+    # closing phase of fold, in which ends of bar come into contact
+    for progress in np.linspace(0.9, 1.02, steps):
+        yield deform(
+            nodes,
+            bend_angle=2 * np.pi * progress,
+            twist_angle=0.5 * np.pi * progress if twist else 0.0,
+        )
+
+
+def run_interpolation(frames, elements, boundary_nodes_count, **_):
+    for moved_nodes, _ in frames:
+        interpolate_nodes(
+            base_nodes=moved_nodes,
+            base_elements=elements,
+            query_nodes=moved_nodes[:boundary_nodes_count],
+        )
+    return {}
+
+
+def run_broadphase(frames, surfaces, boundary_nodes_count, max_dist, skin, **_):
+    broadphase = SelfCollisionBroadphase(
+        surfaces, boundary_nodes_count, max_dist=max_dist, skin=skin
+    )
+    pairs_count = 0
+    for moved_nodes, normals in frames:
+        pairs = broadphase.get_pairs(moved_nodes[:boundary_nodes_count], normals)
+        pairs_count += int(pairs.mask.sum())
+    return dict(rebuilds=broadphase.rebuilds, pairs=pairs_count / len(frames))
+
+
+def main(density: int, steps: int):
+    nodes, elements, surfaces, internal, boundary_nodes_count = get_bar(density)
+    max_dist = get_spacing(nodes, elements)
+    print(f"{len(nodes)} nodes, {boundary_nodes_count} boundary, {steps} steps")
+    print(
+        f"{'motion':>10} | {'method':>13} | {'ms / step':>9} | "
+        f"{'rebuilds':>8} | {'pairs':>6}"
+    )
+    methods = {
+        "interpolation": run_interpolation,
+        "rebuild": lambda **kwargs: run_broadphase(skin=0.0, **kwargs),
+        "coherent": lambda **kwargs: run_broadphase(skin=max_dist, **kwargs),
+    }
+    for motion in ["fold", "twist+fold"]:
+        frames = [
+            (
+                moved_nodes,
+                np.array(
+                    get_boundary_normals_jit(
+                        moved_nodes=moved_nodes,
+                        boundary_surfaces=surfaces,
+                        boundary_internal_indices=internal,
+                        considered_nodes_count=boundary_nodes_count,
+                    )
+                ),
+            )
+            for moved_nodes in get_frames(nodes, steps, twist=motion != "fold")
+        ]
+        for name, method in methods.items():
+            kwargs = dict(
+                elements=elements,
+                surfaces=surfaces,
+                boundary_nodes_count=boundary_nodes_count,
+                max_dist=max_dist,
+            )
+            method(frames=frames[:2], **kwargs)
+            start = time.perf_counter()
+            result = method(frames=frames, **kwargs)
+            elapsed = 1000 * (time.perf_counter() - start) / steps
+            rebuilds = result.get("rebuilds", steps)
+            pairs = result.get("pairs", float("nan"))
+            print(
+                f"{motion:>10} | {name:>13} | {elapsed:>9.2f} | "
+                f"{rebuilds:>8} | {pairs:>6.0f}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare self-collision detection")
+    parser.add_argument("--density", type=int, default=8)
+    parser.add_argument("--steps", type=int, default=200)
+    args = parser.parse_args()
+    main(density=args.density, steps=args.steps)
@@ -0,0 +1,80 @@
+"""
+Dense and sparse legacy statements compared on growing 2D meshes
+Usage: PYTHONPATH=. python examples/benchmark_sparse_statements.py [--sizes 4 8 16 32]
+"""
+import argparse
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+from conmech.dynamics.statement import Variables
+from conmech.mesh.boundaries_description import BoundariesDescription
+from conmech.scenarios.problems import Static
+from conmech.simulations.problem_solver import ProblemSolver
+from conmech.simulations.problem_solver import Static as StaticProblem
+from examples.p_slope_contact_law import make_slope_contact_law
+
+
+@dataclass()
+class StaticSetup(Static):
+    grid_height: ... = 1.0
+    elements_number: ... = (4, 8)
+    mu_coef: ... = 4
+    la_coef: ... = 4
+    contact_law: ... = make_slope_contact_law(slope=1)
+
+    @staticmethod
+    def inner_forces(x):
+        return np.array([-0.2, -0.2])
+
+    @staticmethod
+    def outer_forces(x):
+        return np.array([0, 0])
+
+    @staticmethod
+    def friction_bound(u_nu):
+        return 0
+
+    boundaries: ... = BoundariesDescription(
+        contact=lambda x: x[1] == 0, dirichlet=lambda x: x[0] == 0
+    )
+
+
+def measure(size: int, sparse: bool, repeats: int):
+    ProblemSolver.sparse_statements = sparse
+    setup = StaticSetup(mesh_type="cross", elements_number=(size, 2 * size))
+    runner = StaticProblem(setup, solving_method="schur")
+    solver = runner.step_solver
+    variables = Variables(displacement=solver.u_vector, time_step=solver.time_step)
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        solver.statement.update(variables)
+    update_time = (time.perf_counter() - start) / repeats
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        solver.recalculate_displacement()
+    schur_time = (time.perf_counter() - start) / repeats
+    return runner.body.nodes_count, update_time, schur_time
+
+
+def main(sizes, repeats: int):
+    print(f"{'nodes':>7} | {'mode':>6} | {'update [ms]':>11} | {'schur [ms]':>11}")
+    for size in sizes:
+        for sparse in (False, True):
+            nodes_count, update_time, schur_time = measure(size, sparse, repeats)
+            mode = "sparse" if sparse else "dense"
+            print(
+                f"{nodes_count:>7} | {mode:>6} | {1e3 * update_time:>11.3f}"
+                + f" | {1e3 * schur_time:>11.3f}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare dense and sparse statements")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[4, 8, 16, 32])
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+    main(sizes=args.sizes, repeats=args.repeats)
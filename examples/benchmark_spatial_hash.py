@@ -0,0 +1,112 @@
+"""
+Time and accuracy of interpolate_nodes (Cython and numba spatial hash) and of the
+jitted JAX hash query against brute force, for 2D and 3D meshes of growing density
+Usage: PYTHONPATH=. python examples/benchmark_spatial_hash.py [--densities 8 16 32]
+"""
+import argparse
+import time
+
+import numpy as np
+import scipy.spatial
+
+from conmech.helpers import interpolation_helpers, spatial_hashing
+
+
+def get_mesh(dim: int, density: int):
+    random = np.random.default_rng(0)
+    axis = np.linspace(0, 1, density)
+    grid = np.stack(np.meshgrid(*[axis] * dim), axis=-1).reshape(-1, dim)
+    nodes = grid + random.uniform(-0.2, 0.2, size=grid.shape) / density
+    query_nodes = random.uniform(0, 1, size=(3 * len(nodes) // 2, dim))
+    return nodes, scipy.spatial.Delaunay(nodes), query_nodes
+
+
+def measure(function, repetitions: int = 3):
+    function()
+    start = time.perf_counter()
+    for _ in range(repetitions):
+        result = function()
+    return (time.perf_counter() - start) / repetitions, result
+
+
+def get_accuracy(delaunay, query_nodes, closest_nodes):
+    element_ids = delaunay.find_simplex(query_nodes)
+    inside = element_ids >= 0
+    expected = np.sort(delaunay.simplices[element_ids[inside]], axis=1)
+    return np.mean(np.all(np.sort(closest_nodes[inside], axis=1) == expected, axis=1))
+
+
+def get_skinning_methods():
+    methods = {"numba": interpolation_helpers.get_interlayer_data_skinning_numba}
+    try:
+        # pylint: disable=import-outside-toplevel,unused-import,no-name-in-module
+        from cython_modules import weights  # noqa: F401
+
+        methods["cython"] = interpolation_helpers.get_interlayer_data_skinning_cython
+    except ImportError:
+        print("cython_modules.weights is not built, skipping Cython")
+    return methods
+
+
+def query_brute_force(nodes, query_nodes, max_dist):
+    distances = scipy.spatial.distance.cdist(query_nodes, nodes)
+    return [np.flatnonzero(row <= max_dist) for row in distances]
+
+
+def query_jax(nodes, query_nodes, max_dist, spacing):
+    table = spatial_hashing.get_hash_table(nodes, spacing)
+    return spatial_hashing.query_hasher_jax(
+        query_nodes.astype(np.float32),
+        max_dist,
+        table.nodes,
+        table.cell_starts,
+        table.node_cell,
+        table.spacing,
+        cells_radius=spatial_hashing.get_cells_radius(max_dist, spacing),
+        max_cell_size=table.max_cell_size,
+    ).block_until_ready()
+
+
+def main(densities):
+    methods = get_skinning_methods()
+    print(
+        f"{'dim':>3} | {'nodes':>7} | {'method':>11} | {'time [ms]':>9} | {'accuracy':>8}"
+    )
+    for dim in [2, 3]:
+        for density in densities:
+            nodes, delaunay, query_nodes = get_mesh(dim, density)
+            for name, method in methods.items():
+                elapsed, (closest_nodes, _, _) = measure(
+                    lambda method=method: method(
+                        base_nodes=nodes,
+                        base_elements=delaunay.simplices,
+                        interpolated_nodes=query_nodes,
+                    )
+                )
+                accuracy = get_accuracy(delaunay, query_nodes, closest_nodes)
+                print(
+                    f"{dim:>3} | {len(nodes):>7} | {name:>11} | "
+                    f"{1000 * elapsed:>9.1f} | {accuracy:>8.3f}"
+                )
+
+            spacing = spatial_hashing.get_spacing(nodes, delaunay.simplices)
+            max_dist = 1.5 * spacing
+            for name, query in [
+                (
+                    "brute force",
+                    lambda: query_brute_force(nodes, query_nodes, max_dist),
+                ),
+                ("jax query", lambda: query_jax(nodes, query_nodes, max_dist, spacing)),
+            ]:
+                elapsed, _ = measure(query)
+                print(
+                    f"{dim:>3} | {len(nodes):>7} | {name:>11} | "
+                    f"{1000 * elapsed:>9.1f} | {'-':>8}"
+                )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare spatial hash queries")
+    parser.add_argument("--densities", type=int, nargs="+", default=[8, 16, 32])
+    args = parser.parse_args()
+    main(densities=args.densities)
@@ -0,0 +1,53 @@
+"""
+Per-step graph features construction time with and without static features cache
+Usage: PYTHONPATH=. python examples/benchmark_static_features.py [--mesh-density 16]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from conmech.scenarios.scenarios import bunny_rotate_3d
+from deep_conmech.graph.model_jax import GraphModelDynamicJax
+from deep_conmech.scene.scene_input import StaticFeatures
+from deep_conmech.training_config import get_train_config
+
+
+def get_scene(mesh_density: int):
+    config = get_train_config(shell=False, mode="net")
+    scenario = bunny_rotate_3d(
+        mesh_density=mesh_density, scale=1, final_time=1, simulation_config=config.sc
+    )
+    scene = GraphModelDynamicJax.get_scene_function(scenario=scenario, config=config)
+    scene.reduced.exact_acceleration = np.zeros_like(scene.reduced.initial_nodes)
+    return scene
+
+
+def measure(scene, steps: int, cached: bool):
+    times = []
+    for _ in range(steps + 1):
+        if not cached:
+            scene.static_features = StaticFeatures()
+        start = time.perf_counter()
+        for layer_number in range(2):
+            scene.get_features_data(layer_number=layer_number)
+        times.append(time.perf_counter() - start)
+    return 1000 * np.median(times[1:])  # first step compiles
+
+
+def main(mesh_density: int, steps: int):
+    scene = get_scene(mesh_density)
+    print(f"Nodes: {scene.nodes_count} | Reduced nodes: {scene.reduced.nodes_count}")
+    uncached = measure(scene, steps, cached=False)
+    cached = measure(scene, steps, cached=True)
+    print(f"Features without cache: {uncached:.1f} ms")
+    print(f"Features with cache: {cached:.1f} ms ({uncached / cached:.2f}x)")
+    print(f"Cache size: {scene.static_features.nbytes / 1024 ** 2:.2f} MB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure graph features construction")
+    parser.add_argument("--mesh-density", type=int, default=16)
+    parser.add_argument("--steps", type=int, default=50)
+    args = parser.parse_args()
+    main(mesh_density=args.mesh_density, steps=args.steps)
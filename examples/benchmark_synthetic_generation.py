@@ -0,0 +1,62 @@
+"""
+Scaling of synthetic training data generation with number of workers
+Usage: PYTHONPATH=. python examples/benchmark_synthetic_generation.py [--workers 1 2 4 8]
+"""
+import argparse
+import filecmp
+import tempfile
+import time
+
+from deep_conmech.data.synthetic_dataset import SyntheticDataset
+from deep_conmech.training_config import TrainingData, get_train_config
+
+
+def measure(directory: str, workers: int, samples: int, mesh_density: int):
+    config = get_train_config(shell=False, mode="normal")
+    config.td = TrainingData(dataset_size=samples, mesh_density=mesh_density)
+    config.datasets_main_path = f"{directory}/workers_{workers}"
+    config.synthetic_generation_workers = workers
+    config.generate_data_in_subprocesses = True
+    dataset = SyntheticDataset(
+        description="benchmark",
+        load_data_to_ram=False,
+        randomize=True,
+        with_scenes_file=True,
+        config=config,
+        rank=0,
+        world_size=1,
+        device_count=1,
+    )
+    dataset.create_folders()
+
+    start = time.perf_counter()
+    dataset.generate_data()
+    return samples / (time.perf_counter() - start), dataset.scenes_data_path
+
+
+def main(workers_list, samples: int, mesh_density: int):
+    print(f"{'workers':>7} | {'samples/s':>9} | {'speedup':>7} | identical")
+    with tempfile.TemporaryDirectory() as directory:
+        reference_throughput, reference_path = None, None
+        for workers in workers_list:
+            throughput, path = measure(directory, workers, samples, mesh_density)
+            if reference_path is None:
+                reference_throughput, reference_path = throughput, path
+            identical = filecmp.cmp(path, reference_path, shallow=False)
+            print(
+                f"{workers:>7} | {throughput:>9.2f}"
+                + f" | {throughput / reference_throughput:>7.2f} | {identical}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure synthetic data generation")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--samples", type=int, default=64)
+    parser.add_argument("--mesh-density", type=int, default=8)
+    args = parser.parse_args()
+    main(
+        workers_list=args.workers,
+        samples=args.samples,
+        mesh_density=args.mesh_density,
+    )
@@ -50,6 +50,10 @@ class TPSlopeContactLaw(make_slope_contact_law(slope=1e1)):
     def temp_exchange(temp):  # potential  # TODO # 48
         return 0 * temp
 
+    @staticmethod
+    def temp_exchange_derivative(temp):
+        return 0 * temp
+
     @staticmethod
     def h_temp(u_tau):  # potential  # TODO # 48
         return 0 * u_tau
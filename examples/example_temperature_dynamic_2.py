@@ -82,6 +82,16 @@ class TPSlopeContactLaw(make_slope_contact_law(slope=1e1)):
     def potential_tangential_direction(u_tau: np.ndarray) -> float:
         return np.log(np.sum(u_tau * u_tau) ** 0.5 + 1)
 
+    @staticmethod
+    def regularized_subderivative_tangential_direction(
+        u_tau: np.ndarray, v_tau: np.ndarray, rho=1e-7
+    ) -> float:
+        regularization = 1 / (
+            (np.sum(u_tau * u_tau) ** 0.5 + 1)
+            * np.sqrt(np.sum(u_tau * u_tau) + rho**2)
+        )
+        return regularization * np.sum(u_tau * v_tau)
+
     @staticmethod
     def h_nu(uN, t):
         g_t = 10.7 + t * 0.02
@@ -100,6 +110,10 @@ class TPSlopeContactLaw(make_slope_contact_law(slope=1e1)):
     def temp_exchange(temp):  # potential  # TODO # 48
         return 0.1 * 0.5 * (temp - 0.27) ** 2
 
+    @staticmethod
+    def temp_exchange_derivative(temp):
+        return 0.1 * (temp - 0.27)
+
     @staticmethod
     def h_temp(u_tau):  # potential  # TODO # 48
         return 0.1 * 0.5 * u_tau**2
@@ -47,6 +47,10 @@ def make_slope_contact_law_temp(slope):
         def temp_exchange(temp):  # potential  # TODO # 48
             return 0 * temp
 
+        @staticmethod
+        def temp_exchange_derivative(temp):
+            return 0 * temp
+
         @staticmethod
         def h_temp(u_tau):  # potential  # TODO # 48
             return 0 * u_tau
@@ -0,0 +1,194 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pytest
+import scipy.optimize
+import scipy.sparse
+
+from conmech.mesh.boundaries_description import BoundariesDescription
+from conmech.scenarios.problems import ContactLaw, Static
+from conmech.simulations.problem_solver import Static as StaticProblem
+from conmech.solvers.solver_methods import (
+    make_cost_functional,
+    make_cost_functional_2023,
+    make_cost_functional_temperature,
+)
+from conmech.state.state import State
+from examples.Jureczka_Ochal_Bartman_2023 import make_contact_law
+from examples.p_slope_contact_law import make_slope_contact_law
+
+
+def get_arguments(dimension, seed=0):
+    random = np.random.default_rng(seed)
+    nodes_count = 8
+    nodes = np.column_stack((np.linspace(0, 1, nodes_count), np.zeros(nodes_count)))
+    nodes[nodes_count // 2 :, 1] = 0.5
+    contact_boundary = np.array([[i, i + 1] for i in range(nodes_count // 2 - 1)])
+    size = dimension * nodes_count
+    matrix = random.random((size, size))
+    lhs = scipy.sparse.csr_matrix(matrix @ matrix.T + size * np.eye(size))
+    rhs = random.random(size)
+    vector = random.normal(scale=0.1, size=size)
+    other = random.normal(scale=0.1, size=2 * nodes_count)
+    return vector, (nodes, contact_boundary, lhs, rhs, other, 0.1)
+
+
+def friction_bound(u_nu):
+    return 0.5 * u_nu
+
+
+def friction_bound_derivative(_u_nu):
+    return 0.5
+
+
+def heat_exchange(temp):
+    return 0.3 * temp * temp
+
+
+def heat_exchange_derivative(temp):
+    return 0.6 * temp
+
+
+def potential_tangential_direction(u_tau):
+    return np.sqrt(u_tau[0] * u_tau[0] + u_tau[1] * u_tau[1] + 1e-4)
+
+
+def subderivative_tangential_direction(u_tau, v_tau):
+    return (u_tau[0] * v_tau[0] + u_tau[1] * v_tau[1]) / np.sqrt(
+        u_tau[0] * u_tau[0] + u_tau[1] * u_tau[1] + 1e-4
+    )
+
+
+@pytest.mark.parametrize(
+    "cost_functional, kwargs",
+    [
+        (make_cost_functional, {}),
+        (make_cost_functional_2023, {"h_derivative": friction_bound_derivative}),
+    ],
+)
+def test_cost_functional_gradient(cost_functional, kwargs):
+    # Arrange
+    contact_law = make_slope_contact_law(slope=2)
+    loss, loss_gradient = cost_functional(
+        jn=contact_law.potential_normal_direction,
+        jt=potential_tangential_direction,
+        h_functional=friction_bound,
+        jn_subderivative=contact_law.subderivative_normal_direction,
+        jt_subderivative=subderivative_tangential_direction,
+        **kwargs,
+    )
+    vector, args = get_arguments(dimension=2)
+
+    # Act
+    gradient = loss_gradient(vector, *args)
+    expected = scipy.optimize.approx_fprime(vector, lambda x: loss(x, *args)[0])
+
+    # Assert
+    np.testing.assert_allclose(gradient, expected, atol=1e-5)
+
+
+def test_contact_law_derivatives_give_gradient():
+    # Arrange
+    contact_law = make_contact_law(limit_value=10, limit=0.5)
+    loss, loss_gradient = make_cost_functional(
+        jn=contact_law.potential_normal_direction,
+        jt=contact_law.potential_tangential_direction,
+        h_functional=friction_bound,
+        jn_subderivative=contact_law.subderivative_normal_direction,
+        jt_subderivative=contact_law.regularized_subderivative_tangential_direction,
+    )
+    vector, args = get_arguments(dimension=2)
+
+    # Act
+    gradient = loss_gradient(vector, *args)
+    expected = scipy.optimize.approx_fprime(vector, lambda x: loss(x, *args)[0])
+
+    # Assert
+    np.testing.assert_allclose(gradient, expected, atol=1e-5)
+
+
+def test_no_gradient_without_contact_law_derivatives():
+    # Arrange
+    contact_law = make_slope_contact_law(slope=2)
+
+    # Act
+    _, loss_gradient = make_cost_functional(
+        jn=contact_law.potential_normal_direction,
+        jt=potential_tangential_direction,
+        h_functional=friction_bound,
+        jn_subderivative=contact_law.subderivative_normal_direction,
+    )
+
+    # Assert
+    assert loss_gradient is None
+
+
+def test_temperature_cost_functional_gradient():
+    # Arrange
+    loss, loss_gradient = make_cost_functional_temperature(
+        hn=lambda u_nu, temp: 0.0,
+        h_functional=lambda u_tau: u_tau * u_tau,
+        heat_exchange=heat_exchange,
+        heat_exchange_derivative=heat_exchange_derivative,
+    )
+    vector, args = get_arguments(dimension=1)
+
+    # Act
+    gradient = loss_gradient(vector, *args)
+    expected = scipy.optimize.approx_fprime(vector, lambda x: loss(x, *args)[0])
+
+    # Assert
+    np.testing.assert_allclose(gradient, expected, atol=1e-5)
+
+
+class PotentialOnlyContactLaw(ContactLaw):
+    @staticmethod
+    def potential_normal_direction(u_nu: float) -> float:
+        if u_nu <= 0:
+            return 0.0
+        return u_nu * u_nu
+
+
+@dataclass()
+class StaticSetup(Static):
+    grid_height: ... = 1
+    elements_number: ... = (2, 5)
+    mu_coef: ... = 4
+    la_coef: ... = 4
+    contact_law: ... = None
+
+    @staticmethod
+    def inner_forces(x):
+        return np.array([-0.2, -0.2])
+
+    @staticmethod
+    def outer_forces(x):
+        return np.array([0, 0])
+
+    @staticmethod
+    def friction_bound(u_nu):
+        return 0
+
+    boundaries: ... = BoundariesDescription(
+        contact=lambda x: x[1] == 0, dirichlet=lambda x: x[0] == 0
+    )
+
+
+def test_potential_only_contact_law_solves_without_gradient():
+    # Arrange
+    runners = [
+        StaticProblem(StaticSetup(mesh_type="cross", contact_law=contact_law), "schur")
+        for contact_law in (make_slope_contact_law(slope=2), PotentialOnlyContactLaw)
+    ]
+
+    # Act
+    # validator of ProblemSolver needs subderivatives, so only solver is run
+    solutions = [
+        runner.step_solver.solve(State(runner.body).velocity.reshape(2, -1))
+        for runner in runners
+    ]
+
+    # Assert
+    assert runners[0].step_solver.loss_gradient is not None
+    assert runners[1].step_solver.loss_gradient is None
+    np.testing.assert_allclose(solutions[1], solutions[0], atol=1e-5)
@@ -0,0 +1,106 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import jax
+import pytest
+
+from conmech.helpers import cmh, jxh
+
+ALL_REDUCE_SCRIPT = """
+from conmech.helpers import jxh
+jxh.use_host_devices(4)
+
+import jax
+import jax.numpy as jnp
+
+def gradient(weights, data):
+    return jax.grad(lambda w: jnp.sum((data @ w) ** 2))(weights)
+
+all_reduced = jax.pmap(
+    lambda w, x: jax.lax.pmean(gradient(w, x), "devices"), axis_name="devices"
+)
+data = jnp.arange(4 * 3 * 2, dtype=jnp.float32).reshape(4, 3, 2)
+weights = jnp.ones((4, 2))
+expected = jnp.mean(jnp.stack([gradient(weights[0], x) for x in data]), axis=0)
+result = all_reduced(weights, data)
+assert len(jax.local_devices()) == 4
+assert jnp.allclose(result, expected), (result, expected)
+print("OK")
+"""
+
+
+def test_prefetch_keeps_order_and_buffer_size():
+    # Arrange
+    produced = []
+
+    def produce():
+        for item in range(10):
+            produced.append(item)
+            yield item
+
+    # Act
+    consumed = []
+    ahead = []
+    for item in cmh.prefetch(produce(), buffer_size=2):
+        time.sleep(0.01)
+        ahead.append(len(produced) - len(consumed))
+        consumed.append(item)
+
+    # Assert
+    assert consumed == list(range(10))
+    assert max(ahead) <= 2 + 2  # buffer, item being put and item being consumed
+
+
+def test_prefetch_raises_producer_error():
+    # Arrange
+    def produce():
+        yield 1
+        raise ValueError("broken batch")
+
+    # Act and Assert
+    with pytest.raises(ValueError, match="broken batch"):
+        list(cmh.prefetch(produce()))
+
+
+def test_prefetch_stops_producer_when_closed():
+    # Arrange
+    threads_count = threading.active_count()
+    iterator = cmh.prefetch(iter(range(1000)), buffer_size=2)
+
+    # Act
+    next(iterator)
+    iterator.close()
+
+    # Assert
+    assert threading.active_count() == threads_count
+
+
+def test_use_host_devices_requires_uninitialized_backend(monkeypatch):
+    # Arrange
+    jax.devices()
+    monkeypatch.setenv("XLA_FLAGS", "")
+
+    # Act and Assert
+    with pytest.raises(AssertionError):
+        jxh.use_host_devices(2)
+
+
+def test_gradients_all_reduced_across_host_devices():
+    # Arrange
+    environment = {**os.environ, "PYTHONPATH": os.getcwd()}
+
+    # Act
+    result = subprocess.run(
+        [sys.executable, "-c", ALL_REDUCE_SCRIPT],
+        env=environment,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+
+    # Assert
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip().endswith("OK")
@@ -0,0 +1,127 @@
+import numpy as np
+import pytest
+
+from conmech.dynamics.dynamics import Dynamics, DynamicsConfiguration
+from conmech.dynamics.factory.dynamics_factory_method import (
+    SPARSE_MATRICES,
+    add_dynamics_update,
+    get_changed_elements,
+    get_dynamics,
+    get_dynamics_update,
+)
+from conmech.helpers import jxh
+from conmech.helpers.config import SimulationConfig
+from conmech.properties.mesh_properties import MeshProperties
+from conmech.properties.schedule import Schedule
+from conmech.scenarios.scenarios import M_BUNNY_3D, default_temp_body_prop
+from examples.benchmark_helpers import get_kuhn_cube
+
+
+def move_nodes(nodes, moved_count: int):
+    random_generator = np.random.default_rng(0)
+    moved_nodes = nodes.copy()
+    indices = random_generator.choice(len(nodes), moved_count, replace=False)
+    moved_nodes[indices] += random_generator.uniform(-0.05, 0.05, (moved_count, 3))
+    return moved_nodes
+
+
+def assert_sparse_close(matrix, expected):
+    assert abs(matrix - expected).max() < 1e-10 * max(abs(expected).max(), 1)
+
+
+@pytest.mark.parametrize("moved_count", [1, 10])
+def test_updated_matrices_match_full_assembly(moved_count):
+    # Arrange
+    old_nodes, elements = get_kuhn_cube(size=3)
+    nodes = move_nodes(old_nodes, moved_count)
+    matrices = get_dynamics(
+        elements=elements,
+        nodes=old_nodes,
+        body_prop=default_temp_body_prop,
+        independent_indices=slice(len(nodes)),
+        complete_patterns=True,
+    )
+    element_indices = get_changed_elements(elements, old_nodes, nodes)
+
+    # Act
+    update = get_dynamics_update(
+        elements=elements,
+        old_nodes=old_nodes,
+        nodes=nodes,
+        body_prop=default_temp_body_prop,
+        independent_indices=slice(len(nodes)),
+        element_indices=element_indices,
+    )
+    updated = add_dynamics_update(matrices, update, element_indices)
+
+    # Assert
+    expected = get_dynamics(
+        elements=elements,
+        nodes=nodes,
+        body_prop=default_temp_body_prop,
+        independent_indices=slice(len(nodes)),
+    )
+    assert updated
+    assert len(element_indices) < len(elements)
+    for name in SPARSE_MATRICES:
+        if getattr(expected, name) is not None:
+            assert_sparse_close(getattr(matrices, name), getattr(expected, name))
+    np.testing.assert_allclose(
+        matrices.element_initial_volume, expected.element_initial_volume
+    )
+    np.testing.assert_allclose(
+        jxh.to_dense_np(matrices.dx_big_jax), expected.dx_big.toarray(), atol=1e-10
+    )
+
+
+def get_dynamics_with_lhs(incremental_assembly: bool):
+    return Dynamics(
+        mesh_prop=MeshProperties(
+            dimension=3, mesh_type=M_BUNNY_3D, scale=[1], mesh_density=[8]
+        ),
+        body_prop=default_temp_body_prop,
+        schedule=Schedule(final_time=1.0),
+        simulation_config=SimulationConfig(
+            use_normalization=False,
+            use_linear_solver=False,
+            use_green_strain=True,
+            use_nonconvex_friction_law=False,
+            use_constant_contact_integral=False,
+            use_lhs_preconditioner=True,
+            with_self_collisions=False,
+            use_pca=False,
+        ),
+        dynamics_config=DynamicsConfiguration(
+            incremental_assembly=incremental_assembly
+        ),
+    )
+
+
+def test_incremental_reassembly_matches_full_reassembly():
+    # Arrange
+    dynamics = get_dynamics_with_lhs(incremental_assembly=True)
+    expected_dynamics = get_dynamics_with_lhs(incremental_assembly=False)
+    displacement = np.zeros_like(dynamics.initial_nodes)
+    displacement[:5] = 0.01
+    dynamics.set_displacement_old(displacement)
+    expected_dynamics.set_displacement_old(displacement)
+    _ = dynamics.solver_cache.lhs_preconditioner_jax
+
+    # Act
+    dynamics.reinitialize_matrices()
+
+    # Assert
+    expected_dynamics.reinitialize_matrices()
+    solver_cache = dynamics.solver_cache
+    expected_solver_cache = expected_dynamics.solver_cache
+    assert_sparse_close(solver_cache.lhs_sparse, expected_solver_cache.lhs_sparse)
+    np.testing.assert_allclose(
+        jxh.to_dense_np(solver_cache.lhs_temperature_sparse_jax),
+        jxh.to_dense_np(expected_solver_cache.lhs_temperature_sparse_jax),
+        atol=1e-10,
+    )
+    np.testing.assert_allclose(
+        jxh.to_dense_np(solver_cache.lhs_preconditioner_jax),
+        jxh.to_dense_np(expected_solver_cache.lhs_preconditioner_jax),
+    )
+    np.testing.assert_array_equal(dynamics.assembled_nodes, dynamics.moved_nodes)
@@ -0,0 +1,52 @@
+import pytest
+
+from conmech.helpers import lzh
+
+OPTIONAL_BACKENDS = [
+    "dmsh",
+    "gmsh",
+    "matplotlib",
+    "meshio",
+    "meshzoo",
+    "pandas",
+    "pygmsh",
+    "tensorflow",
+    "torch",
+]
+IMPORT_TIME_BUDGET_S = 15.0
+
+
+def test_lazy_module_loads_on_first_use():
+    # Arrange
+    module = lzh.LazyModule("colorsys")
+
+    # Act
+    loaded_before = lzh.is_loaded(module)
+    result = module.rgb_to_hsv(1.0, 0.0, 0.0)
+
+    # Assert
+    assert not loaded_before
+    assert lzh.is_loaded(module)
+    assert result == (0.0, 1.0, 1.0)
+
+
+def test_missing_optional_dependency_fails_on_use():
+    # Arrange
+    module = lzh.lazy_import("not_installed_backend", extra="testing")
+
+    # Act and Assert
+    with pytest.raises(ImportError, match="required for testing"):
+        _ = module.function
+
+
+def test_simulation_import_skips_optional_backends():
+    # Arrange
+    entry_point = "conmech.simulations.simulation_runner"
+
+    # Act
+    import_times = lzh.get_import_times(f"import {entry_point}")
+
+    # Assert
+    loaded = {name.split(".")[0] for name in import_times}
+    assert loaded.isdisjoint(OPTIONAL_BACKENDS), loaded & set(OPTIONAL_BACKENDS)
+    assert import_times[entry_point].cumulative_us < IMPORT_TIME_BUDGET_S * 1e6
@@ -1,10 +1,7 @@
 import numpy as np
 
-from conmech.dynamics.factory._dynamics_factory_2d import (
-    get_edges_features_matrix_numba as sut_2d,
-)
-from conmech.dynamics.factory._dynamics_factory_3d import (
-    get_edges_features_matrix_numba as sut_3d,
+from conmech.dynamics.factory.dynamics_factory_method import (
+    get_edges_features_matrices as sut,
 )
 from conmech.mesh import mesh_builders
 from conmech.properties.mesh_properties import MeshProperties
@@ -25,7 +22,7 @@ def test_matrices_2d_integrals():
     )
 
     # Act
-    edges_features_matrix, element_initial_volume = sut_2d(
+    edges_features_matrix, element_initial_volume, _ = sut(
         elements=elements, nodes=initial_nodes
     )
 
@@ -55,7 +52,7 @@ def test_matrices_3d_integrals():
     )
 
     # Act
-    edges_features_matrix, element_initial_volume = sut_3d(
+    edges_features_matrix, element_initial_volume, _ = sut(
         elements=elements, nodes=initial_nodes
     )
 
@@ -73,4 +70,28 @@ def test_matrices_3d_integrals():
     for M in (*ALL_V, *ALL_W):
         np.testing.assert_almost_equal(M.sum(), 0)
 
-    # TODO: Check Wij = Wji.T
+
+def test_edges_features_matrices_pattern_3d():
+    # Arrange
+    initial_nodes, elements = mesh_builders.build_mesh(
+        mesh_prop=MeshProperties(
+            dimension=3, mesh_type="meshzoo_cube_3d", mesh_density=[3], scale=[1]
+        ),
+    )
+
+    # Act
+    edges_features_matrix, _, dx_big = sut(elements=elements, nodes=initial_nodes)
+
+    # Assert
+    pairs = {(i, j) for element in elements for i in element for j in element}
+    for M in edges_features_matrix:
+        coo = M.tocoo()
+        assert set(zip(coo.row, coo.col)) == pairs
+    W = [edges_features_matrix[i] for i in range(5, 14)]
+    for j in range(3):
+        for k in range(3):
+            np.testing.assert_allclose(
+                W[3 * j + k].toarray(), W[3 * k + j].T.toarray(), atol=1e-12
+            )
+    assert dx_big.shape == (3 * len(elements), len(initial_nodes))
+    np.testing.assert_allclose(dx_big.sum(axis=1), 0, atol=1e-10)
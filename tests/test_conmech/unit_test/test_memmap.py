@@ -0,0 +1,60 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from conmech.helpers import mmh
+
+
+def get_samples(count: int):
+    random = np.random.default_rng(0)
+    samples = []
+    for nodes_count in random.integers(1, 20, count):
+        samples.append(
+            {
+                "layer_0.x": random.random((nodes_count, 3), dtype=np.float32),
+                "layer_0.edge_index": random.integers(0, 9, (2, 2 * nodes_count)),
+                "layer_0.edge_number": np.array([2 * nodes_count]),
+            }
+        )
+    return samples
+
+
+def test_memmap_round_trip(tmp_path):
+    # Arrange
+    data_path = str(tmp_path / "DATASET.mmap")
+    samples = get_samples(count=10)
+
+    # Act
+    for sample in samples:
+        mmh.append_sample(sample=sample, data_path=data_path, lock=None)
+    reader = mmh.MemmapReader(data_path)
+
+    # Assert
+    assert len(reader) == len(samples)
+    for index, sample in enumerate(samples):
+        item = reader[index]
+        assert set(item) == set(sample)
+        for key, value in sample.items():
+            assert item[key].dtype == value.dtype
+            np.testing.assert_array_equal(item[key], value)
+    with pytest.raises(IndexError):
+        _ = reader[len(samples)]
+
+
+def test_memmap_items_are_views(tmp_path):
+    # Arrange
+    data_path = str(tmp_path / "DATASET.mmap")
+    for sample in get_samples(count=3):
+        mmh.append_sample(sample=sample, data_path=data_path, lock=None)
+    reader = mmh.MemmapReader(data_path)
+
+    # Act
+    item = reader[1]
+    item["layer_0.x"][:] = 0
+    copied_reader = pickle.loads(pickle.dumps(reader))
+
+    # Assert
+    assert not item["layer_0.x"].flags.owndata
+    assert copied_reader._values is None
+    assert np.all(copied_reader[1]["layer_0.x"] != 0)
@@ -2,11 +2,21 @@
 Created at 12.02.2022
 """
 
+import numba
 import numpy as np
 import pytest
 
 from conmech.mesh.boundaries_description import BoundariesDescription
-from conmech.mesh.boundaries_factory import BoundariesFactory
+from conmech.mesh.boundaries_factory import (
+    BoundariesFactory,
+    count_faces_numba,
+    extract_unique_elements,
+    get_boundary_surfaces,
+    get_nodes_mask,
+    get_nodes_mask_numba,
+    identify_surfaces_numba,
+)
+from examples.benchmark_helpers import get_kuhn_cube
 from tests.test_conmech.regression.std_boundary import (
     extract_boundary_paths_from_elements,
 )
@@ -201,8 +211,9 @@ def generate_test_suits():
     )
 
 
+@pytest.mark.parametrize("reduce_bandwidth", (False, True))
 @pytest.mark.parametrize("_test_name_, params", list(generate_test_suits()))
-def test_condition_boundaries(_test_name_, params):
+def test_condition_boundaries(_test_name_, params, reduce_bandwidth):
     # Arrange
     (
         is_dirichlet,
@@ -224,6 +235,7 @@ def test_condition_boundaries(_test_name_, params):
         unordered_nodes,
         unordered_elements,
         boundaries_description=boundaries_description,
+        reduce_bandwidth=reduce_bandwidth,
     )
 
     # Assert
@@ -242,3 +254,150 @@ def test_condition_boundaries(_test_name_, params):
     assert compare_surfaces(
         boundaries_data.dirichlet_boundary, expected_dirichlet_boundary
     )
+
+
+def get_shuffled_grid(size: int):
+    # two triangles in each square of grid, nodes in random order
+    index = np.arange((size + 1) ** 2).reshape(size + 1, size + 1)
+    corners = index[:-1, :-1].reshape(-1)
+    elements = np.vstack(
+        (
+            np.stack((corners, corners + 1, corners + size + 2), axis=1),
+            np.stack((corners, corners + size + 1, corners + size + 2), axis=1),
+        )
+    )
+    nodes = np.stack(np.divmod(index.reshape(-1), size + 1), axis=1) / size
+    order = np.random.default_rng(0).permutation(len(nodes))
+    new_indices = np.argsort(order)
+    return nodes[order], new_indices[elements]
+
+
+def get_mean_edge_span(elements):
+    # bandwidth itself is bounded from below by boundary nodes placed first
+    return np.mean(elements.max(axis=1) - elements.min(axis=1))
+
+
+def test_bandwidth_reduction_keeps_boundaries():
+    # Arrange
+    nodes, elements = get_shuffled_grid(size=20)
+    boundaries_description = BoundariesDescription(
+        contact=lambda x: x[1] == 0, dirichlet=lambda x: x[0] == 0
+    )
+
+    # Act
+    results = [
+        BoundariesFactory.identify_boundaries_and_reorder_nodes(
+            nodes,
+            elements,
+            boundaries_description=boundaries_description,
+            reduce_bandwidth=reduce_bandwidth,
+        )
+        for reduce_bandwidth in (False, True)
+    ]
+
+    # Assert
+    (nodes_0, elements_0, boundaries_0), (nodes_1, elements_1, boundaries_1) = results
+    assert get_mean_edge_span(elements_1) < get_mean_edge_span(elements_0) / 2
+    for name in ["contact", "neumann", "dirichlet"]:
+        indices = boundaries_0.boundaries[name].node_indices
+        assert boundaries_1.boundaries[name].node_indices == indices
+        assert set(map(tuple, nodes_0[indices])) == set(map(tuple, nodes_1[indices]))
+    old_indices = {tuple(node): index for index, node in enumerate(nodes_0)}
+    reindexed_elements = np.array([old_indices[tuple(node)] for node in nodes_1])[
+        elements_1
+    ]
+    assert set(map(frozenset, reindexed_elements)) == set(map(frozenset, elements_0))
+
+
+def get_shuffled_kuhn_cube(size: int):
+    # elements in random order
+    return np.random.default_rng(0).permutation(get_kuhn_cube(size)[1])
+
+
+@pytest.mark.parametrize("size", (1, 4))
+def test_boundary_surfaces_match_counting_all_faces(size):
+    # Arrange
+    _, triangles = get_shuffled_grid(size=size)
+    for elements in (triangles, get_shuffled_kuhn_cube(size=size)):
+        surfaces, opposing_indices = identify_surfaces_numba(
+            sorted_elements=np.sort(elements, axis=1)
+        )
+        expected_surfaces, expected_opposing = extract_unique_elements(
+            surfaces, opposing_indices
+        )
+
+        # Act
+        boundary_surfaces, opposing, boundary_indices = get_boundary_surfaces(
+            elements.copy()
+        )
+
+        # Assert
+        np.testing.assert_array_equal(boundary_surfaces, expected_surfaces)
+        np.testing.assert_array_equal(opposing, expected_opposing)
+        np.testing.assert_array_equal(boundary_indices, np.unique(expected_surfaces))
+
+
+def test_face_table_grows_from_small_capacity():
+    # Arrange
+    elements = np.sort(get_shuffled_kuhn_cube(size=5), axis=1)
+    nodes_count = 6**3
+
+    # Act
+    keys, _ = count_faces_numba(elements, nodes_count, bits=1)
+
+    # Assert
+    assert len(keys) == 6 * 2 * 5**2
+
+
+@pytest.mark.parametrize(
+    "predicate",
+    (
+        lambda x: x[1] == 0,
+        lambda x: (x[0] - 0.5) ** 2 + (x[1] - 0.5) ** 2 <= 0.1,
+        lambda x: (0.2 <= x[0]) & (x[0] <= 0.6),
+        lambda _: True,
+    ),
+)
+def test_vectorized_nodes_mask_matches_numba(predicate):
+    # Arrange
+    nodes = np.random.default_rng(0).random((500, 2))
+    nodes[::7, 1] = 0.0
+    predicate_numba = numba.njit(predicate)
+
+    # Act
+    mask = get_nodes_mask(nodes, predicate_numba, vectorized=True)
+
+    # Assert
+    assert mask.dtype == bool
+    np.testing.assert_array_equal(mask, get_nodes_mask_numba(nodes, predicate_numba))
+
+
+def test_vectorized_boundaries_match_node_by_node():
+    # Arrange
+    nodes, elements = get_shuffled_grid(size=10)
+    indicators = {
+        "contact": lambda x: x[1] == 0,
+        "dirichlet": lambda x: (x[0] == 0) & (x[1] > 0.5),
+    }
+
+    # Act
+    results = [
+        BoundariesFactory.identify_boundaries_and_reorder_nodes(
+            nodes,
+            elements,
+            boundaries_description=BoundariesDescription(
+                vectorized=vectorized, **indicators
+            ),
+        )
+        for vectorized in (False, True)
+    ]
+
+    # Assert
+    (nodes_0, elements_0, boundaries_0), (nodes_1, elements_1, boundaries_1) = results
+    np.testing.assert_array_equal(nodes_1, nodes_0)
+    np.testing.assert_array_equal(elements_1, elements_0)
+    for name in ["contact", "neumann", "dirichlet"]:
+        np.testing.assert_array_equal(
+            boundaries_1.boundaries[name].surfaces,
+            boundaries_0.boundaries[name].surfaces,
+        )
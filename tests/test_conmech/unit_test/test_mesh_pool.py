@@ -0,0 +1,129 @@
+import os
+
+import numpy as np
+import pytest
+
+from conmech.mesh import mesh_builders, mesh_pool
+from conmech.properties.mesh_properties import MeshProperties
+
+
+def get_mesh_prop(mesh_type: str, mesh_density: int = 16):
+    return MeshProperties(
+        dimension=3, mesh_type=mesh_type, mesh_density=[mesh_density], scale=[1.0]
+    )
+
+
+MESH_PROPS = [
+    get_mesh_prop("meshzoo_cube_3d"),
+    get_mesh_prop("pygmsh_bunny_3d", mesh_density=8),
+    get_mesh_prop("meshzoo_ball_3d"),
+    get_mesh_prop("pygmsh_bunny_3d"),
+]
+
+
+def get_shared_memory_files():
+    return set(os.listdir("/dev/shm")) if os.path.isdir("/dev/shm") else set()
+
+
+def assert_meshes_equal(meshes, mesh_props):
+    for (nodes, elements), mesh_prop in zip(meshes, mesh_props):
+        expected_nodes, expected_elements = mesh_builders.build_initial_mesh(mesh_prop)
+        np.testing.assert_array_equal(nodes, expected_nodes)
+        np.testing.assert_array_equal(elements, expected_elements)
+
+
+def test_pool_builds_same_meshes():
+    # Arrange
+    with mesh_pool.MeshPool(workers=2) as pool:
+        # Act
+        meshes = pool.map(MESH_PROPS)
+
+    # Assert
+    assert_meshes_equal(meshes, MESH_PROPS)
+
+
+def test_prefetched_meshes_match_requests():
+    # Arrange
+    order = [2, 0, 3, 1]
+    with mesh_pool.MeshPool(workers=2) as pool:
+        pool.prefetch(MESH_PROPS)
+
+        # Act
+        meshes = [pool.build_mesh(MESH_PROPS[index]) for index in order]
+
+    # Assert
+    assert_meshes_equal(meshes, [MESH_PROPS[index] for index in order])
+
+
+def test_closing_pool_frees_unrequested_meshes():
+    # Arrange
+    shared_memory_files = get_shared_memory_files()
+    pool = mesh_pool.MeshPool(workers=2)
+    pool.prefetch(MESH_PROPS)
+    pool.build_mesh(MESH_PROPS[0])
+
+    # Act
+    pool.close()
+
+    # Assert
+    assert get_shared_memory_files() == shared_memory_files
+    assert not any(process.is_alive() for process in pool.processes)
+
+
+def test_next_prefetch_frees_unrequested_meshes():
+    # Arrange
+    shared_memory_files = get_shared_memory_files()
+    with mesh_pool.MeshPool(workers=1) as pool:
+        pool.prefetch(MESH_PROPS[:2])
+        pool.build_mesh(MESH_PROPS[0])
+
+        # Act
+        pool.prefetch(MESH_PROPS[2:])
+        meshes = [pool.build_mesh(mesh_prop) for mesh_prop in MESH_PROPS[2:]]
+
+        # Assert
+        assert pool.prefetched_count == 0
+        assert not pool.received and not pool.cancelled
+        assert get_shared_memory_files() == shared_memory_files
+    assert_meshes_equal(meshes, MESH_PROPS[2:])
+
+
+def test_worker_error_is_raised():
+    # Arrange
+    with mesh_pool.MeshPool(workers=1) as pool:
+        # Act & Assert
+        with pytest.raises(NotImplementedError):
+            pool.build_mesh(get_mesh_prop("unknown"))
+        pool.build_mesh(MESH_PROPS[0])
+
+
+def test_build_mesh_in_subprocess_uses_pool():
+    # Arrange
+    mesh_prop = get_mesh_prop("pygmsh_bunny_3d", mesh_density=8)
+    mesh_pool.prefetch_meshes([], workers=1)
+
+    # Act
+    nodes, elements = mesh_builders.build_mesh(mesh_prop, create_in_subprocess=True)
+
+    # Assert
+    expected_nodes, expected_elements = mesh_builders.build_mesh(mesh_prop)
+    np.testing.assert_array_equal(nodes, expected_nodes)
+    np.testing.assert_array_equal(elements, expected_elements)
+    assert mesh_pool.get_pool().built_count >= 1
+    mesh_pool.close_pools()
+
+
+def test_build_mesh_in_subprocess_without_workers_skips_pool():
+    # Arrange
+    mesh_pool.close_pools()
+    mesh_prop = get_mesh_prop("meshzoo_cube_3d")
+    mesh_pool.prefetch_meshes([mesh_prop], workers=0)
+
+    # Act
+    nodes, elements = mesh_builders.build_mesh(mesh_prop, create_in_subprocess=True)
+
+    # Assert
+    expected_nodes, expected_elements = mesh_builders.build_mesh(mesh_prop)
+    np.testing.assert_array_equal(nodes, expected_nodes)
+    np.testing.assert_array_equal(elements, expected_elements)
+    assert not mesh_pool.has_pool()
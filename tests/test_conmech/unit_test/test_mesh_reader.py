@@ -0,0 +1,174 @@
+import numpy as np
+import pytest
+
+from conmech.mesh import mesh_reader
+
+POINTS = np.array(
+    [[0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0]],
+)
+TRIANGLES = np.array([[0, 2, 1], [0, 1, 3], [0, 3, 2], [1, 2, 3]])
+
+
+def write_ply(path, file_format: str):
+    header = (
+        f"ply\nformat {file_format} 1.0\nelement vertex {len(POINTS)}\n"
+        "property float x\nproperty float y\nproperty float z\n"
+        "property float confidence\n"
+        f"element face {len(TRIANGLES)}\nproperty list uchar int vertex_indices\n"
+        "end_header\n"
+    )
+    with open(path, "wb") as file:
+        file.write(header.encode("ascii"))
+        if file_format == "ascii":
+            for point in POINTS:
+                file.write((" ".join(map(str, point)) + " 0.5\n").encode("ascii"))
+            for triangle in TRIANGLES:
+                file.write(("3 " + " ".join(map(str, triangle)) + "\n").encode())
+            return
+        vertices = np.zeros(len(POINTS), dtype=[("xyz", "<f4", 3), ("c", "<f4")])
+        vertices["xyz"] = POINTS
+        faces = np.zeros(len(TRIANGLES), dtype=[("count", "u1"), ("ids", "<i4", 3)])
+        faces["count"] = 3
+        faces["ids"] = TRIANGLES
+        file.write(vertices.tobytes() + faces.tobytes())
+
+
+def write_stl(path):
+    triangles = np.zeros(
+        len(TRIANGLES),
+        dtype=[("normal", "<f4", 3), ("nodes", "<f4", (3, 3)), ("attribute", "<u2")],
+    )
+    triangles["nodes"] = POINTS[TRIANGLES]
+    with open(path, "wb") as file:
+        file.write(bytes(80) + np.uint32(len(TRIANGLES)).tobytes())
+        file.write(triangles.tobytes())
+
+
+@pytest.mark.parametrize("file_format", ("ascii", "binary_little_endian"))
+def test_read_ply(tmp_path, file_format):
+    # Arrange
+    path = str(tmp_path / "mesh.ply")
+    write_ply(path, file_format)
+
+    # Act
+    mesh = mesh_reader.read(path)
+
+    # Assert
+    np.testing.assert_allclose(mesh.points, POINTS)
+    np.testing.assert_array_equal(mesh.cells_dict["triangle"], TRIANGLES)
+
+
+def test_read_stl_deduplicates_nodes(tmp_path):
+    # Arrange
+    path = str(tmp_path / "mesh.stl")
+    write_stl(path)
+
+    # Act
+    mesh = mesh_reader.read(path)
+
+    # Assert
+    assert len(mesh.points) == len(POINTS)
+    np.testing.assert_allclose(
+        mesh.points[mesh.cells_dict["triangle"]], POINTS[TRIANGLES]
+    )
+
+
+def write_ascii_stl(path):
+    with open(path, "w", encoding="ascii") as file:
+        file.write("solid mesh\n")
+        for triangle in POINTS[TRIANGLES]:
+            file.write("facet normal 0 0 0\nouter loop\n")
+            for point in triangle:
+                file.write("vertex " + " ".join(map(str, point)) + "\n")
+            file.write("endloop\nendfacet\n")
+        file.write("endsolid mesh\n")
+
+
+def test_unsupported_format_is_read_with_meshio(tmp_path):
+    # Arrange
+    path = str(tmp_path / "mesh.stl")
+    write_ascii_stl(path)
+
+    # Act
+    mesh = mesh_reader.read(path)
+
+    # Assert
+    with pytest.raises(mesh_reader.UnsupportedMeshFormat):
+        mesh_reader.read_stl(path)
+    np.testing.assert_allclose(
+        mesh.points[mesh.cells_dict["triangle"]], POINTS[TRIANGLES]
+    )
+
+
+def test_deduplicate_nodes_keeps_first_occurrence():
+    # Arrange
+    points = np.array([[1.0, 2.0], [0.0, -0.0], [1.0, 2.0], [0.0, 0.0], [3.0, 1.0]])
+    cells = np.array([[0, 1, 4], [2, 3, 4]])
+
+    # Act
+    mesh = mesh_reader.deduplicate_nodes(points, {"triangle": cells})
+
+    # Assert
+    np.testing.assert_array_equal(mesh.points, [[1.0, 2.0], [0.0, 0.0], [3.0, 1.0]])
+    np.testing.assert_array_equal(mesh.cells_dict["triangle"], [[0, 1, 2], [0, 1, 2]])
+
+
+def test_read_msh():
+    # Act
+    mesh = mesh_reader.read("models/bunny/bun_zipper_res4_.msh")
+
+    # Assert
+    tetra = mesh.cells_dict["tetra"]
+    assert mesh.points.shape[1] == 3
+    assert tetra.min() >= 0 and tetra.max() < len(mesh.points)
+    volumes = np.linalg.det(mesh.points[tetra[:, 1:]] - mesh.points[tetra[:, :1]])
+    assert np.all(np.abs(volumes) > 0)
+
+
+def test_cache_is_memory_mapped_copy_on_write(tmp_path):
+    # Arrange
+    path = str(tmp_path / "mesh.ply")
+    write_ply(path, "binary_little_endian")
+    mesh_reader.read(path, cache=True)
+
+    # Act
+    cached = mesh_reader.read(path, cache=True)
+    points = cached.points
+    points += 1.0
+
+    # Assert
+    assert isinstance(cached.cells_dict["triangle"], np.memmap)
+    np.testing.assert_array_equal(cached.cells_dict["triangle"], TRIANGLES)
+    np.testing.assert_allclose(mesh_reader.read(path, cache=True).points, POINTS)
+
+
+def test_read_stl_of_short_file_raises_unsupported_format(tmp_path):
+    # Arrange
+    path = str(tmp_path / "mesh.stl")
+    with open(path, "wb") as file:
+        file.write(bytes(40))
+
+    # Act & Assert
+    with pytest.raises(mesh_reader.UnsupportedMeshFormat):
+        mesh_reader.read_stl(path)
+
+
+def test_cache_depends_on_deduplicate(tmp_path):
+    # Arrange
+    path = str(tmp_path / "mesh.ply")
+    write_ply(path, "binary_little_endian")
+    points = np.concatenate((POINTS, POINTS[:1]))
+    cells = np.concatenate((TRIANGLES, [[4, 2, 1]]))
+    mesh_reader.save_cache(
+        mesh_reader.MeshData(points=points, cells_dict={"triangle": cells}),
+        mesh_reader.get_cache_path(path),
+    )
+
+    # Act
+    raw = mesh_reader.read(path, cache=True)
+    deduplicated = mesh_reader.read(path, cache=True, deduplicate=True)
+
+    # Assert
+    assert len(raw.points) == len(points)
+    assert len(deduplicated.points) == len(POINTS)
+    np.testing.assert_array_equal(deduplicated.cells_dict["triangle"], TRIANGLES)
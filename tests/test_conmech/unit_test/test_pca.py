@@ -0,0 +1,65 @@
+import os
+import pickle
+
+import numpy as np
+
+from conmech.helpers import pca
+
+
+def get_low_rank_data(rows: int, features: int, rank: int):
+    random = np.random.default_rng(0)
+    return random.normal(size=(rows, rank)) @ random.normal(size=(rank, features))
+
+
+def test_streaming_projection_spans_full_svd_projection():
+    # Arrange
+    data = get_low_rank_data(rows=500, features=90, rank=8)
+    chunks = np.array_split(data, 23)
+
+    # Act
+    projection = pca.get_projection_streaming(chunks, latent_dim=8)
+
+    # Assert
+    expected = np.asarray(pca.get_projection(data, latent_dim=8)["matrix"])
+    matrix = projection["matrix"]
+    np.testing.assert_allclose(matrix @ matrix.T, expected @ expected.T, atol=1e-4)
+    reprojected = pca.project_from_latent(
+        projection, pca.project_to_latent(projection, data.T)
+    )
+    np.testing.assert_allclose(reprojected, data.T, atol=1e-3)
+
+
+def test_saved_projection_is_memory_mapped(tmp_path):
+    # Arrange
+    data = get_low_rank_data(rows=50, features=30, rank=4)
+    projection = pca.get_projection_streaming([data], latent_dim=4)
+    path = str(tmp_path / "PCA")
+
+    # Act
+    pca.save_pca(projection, path)
+    loaded = pca.load_pca(path)
+
+    # Assert
+    assert isinstance(loaded["matrix"], np.memmap)
+    np.testing.assert_array_equal(loaded["matrix"], projection["matrix"])
+    np.testing.assert_array_equal(loaded["mean"], projection["mean"])
+
+
+def test_default_path_is_not_legacy_pickle(tmp_path, monkeypatch):
+    # Arrange
+    monkeypatch.chdir(tmp_path)
+    data = get_low_rank_data(rows=50, features=30, rank=4)
+    legacy_projection = pca.get_projection_streaming([data], latent_dim=2)
+    projection = pca.get_projection_streaming([data], latent_dim=4)
+    os.makedirs(os.path.dirname(pca.LEGACY_PCA_PATH))
+    with open(pca.LEGACY_PCA_PATH, "wb") as file:
+        pickle.dump(legacy_projection, file)
+
+    # Act
+    loaded_legacy = pca.load_pca()
+    pca.save_pca(projection)
+    loaded = pca.load_pca()
+
+    # Assert
+    np.testing.assert_array_equal(loaded_legacy["matrix"], legacy_projection["matrix"])
+    np.testing.assert_array_equal(loaded["matrix"], projection["matrix"])
@@ -0,0 +1,105 @@
+import jax.numpy as jnp
+import numpy as np
+import pytest
+
+from conmech.helpers import jxh
+from conmech.helpers.config import Config, SimulationConfig
+from conmech.properties.mesh_properties import MeshProperties
+from conmech.properties.schedule import Schedule
+from conmech.scenarios.scenarios import (
+    M_CUBE_3D,
+    Scenario,
+    default_body_prop,
+    default_obstacle_prop,
+    f_rotate_3d,
+)
+from conmech.simulations import simulation_runner
+from conmech.solvers.calculator import Calculator
+from conmech.state.obstacle import Obstacle
+
+
+@pytest.fixture(name="monitor")
+def fixture_monitor():
+    jxh.MONITOR.reset()
+    yield jxh.MONITOR
+    jxh.MONITOR.stop()
+    jxh.MONITOR.reset()
+
+
+def test_tracked_jit_records_retrace_trigger(monitor):
+    # Arrange
+    monitor.start()
+    function = jxh.jit(lambda x, n: jnp.sum(x) * n, name="sum", static_argnames="n")
+
+    # Act
+    function(jnp.ones(3), n=2)
+    function(jnp.ones(3), n=2)
+    function(jnp.ones(4), n=2)
+
+    # Assert
+    record = monitor.records["sum"]
+    assert record.calls == 3
+    assert record.traces == 2
+    assert record.compiles == 2
+    assert record.triggers[0] == "first trace"
+    assert "float32[3] -> float32[4]" in record.triggers[1]
+
+
+def test_strict_mode_fails_after_warm_up(monitor):
+    # Arrange
+    function = jxh.jit(lambda x: x + 1, name="add")
+    float_data = jnp.ones(3)
+    int_data = jnp.ones(3, dtype=jnp.int32)
+    monitor.start(strict=True)
+    function(float_data)
+    monitor.finish_warm_up()
+
+    # Act and Assert
+    function(float_data)
+    with pytest.raises(jxh.RecompilationError, match="float32.* -> int32"):
+        function(int_data)
+
+
+def test_simulation_steps_do_not_recompile(monitor):
+    # Arrange
+    simulation_config = SimulationConfig(
+        use_normalization=False,
+        use_linear_solver=False,
+        use_green_strain=True,
+        use_nonconvex_friction_law=False,
+        use_constant_contact_integral=False,
+        use_lhs_preconditioner=False,
+        with_self_collisions=False,
+        use_pca=False,
+    )
+    scenario = Scenario(
+        name="cube_recompilation",
+        mesh_prop=MeshProperties(
+            dimension=3, mesh_type=M_CUBE_3D, scale=[1], mesh_density=[4]
+        ),
+        body_prop=default_body_prop,
+        schedule=Schedule(final_time=0.06, time_step=0.01),
+        forces_function=f_rotate_3d,
+        obstacle=Obstacle(
+            np.array([[[-1.0, 0.0, 1.0]], [[2.0, 0.0, 0.0]]]), default_obstacle_prop
+        ),
+        simulation_config=simulation_config,
+    )
+    scene = simulation_runner.create_scene(scenario)
+    monitor.start(strict=True)
+
+    # Act
+    simulation_runner.simulate(
+        scene=scene,
+        solve_function=Calculator.solve,
+        scenario=scenario,
+        simulate_dirty_data=False,
+        config=Config(),
+    )
+
+    # Assert
+    assert monitor.warm
+    for name in ["compute_displacement_energy", "get_integrated_forces"]:
+        record = monitor.records[name]
+        assert record.traces == 1, monitor.report()
+        assert record.calls == scenario.schedule.episode_steps
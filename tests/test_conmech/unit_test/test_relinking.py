@@ -0,0 +1,101 @@
+import numpy as np
+import scipy.spatial
+
+from conmech.helpers import interpolation_helpers
+
+
+def get_link(base_nodes, elements, query_nodes):
+    # reference link: element containing each query node, by brute force
+    closest_nodes = np.zeros((len(query_nodes), elements.shape[1]), dtype=np.int64)
+    closest_weights = np.zeros(closest_nodes.shape)
+    for node_id, node in enumerate(query_nodes):
+        all_weights = interpolation_helpers.get_barycentric_weights(
+            np.repeat(node[None], len(elements), axis=0), base_nodes[elements]
+        )
+        element_id = np.argmax(all_weights.min(axis=1))
+        assert all_weights[element_id].min() > -1e-12
+        closest_nodes[node_id] = elements[element_id]
+        closest_weights[node_id] = all_weights[element_id]
+    return closest_nodes, closest_weights
+
+
+def get_meshes():
+    random = np.random.default_rng(0)
+    base_nodes = random.uniform(size=(200, 3))
+    elements = scipy.spatial.Delaunay(base_nodes).simplices
+    query_nodes = random.uniform(0.2, 0.8, size=(500, 3))
+    return base_nodes, elements, query_nodes
+
+
+def test_interpolation_matrix_matches_approximate_internal():
+    # Arrange
+    base_nodes, elements, query_nodes = get_meshes()
+    closest_nodes, closest_weights = get_link(base_nodes, elements, query_nodes)
+    values = np.random.default_rng(1).normal(size=(len(base_nodes), 3))
+
+    # Act
+    matrix = interpolation_helpers.get_interpolation_matrix(
+        closest_nodes, closest_weights, base_nodes_count=len(base_nodes)
+    )
+
+    # Assert
+    np.testing.assert_allclose(
+        matrix @ values,
+        interpolation_helpers.approximate_internal(
+            values, closest_nodes, closest_weights
+        ),
+    )
+    np.testing.assert_allclose(matrix @ base_nodes, query_nodes)
+
+
+def test_update_link_weights_without_movement_keeps_link():
+    # Arrange
+    base_nodes, elements, query_nodes = get_meshes()
+    closest_nodes, closest_weights = get_link(base_nodes, elements, query_nodes)
+
+    # Act
+    new_weights, stale_mask = interpolation_helpers.update_link_weights(
+        base_nodes=base_nodes,
+        query_nodes=query_nodes,
+        old_base_nodes=base_nodes,
+        old_query_nodes=query_nodes,
+        closest_nodes=closest_nodes,
+        closest_weights=closest_weights,
+    )
+
+    # Assert
+    assert not stale_mask.any()
+    np.testing.assert_array_equal(new_weights, closest_weights)
+
+
+def test_update_link_weights_marks_only_nodes_leaving_element():
+    # Arrange
+    base_nodes, elements, query_nodes = get_meshes()
+    closest_nodes, closest_weights = get_link(base_nodes, elements, query_nodes)
+    moved_query_nodes = query_nodes.copy()
+    moved_query_nodes[:50] += np.random.default_rng(2).normal(0, 0.05, size=(50, 3))
+    moved_base_nodes = base_nodes.copy()
+    moved_base_nodes[0] += 0.01
+    expected_nodes, expected_weights = get_link(
+        moved_base_nodes, elements, moved_query_nodes
+    )
+
+    # Act
+    new_weights, stale_mask = interpolation_helpers.update_link_weights(
+        base_nodes=moved_base_nodes,
+        query_nodes=moved_query_nodes,
+        old_base_nodes=base_nodes,
+        old_query_nodes=query_nodes,
+        closest_nodes=closest_nodes,
+        closest_weights=closest_weights,
+    )
+
+    # Assert
+    same_element = np.all(
+        np.sort(closest_nodes, axis=1) == np.sort(expected_nodes, axis=1), axis=1
+    )
+    np.testing.assert_array_equal(stale_mask, ~same_element)
+    assert 0 < stale_mask.sum() < 50
+    np.testing.assert_allclose(
+        new_weights[~stale_mask], expected_weights[~stale_mask], atol=1e-12
+    )
@@ -0,0 +1,102 @@
+import numpy as np
+
+from conmech.helpers.config import SimulationConfig
+from conmech.mesh import remesher
+from conmech.mesh.boundaries_description import BoundariesDescription
+from conmech.properties.mesh_properties import MeshProperties
+from conmech.properties.schedule import Schedule
+from conmech.scenarios.scenarios import (
+    M_BUNNY_3D,
+    default_obstacle_prop,
+    default_temp_body_prop,
+)
+from conmech.scene.scene_temperature import SceneTemperature
+from examples.benchmark_helpers import get_kuhn_cube
+
+
+def get_linear_field(nodes):
+    return nodes @ np.array([[1.0, -2.0, 0.5], [0.3, 0.2, 1.0], [-1.0, 0.0, 2.0]])
+
+
+def test_transfer_reproduces_linear_fields():
+    # Arrange
+    old_nodes, old_elements = get_kuhn_cube(size=2)
+    new_nodes, _ = get_kuhn_cube(size=4)
+    fields = [
+        get_linear_field(old_nodes),
+        get_linear_field(old_nodes)[:, :1],
+        old_nodes[:, 0],
+    ]
+
+    # Act
+    transfer = remesher.get_field_transfer(old_nodes, old_elements, new_nodes)
+    new_fields = remesher.transfer_fields(transfer, fields)
+
+    # Assert
+    np.testing.assert_allclose(new_fields[0], get_linear_field(new_nodes), atol=1e-10)
+    np.testing.assert_allclose(
+        new_fields[1], get_linear_field(new_nodes)[:, :1], atol=1e-10
+    )
+    np.testing.assert_allclose(new_fields[2], new_nodes[:, 0], atol=1e-10)
+    # corners and middle of cube are nodes of both meshes
+    assert transfer.reused_mask.sum() == 27
+
+
+def test_transfer_copies_values_of_reordered_nodes():
+    # Arrange
+    old_nodes, old_elements = get_kuhn_cube(size=3)
+    order = np.random.default_rng(0).permutation(len(old_nodes))
+    values = np.random.default_rng(1).normal(size=(len(old_nodes), 3))
+
+    # Act
+    transfer = remesher.get_field_transfer(old_nodes, old_elements, old_nodes[order])
+    (new_values,) = remesher.transfer_fields(transfer, [values])
+
+    # Assert
+    assert transfer.reused_mask.all()
+    np.testing.assert_array_equal(new_values, values[order])
+
+
+def test_remesh_transfers_scene_fields():
+    # Arrange
+    scene = SceneTemperature(
+        mesh_prop=MeshProperties(
+            dimension=3, mesh_type=M_BUNNY_3D, scale=[1], mesh_density=[8]
+        ),
+        body_prop=default_temp_body_prop,
+        obstacle_prop=default_obstacle_prop,
+        schedule=Schedule(final_time=1.0),
+        simulation_config=SimulationConfig(
+            use_normalization=False,
+            use_linear_solver=False,
+            use_green_strain=True,
+            use_nonconvex_friction_law=False,
+            use_constant_contact_integral=False,
+            use_lhs_preconditioner=False,
+            with_self_collisions=False,
+            use_pca=False,
+        ),
+        create_in_subprocess=False,
+    )
+    scene.set_displacement_old(0.1 * get_linear_field(scene.initial_nodes))
+    scene.set_velocity_old(get_linear_field(scene.initial_nodes)[:, ::-1])
+    scene.set_temperature_old(scene.initial_nodes[:, :1].copy())
+    old_nodes_count = scene.nodes_count
+    scene.mesh.mesh_prop.mesh_density = [16]
+
+    # Act
+    scene.remesh(
+        BoundariesDescription(contact=None, dirichlet=None), create_in_subprocess=False
+    )
+
+    # Assert
+    nodes = scene.initial_nodes
+    assert scene.nodes_count != old_nodes_count
+    np.testing.assert_allclose(
+        scene.displacement_old, 0.1 * get_linear_field(nodes), atol=1e-8
+    )
+    np.testing.assert_allclose(
+        scene.velocity_old, get_linear_field(nodes)[:, ::-1], atol=1e-8
+    )
+    np.testing.assert_allclose(scene.t_old, nodes[:, :1], atol=1e-8)
+    assert scene.boundary_obstacle_normals.shape == scene.boundary_nodes.shape
@@ -0,0 +1,19 @@
+import numpy as np
+import pytest
+
+from conmech.dynamics.dynamics import complete_base_jax
+from conmech.helpers.lnh import complete_base
+
+
+@pytest.mark.parametrize("dimension", [2, 3])
+def test_complete_base_jax_matches_numpy(dimension):
+    # Arrange
+    base_seed = np.eye(dimension) + 0.1 * np.random.default_rng(0).normal(
+        size=(dimension, dimension)
+    )
+
+    # Act
+    base = complete_base_jax(base_seed)
+
+    # Assert
+    np.testing.assert_allclose(base, complete_base(base_seed), atol=1e-6)
@@ -0,0 +1,176 @@
+import jax.numpy as jnp
+import numpy as np
+import scipy.spatial
+
+from conmech.mesh.boundaries_factory import get_boundary_surfaces
+from conmech.properties.obstacle_properties import ObstacleProperties
+from conmech.scene import energy_functions
+from conmech.scene.self_collisions import SelfCollisionBroadphase
+from conmech.state.body_position import get_boundary_normals_jit
+from examples.benchmark_helpers import get_kuhn_grid
+
+
+def get_bar(length: float = 4.0, density: int = 8):
+    # Kuhn split of hexahedral grid into tetrahedra, boundary nodes first
+    lengths = [length, 0.5, 0.25]
+    nodes, elements = get_kuhn_grid(
+        [int(size * density) for size in lengths], lengths=lengths
+    )
+    *_, boundary_indices = get_boundary_surfaces(elements.copy())
+    internal_indices = np.setdiff1d(np.arange(len(nodes)), boundary_indices)
+    permutation = np.concatenate((boundary_indices, internal_indices))
+    elements = np.argsort(permutation)[elements]
+    surfaces, internal, _ = get_boundary_surfaces(elements.copy())
+    return nodes[permutation], surfaces, internal, len(boundary_indices)
+
+
+def bend(nodes, angle: float, length: float = 4.0):
+    # bar rolled around y axis into ring, ends meet for angle 2 * pi
+    radius = length / angle
+    phi = angle * nodes[:, 0] / length
+    distance = radius + nodes[:, 2]
+    return np.stack(
+        (distance * np.sin(phi), nodes[:, 1], radius - distance * np.cos(phi)), axis=1
+    )
+
+
+def get_brute_force_pairs(nodes, broadphase, max_dist):
+    pairs = set()
+    for i, j in zip(
+        *np.nonzero(scipy.spatial.distance.cdist(nodes, nodes) <= max_dist)
+    ):
+        excluded = broadphase.excluded_indices[
+            broadphase.excluded_indptr[i] : broadphase.excluded_indptr[i + 1]
+        ]
+        if i < j and j not in excluded:
+            pairs.add((i, j))
+    return pairs
+
+
+def get_normals(nodes, surfaces, internal, boundary_nodes_count):
+    return np.array(
+        get_boundary_normals_jit(
+            moved_nodes=nodes,
+            boundary_surfaces=surfaces,
+            boundary_internal_indices=internal,
+            considered_nodes_count=boundary_nodes_count,
+        )
+    )
+
+
+def test_candidates_match_brute_force_after_refit():
+    # Arrange
+    nodes, surfaces, _, boundary_nodes_count = get_bar()
+    boundary_nodes = nodes[:boundary_nodes_count]
+    broadphase = SelfCollisionBroadphase(surfaces, boundary_nodes_count, max_dist=0.2)
+    fresh_broadphase = SelfCollisionBroadphase(
+        surfaces, boundary_nodes_count, max_dist=0.2
+    )
+    broadphase.get_candidates(bend(boundary_nodes, angle=5.0))
+    bent_nodes = bend(boundary_nodes, angle=6.2)
+
+    # Act
+    refitted = broadphase.get_candidates(bent_nodes)
+    fresh = fresh_broadphase.get_candidates(bent_nodes)
+
+    # Assert
+    expected = get_brute_force_pairs(bent_nodes, broadphase, max_dist=0.4)
+    assert broadphase.rebuilds == 2
+    assert 0 < broadphase.refitted_nodes < boundary_nodes_count
+    assert set(map(tuple, refitted)) == expected
+    assert set(map(tuple, fresh)) == expected
+
+
+def test_candidates_are_reused_within_skin():
+    # Arrange
+    nodes, surfaces, _, boundary_nodes_count = get_bar()
+    boundary_nodes = bend(nodes[:boundary_nodes_count], angle=6.2)
+    broadphase = SelfCollisionBroadphase(surfaces, boundary_nodes_count, max_dist=0.2)
+    candidates = broadphase.get_candidates(boundary_nodes)
+
+    # Act
+    reused = broadphase.get_candidates(boundary_nodes + [0.09, 0.0, 0.0])
+
+    # Assert
+    assert broadphase.rebuilds == 1
+    assert reused is candidates
+
+
+def test_pairs_use_current_distances_after_move_beyond_half_skin():
+    # Arrange
+    nodes, surfaces, internal, boundary_nodes_count = get_bar()
+    broadphase = SelfCollisionBroadphase(surfaces, boundary_nodes_count, max_dist=0.2)
+    broadphase.get_candidates(bend(nodes[:boundary_nodes_count], angle=5.0))
+    bent_nodes = bend(nodes, angle=2 * np.pi * 1.01)
+    boundary_nodes = bent_nodes[:boundary_nodes_count]
+    normals = get_normals(bent_nodes, surfaces, internal, boundary_nodes_count)
+
+    # Act
+    pairs = broadphase.get_pairs(boundary_nodes, normals)
+
+    # Assert
+    valid = pairs.mask[:, 0] > 0
+    distances = np.linalg.norm(
+        boundary_nodes[pairs.nodes[valid]] - boundary_nodes[pairs.targets[valid]],
+        axis=1,
+    )
+    expected = {
+        pair
+        for pair in get_brute_force_pairs(boundary_nodes, broadphase, max_dist=0.2)
+        if np.dot(normals[pair[0]], normals[pair[1]]) < 0
+    }
+    assert broadphase.rebuilds == 2
+    assert np.all(distances <= 0.2)
+    assert set(zip(pairs.nodes[valid], pairs.targets[valid])) >= expected
+    assert len(expected) > 0
+
+
+def test_closed_ring_ends_are_paired_and_penetrating():
+    # Arrange
+    nodes, surfaces, internal, boundary_nodes_count = get_bar()
+    bent_nodes = bend(nodes, angle=2 * np.pi * 1.01)
+    boundary_nodes = bent_nodes[:boundary_nodes_count]
+    normals = get_normals(bent_nodes, surfaces, internal, boundary_nodes_count)
+    broadphase = SelfCollisionBroadphase(surfaces, boundary_nodes_count, max_dist=0.2)
+
+    # Act
+    pairs = broadphase.get_pairs(boundary_nodes, normals)
+
+    # Assert
+    valid = pairs.mask[:, 0] > 0
+    assert len(pairs.nodes) & (len(pairs.nodes) - 1) == 0
+    ends = nodes[pairs.nodes[valid], 0], nodes[pairs.targets[valid], 0]
+    assert np.all(np.abs(ends[0] - ends[1]) > 3.5)
+    assert pairs.initial_penetration[valid].max() > 0
+    assert np.all(pairs.initial_penetration[~valid] == 0)
+
+
+def test_self_collision_integral_counts_only_penetrating_pairs():
+    # Arrange
+    nodes, surfaces, internal, boundary_nodes_count = get_bar()
+    bent_nodes = bend(nodes, angle=2 * np.pi * 1.01)
+    normals = get_normals(bent_nodes, surfaces, internal, boundary_nodes_count)
+    broadphase = SelfCollisionBroadphase(surfaces, boundary_nodes_count, max_dist=0.2)
+    pairs = broadphase.get_pairs(bent_nodes[:boundary_nodes_count], normals)
+    args = energy_functions.EnergyObstacleArguments(
+        *[None] * 19,
+        self_collision_pairs=pairs,
+    )._replace(
+        surface_per_boundary_node=jnp.ones((boundary_nodes_count, 1)),
+        obstacle_prop=ObstacleProperties(hardness=1.0, friction=0.0),
+        time_step=0.1,
+    )
+    step = jnp.zeros((boundary_nodes_count, 3))
+    separated_pairs = pairs._replace(
+        initial_penetration=-np.abs(pairs.initial_penetration)
+    )
+
+    # Act
+    integral = energy_functions._get_self_collision_integral(step, args)
+    separated_integral = energy_functions._get_self_collision_integral(
+        step, args._replace(self_collision_pairs=separated_pairs)
+    )
+
+    # Assert
+    assert integral > 0
+    assert separated_integral == 0
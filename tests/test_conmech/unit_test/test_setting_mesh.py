@@ -89,3 +89,48 @@ def test_remove_unconnected_nodes():
     expected_elements = np.array([[1, 0], [0, 2], [1, 2]])
     np.testing.assert_array_equal(expected_nodes, cleaned_nodes)
     np.testing.assert_array_equal(expected_elements, cleaned_elements)
+
+
+@pytest.mark.parametrize("dimension", (2, 3))
+def test_remove_unconnected_nodes_matches_unique(dimension):
+    # Arrange
+    random = np.random.default_rng(dimension)
+    nodes = random.uniform(size=(500, dimension))
+    elements = random.choice(400, size=(300, dimension + 1)) + 50
+
+    # Act
+    cleaned_nodes, cleaned_elements = mesh.remove_unconnected_nodes_numba(
+        nodes, elements.copy()
+    )
+
+    # Assert
+    present_nodes, expected_elements = np.unique(elements, return_inverse=True)
+    np.testing.assert_array_equal(nodes[present_nodes], cleaned_nodes)
+    np.testing.assert_array_equal(
+        expected_elements.reshape(elements.shape), cleaned_elements
+    )
+
+
+@pytest.mark.parametrize("dimension", (2, 3))
+def test_directional_edges_match_all_element_edges(dimension):
+    # Arrange
+    random = np.random.default_rng(dimension)
+    elements = np.argsort(random.uniform(size=(300, 200)), axis=1)[:, : dimension + 1]
+    size = elements.shape[1]
+
+    # Act
+    directional_edges = mesh.get_directional_edges(elements, nodes_count=200)
+
+    # Assert
+    expected_edges = {
+        (element[i], element[j])
+        for element in elements
+        for i in range(size)
+        for j in range(size)
+        if i != j
+    }
+    assert len(directional_edges) == len(expected_edges)
+    assert set(map(tuple, directional_edges)) == expected_edges
+    np.testing.assert_array_equal(
+        np.lexsort(directional_edges.T[::-1]), np.arange(len(directional_edges))
+    )
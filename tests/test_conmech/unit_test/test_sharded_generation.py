@@ -0,0 +1,81 @@
+import numpy as np
+
+from conmech.helpers import interpolation_helpers, mph, pkh
+
+
+def generate_sample(sample_index: int):
+    interpolation_helpers.seed_sample(0, sample_index)
+    return {"index": sample_index, "values": np.random.normal(size=3)}
+
+
+def load_samples(data_path: str):
+    with pkh.open_file_read(data_path) as file:
+        return [
+            pkh.load_byte_index(byte_index, file)
+            for byte_index in pkh.get_all_indices(data_path)
+        ]
+
+
+def test_generate_in_shards(tmp_path):
+    # Arrange
+    data_path = str(tmp_path / "DATA.scenes")
+
+    # Act
+    done = mph.generate_in_shards(
+        generate_sample=generate_sample,
+        data_path=data_path,
+        samples_count=5,
+        num_workers=1,
+    )
+
+    # Assert
+    assert done
+    samples = load_samples(data_path)
+    assert [sample["index"] for sample in samples] == list(range(5))
+    assert not pkh.get_shard_paths(data_path)
+
+
+def test_generate_in_shards_resumes_and_keeps_order(tmp_path):
+    # Arrange
+    data_path = str(tmp_path / "DATA.scenes")
+    expected_path = str(tmp_path / "EXPECTED.scenes")
+    mph.generate_in_shards(generate_sample, expected_path, 6, num_workers=1)
+    # interrupted run of two workers
+    for sample_index, shard_id in [(4, 0), (1, 1), (5, 1)]:
+        shard_path = pkh.get_shard_path(data_path, shard_id)
+        pkh.append_shard_data(generate_sample(sample_index), sample_index, shard_path)
+    with open(f"{pkh.get_shard_path(data_path, 1)}_indices", "ab") as file:
+        file.write(b"\x80")  # record cut by interruption
+    generated = []
+    prepared = []
+
+    def generate_remaining(sample_index: int):
+        generated.append(sample_index)
+        return generate_sample(sample_index)
+
+    # Act
+    done = mph.generate_in_shards(
+        generate_remaining, data_path, 6, num_workers=1, prepare=prepared.append
+    )
+
+    # Assert
+    assert done
+    assert generated == [0, 2, 3]
+    assert prepared == [[0, 2, 3]]
+    for sample, expected in zip(load_samples(data_path), load_samples(expected_path)):
+        assert sample["index"] == expected["index"]
+        np.testing.assert_array_equal(sample["values"], expected["values"])
+
+
+def test_merge_shards_waits_for_missing_samples(tmp_path):
+    # Arrange
+    data_path = str(tmp_path / "DATA.scenes")
+    shard_path = pkh.get_shard_path(data_path, 0)
+    pkh.append_shard_data(generate_sample(1), 1, shard_path)
+
+    # Act
+    done = pkh.merge_shards(data_path, samples_count=2)
+
+    # Assert
+    assert not done
+    assert pkh.get_shard_paths(data_path) == [shard_path]
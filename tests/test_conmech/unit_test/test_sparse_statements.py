@@ -0,0 +1,78 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pytest
+import scipy.sparse
+
+from conmech.mesh.boundaries_description import BoundariesDescription
+from conmech.scenarios.problems import Static
+from conmech.simulations.problem_solver import ProblemSolver
+from conmech.simulations.problem_solver import Static as StaticProblem
+from examples.p_slope_contact_law import make_slope_contact_law
+
+
+@dataclass()
+class StaticSetup(Static):
+    grid_height: ... = 1
+    elements_number: ... = (3, 6)
+    mu_coef: ... = 4
+    la_coef: ... = 4
+    contact_law: ... = make_slope_contact_law(slope=1)
+
+    @staticmethod
+    def inner_forces(x):
+        return np.array([-0.2, -0.2])
+
+    @staticmethod
+    def outer_forces(x):
+        return np.array([0, 0])
+
+    @staticmethod
+    def friction_bound(u_nu):
+        return 0
+
+    boundaries: ... = BoundariesDescription(
+        contact=lambda x: x[1] == 0, dirichlet=lambda x: x[0] == 0
+    )
+
+
+def get_runner(monkeypatch, solving_method, sparse):
+    monkeypatch.setattr(ProblemSolver, "sparse_statements", sparse)
+    return StaticProblem(StaticSetup(mesh_type="cross"), solving_method)
+
+
+def test_sparse_statement_matches_dense(monkeypatch):
+    # Arrange
+    dense_statement = get_runner(monkeypatch, "direct", False).step_solver.statement
+    sparse_statement = get_runner(monkeypatch, "direct", True).step_solver.statement
+
+    # Act
+    dense_lhs = dense_statement.left_hand_side
+    sparse_lhs = sparse_statement.left_hand_side
+
+    # Assert
+    assert isinstance(dense_lhs, np.ndarray)
+    assert scipy.sparse.isspmatrix_csr(sparse_lhs)
+    np.testing.assert_allclose(sparse_lhs.toarray(), dense_lhs, atol=1e-12)
+    np.testing.assert_allclose(
+        sparse_statement.right_hand_side, dense_statement.right_hand_side, atol=1e-12
+    )
+    indices, values = sparse_statement.get_dirichlet_values()
+    assert len(indices) > 0
+    np.testing.assert_array_equal(sparse_statement.right_hand_side[indices], values)
+
+
+@pytest.mark.parametrize("solving_method", ["direct", "global optimization", "schur"])
+def test_sparse_solvers_match_dense(monkeypatch, solving_method):
+    # Arrange
+    setup = StaticSetup(mesh_type="cross")
+    results = []
+
+    # Act
+    for sparse in (False, True):
+        runner = get_runner(monkeypatch, solving_method, sparse)
+        result = runner.solve(initial_displacement=setup.initial_displacement)
+        results.append(result.displaced_nodes - result.body.initial_nodes)
+
+    # Assert
+    np.testing.assert_array_almost_equal(results[1], results[0], decimal=5)
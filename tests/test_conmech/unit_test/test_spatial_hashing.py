@@ -0,0 +1,116 @@
+import numpy as np
+import pytest
+import scipy.spatial
+
+from conmech.helpers import interpolation_helpers, spatial_hashing
+
+
+def get_mesh(dim: int, nodes_count: int = 1000):
+    random = np.random.default_rng(dim)
+    nodes = random.uniform(-1, 1, size=(nodes_count, dim))
+    elements = scipy.spatial.Delaunay(nodes).simplices
+    query_nodes = random.uniform(-1.05, 1.05, size=(300, dim))
+    return nodes, elements, query_nodes
+
+
+def test_spacing_of_regular_grid_is_grid_step():
+    # Arrange
+    grid = np.stack(np.meshgrid(*[np.linspace(0, 1, 11)] * 2), axis=-1).reshape(-1, 2)
+    elements = scipy.spatial.Delaunay(grid).simplices
+
+    # Act
+    spacing = spatial_hashing.get_spacing(grid, elements)
+
+    # Assert
+    assert spacing == pytest.approx(0.1)
+
+
+@pytest.mark.parametrize("dim", [2, 3])
+def test_numba_query_finds_nodes_within_distance(dim):
+    # Arrange
+    nodes, elements, query_nodes = get_mesh(dim)
+    spacing = spatial_hashing.get_spacing(nodes, elements)
+    cell_starts = np.zeros(2 * len(nodes) + 1, dtype=np.int64)
+    node_cell = np.zeros(len(nodes), dtype=np.int64)
+    nodes_query = np.zeros(len(nodes), dtype=np.int64)
+    ready_nodes_mask = np.zeros(len(nodes), dtype=bool)
+    tree = scipy.spatial.cKDTree(nodes)
+    max_dist = 1.5 * spacing
+
+    # Act
+    spatial_hashing.initialize_hasher_numba(nodes, spacing, cell_starts, node_cell)
+    results = []
+    for query_node in query_nodes:
+        query_size = spatial_hashing.query_hasher_numba(
+            nodes_query,
+            ready_nodes_mask,
+            query_node,
+            max_dist,
+            cell_starts,
+            node_cell,
+            spacing,
+            nodes,
+        )
+        results.append(nodes_query[:query_size].copy())
+
+    # Assert
+    for query_node, result in zip(query_nodes, results):
+        assert len(np.unique(result)) == len(result)
+        close = result[np.linalg.norm(nodes[result] - query_node, axis=1) <= max_dist]
+        assert set(close) == set(tree.query_ball_point(query_node, max_dist))
+
+
+@pytest.mark.parametrize("dim", [2, 3])
+def test_jax_query_finds_nodes_within_distance(dim):
+    # Arrange
+    nodes, elements, query_nodes = get_mesh(dim)
+    spacing = spatial_hashing.get_spacing(nodes, elements)
+    max_dist = 1.5 * spacing
+    table = spatial_hashing.get_hash_table(nodes, spacing)
+    tree = scipy.spatial.cKDTree(table.nodes)
+    query_nodes = query_nodes.astype(np.float32)
+
+    # Act
+    result = spatial_hashing.query_hasher_jax(
+        query_nodes,
+        max_dist,
+        table.nodes,
+        table.cell_starts,
+        table.node_cell,
+        table.spacing,
+        cells_radius=spatial_hashing.get_cells_radius(max_dist, spacing),
+        max_cell_size=table.max_cell_size,
+    )
+
+    # Assert
+    for query_node, row in zip(query_nodes, np.array(result)):
+        found = row[row >= 0]
+        assert len(np.unique(found)) == len(found)
+        expected = tree.query_ball_point(query_node, max_dist * (1 - 1e-5))
+        assert set(expected) <= set(found)
+        distances = np.linalg.norm(table.nodes[found] - query_node, axis=1)
+        assert np.all(distances <= max_dist * (1 + 1e-5))
+
+
+@pytest.mark.parametrize("dim", [2, 3])
+def test_interpolate_nodes_locates_nodes_in_elements(dim):
+    # Arrange
+    nodes, elements, query_nodes = get_mesh(dim)
+    element_ids = scipy.spatial.Delaunay(nodes).find_simplex(query_nodes)
+    inside = element_ids >= 0
+
+    # Act
+    closest_nodes, _, closest_weights = interpolation_helpers.interpolate_nodes(
+        base_nodes=nodes, base_elements=elements, query_nodes=query_nodes
+    )
+
+    # Assert
+    assert np.all(closest_nodes >= 0)
+    np.testing.assert_array_equal(
+        np.sort(closest_nodes[inside], axis=1),
+        np.sort(elements[element_ids[inside]], axis=1),
+    )
+    interpolated = interpolation_helpers.approximate_internal(
+        nodes, closest_nodes, closest_weights
+    )
+    np.testing.assert_allclose(interpolated, query_nodes, atol=1e-10)
@@ -0,0 +1,67 @@
+import json
+import time
+
+import jax
+import jax.numpy as jnp
+
+from conmech.helpers import trh
+
+
+def test_disabled_tracer_records_nothing():
+    # Arrange
+    tracer = trh.Tracer()
+
+    # Act
+    with tracer.span("step"):
+        with tracer.span("solver"):
+            pass
+
+    # Assert
+    assert tracer.events == []
+    assert tracer.span("step") is tracer.span("other")
+
+
+def test_summary_attributes_self_time_to_phases():
+    # Arrange
+    tracer = trh.Tracer(with_jax=False)
+    tracer.enable()
+
+    # Act
+    for _ in range(2):
+        with tracer.span("step"):
+            with tracer.span("prepare"):
+                time.sleep(0.01)
+            with tracer.span("solver"):
+                time.sleep(0.02)
+
+    # Assert
+    phases = {phase.name: phase for phase in tracer.summary(root="step")}
+    assert phases["step"].count == 2
+    assert phases["solver"].count == 2
+    assert phases["solver"].self_s > phases["prepare"].self_s
+    assert phases["step"].self_s < phases["prepare"].self_s
+    shares = sum(phase.share for phase in phases.values())
+    assert abs(shares - 1.0) < 1e-6
+    assert "solver" in tracer.report(root="step")
+
+
+def test_chrome_trace_export(tmp_path):
+    # Arrange
+    tracer = trh.Tracer()
+    tracer.enable(with_jax=True)
+
+    @tracer.traced("jitted")
+    def run(x):
+        return jax.jit(lambda y: jnp.sin(y) * 2.0)(x).block_until_ready()
+
+    # Act
+    run(jnp.arange(7.0))
+    path = tracer.export_chrome_trace(str(tmp_path / "trace.json"))
+
+    # Assert
+    with open(path, encoding="utf-8") as file:
+        trace = json.load(file)
+    names = [event["name"] for event in trace["traceEvents"]]
+    assert "jitted" in names
+    assert any(name.startswith("jax_compile") for name in names)
+    assert all(event["ph"] == "X" for event in trace["traceEvents"])
@@ -0,0 +1,67 @@
+import numpy as np
+import torch
+
+from deep_conmech.data.dataset_statistics import (
+    FeaturesStatistics,
+    StreamingStatistics,
+)
+
+
+def get_chunks():
+    generator = torch.Generator().manual_seed(0)
+    return [
+        3.0 + 2.0 * torch.randn((size, 4), generator=generator)
+        for size in [17, 0, 40, 1, 33, 8]
+    ]
+
+
+def test_streaming_statistics_match_two_pass_statistics():
+    # Arrange
+    chunks = get_chunks()
+    expected = FeaturesStatistics()
+    for chunk in chunks:
+        if len(chunk):
+            expected.set_mean_and_max_abs(chunk)
+    expected.finalaze_mean()
+    for chunk in chunks:
+        if len(chunk):
+            expected.set_variance(chunk)
+    expected.finalize_variance()
+
+    # Act
+    statistics = StreamingStatistics()
+    for chunk in chunks:
+        statistics.update(chunk)
+
+    # Assert
+    np.testing.assert_allclose(statistics.mean, expected.mean.numpy())
+    np.testing.assert_allclose(statistics.std, expected.std.numpy())
+    np.testing.assert_allclose(statistics.max_abs, expected.max_abs.numpy())
+
+
+def test_merged_statistics_match_sequential_statistics():
+    # Arrange
+    chunks = get_chunks()
+    data = torch.cat(chunks).numpy().astype(np.float64)
+    histogram_range = (-5.0, np.full(4, 10.0))
+    workers = [
+        StreamingStatistics(bins=10, histogram_range=histogram_range) for _ in range(3)
+    ]
+
+    # Act
+    for chunk_id, chunk in enumerate(chunks):
+        workers[chunk_id % 3].update(chunk)
+    statistics = StreamingStatistics(bins=10, histogram_range=histogram_range)
+    for worker_statistics in workers:
+        statistics.merge(worker_statistics)
+
+    # Assert
+    assert statistics.size == len(data)
+    np.testing.assert_allclose(statistics.mean, data.mean(axis=0))
+    np.testing.assert_allclose(statistics.std, data.std(axis=0))
+    np.testing.assert_allclose(statistics.min, data.min(axis=0))
+    np.testing.assert_allclose(statistics.max, data.max(axis=0))
+    clipped = np.clip(data, -5.0, np.nextafter(10.0, 0))
+    for column in range(4):
+        histogram, _ = np.histogram(clipped[:, column], bins=10, range=(-5.0, 10.0))
+        np.testing.assert_array_equal(statistics.histogram[column], histogram)
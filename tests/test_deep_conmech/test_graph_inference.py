@@ -0,0 +1,77 @@
+import copy
+
+import jax
+import numpy as np
+
+from conmech.scenarios.scenarios import cube_rotate_3d
+from conmech.simulations import simulation_runner
+from deep_conmech.data.dataset_statistics import StreamingStatistics
+from deep_conmech.graph import model_jax
+from deep_conmech.graph.model_jax import GraphModelDynamicJax
+from deep_conmech.graph.net_jax import CustomGraphNetJax
+from deep_conmech.training_config import get_train_config
+
+
+def get_scene_and_state():
+    config = get_train_config(shell=False, mode="net")
+    scenario = cube_rotate_3d(
+        mesh_density=8, scale=1, final_time=0.1, simulation_config=config.sc
+    )
+    scene = GraphModelDynamicJax.get_scene_function(scenario=scenario, config=config)
+    simulation_runner.prepare(scenario, scene, 0, with_temperature=False)
+    random = np.random.default_rng(0)
+    for mesh in [scene, scene.reduced]:
+        mesh.set_displacement_old(0.01 * random.normal(size=mesh.initial_nodes.shape))
+        mesh.set_velocity_old(0.1 * random.normal(size=mesh.initial_nodes.shape))
+    scene.reduced.exact_acceleration = np.zeros_like(scene.reduced.initial_nodes)
+
+    layers_list = [scene.get_features_data(layer_number=i) for i in range(2)]
+    sample_args = model_jax.prepare_input(model_jax.convert_to_jax(layers_list))
+    statistics = {
+        label: StreamingStatistics(label=label).update(data)
+        for label, data in [
+            ("sparse_nodes", sample_args.sparse_x),
+            ("sparse_edges", sample_args.sparse_edge_attr),
+            ("multilayer_edges", sample_args.multilayer_edge_attr),
+            ("dense_nodes", sample_args.dense_x),
+            ("dense_edges", sample_args.dense_edge_attr),
+        ]
+    }
+    params, batch_stats = CustomGraphNetJax(statistics=statistics).get_params(
+        sample_args, jax.random.PRNGKey(0)
+    )
+    energy_functions = simulation_runner.prepare_energy_functions(
+        scenario, scene, None, with_temperature=False, precompile=False
+    )
+    return scene, {"params": params, "batch_stats": batch_stats}, energy_functions
+
+
+def test_jitted_solve_matches_solve():
+    # Arrange
+    scene, state, energy_functions = get_scene_and_state()
+    expected_scene = copy.deepcopy(scene)
+    solve_jitted = model_jax.get_solve_jitted(state)
+
+    # Act
+    expected_acceleration, _ = model_jax.solve(
+        apply_net=model_jax.get_apply_net(state),
+        scene=expected_scene,
+        energy_functions=energy_functions,
+        initial_a=None,
+        initial_t=None,
+    )
+    acceleration, _ = solve_jitted(
+        scene=scene, energy_functions=energy_functions, initial_a=None, initial_t=None
+    )
+
+    # Assert
+    np.testing.assert_allclose(
+        scene.norm_lifted_new_displacement,
+        expected_scene.norm_lifted_new_displacement,
+        rtol=1e-4,
+        atol=1e-7,
+    )
+    scale = np.abs(expected_acceleration).max()
+    np.testing.assert_allclose(
+        acceleration, expected_acceleration, rtol=0, atol=1e-4 * scale
+    )
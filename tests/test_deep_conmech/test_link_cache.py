@@ -0,0 +1,46 @@
+from dataclasses import dataclass
+
+import numpy as np
+import scipy.spatial
+
+from conmech.helpers import interpolation_helpers
+from deep_conmech.scene.scene_layers import LinkCache
+
+
+@dataclass
+class MeshStub:
+    initial_nodes: np.ndarray
+    elements: np.ndarray
+
+    @property
+    def nodes_count(self):
+        return len(self.initial_nodes)
+
+
+def test_relink_recomputes_distances_of_kept_nodes():
+    # Arrange
+    random = np.random.default_rng(0)
+    base_nodes = random.uniform(size=(200, 3))
+    base_mesh = MeshStub(base_nodes, scipy.spatial.Delaunay(base_nodes).simplices)
+    query_nodes = random.uniform(0.2, 0.8, size=(500, 3))
+    query_mesh = MeshStub(query_nodes, np.zeros((0, 4), dtype=np.int64))
+    link_cache = LinkCache()
+    link_cache.get_link(base_mesh, query_mesh, mesh_layer_proportion=2)
+
+    # Act
+    # moves of about half of element size, most nodes stay in their elements
+    query_mesh.initial_nodes = query_nodes + random.normal(0, 0.02, size=(500, 3))
+    base_mesh.initial_nodes = base_nodes + random.normal(0, 0.01, size=(200, 3))
+    link = link_cache.get_link(base_mesh, query_mesh, mesh_layer_proportion=2)
+
+    # Assert
+    assert link_cache.hits == 1
+    assert 0 < link_cache.requeried_nodes < len(query_nodes)
+    np.testing.assert_allclose(
+        link.closest_distances,
+        interpolation_helpers.get_closest_distances(
+            base_nodes=base_mesh.initial_nodes,
+            query_nodes=query_mesh.initial_nodes,
+            closest_nodes=link.closest_nodes,
+        ),
+    )
@@ -0,0 +1,84 @@
+import os
+import subprocess
+import sys
+
+TRAIN_STEP_SCRIPT = """
+from conmech.helpers import jxh
+jxh.use_host_devices(2)
+
+import flax.jax_utils
+import jax
+import numpy as np
+import optax
+
+from deep_conmech.graph import model_jax
+from tests.test_deep_conmech.test_padding import get_random_args, get_statistics
+
+devices = jax.local_devices()
+random = np.random.default_rng(0)
+all_args = [get_random_args(random, 10, 40), get_random_args(random, 12, 50)]
+all_targets = [
+    random.normal(size=(len(args.dense_x), 3)).astype(np.float32) for args in all_args
+]
+state = model_jax.create_train_state(
+    jax.random.PRNGKey(0), all_args[0], 1e-4, get_statistics(all_args[0])
+)
+# plain gradient step, so parameters change by minus mean gradient
+optimizer = optax.sgd(1.0)
+state = state.replace(tx=optimizer, opt_state=optimizer.init(state.params))
+
+sharded_args, sharded_targets = model_jax.shard_batch(
+    all_args, all_targets, devices, growth=1.25
+)
+states, losses = model_jax.apply_model_train(
+    flax.jax_utils.replicate(state, devices), sharded_args, sharded_targets
+)
+
+expected_losses = []
+gradients = []
+for device_id in range(len(devices)):
+    args, targets = jax.tree_util.tree_map(
+        lambda x: x[device_id], (sharded_args, sharded_targets)
+    )
+    loss_function = model_jax.get_loss_function(state, args, targets, train=True)
+    (loss, _), gradient = jax.value_and_grad(loss_function, has_aux=True)(
+        state.params
+    )
+    expected_losses.append(loss)
+    gradients.append(gradient)
+expected_params = jax.tree_util.tree_map(
+    lambda params, *gradient: params - np.mean(gradient, axis=0),
+    state.params,
+    *gradients,
+)
+
+np.testing.assert_allclose(losses, expected_losses, rtol=1e-5)
+for device_id in range(len(devices)):
+    params = jax.tree_util.tree_map(lambda x: x[device_id], states.params)
+    jax.tree_util.tree_map(
+        lambda value, expected: np.testing.assert_allclose(
+            value, expected, rtol=1e-4, atol=1e-6
+        ),
+        params,
+        expected_params,
+    )
+print("OK")
+"""
+
+
+def test_train_step_all_reduces_gradients_across_host_devices():
+    # Arrange
+    environment = {**os.environ, "PYTHONPATH": os.getcwd()}
+
+    # Act
+    result = subprocess.run(
+        [sys.executable, "-c", TRAIN_STEP_SCRIPT],
+        env=environment,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+
+    # Assert
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip().endswith("OK")
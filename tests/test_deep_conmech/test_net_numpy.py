@@ -0,0 +1,141 @@
+import os
+import subprocess
+import sys
+
+import jax
+import numpy as np
+import pytest
+
+from deep_conmech.graph import net_numpy
+from deep_conmech.graph.net_jax import CustomGraphNetJax
+from deep_conmech.training_config import CLOSEST_COUNT
+from tests.test_deep_conmech.test_padding import get_random_args, get_statistics
+
+NO_HEAVY_IMPORTS_SCRIPT = """
+import sys
+from deep_conmech.graph.net_numpy import GraphNetNumpy
+net = GraphNetNumpy.load(sys.argv[1])
+heavy = {"flax", "torch", "tensorflow"}.intersection(sys.modules)
+assert not heavy, heavy
+print("OK")
+"""
+
+
+def export(path, variables, quantization):
+    net = CustomGraphNetJax()
+    net_numpy.export_weights(
+        path,
+        variables=variables,
+        message_passes_sparse=net.message_passes_sparse,
+        message_passes_dense=net.message_passes_dense,
+        closest_count=CLOSEST_COUNT,
+        quantization=quantization,
+    )
+    return net_numpy.GraphNetNumpy.load(path)
+
+
+@pytest.fixture(name="reference")
+def reference_fixture():
+    random = np.random.default_rng(0)
+    args = get_random_args(random, sparse_nodes=20, dense_nodes=60)
+    net = CustomGraphNetJax(statistics=get_statistics(args))
+    params, batch_stats = net.get_params(args, jax.random.PRNGKey(0))
+    variables = {"params": params, "batch_stats": batch_stats}
+    result = np.array(net.apply(variables, args, train=False))
+    return args, variables, result
+
+
+@pytest.mark.parametrize(
+    "quantization, tolerance", [("float32", 1e-4), ("float16", 1e-2), ("int8", 5e-2)]
+)
+def test_numpy_net_matches_jax_net(tmp_path, reference, quantization, tolerance):
+    # Arrange
+    args, variables, expected = reference
+
+    # Act
+    net = export(tmp_path / "model.npz", variables, quantization)
+    result = net(args)
+
+    # Assert
+    error = np.linalg.norm(result - expected) / np.linalg.norm(expected)
+    assert error < tolerance
+
+
+def test_quantized_weights_files_are_smaller(tmp_path, reference):
+    # Arrange
+    _, variables, _ = reference
+
+    # Act
+    nbytes = {}
+    for quantization in net_numpy.QUANTIZATIONS:
+        path = tmp_path / f"{quantization}.npz"
+        export(path, variables, quantization)
+        nbytes[quantization] = os.path.getsize(path)
+
+    # Assert
+    assert nbytes["int8"] < 0.3 * nbytes["float32"]
+    assert nbytes["float16"] < 0.55 * nbytes["float32"]
+
+
+def test_numpy_net_loads_without_flax_and_torch(tmp_path, reference):
+    # Arrange
+    _, variables, _ = reference
+    path = tmp_path / "model.npz"
+    export(path, variables, "int8")
+    environment = {**os.environ, "PYTHONPATH": os.getcwd()}
+
+    # Act
+    result = subprocess.run(
+        [sys.executable, "-c", NO_HEAVY_IMPORTS_SCRIPT, str(path)],
+        env=environment,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+
+    # Assert
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip().endswith("OK")
+
+
+def test_zero_variance_feature_matches_jax_net(tmp_path):
+    # Arrange
+    random = np.random.default_rng(0)
+    args = get_random_args(random, sparse_nodes=20, dense_nodes=60)
+    args.dense_x[:, 0] = 0.0
+    statistics = get_statistics(args)
+    assert statistics["dense_nodes"].std[0] == 0.0
+    net = CustomGraphNetJax(statistics=statistics)
+    params, batch_stats = net.get_params(args, jax.random.PRNGKey(0))
+    variables = {"params": params, "batch_stats": batch_stats}
+    expected = np.array(net.apply(variables, args, train=False))
+
+    # Act
+    result = export(tmp_path / "model.npz", variables, "float32")(args)
+
+    # Assert
+    assert np.all(np.isfinite(expected))
+    error = np.linalg.norm(result - expected) / np.linalg.norm(expected)
+    assert error < 1e-4
+
+
+def test_unsupported_layer_export_raises_value_error():
+    # Act, Assert
+    with pytest.raises(ValueError, match="BatchNorm_0"):
+        net_numpy.get_engine_name("BatchNorm_0/scale", message_passes_sparse=1)
+
+
+def test_export_with_other_message_passes_raises_value_error(tmp_path, reference):
+    # Arrange
+    _, variables, _ = reference
+    net = CustomGraphNetJax()
+
+    # Act, Assert
+    with pytest.raises(ValueError, match="message passing layers"):
+        net_numpy.export_weights(
+            tmp_path / "model.npz",
+            variables=variables,
+            message_passes_sparse=net.message_passes_sparse + 1,
+            message_passes_dense=net.message_passes_dense,
+            closest_count=CLOSEST_COUNT,
+        )
@@ -0,0 +1,94 @@
+import jax
+import numpy as np
+import pytest
+
+from deep_conmech.data.dataset_statistics import StreamingStatistics
+from deep_conmech.graph import padding
+from deep_conmech.graph.model_jax import RMSE
+from deep_conmech.graph.net_jax import CustomGraphNetJax, GraphNetArguments
+from deep_conmech.training_config import CLOSEST_COUNT
+
+
+def get_edge_index(random, nodes_from: int, nodes_to: int, count: int):
+    return np.vstack(
+        (random.integers(0, nodes_from, count), random.integers(0, nodes_to, count))
+    )
+
+
+def get_random_args(random, sparse_nodes: int, dense_nodes: int):
+    sparse_edges, dense_edges = 6 * sparse_nodes, 6 * dense_nodes
+    multilayer_edge_index = np.vstack(
+        (
+            random.integers(0, sparse_nodes, dense_nodes * CLOSEST_COUNT),
+            np.repeat(np.arange(dense_nodes), CLOSEST_COUNT),
+        )
+    )
+    return GraphNetArguments(
+        sparse_x=random.normal(size=(sparse_nodes, 4)).astype(np.float32),
+        sparse_edge_attr=random.normal(size=(sparse_edges, 12)).astype(np.float32),
+        dense_x=random.normal(size=(dense_nodes, 4)).astype(np.float32),
+        dense_edge_attr=random.normal(size=(dense_edges, 4)).astype(np.float32),
+        multilayer_edge_attr=random.normal(
+            size=(dense_nodes * CLOSEST_COUNT, 4)
+        ).astype(np.float32),
+        sparse_edge_index=get_edge_index(
+            random, sparse_nodes, sparse_nodes, sparse_edges
+        ),
+        dense_edge_index=get_edge_index(random, dense_nodes, dense_nodes, dense_edges),
+        multilayer_edge_index=multilayer_edge_index,
+    )
+
+
+def get_statistics(args: GraphNetArguments):
+    return {
+        label: StreamingStatistics(label=label).update(data)
+        for label, data in [
+            ("sparse_nodes", args.sparse_x),
+            ("sparse_edges", args.sparse_edge_attr),
+            ("multilayer_edges", args.multilayer_edge_attr),
+            ("dense_nodes", args.dense_x),
+            ("dense_edges", args.dense_edge_attr),
+        ]
+    }
+
+
+@pytest.mark.parametrize("growth", [1.1, 1.25, 2.0])
+def test_bucket_size_bounds_padding(growth):
+    # Arrange
+    sizes = range(1, 5000)
+
+    # Act
+    buckets = [padding.get_bucket_size(size, growth=growth) for size in sizes]
+
+    # Assert
+    for size, bucket in zip(sizes, buckets):
+        assert size <= bucket <= max(padding.MINIMUM_BUCKET_SIZE, growth * size + 1)
+    assert buckets == sorted(buckets)
+    assert (
+        len(set(buckets))
+        <= np.log(5000 / padding.MINIMUM_BUCKET_SIZE) / np.log(growth) + 2
+    )
+
+
+def test_padded_graph_gives_same_output_and_loss():
+    # Arrange
+    random = np.random.default_rng(0)
+    args = get_random_args(random, sparse_nodes=20, dense_nodes=50)
+    target = random.normal(size=(50, 3)).astype(np.float32)
+    net = CustomGraphNetJax(statistics=get_statistics(args))
+    params, batch_stats = net.get_params(args, jax.random.PRNGKey(0))
+    variables = {"params": params, "batch_stats": batch_stats}
+
+    # Act
+    [padded_args], [padded_target] = padding.pad_batch([args], [target], growth=1.25)
+    result = CustomGraphNetJax().apply(variables, args, train=False)
+    padded_result = CustomGraphNetJax().apply(variables, padded_args, train=False)
+
+    # Assert
+    assert len(padded_args.dense_x) == padding.MINIMUM_BUCKET_SIZE
+    np.testing.assert_allclose(padded_result[:50], result, rtol=1e-5, atol=1e-5)
+    np.testing.assert_allclose(
+        RMSE(padded_result, padded_target, padded_args.dense_nodes_mask),
+        RMSE(result, target),
+        rtol=1e-5,
+    )
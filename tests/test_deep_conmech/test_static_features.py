@@ -0,0 +1,63 @@
+import numpy as np
+import torch
+
+from conmech.scenarios.scenarios import cube_rotate_3d
+from deep_conmech.graph.model_jax import GraphModelDynamicJax
+from deep_conmech.scene.scene_input import StaticFeatures
+from deep_conmech.training_config import get_train_config
+
+
+def get_scene():
+    config = get_train_config(shell=False, mode="net")
+    scenario = cube_rotate_3d(
+        mesh_density=8, scale=1, final_time=0.1, simulation_config=config.sc
+    )
+    scene = GraphModelDynamicJax.get_scene_function(scenario=scenario, config=config)
+    scene.reduced.exact_acceleration = np.zeros_like(scene.reduced.initial_nodes)
+    return scene
+
+
+def move(scene, seed: int):
+    random = np.random.default_rng(seed)
+    for mesh in [scene, scene.reduced]:
+        mesh.set_displacement_old(0.01 * random.normal(size=mesh.initial_nodes.shape))
+        mesh.set_velocity_old(0.1 * random.normal(size=mesh.initial_nodes.shape))
+
+
+def get_features(scene):
+    return [scene.get_features_data(layer_number=i) for i in range(2)]
+
+
+def test_cached_features_match_recomputed_features():
+    # Arrange
+    scene = get_scene()
+    move(scene, seed=0)
+    get_features(scene)  # fills cache
+    move(scene, seed=1)
+
+    # Act
+    features = get_features(scene)
+    scene.static_features = StaticFeatures()
+    expected_features = get_features(scene)
+
+    # Assert
+    for layer, expected_layer in zip(features, expected_features):
+        assert set(layer.keys) == set(expected_layer.keys)
+        for key in expected_layer.keys:
+            torch.testing.assert_close(layer[key], expected_layer[key])
+
+
+def test_static_features_are_computed_once():
+    # Arrange
+    scene = get_scene()
+    get_features(scene)
+    nbytes = scene.static_features.nbytes
+
+    # Act
+    move(scene, seed=0)
+    features = get_features(scene)
+
+    # Assert
+    assert nbytes > 0
+    assert scene.static_features.nbytes == nbytes
+    assert features[0].edge_attr is scene.static_features.features["layer_0.edge_attr"]